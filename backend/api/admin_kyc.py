@@ -1,15 +1,27 @@
 """
 Admin KYC API endpoints for compliance team
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime
+from typing import Tuple
+import base64
+import binascii
 import logging
+import os
+from sqlalchemy.orm import joinedload, undefer
 from database import db
-from models import User, KYCDocument, KYCWorkflow
+from models import User, KYCDocument, KYCWorkflow, KYCReviewSummary
 from models.user import KYCStatus, RiskLevel, SanctionsCheckStatus
-from models.kyc_document import VerificationStatus
+from models.kyc_document import VerificationStatus, ProcessingStatus
 from models.kyc_workflow import WorkflowStep, WorkflowStatus
-from services.sanctions_checker import SanctionsChecker
+from services.sanctions_checker import SanctionsChecker, list_loader
+from services.sanctions_rescreening import sanctions_rescreening
+from services.eu_ets_verifier import EUETSVerifier, registry_verifier
+from services.review_queue import review_queue, QUEUE_STATUSES
+from config import Config
+from services.document_validator import DocumentValidator
+from services.document_processor import document_processor, PAGE_SEPARATOR
+from services.document_preview import document_previews, PreviewUnavailableError
 from utils.helpers import generate_uuid, require_auth, require_admin, standard_error_response
 from utils.validators import validate_uuid
 from utils.serializers import to_camel_case
@@ -19,6 +31,18 @@ logger = logging.getLogger(__name__)
 admin_kyc_bp = Blueprint('admin_kyc', __name__, url_prefix='/api/admin/kyc')
 
 
+def _review_dict(document: KYCDocument) -> dict:
+    """
+    Document data for reviewers, with the expiry check computed from the
+    precomputed document date (the file itself is not opened)
+    """
+    is_valid, days_old, error = DocumentValidator.check_document_expiry(
+        document.document_type.value if document.document_type else None,
+        document_date=document.document_date
+    )
+    data = document.to_dict(camel_case=True)
+    data['expiryCheck'] = {'isValid': is_valid, 'daysOld': days_old, 'error': error}
+    return data
 
 
 @admin_kyc_bp.route('/pending', methods=['GET'])
@@ -51,9 +75,7 @@ def list_pending():
                 pass
         
         # Get pending or in_review users
-        query = query.filter(
-            User.kyc_status.in_([KYCStatus.PENDING, KYCStatus.IN_REVIEW, KYCStatus.NEEDS_UPDATE])
-        )
+        query = query.filter(User.kyc_status.in_(QUEUE_STATUSES))
         
         pagination = query.paginate(page=page, per_page=per_page, error_out=False)
         
@@ -72,6 +94,103 @@ def list_pending():
         return standard_error_response('Failed to list pending KYC dossiers', 'LIST_ERROR', 500)
 
 
+def _encode_queue_cursor(summary: KYCReviewSummary) -> str:
+    """Opaque keyset cursor (queued_at, user_id) of the last dossier on a page"""
+    raw = f"{summary.queued_at.isoformat()}|{summary.user_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def _decode_queue_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inverse of _encode_queue_cursor (ValueError if malformed)"""
+    try:
+        queued_at, user_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|', 1)
+        return datetime.fromisoformat(queued_at), user_id
+    except (UnicodeError, binascii.Error, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+@admin_kyc_bp.route('/queue', methods=['GET'])
+@require_admin
+def get_review_queue():
+    """
+    Review queue: pending, in-review and needs-update dossiers, longest
+    waiting first, from the precomputed dossier summaries (one query per page).
+    
+    Query params:
+        status: Only this queue status (pending, in_review, needs_update)
+        risk_level: Only this risk level
+        limit: Page size (default: REVIEW_QUEUE_PAGE_SIZE, max: REVIEW_QUEUE_MAX_PAGE_SIZE)
+        cursor: nextCursor of the previous page
+    
+    Response:
+        {
+            "dossiers": [
+                {
+                    "userId": string,
+                    "username": string,
+                    "companyName": string | null,
+                    "kycStatus": string,
+                    "riskLevel": string,
+                    "queuedAt": string,
+                    "ageInQueueHours": number,
+                    "documentCounts": {documentType: number},
+                    "documentTotal": number,
+                    "unverifiedDocuments": number,
+                    "rejectedDocuments": number,
+                    "missingDocuments": [documentType],
+                    "riskFlags": [string]
+                }
+            ],
+            "nextCursor": string | null,
+            "hasMore": boolean
+        }
+    """
+    try:
+        try:
+            limit = int(request.args.get('limit', Config.REVIEW_QUEUE_PAGE_SIZE))
+        except (TypeError, ValueError):
+            return standard_error_response('limit must be an integer', 'INVALID_LIMIT', 400)
+        limit = max(1, min(limit, Config.REVIEW_QUEUE_MAX_PAGE_SIZE))
+        
+        status = None
+        if request.args.get('status'):
+            try:
+                status = KYCStatus(request.args['status'])
+            except ValueError:
+                status = None
+            if status not in QUEUE_STATUSES:
+                return standard_error_response('status must be pending, in_review or needs_update',
+                                               'INVALID_STATUS', 400)
+        
+        risk_level = None
+        if request.args.get('risk_level'):
+            try:
+                risk_level = RiskLevel(request.args['risk_level'])
+            except ValueError:
+                return standard_error_response('Invalid risk_level', 'INVALID_RISK_LEVEL', 400)
+        
+        after = None
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                after = _decode_queue_cursor(cursor)
+            except ValueError:
+                return standard_error_response('Invalid cursor', 'INVALID_CURSOR', 400)
+        
+        summaries, has_more = review_queue.page(limit, after=after, status=status, risk_level=risk_level)
+        now = datetime.utcnow()
+        
+        return jsonify({
+            'dossiers': [summary.to_dict(camel_case=True, now=now) for summary in summaries],
+            'nextCursor': _encode_queue_cursor(summaries[-1]) if has_more else None,
+            'hasMore': has_more
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error listing review queue: {e}", exc_info=True)
+        return standard_error_response('Failed to list review queue', 'QUEUE_ERROR', 500)
+
+
 @admin_kyc_bp.route('/<user_id>', methods=['GET'])
 @require_admin
 def get_kyc_details(user_id):
@@ -81,17 +200,17 @@ def get_kyc_details(user_id):
         if not validate_uuid(user_id):
             return standard_error_response('Invalid user ID format', 'INVALID_USER_ID', 400)
         
-        user = User.query.filter_by(id=user_id).first()
+        # User, documents and workflow in one query
+        user = User.query.options(
+            joinedload(User.documents), joinedload(User.workflow)
+        ).filter_by(id=user_id).first()
         if not user:
             return standard_error_response('User not found', 'USER_NOT_FOUND', 404)
         
-        documents = KYCDocument.query.filter_by(user_id=user_id).all()
-        workflow = KYCWorkflow.query.filter_by(user_id=user_id).first()
-        
         return jsonify({
             'user': user.to_dict(camel_case=True),
-            'documents': [doc.to_dict(camel_case=True) for doc in documents],
-            'workflow': workflow.to_dict(camel_case=True) if workflow else None
+            'documents': [_review_dict(doc) for doc in user.documents],
+            'workflow': user.workflow.to_dict(camel_case=True) if user.workflow else None
         }), 200
         
     except Exception as e:
@@ -131,6 +250,7 @@ def approve_kyc(user_id):
             workflow.completed_at = datetime.utcnow()
             workflow.assigned_reviewer = admin_id
         
+        review_queue.refresh(user_id)
         db.session.commit()
         
         return jsonify({
@@ -181,6 +301,7 @@ def reject_kyc(user_id):
             workflow.assigned_reviewer = admin_id
             workflow.notes = data.get('notes', data['reason'])
         
+        review_queue.refresh(user_id)
         db.session.commit()
         
         return jsonify({
@@ -230,6 +351,7 @@ def request_update(user_id):
             workflow.notes = data.get('notes', '')
             workflow.workflow_data['required_documents'] = data['required_documents']
         
+        review_queue.refresh(user_id)
         db.session.commit()
         
         return jsonify({
@@ -270,6 +392,7 @@ def verify_document(user_id, document_id):
         else:
             return standard_error_response('Invalid action. Use "verify" or "reject"', 'INVALID_ACTION', 400)
         
+        review_queue.refresh(user_id)
         db.session.commit()
         
         return jsonify({
@@ -296,6 +419,11 @@ def run_sanctions_check(user_id):
         if not user:
             return standard_error_response('User not found', 'USER_NOT_FOUND', 404)
         
+        # A check against missing lists would clear anyone
+        unavailable = SanctionsChecker.lists_unavailable()
+        if unavailable:
+            return standard_error_response(unavailable, 'SANCTIONS_LISTS_UNAVAILABLE', 503)
+        
         # Run sanctions check
         sanctions_result = SanctionsChecker.check_sanctions(
             name=user.company_name or user.username,
@@ -305,17 +433,23 @@ def run_sanctions_check(user_id):
         # Update user
         user.sanctions_check_status = SanctionsCheckStatus.CLEARED if not sanctions_result['sanctions_match'] else SanctionsCheckStatus.FLAGGED
         user.sanctions_check_date = datetime.utcnow()
+        user.sanctions_list_version = SanctionsChecker.list_version()
         user.pep_status = sanctions_result['pep_match']
         user.risk_level = RiskLevel(sanctions_result['risk_level'])
         
         # Check beneficial owners if available
         if user.beneficial_owners:
             beneficial_owners_result = SanctionsChecker.check_beneficial_owners(user.beneficial_owners)
+            if beneficial_owners_result['sanctions_matches']:
+                user.sanctions_check_status = SanctionsCheckStatus.FLAGGED
+            if beneficial_owners_result['pep_matches']:
+                user.pep_status = True
             if beneficial_owners_result['risk_level'] == 'high':
                 user.risk_level = RiskLevel.HIGH
             elif beneficial_owners_result['risk_level'] == 'medium' and user.risk_level == RiskLevel.LOW:
                 user.risk_level = RiskLevel.MEDIUM
         
+        review_queue.refresh(user_id)
         db.session.commit()
         
         return jsonify({
@@ -330,6 +464,114 @@ def run_sanctions_check(user_id):
         return standard_error_response('Failed to run sanctions check', 'SANCTIONS_CHECK_ERROR', 500)
 
 
+@admin_kyc_bp.route('/rescreen', methods=['POST'])
+@require_admin
+def start_rescreening():
+    """
+    Rescreen all users and their beneficial owners in the background
+    
+    Users already screened against the current list version are skipped
+    unless "force" is true.
+    """
+    try:
+        unavailable = SanctionsChecker.lists_unavailable()
+        if unavailable:
+            return standard_error_response(unavailable, 'SANCTIONS_LISTS_UNAVAILABLE', 503)
+        
+        data = request.get_json(silent=True) or {}
+        if not sanctions_rescreening.start(current_app._get_current_object(), force=bool(data.get('force'))):
+            return standard_error_response('Sanctions rescreening is already running', 'RESCREENING_RUNNING', 409)
+        
+        return jsonify({
+            'message': 'Sanctions rescreening started',
+            'listVersion': SanctionsChecker.list_version()
+        }), 202
+        
+    except Exception as e:
+        logger.error(f"Error starting sanctions rescreening: {e}", exc_info=True)
+        return standard_error_response('Failed to start sanctions rescreening', 'RESCREENING_ERROR', 500)
+
+
+@admin_kyc_bp.route('/sanctions-lists/sync', methods=['POST'])
+@require_admin
+def sync_sanctions_lists():
+    """
+    Apply changes in the sanctions/PEP list files to the screening index
+    
+    Only added, changed and removed entries are applied; screening keeps
+    running meanwhile. "force" parses the files even if they look unchanged;
+    "accept_removals" applies a sync removing more than
+    SANCTIONS_MAX_REMOVAL_SHARE of the entries (refused otherwise).
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        result = SanctionsChecker.load_lists(force=bool(data.get('force')),
+                                             accept_removals=bool(data.get('accept_removals')))
+        
+        return jsonify({
+            'message': 'Sanctions lists synced' if not result.errors else 'Sanctions lists synced with errors',
+            'result': to_camel_case(dict(result._asdict(), changed=result.changed)),
+            'status': to_camel_case(list_loader.get_stats())
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error syncing sanctions lists: {e}", exc_info=True)
+        return standard_error_response('Failed to sync sanctions lists', 'SANCTIONS_LIST_SYNC_ERROR', 500)
+
+
+@admin_kyc_bp.route('/sanctions-lists', methods=['GET'])
+@require_admin
+def get_sanctions_lists_status():
+    """Loaded list version, entry count, last sync changes and the snapshot restored at startup"""
+    SanctionsChecker.get_index()
+    return jsonify(to_camel_case(list_loader.get_stats())), 200
+
+
+@admin_kyc_bp.route('/rescreen/status', methods=['GET'])
+@require_admin
+def get_rescreening_status():
+    """Rescreening progress: last run counts, duration and the current list version"""
+    return jsonify(to_camel_case(sanctions_rescreening.get_stats())), 200
+
+
+@admin_kyc_bp.route('/eu-ets-verify/batch', methods=['POST'])
+@require_admin
+def verify_eu_ets_batch():
+    """
+    Verify several EU ETS Registry accounts at once
+    
+    Accounts are grouped by country registry and looked up in parallel;
+    cached results are reused unless "refresh" is true.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        accounts = data.get('accounts')
+        if not isinstance(accounts, list) or not accounts:
+            return standard_error_response('accounts must be a non-empty list', 'MISSING_ACCOUNTS', 400)
+        if len(accounts) > Config.EU_ETS_BATCH_MAX_ACCOUNTS:
+            return standard_error_response(
+                f'At most {Config.EU_ETS_BATCH_MAX_ACCOUNTS} accounts per request', 'TOO_MANY_ACCOUNTS', 400
+            )
+        if not all(isinstance(account, dict) for account in accounts):
+            return standard_error_response('Each account needs account_number and country', 'INVALID_ACCOUNTS', 400)
+        
+        results = EUETSVerifier.verify_registry_accounts(
+            [(account.get('account_number'), account.get('country')) for account in accounts],
+            refresh=bool(data.get('refresh'))
+        )
+        
+        return jsonify({
+            'message': 'EU ETS Registry verification completed',
+            'verifications': to_camel_case(results),
+            'stats': to_camel_case(registry_verifier.get_stats())
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error verifying EU ETS accounts: {e}", exc_info=True)
+        return standard_error_response('Failed to verify EU ETS Registry accounts', 'VERIFY_ERROR', 500)
+
+
 @admin_kyc_bp.route('/<user_id>/set-risk-level', methods=['POST'])
 @require_admin
 def set_risk_level(user_id):
@@ -355,6 +597,7 @@ def set_risk_level(user_id):
             return standard_error_response('User not found', 'USER_NOT_FOUND', 404)
         
         user.risk_level = risk_level
+        review_queue.refresh(user_id)
         db.session.commit()
         
         return jsonify({
@@ -367,3 +610,99 @@ def set_risk_level(user_id):
         logger.error(f"Error setting risk level: {e}", exc_info=True)
         return standard_error_response('Failed to set risk level', 'SET_RISK_LEVEL_ERROR', 500)
 
+
+@admin_kyc_bp.route('/<user_id>/documents/<document_id>/analysis', methods=['GET'])
+@require_admin
+def get_document_analysis(user_id, document_id):
+    """
+    Background processing results of a document: extracted text per page,
+    dates, registration numbers and the expiry check
+    """
+    try:
+        document = (
+            KYCDocument.query
+            .options(undefer(KYCDocument.extracted_text))
+            .filter_by(id=document_id, user_id=user_id)
+            .first()
+        )
+        if not document:
+            return standard_error_response('Document not found', 'DOCUMENT_NOT_FOUND', 404)
+        
+        data = _review_dict(document)
+        data['pages'] = document.extracted_text.split(PAGE_SEPARATOR) if document.extracted_text else []
+        return jsonify({'document': data}), 200
+        
+    except Exception as e:
+        logger.error(f"Error getting document analysis: {e}", exc_info=True)
+        return standard_error_response('Failed to get document analysis', 'ANALYSIS_ERROR', 500)
+
+
+@admin_kyc_bp.route('/<user_id>/documents/<document_id>/thumbnail', methods=['GET'])
+@require_admin
+def get_document_thumbnail(user_id, document_id):
+    """JPEG thumbnail of a document's first page, served from the preview cache"""
+    try:
+        document = KYCDocument.query.filter_by(id=document_id, user_id=user_id).first()
+        if not document:
+            return standard_error_response('Document not found', 'DOCUMENT_NOT_FOUND', 404)
+        if not document.page_count:
+            return standard_error_response('Thumbnail not available', 'THUMBNAIL_UNAVAILABLE', 404)
+        if not document.file_path or not os.path.exists(document.file_path):
+            return standard_error_response('File not found', 'FILE_NOT_FOUND', 404)
+        return document_previews.send(document, document_previews.bound_size(Config.DOCUMENT_THUMBNAIL_SIZE))
+        
+    except PreviewUnavailableError:
+        return standard_error_response('Thumbnail not available', 'THUMBNAIL_UNAVAILABLE', 404)
+    except Exception as e:
+        logger.error(f"Error getting document thumbnail: {e}", exc_info=True)
+        return standard_error_response('Failed to get thumbnail', 'THUMBNAIL_ERROR', 500)
+
+
+@admin_kyc_bp.route('/<user_id>/documents/<document_id>/preview', methods=['GET'])
+@require_admin
+def get_document_preview(user_id, document_id):
+    """Cached JPEG/WebP preview of an image or PDF document (query: size, format)"""
+    try:
+        document = KYCDocument.query.filter_by(id=document_id, user_id=user_id).first()
+        if not document:
+            return standard_error_response('Document not found', 'DOCUMENT_NOT_FOUND', 404)
+        try:
+            size, fmt = document_previews.options_from(request.args)
+        except ValueError as e:
+            return standard_error_response(str(e), 'INVALID_PREVIEW_OPTIONS', 400)
+        if not document.file_path or not os.path.exists(document.file_path):
+            return standard_error_response('File not found', 'FILE_NOT_FOUND', 404)
+        return document_previews.send(document, size, fmt)
+        
+    except PreviewUnavailableError as e:
+        return standard_error_response(str(e), 'INVALID_FILE_TYPE', 400)
+    except Exception as e:
+        logger.error(f"Error previewing document: {e}", exc_info=True)
+        return standard_error_response('Failed to preview document', 'PREVIEW_ERROR', 500)
+
+
+@admin_kyc_bp.route('/<user_id>/documents/<document_id>/reprocess', methods=['POST'])
+@require_admin
+def reprocess_document(user_id, document_id):
+    """Queue a document for background processing again (e.g. after a failure)"""
+    try:
+        document = KYCDocument.query.filter_by(id=document_id, user_id=user_id).first()
+        if not document:
+            return standard_error_response('Document not found', 'DOCUMENT_NOT_FOUND', 404)
+        if document.processing_status == ProcessingStatus.PROCESSING:
+            return standard_error_response('Document is being processed', 'PROCESSING_IN_PROGRESS', 409)
+        
+        document.processing_status = ProcessingStatus.PENDING
+        document.processing_error = None
+        db.session.commit()
+        document_processor.enqueue(document.id)
+        
+        return jsonify({
+            'message': 'Document queued for processing',
+            'document': document.to_dict(camel_case=True)
+        }), 202
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error queueing document for processing: {e}", exc_info=True)
+        return standard_error_response('Failed to queue document', 'REPROCESS_ERROR', 500)
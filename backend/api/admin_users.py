@@ -11,6 +11,10 @@ from models.user import KYCStatus, RiskLevel
 from utils.helpers import require_admin, standard_error_response, generate_uuid
 from utils.validators import validate_email
 from utils.serializers import to_camel_case
+from utils.identity import invalidate_user_identity
+from services.document_store import document_store
+from services.document_preview import document_previews
+from services.review_queue import review_queue
 
 logger = logging.getLogger(__name__)
 
@@ -110,6 +114,7 @@ def create_user():
         )
         
         db.session.add(user)
+        review_queue.refresh(user.id)
         db.session.commit()
         
         # Audit log: User creation
@@ -241,7 +246,9 @@ def update_user(user_id: str):
         
         user.updated_at = datetime.utcnow()
         
+        review_queue.refresh(user_id)
         db.session.commit()
+        invalidate_user_identity(user_id)
         
         # Audit log: User update
         admin_id = request.admin_id
@@ -277,8 +284,20 @@ def delete_user(user_id: str):
         deleted_username = user.username
         deleted_email = user.email
         
+        # KYC documents are deleted with the user; drop their blob references
+        document_ids = [document.id for document in user.documents]
+        unreferenced_blobs = [
+            (document.sha256, document_store.release(document.sha256))
+            for document in user.documents if document.sha256
+        ]
+        
         db.session.delete(user)
         db.session.commit()
+        invalidate_user_identity(user_id)
+        for sha256, path in unreferenced_blobs:
+            document_store.remove_unreferenced(sha256, path)
+        for document_id in document_ids:
+            document_previews.invalidate(document_id)
         
         # Audit log: User deletion
         admin_id = request.admin_id
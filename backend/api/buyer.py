@@ -6,9 +6,12 @@ from flask import Blueprint, request, jsonify
 from database import db
 from models import (
     Listing, ListingStatus, DemandListing, DemandStatus, IntendedUse,
-    User, UserRole
+    UserRole
 )
 from utils.helpers import require_auth, standard_error_response
+from utils.identity import ensure_buyer_code, get_user_identity, is_admin_user, invalidate_user_identity
+from utils.bulk import parse_batch_payload, build_batch_rows, bulk_insert, batch_response_status
+from config import Config
 from datetime import datetime, timedelta
 import uuid
 
@@ -21,13 +24,13 @@ def browse_offerings():
     """Browse CEA offerings (anonymized)"""
     try:
         user_id = request.headers.get('X-User-ID')
-        user = User.query.get(user_id)
+        user = get_user_identity(user_id)
         
         if not user:
             return standard_error_response('User not found', 'USER_NOT_FOUND'), 404
         
         # Verify user is a buyer
-        if user.role != UserRole.CEA_BUYER and not user.is_admin:
+        if user.role != UserRole.CEA_BUYER and not is_admin_user(user_id):
             return standard_error_response('Access denied. Buyer role required.', 'ACCESS_DENIED'), 403
         
         # Get query parameters for filtering
@@ -78,13 +81,13 @@ def search_offerings():
     """Advanced search for CEA offerings"""
     try:
         user_id = request.headers.get('X-User-ID')
-        user = User.query.get(user_id)
+        user = get_user_identity(user_id)
         
         if not user:
             return standard_error_response('User not found', 'USER_NOT_FOUND'), 404
         
         # Verify user is a buyer
-        if user.role != UserRole.CEA_BUYER and not user.is_admin:
+        if user.role != UserRole.CEA_BUYER and not is_admin_user(user_id):
             return standard_error_response('Access denied. Buyer role required.', 'ACCESS_DENIED'), 403
         
         data = request.get_json() or {}
@@ -128,55 +131,82 @@ def search_offerings():
         return standard_error_response(f'Error searching offerings: {str(e)}', 'SEARCH_OFFERINGS_ERROR'), 500
 
 
+def _demand_row(data, user_id, buyer_code, now):
+    """
+    Validate demand input and build a demand_listings row.
+
+    Returns:
+        Tuple of (row dict, None) or (None, (error message, error code))
+    """
+    required_fields = ['volume_needed', 'max_price', 'currency', 'timeline']
+    for field in required_fields:
+        if field not in data:
+            return None, (f'Missing required field: {field}', f'MISSING_{field.upper()}')
+
+    try:
+        volume_needed = int(data['volume_needed'])
+        max_price = float(data['max_price'])
+    except (TypeError, ValueError):
+        return None, ('Invalid numeric value', 'INVALID_VALUE')
+
+    if volume_needed <= 0 or max_price <= 0:
+        return None, ('Volume and price must be positive', 'INVALID_VALUE')
+
+    try:
+        intended_use = IntendedUse(data['intended_use']) if data.get('intended_use') else None
+    except ValueError:
+        return None, (f'Invalid intended use: {data["intended_use"]}', 'INVALID_INTENDED_USE')
+
+    return {
+        'id': str(uuid.uuid4()),
+        'buyer_id': user_id,
+        'buyer_code': buyer_code,
+        'volume_needed': volume_needed,
+        'max_price': max_price,
+        'currency': data['currency'],
+        'intended_use': intended_use,
+        'timeline': data['timeline'],
+        'seller_preferences': data.get('seller_preferences'),
+        'status': DemandStatus.ACTIVE,
+        'created_at': now,
+        'updated_at': now,
+        'expires_at': now + timedelta(days=30) if data.get('expires_at') is None else None
+    }, None
+
+
 @buyer_bp.route('/demand', methods=['POST'])
 @require_auth
 def post_demand():
     """Post a demand listing"""
     try:
         user_id = request.headers.get('X-User-ID')
-        user = User.query.get(user_id)
+        user = get_user_identity(user_id)
         
         if not user:
             return standard_error_response('User not found', 'USER_NOT_FOUND'), 404
         
         # Verify user is a buyer
-        if user.role != UserRole.CEA_BUYER and not user.is_admin:
+        if user.role != UserRole.CEA_BUYER and not is_admin_user(user_id):
             return standard_error_response('Access denied. Buyer role required.', 'ACCESS_DENIED'), 403
         
-        # Generate buyer code if not exists
-        if not user.buyer_code:
-            import random
-            code_number = random.randint(1000, 9999)
-            user.buyer_code = f"BUYER-EU-{code_number}"
-            db.session.commit()
-        
         data = request.get_json()
         if not data:
             return standard_error_response('Request body required', 'MISSING_BODY'), 400
         
-        # Validate required fields
-        required_fields = ['volume_needed', 'max_price', 'currency', 'timeline']
-        for field in required_fields:
-            if field not in data:
-                return standard_error_response(f'Missing required field: {field}', f'MISSING_{field.upper()}'), 400
+        row, error = _demand_row(data, user_id, None, datetime.utcnow())
+        if error:
+            return standard_error_response(error[0], error[1], 400)
+        
+        # Generate buyer code if not exists
+        row['buyer_code'], code_assigned = ensure_buyer_code(user_id, user)
         
         # Create demand listing
-        demand = DemandListing(
-            id=str(uuid.uuid4()),
-            buyer_id=user_id,
-            buyer_code=user.buyer_code,
-            volume_needed=int(data['volume_needed']),
-            max_price=float(data['max_price']),
-            currency=data['currency'],
-            intended_use=IntendedUse(data['intended_use']) if data.get('intended_use') else None,
-            timeline=data['timeline'],
-            seller_preferences=data.get('seller_preferences'),
-            status=DemandStatus.ACTIVE,
-            expires_at=datetime.utcnow() + timedelta(days=30) if data.get('expires_at') is None else None
-        )
+        demand = DemandListing(**row)
         
         db.session.add(demand)
         db.session.commit()
+        if code_assigned:
+            invalidate_user_identity(user_id)
         
         return jsonify(demand.to_dict(camel_case=True)), 201
         
@@ -185,19 +215,79 @@ def post_demand():
         return standard_error_response(f'Error posting demand: {str(e)}', 'POST_DEMAND_ERROR'), 500
 
 
+@buyer_bp.route('/demand/batch', methods=['POST'])
+@require_auth
+def post_demand_batch():
+    """
+    Post many demand listings in one request.
+    
+    Body is a JSON array, {"demands": [...]} or NDJSON. All items are
+    validated first; valid ones are inserted in a single transaction with one
+    bulk INSERT and invalid ones are reported per index.
+    """
+    try:
+        user_id = request.headers.get('X-User-ID')
+        user = get_user_identity(user_id)
+        
+        if not user:
+            return standard_error_response('User not found', 'USER_NOT_FOUND', 404)
+        
+        # Verify user is a buyer
+        if user.role != UserRole.CEA_BUYER and not is_admin_user(user_id):
+            return standard_error_response('Access denied. Buyer role required.', 'ACCESS_DENIED', 403)
+        
+        items, parse_errors = parse_batch_payload('demands')
+        if items is None:
+            return standard_error_response('Request body must be a JSON array, {"demands": [...]} or NDJSON', 'INVALID_BATCH', 400)
+        if not items:
+            return standard_error_response('Batch is empty', 'EMPTY_BATCH', 400)
+        if len(items) > Config.BULK_MAX_ITEMS:
+            return standard_error_response(
+                f'Batch too large: {len(items)} items (max {Config.BULK_MAX_ITEMS})',
+                'BATCH_TOO_LARGE', 413
+            )
+        
+        now = datetime.utcnow()
+        rows, errors = build_batch_rows(
+            items, lambda data: _demand_row(data, user_id, None, now), parse_errors
+        )
+        
+        code_assigned = False
+        if rows:
+            buyer_code, code_assigned = ensure_buyer_code(user_id, user)
+            for _, row in rows:
+                row['buyer_code'] = buyer_code
+            bulk_insert(DemandListing, [row for _, row in rows])
+            db.session.commit()
+        if code_assigned:
+            invalidate_user_identity(user_id)
+        
+        return jsonify({
+            'created': [{'index': index, 'id': row['id']} for index, row in rows],
+            'errors': errors,
+            'total': len(items),
+            'createdCount': len(rows),
+            'errorCount': len(errors)
+        }), batch_response_status(len(rows), len(errors))
+        
+    except Exception as e:
+        db.session.rollback()
+        return standard_error_response(f'Error posting demands: {str(e)}', 'POST_DEMAND_BATCH_ERROR', 500)
+
+
 @buyer_bp.route('/demand', methods=['GET'])
 @require_auth
 def list_demand():
     """List buyer's demand listings"""
     try:
         user_id = request.headers.get('X-User-ID')
-        user = User.query.get(user_id)
+        user = get_user_identity(user_id)
         
         if not user:
             return standard_error_response('User not found', 'USER_NOT_FOUND'), 404
         
         # Verify user is a buyer
-        if user.role != UserRole.CEA_BUYER and not user.is_admin:
+        if user.role != UserRole.CEA_BUYER and not is_admin_user(user_id):
             return standard_error_response('Access denied. Buyer role required.', 'ACCESS_DENIED'), 403
         
         demands = DemandListing.query.filter_by(buyer_id=user_id).order_by(DemandListing.created_at.desc()).all()
@@ -217,13 +307,13 @@ def get_portfolio():
     """Get CEA portfolio holdings"""
     try:
         user_id = request.headers.get('X-User-ID')
-        user = User.query.get(user_id)
+        user = get_user_identity(user_id)
         
         if not user:
             return standard_error_response('User not found', 'USER_NOT_FOUND'), 404
         
         # Verify user is a buyer
-        if user.role != UserRole.CEA_BUYER and not user.is_admin:
+        if user.role != UserRole.CEA_BUYER and not is_admin_user(user_id):
             return standard_error_response('Access denied. Buyer role required.', 'ACCESS_DENIED'), 403
         
         from models import CEAPortfolio
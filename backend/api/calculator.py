@@ -4,22 +4,40 @@ Calculator API endpoints
 Provides endpoints for value calculation scenarios:
 - POST /api/calculator/seller-scenario - Calculate benefits for CEA sellers
 - POST /api/calculator/buyer-swap-scenario - Calculate benefits for swap buyers
+- POST /api/calculator/batch - Calculate many seller or swap scenarios at once
+- POST /api/calculator/grid - Sensitivity surface over volume x price x urgency/use case
+- POST /api/calculator/monte-carlo - Savings distribution and VaR from simulated prices
 - POST /api/calculator/scenarios - Save calculated scenario
-- GET /api/calculator/scenarios - List saved scenarios
+- GET /api/calculator/scenarios - List saved scenarios (cursor-paginated)
+- GET /api/calculator/scenarios/<id> - Get one saved scenario
 """
 
 from flask import Blueprint, request, jsonify
+from sqlalchemy import Text, and_, or_, type_coerce
+from sqlalchemy.orm import undefer_group
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+import base64
+import binascii
 import json
 import logging
 
+import numpy as np
+
+from config import Config
 from database import db
 from models.user import User
 from models.value_scenario import ValueScenario
-from services.value_calculator import ValueCalculatorService
+from services.value_calculator import ValueCalculatorService, URGENCY_LEVELS
 from services.swap_calculator import SwapCalculator
+from services.buyer_swap_calculator import (
+    BuyerSwapCalculator, USE_CASES, CEA_TO_EUA_FALLBACK_RATIO, LARGE_VOLUME_THRESHOLD
+)
+from services.monte_carlo import monte_carlo_engine, SCENARIO_TYPES
+from services.scenario_grid import scenario_grid_service, GRID_CATEGORY_AXIS, GRID_METRICS, DEFAULT_METRICS
+from utils.compliance_detector import ComplianceDetector
 from utils.helpers import require_auth, standard_error_response, generate_uuid
+from utils.serializers import to_camel_case, snake_to_camel
 from utils.validators import validate_uuid
 
 logger = logging.getLogger(__name__)
@@ -28,6 +46,7 @@ calculator_bp = Blueprint('calculator', __name__, url_prefix='/api/calculator')
 
 value_calculator_service = ValueCalculatorService()
 swap_calculator = SwapCalculator()
+buyer_swap_calculator = BuyerSwapCalculator()
 
 
 @calculator_bp.route('/seller-scenario', methods=['POST'])
@@ -190,84 +209,464 @@ def calculate_buyer_swap_scenario():
         # Get optional parameters
         cea_price = data.get('ceaPrice')
         swap_ratio = data.get('swapRatio')
-        use_case = data.get('useCase', 'compliance')
-        has_china_ops = data.get('hasChinaOperations', False)
         
-        # Calculate CEA price if not provided (estimate as 40% discount from EUA)
-        if cea_price is None:
-            cea_price = eua_price * 0.6
-        else:
-            cea_price = float(cea_price)
-        
-        # Calculate swap ratio if not provided
-        if swap_ratio is None:
-            from utils.compliance_detector import ComplianceDetector
-            compliance_detector = ComplianceDetector()
-            
-            market_conditions = {
-                'liquidity_premium': 0.1,
-                'compliance_adjustment': 0.2 if compliance_detector.is_compliance_period() else 0.0,
-                'volume_discount': 0.1 if eua_volume > 1000000 else 0.0
+        try:
+            cea_price = float(cea_price) if cea_price is not None else None
+            swap_ratio = float(swap_ratio) if swap_ratio is not None else None
+        except (ValueError, TypeError):
+            return standard_error_response('ceaPrice and swapRatio must be numbers', 'INVALID_TYPE', 400)
+        
+        result = buyer_swap_calculator.calculate_buyer_swap_benefits(
+            eua_volume=eua_volume,
+            eua_price=eua_price,
+            cea_price=cea_price,
+            swap_ratio=swap_ratio,
+            use_case=data.get('useCase', 'compliance'),
+            has_china_operations=data.get('hasChinaOperations', False)
+        )
+        result = to_camel_case(result)
+        
+        return jsonify(result), 200
+        
+    except Exception as e:
+        logger.error(f"Error calculating buyer swap scenario: {e}", exc_info=True)
+        return standard_error_response('Failed to calculate scenario', 'CALCULATION_ERROR', 500)
+
+
+class BatchInputError(ValueError):
+    """Invalid batch input; carries the error code for the response"""
+
+    def __init__(self, message: str, code: str, status: int = 400):
+        super().__init__(message)
+        self.code = code
+        self.status = status
+
+
+def _batch_size(inputs: Dict) -> int:
+    """Number of scenarios: the common length of all array inputs (1 if all scalars)"""
+    lengths = {len(value) for value in inputs.values() if isinstance(value, list)}
+    if len(lengths) > 1:
+        raise BatchInputError('All array inputs must have the same length', 'LENGTH_MISMATCH')
+    size = lengths.pop() if lengths else 1
+    if size == 0:
+        raise BatchInputError('inputs must contain at least one scenario', 'EMPTY_BATCH')
+    if size > Config.CALCULATOR_BATCH_MAX_SCENARIOS:
+        raise BatchInputError(
+            f'Batch exceeds {Config.CALCULATOR_BATCH_MAX_SCENARIOS} scenarios', 'BATCH_TOO_LARGE', 413
+        )
+    return size
+
+
+def _numeric_column(
+    inputs: Dict,
+    name: str,
+    size: int,
+    default: Optional[float] = None,
+    positive: bool = False
+) -> Optional[np.ndarray]:
+    """
+    Read a numeric input as an array of length size.
+
+    A scalar is broadcast to every scenario; None is returned if the input
+    is missing and has no default.
+    """
+    value = inputs.get(name, default)
+    if value is None:
+        return None
+    try:
+        column = np.broadcast_to(np.asarray(value, dtype=float), (size,))
+    except (TypeError, ValueError):
+        raise BatchInputError(f'{name} must be a number or an array of numbers', 'INVALID_TYPE')
+    invalid = ~np.isfinite(column)
+    if positive:
+        invalid |= column <= 0
+    if invalid.any():
+        index = int(np.argmax(invalid))
+        raise BatchInputError(
+            f'{name}[{index}] must be a {"positive " if positive else ""}finite number', 'INVALID_VALUE'
+        )
+    return column
+
+
+def _seller_batch(inputs: Dict, size: int) -> Dict[str, np.ndarray]:
+    """Seller scenarios (batch form of /seller-scenario)"""
+    volumes = _numeric_column(inputs, 'volume', size, positive=True)
+    current_prices = _numeric_column(inputs, 'currentPrice', size, positive=True)
+    if volumes is None:
+        raise BatchInputError('volume is required', 'MISSING_VOLUME')
+    if current_prices is None:
+        raise BatchInputError('currentPrice is required', 'MISSING_CURRENT_PRICE')
+
+    # Unknown urgencies fall back to normal, as in the single-scenario endpoint
+    urgencies = np.broadcast_to(np.asarray(inputs.get('urgency', 'normal'), dtype=object), (size,))
+    urgencies = np.where(np.isin(urgencies, URGENCY_LEVELS), urgencies, 'normal')
+
+    return value_calculator_service.calculate_seller_benefits_batch(volumes, current_prices, urgencies)
+
+
+def _swap_batch(inputs: Dict, size: int) -> Dict[str, np.ndarray]:
+    """EUA -> CEA swap scenarios (ratio and values)"""
+    eua_volumes = _numeric_column(inputs, 'euaVolume', size, positive=True)
+    eua_prices = _numeric_column(inputs, 'euaPrice', size, positive=True)
+    if eua_volumes is None:
+        raise BatchInputError('euaVolume is required', 'MISSING_EUA_VOLUME')
+    if eua_prices is None:
+        raise BatchInputError('euaPrice is required', 'MISSING_EUA_PRICE')
+
+    # Same defaults as /buyer-swap-scenario: CEA at a 40% discount, compliance
+    # adjustment from the calendar and a volume discount above LARGE_VOLUME_THRESHOLD EUA
+    cea_prices = _numeric_column(inputs, 'ceaPrice', size, positive=True)
+    if cea_prices is None:
+        cea_prices = eua_prices * CEA_TO_EUA_FALLBACK_RATIO
+    liquidity = _numeric_column(inputs, 'liquidityPremium', size, default=0.1)
+    compliance = _numeric_column(
+        inputs, 'complianceAdjustment', size,
+        default=0.2 if ComplianceDetector.is_compliance_period() else 0.0
+    )
+    volume_discount = _numeric_column(inputs, 'volumeDiscount', size)
+    if volume_discount is None:
+        volume_discount = np.where(eua_volumes > LARGE_VOLUME_THRESHOLD, 0.1, 0.0)
+
+    ratios = swap_calculator.calculate_swap_ratios(eua_prices, cea_prices, liquidity, compliance, volume_discount)
+    results = swap_calculator.calculate_swap_values(eua_volumes, eua_prices, ratios)
+    results['cea_price'] = np.round(cea_prices, 2)
+    return results
+
+
+BATCH_CALCULATIONS = {
+    'seller': _seller_batch,
+    'swap': _swap_batch,
+}
+
+
+@calculator_bp.route('/batch', methods=['POST'])
+@require_auth
+def calculate_batch():
+    """
+    Calculate many scenarios in one request (sensitivity sweeps, sliders).
+    
+    Each input is either a single value (applied to every scenario) or an
+    array; all arrays must have the same length. Computation is vectorized,
+    so thousands of scenarios cost about as much as a handful.
+    
+    Request Body:
+        {
+            "calculation": "seller" | "swap" (required),
+            "inputs": {
+                // seller
+                "volume": number | number[] (required),
+                "currentPrice": number | number[] (required),
+                "urgency": string | string[] (optional, default: "normal"),
+                // swap
+                "euaVolume": number | number[] (required),
+                "euaPrice": number | number[] (required),
+                "ceaPrice": number | number[] (optional, default: 60% of euaPrice),
+                "liquidityPremium": number | number[] (optional, default: 0.1),
+                "complianceAdjustment": number | number[] (optional, default: from calendar),
+                "volumeDiscount": number | number[] (optional, default: 0.1 above 1M EUA)
             }
-            swap_ratio = swap_calculator.calculate_swap_ratio(eua_price, cea_price, market_conditions)
-        else:
-            swap_ratio = float(swap_ratio)
+        }
+    
+    Response (column-oriented, one entry per scenario):
+        {
+            "calculation": string,
+            "count": number,
+            "results": {
+                // seller
+                "nihaoPrice": number[], "nihaoTotal": number[],
+                "shanghaiPrice": number[], "shanghaiTotal": number[],
+                "shanghaiExecutionTime": string[], "marketImpact": number[],
+                "totalSavings": number[], "savingsPercentage": number[],
+                // swap
+                "swapRatio": number[], "ceaPrice": number[], "euaValue": number[],
+                "ceaVolume": number[], "ceaValue": number[], "valueDifference": number[]
+            }
+        }
+    """
+    try:
+        data = request.get_json(silent=True)
         
-        # Calculate direct swap costs
-        wfoe_setup = 75000 if not has_china_ops else 0  # €50k-100k average
-        time_to_market = "6-12 months" if not has_china_ops else "2-4 weeks"
-        capital_controls_risk = True
-        fx_exposure = eua_volume * eua_price * 0.015  # 1.5% FX spread
+        if not data:
+            return standard_error_response('Request body is required', 'MISSING_BODY', 400)
         
-        # Calculate Nihao swap
-        transaction_value = eua_volume * eua_price
-        nihao_fee = transaction_value * 0.015  # 1.5% intermediation fee
-        nihao_execution = "48 hours"
+        calculation = data.get('calculation')
+        inputs = data.get('inputs')
         
-        # Calculate benefits
-        wfoe_savings = wfoe_setup
-        time_value = 0.05 * transaction_value if not has_china_ops else 0.01 * transaction_value  # Time value of money
-        cbam_optimization = 0
-        
-        if use_case == 'cbam':
-            # CBAM optimization: estimate €40/ton savings
-            cea_volume = eua_volume * swap_ratio
-            cbam_optimization = cea_volume * 40  # €40 per ton
-        
-        total_savings = wfoe_savings + time_value - nihao_fee + cbam_optimization
-        savings_percentage = (total_savings / transaction_value * 100) if transaction_value > 0 else 0
-        
-        result = {
-            'directSwapCosts': {
-                'wfoeSetup': round(wfoe_setup, 2),
-                'timeToMarket': time_to_market,
-                'capitalControlsRisk': capital_controls_risk,
-                'fxExposure': round(fx_exposure, 2)
-            },
-            'nihaoSwap': {
-                'fee': round(nihao_fee, 2),
-                'executionTime': nihao_execution,
-                'noWfoeNeeded': True,
-                'noCapitalControls': True
+        if calculation not in BATCH_CALCULATIONS:
+            return standard_error_response(
+                f"calculation must be one of: {', '.join(BATCH_CALCULATIONS)}", 'INVALID_CALCULATION', 400
+            )
+        if not isinstance(inputs, dict):
+            return standard_error_response('inputs must be an object', 'MISSING_INPUTS', 400)
+        
+        try:
+            size = _batch_size(inputs)
+            columns = BATCH_CALCULATIONS[calculation](inputs, size)
+        except BatchInputError as e:
+            return standard_error_response(str(e), e.code, e.status)
+        
+        return jsonify({
+            'calculation': calculation,
+            'count': size,
+            'results': to_camel_case({name: column.tolist() for name, column in columns.items()})
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error calculating batch: {e}", exc_info=True)
+        return standard_error_response('Failed to calculate batch', 'CALCULATION_ERROR', 500)
+
+
+def _grid_axis(axes: Dict, name: str) -> np.ndarray:
+    """
+    Read a numeric grid axis: an explicit array of values or
+    {"min", "max", "steps"} (evenly spaced, inclusive).
+    """
+    spec = axes.get(name)
+    if spec is None:
+        raise BatchInputError(f'axes.{name} is required', 'MISSING_AXIS')
+    try:
+        if isinstance(spec, dict):
+            steps = int(spec.get('steps', 10))
+            if steps < 1:
+                raise BatchInputError(f'axes.{name}.steps must be at least 1', 'INVALID_AXIS')
+            values = np.linspace(float(spec['min']), float(spec['max']), steps)
+        else:
+            values = np.atleast_1d(np.asarray(spec, dtype=float))
+    except (KeyError, TypeError, ValueError):
+        raise BatchInputError(
+            f'axes.{name} must be an array of numbers or {{"min", "max", "steps"}}', 'INVALID_AXIS'
+        )
+    if values.ndim != 1 or values.size == 0 or not np.isfinite(values).all() or (values <= 0).any():
+        raise BatchInputError(f'axes.{name} values must be positive numbers', 'INVALID_AXIS')
+    return np.round(values, 6)
+
+
+def _grid_categories(axes: Dict, name: str, allowed, default: str):
+    """Read the categorical grid axis (urgency or use case)"""
+    values = axes.get(name, [default])
+    if isinstance(values, str):
+        values = [values]
+    if not isinstance(values, list) or not values or any(value not in allowed for value in values):
+        raise BatchInputError(f"axes.{name} must be a list of: {', '.join(allowed)}", 'INVALID_AXIS')
+    return list(dict.fromkeys(values))
+
+
+@calculator_bp.route('/grid', methods=['POST'])
+@require_auth
+def calculate_grid():
+    """
+    Evaluate a calculator over the Cartesian grid of its axes in one pass.
+    
+    Request Body:
+        {
+            "calculation": "seller" | "buyerSwap" (required),
+            "axes": {
+                "volume": number[] | {"min", "max", "steps"} (required),
+                "price": number[] | {"min", "max", "steps"} (required;
+                         CEA price for seller, EUA price for buyerSwap),
+                "urgency": string[] (seller, optional, default: ["normal"]),
+                "useCase": string[] (buyerSwap, optional, default: ["compliance"])
             },
-            'benefits': {
-                'wfoeSavings': round(wfoe_savings, 2),
-                'timeSavings': f"{'5-11 months' if not has_china_ops else '2-4 weeks'} faster",
-                'riskReduction': 'Eliminated capital controls and FX exposure',
-                'cbamOptimization': round(cbam_optimization, 2) if use_case == 'cbam' else None
+            "fixed": {
+                "ceaPriceRatio": number (buyerSwap, optional, default: 0.6),
+                "hasChinaOperations": boolean (buyerSwap, optional)
             },
-            'totalSavings': round(total_savings, 2),
-            'savingsPercentage': round(savings_percentage, 2)
+            "metrics": string[] (optional, default: ["totalSavings", "savingsPercentage"])
         }
+    
+    Response:
+        {
+            "calculation": string,
+            "axes": {"volume": number[], "price": number[], "urgency" | "useCase": string[]},
+            "shape": [volumes, prices, categories],
+            "metrics": {"totalSavings": number[][][] (indexed [volume][price][category]), ...},
+            "cached": boolean
+        }
+    
+    Identical grids are served from a memo for CALCULATOR_GRID_CACHE_TTL_SECONDS.
+    """
+    try:
+        data = request.get_json(silent=True)
+        
+        if not data:
+            return standard_error_response('Request body is required', 'MISSING_BODY', 400)
         
-        # Remove None values from benefits
-        result['benefits'] = {k: v for k, v in result['benefits'].items() if v is not None}
+        calculation = data.get('calculation')
+        axes = data.get('axes')
+        fixed = data.get('fixed') or {}
+        
+        if calculation not in GRID_CATEGORY_AXIS:
+            return standard_error_response(
+                f"calculation must be one of: {', '.join(GRID_CATEGORY_AXIS)}", 'INVALID_CALCULATION', 400
+            )
+        if not isinstance(axes, dict):
+            return standard_error_response('axes must be an object', 'MISSING_AXES', 400)
+        if not isinstance(fixed, dict):
+            return standard_error_response('fixed must be an object', 'INVALID_FIXED', 400)
+        
+        allowed_metrics = {snake_to_camel(metric): metric for metric in GRID_METRICS[calculation]}
+        requested = data.get('metrics') or [snake_to_camel(metric) for metric in DEFAULT_METRICS]
+        if not isinstance(requested, list) or any(metric not in allowed_metrics for metric in requested):
+            return standard_error_response(
+                f"metrics must be a list of: {', '.join(allowed_metrics)}", 'INVALID_METRICS', 400
+            )
         
+        try:
+            volumes = _grid_axis(axes, 'volume')
+            prices = _grid_axis(axes, 'price')
+            if calculation == 'seller':
+                categories = _grid_categories(axes, 'urgency', URGENCY_LEVELS, 'normal')
+                fixed = {}
+            else:
+                categories = _grid_categories(axes, 'useCase', USE_CASES, 'compliance')
+                cea_ratio = _numeric_column(fixed, 'ceaPriceRatio', 1, positive=True)
+                fixed = {
+                    'ceaPriceRatio': float(cea_ratio[0]) if cea_ratio is not None else None,
+                    'hasChinaOperations': bool(fixed.get('hasChinaOperations', False))
+                }
+        except BatchInputError as e:
+            return standard_error_response(str(e), e.code, e.status)
+        
+        points = volumes.size * prices.size * len(categories)
+        if points > Config.CALCULATOR_GRID_MAX_POINTS:
+            return standard_error_response(
+                f'Grid of {points} points exceeds {Config.CALCULATOR_GRID_MAX_POINTS}', 'GRID_TOO_LARGE', 413
+            )
+        
+        result = scenario_grid_service.evaluate(
+            calculation, volumes, prices, categories,
+            fixed=fixed, metrics=[allowed_metrics[metric] for metric in requested]
+        )
         return jsonify(result), 200
         
     except Exception as e:
-        logger.error(f"Error calculating buyer swap scenario: {e}", exc_info=True)
-        return standard_error_response('Failed to calculate scenario', 'CALCULATION_ERROR', 500)
+        logger.error(f"Error calculating grid: {e}", exc_info=True)
+        return standard_error_response('Failed to calculate grid', 'CALCULATION_ERROR', 500)
+
+
+def _scalar_input(inputs: Dict, name: str, default: Optional[float] = None, positive: bool = True) -> Optional[float]:
+    """Read one numeric scenario input (BatchInputError if invalid)"""
+    if isinstance(inputs.get(name), list):
+        raise BatchInputError(f'{name} must be a number', 'INVALID_TYPE')
+    column = _numeric_column(inputs, name, 1, default=default, positive=positive)
+    return float(column[0]) if column is not None else None
+
+
+def _monte_carlo_scenario(scenario_type: str, inputs: Dict) -> Dict:
+    """Normalize Monte Carlo scenario inputs (same fields as the single-scenario endpoints)"""
+    if scenario_type == 'seller':
+        volume = _scalar_input(inputs, 'volume')
+        current_price = _scalar_input(inputs, 'currentPrice')
+        if volume is None:
+            raise BatchInputError('volume is required', 'MISSING_VOLUME')
+        if current_price is None:
+            raise BatchInputError('currentPrice is required', 'MISSING_CURRENT_PRICE')
+        urgency = inputs.get('urgency', 'normal')
+        return {
+            'volume': volume,
+            'current_price': current_price,
+            'urgency': urgency if urgency in URGENCY_LEVELS else 'normal',
+        }
+
+    eua_volume = _scalar_input(inputs, 'euaVolume')
+    eua_price = _scalar_input(inputs, 'euaPrice')
+    if eua_volume is None:
+        raise BatchInputError('euaVolume is required', 'MISSING_EUA_VOLUME')
+    if eua_price is None:
+        raise BatchInputError('euaPrice is required', 'MISSING_EUA_PRICE')
+    use_case = inputs.get('useCase', 'compliance')
+    return {
+        'eua_volume': eua_volume,
+        'eua_price': eua_price,
+        'cea_price': _scalar_input(inputs, 'ceaPrice', default=eua_price * CEA_TO_EUA_FALLBACK_RATIO),
+        'use_case': use_case if use_case in USE_CASES else 'compliance',
+        'has_china_operations': bool(inputs.get('hasChinaOperations', False)),
+        'in_compliance_period': ComplianceDetector.is_compliance_period(),
+    }
+
+
+@calculator_bp.route('/monte-carlo', methods=['POST'])
+@require_auth
+def calculate_monte_carlo():
+    """
+    Simulate EUA/CEA prices and return the distribution of a scenario's savings.
+    
+    Prices follow a correlated geometric Brownian motion calibrated from the
+    stored EUA/CEA history. Seller savings compare selling through Nihao now
+    with selling on the Shanghai Exchange at the simulated price after its
+    execution time; buyer-swap savings compare today's Nihao swap ratio with
+    the ratio a direct swap gets after WFOE setup.
+    
+    Request Body:
+        {
+            "calculation": "seller" | "buyerSwap" (required),
+            "inputs": object (required; same fields as /seller-scenario or
+                      /buyer-swap-scenario),
+            "paths": number (optional, default: MONTE_CARLO_DEFAULT_PATHS,
+                     max: MONTE_CARLO_MAX_PATHS),
+            "seed": integer (optional; same seed and inputs give the same result
+                     unless the run is truncated),
+            "horizonDays": number (optional, default: execution time of the alternative),
+            "timeBudgetMs": number (optional, capped at MONTE_CARLO_TIME_BUDGET_MS)
+        }
+    
+    Response:
+        {
+            "mean": number, "std": number, "min": number, "max": number,
+            "percentiles": {"p1", "p5", "p25", "p50", "p75", "p95", "p99"},
+            "var95": number, "var99": number, "expectedShortfall95": number,
+            "probabilityOfLoss": number,
+            "paths": number, "requestedPaths": number, "truncated": boolean,
+            "seed": number, "horizonDays": number, "calibration": object,
+            "durationMs": number
+        }
+    """
+    try:
+        data = request.get_json(silent=True)
+        
+        if not data:
+            return standard_error_response('Request body is required', 'MISSING_BODY', 400)
+        
+        scenario_type = data.get('calculation')
+        inputs = data.get('inputs')
+        
+        if scenario_type not in SCENARIO_TYPES:
+            return standard_error_response(
+                f"calculation must be one of: {', '.join(SCENARIO_TYPES)}", 'INVALID_CALCULATION', 400
+            )
+        if not isinstance(inputs, dict):
+            return standard_error_response('inputs must be an object', 'MISSING_INPUTS', 400)
+        
+        try:
+            scenario = _monte_carlo_scenario(scenario_type, inputs)
+            paths = _scalar_input(data, 'paths', default=Config.MONTE_CARLO_DEFAULT_PATHS)
+            horizon_days = _scalar_input(data, 'horizonDays')
+            time_budget_ms = _scalar_input(data, 'timeBudgetMs', default=Config.MONTE_CARLO_TIME_BUDGET_MS)
+        except BatchInputError as e:
+            return standard_error_response(str(e), e.code, e.status)
+        
+        if paths > Config.MONTE_CARLO_MAX_PATHS:
+            return standard_error_response(
+                f'paths must not exceed {Config.MONTE_CARLO_MAX_PATHS}', 'TOO_MANY_PATHS', 400
+            )
+        
+        seed = data.get('seed')
+        if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int) or seed < 0):
+            return standard_error_response('seed must be a non-negative integer', 'INVALID_SEED', 400)
+        
+        result = monte_carlo_engine.run(
+            scenario_type,
+            scenario,
+            paths=int(paths),
+            seed=seed,
+            horizon_days=horizon_days,
+            time_budget_ms=min(time_budget_ms, Config.MONTE_CARLO_TIME_BUDGET_MS)
+        )
+        return jsonify(to_camel_case(result)), 200
+        
+    except Exception as e:
+        logger.error(f"Error running Monte Carlo simulation: {e}", exc_info=True)
+        return standard_error_response('Failed to run simulation', 'CALCULATION_ERROR', 500)
 
 
 @calculator_bp.route('/scenarios', methods=['POST'])
@@ -329,9 +728,9 @@ def save_scenario():
             id=scenario_id,
             user_id=user_id,
             scenario_type=scenario_type,
-            input_data=json.dumps(input_data),
-            nihao_benefits=json.dumps(nihao_benefits),
-            alternative_costs=json.dumps(alternative_costs),
+            input_data=input_data,
+            nihao_benefits=nihao_benefits,
+            alternative_costs=alternative_costs,
             savings=float(savings),
             created_at=created_at
         )
@@ -349,11 +748,62 @@ def save_scenario():
         return standard_error_response('Failed to save scenario', 'SAVE_ERROR', 500)
 
 
+def _encode_scenario_cursor(scenario: ValueScenario) -> str:
+    """Opaque keyset cursor (created_at, id) of the last scenario on a page"""
+    raw = f"{scenario.created_at.isoformat()}|{scenario.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def _decode_scenario_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inverse of _encode_scenario_cursor (ValueError if malformed)"""
+    try:
+        created_at, scenario_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|', 1)
+        return datetime.fromisoformat(created_at), scenario_id
+    except (UnicodeError, binascii.Error, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+# Payload columns of the scenario list, selected as raw text (see list_scenarios)
+SCENARIO_PAYLOAD_COLUMNS = (
+    ('inputData', ValueScenario.input_data),
+    ('nihaoBenefits', ValueScenario.nihao_benefits),
+    ('alternativeCosts', ValueScenario.alternative_costs),
+)
+
+
+def _parse_payload(value):
+    """Decode a payload column read as text (ValueError if it isn't JSON)"""
+    if isinstance(value, (str, bytes)):
+        return json.loads(value)
+    return value  # Already decoded by the driver (PostgreSQL JSON)
+
+
+def _scenario_payload(scenario: ValueScenario, summary: bool = False) -> Dict[str, Any]:
+    """API representation of a saved scenario"""
+    data = {
+        'id': scenario.id,
+        'scenarioType': scenario.scenario_type,
+        'savings': scenario.savings,
+        'createdAt': scenario.created_at.isoformat() if scenario.created_at else None
+    }
+    if not summary:
+        data['inputData'] = scenario.input_data
+        data['nihaoBenefits'] = scenario.nihao_benefits
+        data['alternativeCosts'] = scenario.alternative_costs
+    return data
+
+
 @calculator_bp.route('/scenarios', methods=['GET'])
 @require_auth
 def list_scenarios():
     """
-    List saved scenarios for the user.
+    List saved scenarios for the user, newest first, one page at a time.
+    
+    Query params:
+        limit: Page size (default: VALUE_SCENARIO_PAGE_SIZE, max: VALUE_SCENARIO_MAX_PAGE_SIZE)
+        cursor: nextCursor of the previous page
+        view: "full" (default) or "summary" (omits inputData, nihaoBenefits
+              and alternativeCosts, which are then not loaded at all)
     
     Response:
         {
@@ -367,36 +817,96 @@ def list_scenarios():
                     "savings": number,
                     "createdAt": string
                 }
-            ]
+            ],
+            "nextCursor": string | null,
+            "hasMore": boolean
         }
     """
     try:
         user_id = request.user_id
         
-        # Query scenarios for this user
-        scenarios = ValueScenario.query.filter_by(user_id=user_id).order_by(ValueScenario.created_at.desc()).all()
+        try:
+            limit = int(request.args.get('limit', Config.VALUE_SCENARIO_PAGE_SIZE))
+        except (TypeError, ValueError):
+            return standard_error_response('limit must be an integer', 'INVALID_LIMIT', 400)
+        limit = max(1, min(limit, Config.VALUE_SCENARIO_MAX_PAGE_SIZE))
+        
+        view = request.args.get('view', 'full')
+        if view not in ('full', 'summary'):
+            return standard_error_response('view must be "full" or "summary"', 'INVALID_VIEW', 400)
+        summary = view == 'summary'
+        
+        query = ValueScenario.query.filter(ValueScenario.user_id == user_id)
+        
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                cursor_created_at, cursor_id = _decode_scenario_cursor(cursor)
+            except ValueError:
+                return standard_error_response('Invalid cursor', 'INVALID_CURSOR', 400)
+            query = query.filter(or_(
+                ValueScenario.created_at < cursor_created_at,
+                and_(ValueScenario.created_at == cursor_created_at, ValueScenario.id < cursor_id)
+            ))
+        
+        if not summary:
+            # Load the page's payloads with the rows instead of one query per row. They
+            # are read as text and decoded here, so one legacy row that isn't valid
+            # JSON is skipped instead of failing the whole page.
+            query = query.add_columns(*(type_coerce(column, Text) for _, column in SCENARIO_PAYLOAD_COLUMNS))
+        
+        rows = query.order_by(
+            ValueScenario.created_at.desc(), ValueScenario.id.desc()
+        ).limit(limit + 1).all()
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
         
         scenarios_data = []
-        for scenario in scenarios:
+        for row in rows:
+            if summary:
+                scenarios_data.append(_scenario_payload(row, summary=True))
+                continue
+            scenario, *payloads = row
+            data = _scenario_payload(scenario, summary=True)
             try:
-                scenarios_data.append({
-                    'id': scenario.id,
-                    'scenarioType': scenario.scenario_type,
-                    'inputData': json.loads(scenario.input_data),
-                    'nihaoBenefits': json.loads(scenario.nihao_benefits),
-                    'alternativeCosts': json.loads(scenario.alternative_costs),
-                    'savings': scenario.savings,
-                    'createdAt': scenario.created_at.isoformat() if scenario.created_at else None
-                })
-            except (json.JSONDecodeError, AttributeError) as e:
+                for (key, _), payload in zip(SCENARIO_PAYLOAD_COLUMNS, payloads):
+                    data[key] = _parse_payload(payload)
+            except ValueError as e:
                 logger.warning(f"Error parsing scenario {scenario.id}: {e}")
                 continue
+            scenarios_data.append(data)
         
+        # The cursor follows the last row read, even if it was skipped
         return jsonify({
-            'scenarios': scenarios_data
+            'scenarios': scenarios_data,
+            'nextCursor': _encode_scenario_cursor(rows[-1] if summary else rows[-1][0]) if has_more else None,
+            'hasMore': has_more
         }), 200
         
     except Exception as e:
         logger.error(f"Error listing scenarios: {e}", exc_info=True)
         return standard_error_response('Failed to list scenarios', 'LIST_ERROR', 500)
 
+
+@calculator_bp.route('/scenarios/<scenario_id>', methods=['GET'])
+@require_auth
+def get_scenario(scenario_id):
+    """
+    Get one saved scenario with its full payload.
+    
+    Response: Same shape as an entry of GET /scenarios (full view)
+    """
+    try:
+        scenario = ValueScenario.query.options(undefer_group('payload')).filter_by(
+            id=scenario_id, user_id=request.user_id
+        ).first()
+        
+        if not scenario:
+            return standard_error_response('Scenario not found', 'SCENARIO_NOT_FOUND', 404)
+        
+        return jsonify(_scenario_payload(scenario)), 200
+        
+    except Exception as e:
+        logger.error(f"Error getting scenario {scenario_id}: {e}", exc_info=True)
+        return standard_error_response('Failed to get scenario', 'GET_ERROR', 500)
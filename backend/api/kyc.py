@@ -7,8 +7,13 @@ Most endpoints require authentication via the @require_auth decorator.
 Endpoints:
 - POST /api/kyc/register - Start onboarding process (no authentication required, user_id in body)
 - POST /api/kyc/documents/upload - Upload KYC document (requires authentication, supports multiple files)
+- POST /api/kyc/documents/uploads - Start a resumable chunked upload (requires authentication)
+- GET/HEAD /api/kyc/documents/uploads/<upload_id> - Resumable upload progress (requires authentication)
+- PATCH /api/kyc/documents/uploads/<upload_id> - Append a chunk at Upload-Offset (requires authentication)
+- POST /api/kyc/documents/uploads/<upload_id>/finalize - Create the document from a finished upload (requires authentication)
+- DELETE /api/kyc/documents/uploads/<upload_id> - Abort a resumable upload (requires authentication)
 - GET /api/kyc/documents - List user's documents (requires authentication)
-- GET /api/kyc/documents/<document_id>/preview - Preview image document (requires authentication, image files only)
+- GET /api/kyc/documents/<document_id>/preview - Cached JPEG/WebP preview of an image or PDF document (requires authentication)
 - DELETE /api/kyc/documents/<document_id> - Delete document (requires authentication)
 - POST /api/kyc/submit - Submit KYC dossier for review (requires authentication)
 - GET /api/kyc/status - Get current KYC status (requires authentication)
@@ -24,17 +29,24 @@ auto-create users if they don't exist. All other endpoints require the X-User-ID
 All responses use camelCase format for frontend compatibility.
 All errors use standardized error response format with error codes.
 """
+import mimetypes
 import os
 from typing import Tuple, Dict, Any
-from flask import Blueprint, request, jsonify, current_app, Response, send_file
+from flask import Blueprint, request, jsonify, current_app, Response, url_for
+from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 from datetime import datetime
 from database import db
-from models import User, KYCDocument, KYCWorkflow
+from models import User, KYCDocument, KYCWorkflow, DocumentUpload, UploadStatus
 from models.user import KYCStatus, RiskLevel
 from models.kyc_document import DocumentType, VerificationStatus
 from models.kyc_workflow import WorkflowStep, WorkflowStatus
 from services.document_validator import DocumentValidator
+from services.document_store import document_store, DocumentTooLargeError, StoredBlob
+from services.resumable_upload import resumable_uploads, UploadConflictError, InvalidContentError
+from services.document_processor import document_processor
+from services.review_queue import review_queue, REQUIRED_DOCUMENTS
+from services.document_preview import document_previews, PreviewUnavailableError
 from services.sanctions_checker import SanctionsChecker
 from services.eu_ets_verifier import EUETSVerifier
 from services.suitability_assessor import SuitabilityAssessor
@@ -42,6 +54,7 @@ from services.appropriateness_assessor import AppropriatenessAssessor
 from utils.helpers import generate_uuid, require_auth, standard_error_response
 from utils.validators import validate_uuid, validate_path_safe, sanitize_string
 from utils.serializers import to_camel_case
+from utils.uploads import UploadRequest, file_stream_factory
 from config import Config
 import logging
 
@@ -50,6 +63,13 @@ logger = logging.getLogger(__name__)
 kyc_bp = Blueprint('kyc', __name__, url_prefix='/api/kyc')
 
 
+@kyc_bp.record_once
+def _use_upload_request(state):
+    """Let upload routes choose their file part containers (see utils.uploads)"""
+    if not issubclass(state.app.request_class, UploadRequest):
+        state.app.request_class = UploadRequest
+
+
 @kyc_bp.route('/register', methods=['POST'])
 def register() -> Tuple[Response, int]:
     """
@@ -140,6 +160,7 @@ def register() -> Tuple[Response, int]:
             workflow.current_step = WorkflowStep.DOCUMENT_COLLECTION
             workflow.status = WorkflowStatus.IN_PROGRESS
         
+        review_queue.refresh(user_id)
         db.session.commit()
         
         return jsonify({
@@ -154,15 +175,75 @@ def register() -> Tuple[Response, int]:
         return standard_error_response('Failed to start onboarding. Please try again.', 'REGISTER_ERROR', 500)
 
 
+def _ensure_document_workflow(user_id: str) -> KYCWorkflow:
+    """Create the user's workflow if missing (documents may be uploaded before formal onboarding start)"""
+    workflow = KYCWorkflow.query.filter_by(user_id=user_id).first()
+    if not workflow:
+        workflow = KYCWorkflow(
+            id=generate_uuid(),
+            user_id=user_id,
+            current_step=WorkflowStep.DOCUMENT_COLLECTION,
+            status=WorkflowStatus.IN_PROGRESS
+        )
+        db.session.add(workflow)
+        logger.info(f"Auto-created workflow for user {user_id} on first document upload")
+    return workflow
+
+
+def _add_document(user: User, document_type: DocumentType, file_name: str, mime_type: str, stored: StoredBlob) -> KYCDocument:
+    """
+    Create the KYCDocument for a file in the document store and record it in
+    the user's document metadata (added to the session, not committed)
+    """
+    document_id = generate_uuid()
+    document = KYCDocument(
+        id=document_id,
+        user_id=user.id,
+        document_type=document_type,
+        file_path=stored.file_path,
+        file_name=file_name,
+        file_size=stored.file_size,
+        mime_type=mime_type,
+        sha256=stored.sha256,
+        verification_status=VerificationStatus.PENDING
+    )
+    
+    db.session.add(document)
+    
+    # Update user's document metadata
+    if not user.kyc_documents:
+        user.kyc_documents = []
+    
+    user.kyc_documents.append({
+        'document_id': document_id,
+        'document_type': document_type.value,
+        'file_name': file_name,
+        'uploaded_at': datetime.utcnow().isoformat()
+    })
+    review_queue.refresh(user.id)
+    return document
+
+
+def _spool_document(total_content_length, content_type, filename=None, content_length=None):
+    """Container of an uploaded file part: a size-capped, sniffed HashingSpool in the document store"""
+    factory = document_store.spool_factory(max_size=Config.MAX_CONTENT_LENGTH, check=DocumentValidator.check_content)
+    return factory(total_content_length, content_type, filename, content_length)
+
+
 @kyc_bp.route('/documents/upload', methods=['POST'])
+@file_stream_factory(_spool_document)
 @require_auth
 def upload_document():
     """
     Upload a KYC document.
     
     Validates file type, size, and content-type before saving.
-    Creates database record and saves file with UUID-based filename
-    to prevent path traversal attacks.
+    The multipart parser writes the file part straight into the
+    content-addressed document store (services/document_store.py) while
+    computing its SHA-256 as the body is received, so the upload is
+    written once and the stored path derives from the digest rather than
+    the client filename. Identical contents are stored once and reference
+    counted.
     
     Supports multiple documents per document type (no unique constraint).
     All document types accept PDF, PNG, JPG, and JPEG formats.
@@ -189,10 +270,18 @@ def upload_document():
     endpoint multiple times. Each upload creates a separate document record.
     """
     try:
+        # File parts are spooled into the store, hashed and sniffed while the body is parsed
         if 'file' not in request.files:
             return standard_error_response('No file provided', 'NO_FILE', 400)
         
         file = request.files['file']
+        if file.stream.too_large:
+            max_size_mb = Config.MAX_CONTENT_LENGTH / (1024 * 1024)
+            return standard_error_response(f'File too large. Maximum size: {max_size_mb}MB', 'INVALID_FILE', 400)
+        if file.stream.error:
+            # Refused on its first UPLOAD_SNIFF_BYTES; nothing past them was written
+            logger.warning(f"File content check failed - filename: {file.filename}, error: {file.stream.error}")
+            return standard_error_response(file.stream.error, 'INVALID_FILE', 400)
         document_type_str = request.form.get('document_type')
         user_id = request.headers.get('X-User-ID')
         
@@ -219,100 +308,60 @@ def upload_document():
         if not is_valid:
             logger.warning(f"File validation failed - filename: {file.filename}, error: {error}")
             return standard_error_response(error or 'Invalid file', 'INVALID_FILE', 400)
+        # Stored type comes from the magic bytes, not the client's Content-Type
+        mime_type = DocumentValidator.detected_mime_type(file)
         
         # Get user
         user = User.query.filter_by(id=user_id).first()
         if not user:
             return standard_error_response('User not found', 'USER_NOT_FOUND', 404)
         
-        # Create or update workflow if it doesn't exist (allow document upload before formal onboarding start)
-        workflow = KYCWorkflow.query.filter_by(user_id=user_id).first()
-        if not workflow:
-            workflow = KYCWorkflow(
-                id=generate_uuid(),
-                user_id=user_id,
-                current_step=WorkflowStep.DOCUMENT_COLLECTION,
-                status=WorkflowStatus.IN_PROGRESS
-            )
-            db.session.add(workflow)
-            logger.info(f"Auto-created workflow for user {user_id} on first document upload")
-        
-        # Create upload directory if it doesn't exist
-        upload_dir = Config.UPLOAD_FOLDER
-        os.makedirs(upload_dir, exist_ok=True)
+        _ensure_document_workflow(user_id)
         
         # Validate user_id and document_type don't contain path separators
         if not validate_path_safe(user_id) or not validate_path_safe(document_type_str):
             return standard_error_response('Invalid characters in user ID or document type', 'INVALID_PATH', 400)
         
-        # Generate safe filename
-        file_ext = file.filename.rsplit('.', 1)[1].lower() if '.' in file.filename else ''
         safe_filename = DocumentValidator.get_safe_filename(file.filename)
-        # Use only UUID for filename to prevent any path issues
-        unique_filename = f"{generate_uuid()}.{file_ext}"
-        file_path = os.path.join(upload_dir, unique_filename)
-        
-        # Ensure path is within upload directory (prevent path traversal)
-        file_path = os.path.abspath(file_path)
-        upload_dir_abs = os.path.abspath(upload_dir)
-        if not file_path.startswith(upload_dir_abs):
-            return standard_error_response('Invalid file path', 'INVALID_PATH', 400)
-        
-        # Get file size before saving
-        file.seek(0, os.SEEK_END)
-        file_size = file.tell()
-        file.seek(0)
-        
-        # Create document record first (before saving file)
-        document_id = generate_uuid()
-        document = KYCDocument(
-            id=document_id,
-            user_id=user_id,
-            document_type=document_type,
-            file_path=file_path,
-            file_name=safe_filename,
-            file_size=file_size,
-            mime_type=file.content_type or 'application/octet-stream',
-            verification_status=VerificationStatus.PENDING
-        )
-        
-        db.session.add(document)
         
-        # Update user's document metadata
-        if not user.kyc_documents:
-            user.kyc_documents = []
-        
-        user.kyc_documents.append({
-            'document_id': document_id,
-            'document_type': document_type_str,
-            'file_name': safe_filename,
-            'uploaded_at': datetime.utcnow().isoformat()
-        })
-        
-        # Save file only after DB record is created (but before commit)
-        # This way if file save fails, we can rollback the transaction
+        # Move the spooled upload (hashed while received) into the content-addressed store.
+        # Identical contents share one blob file; the reference is counted in this transaction
+        # before the file is kept or placed, so a concurrent deletion can't remove it.
         try:
-            file.save(file_path)
+            stored = document_store.place_spool(file.stream)
+        except DocumentTooLargeError:
+            db.session.rollback()
+            max_size_mb = Config.MAX_CONTENT_LENGTH / (1024 * 1024)
+            return standard_error_response(f'File too large. Maximum size: {max_size_mb}MB', 'INVALID_FILE', 400)
         except Exception as e:
             db.session.rollback()
             logger.error(f"Error saving file: {e}", exc_info=True)
             return standard_error_response('Failed to save file', 'FILE_SAVE_ERROR', 500)
         
-        # Commit transaction - if this fails, file will be orphaned but that's acceptable
-        # as we can implement a cleanup job later
+        # Content already in the store passed this check when it was first uploaded
+        if stored.created and mime_type == 'application/pdf':
+            is_valid, error = DocumentValidator.check_pdf_structure(stored.file_path)
+            if not is_valid:
+                db.session.rollback()
+                document_store.remove_unreferenced(stored.sha256, stored.file_path)
+                logger.warning(f"PDF structure check failed - filename: {file.filename}, error: {error}")
+                return standard_error_response(error, 'INVALID_FILE', 400)
+        
+        document = _add_document(user, document_type, safe_filename, mime_type, stored)
+        
+        # Commit transaction - if this fails, remove a new blob unless another upload now references it
         try:
             db.session.commit()
         except Exception as e:
-            # If commit fails, try to clean up the file
             db.session.rollback()
-            if os.path.exists(file_path):
-                try:
-                    os.remove(file_path)
-                except:
-                    pass  # Log but don't fail
+            if stored.created:
+                document_store.remove_unreferenced(stored.sha256, stored.file_path)
             logger.error(f"Error committing document: {e}", exc_info=True)
             return standard_error_response('Failed to save document. Please try again.', 'COMMIT_ERROR', 500)
         
+        # Text, dates, registration numbers and thumbnail are extracted in the background
+        document_processor.enqueue(document.id)
+        
         return jsonify({
             'message': 'Document uploaded successfully',
             'document': document.to_dict(camel_case=True)
@@ -320,16 +369,321 @@ def upload_document():
         
     except Exception as e:
         db.session.rollback()
-        # Clean up file if DB commit failed
-        if 'file_path' in locals() and os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-            except:
-                pass
+        # Clean up a newly stored blob if DB commit failed
+        if 'stored' in locals() and stored.created:
+            document_store.remove_unreferenced(stored.sha256, stored.file_path)
         logger.error(f"Error uploading document: {e}", exc_info=True)
         return standard_error_response('Failed to upload document', 'UPLOAD_ERROR', 500)
 
 
+# Resumable (tus-style) chunked uploads
+
+TUS_VERSION = '1.0.0'
+
+
+def _upload_headers(upload: DocumentUpload) -> Dict[str, str]:
+    """tus progress headers of an upload"""
+    return {
+        'Tus-Resumable': TUS_VERSION,
+        'Upload-Offset': str(upload.upload_offset),
+        'Upload-Length': str(upload.upload_length),
+        'Cache-Control': 'no-store',
+    }
+
+
+def _find_upload(upload_id: str):
+    """
+    Look up the caller's upload for a chunk or finalize request.
+
+    Returns:
+        (upload, None) if it accepts data, otherwise (None, error response)
+    """
+    user_id = request.headers.get('X-User-ID')
+    upload = DocumentUpload.query.filter_by(id=upload_id, user_id=user_id).first()
+    if not upload:
+        return None, standard_error_response('Upload not found', 'UPLOAD_NOT_FOUND', 404)
+    if resumable_uploads.is_expired(upload):
+        return None, standard_error_response('Upload expired. Please start again.', 'UPLOAD_EXPIRED', 410)
+    if upload.status != UploadStatus.IN_PROGRESS:
+        return None, standard_error_response(f'Upload is {upload.status.value}', 'UPLOAD_CLOSED', 409)
+    return upload, None
+
+
+@kyc_bp.route('/documents/uploads', methods=['POST'])
+@require_auth
+def create_upload():
+    """
+    Start a resumable upload of a KYC document.
+    
+    Large files are sent in chunks (PATCH) and completed with finalize, so
+    an interrupted transfer resumes from the last received byte instead of
+    restarting. The finished file goes through the same validation and
+    document creation as /documents/upload.
+    
+    JSON body:
+        - document_type: Type of document (company_registration, financial_statement, etc.)
+        - file_name: Original file name (PDF, PNG, JPG, JPEG, DOC, DOCX)
+        - file_size: Total size in bytes (or the tus Upload-Length header)
+        - mime_type: Optional content type (default: guessed from file_name)
+    
+    Returns:
+        201 with the upload (camelCase), Location and Upload-Offset headers
+    
+    Errors:
+        - 400: Missing or invalid fields
+        - 404: User not found
+        - 413: file_size exceeds RESUMABLE_UPLOAD_MAX_SIZE
+    """
+    try:
+        user_id = request.headers.get('X-User-ID')
+        data = request.get_json(silent=True) or {}
+        document_type_str = data.get('document_type')
+        file_name = data.get('file_name')
+        file_size = data.get('file_size', request.headers.get('Upload-Length'))
+        
+        if not document_type_str:
+            return standard_error_response('document_type is required', 'MISSING_DOCUMENT_TYPE', 400)
+        try:
+            document_type = DocumentType(document_type_str)
+        except ValueError:
+            return standard_error_response('Invalid document type', 'INVALID_DOCUMENT_TYPE', 400)
+        
+        if not file_name or not DocumentValidator.allowed_file(file_name):
+            return standard_error_response(
+                f"File type not allowed. Allowed types: {', '.join(sorted(DocumentValidator.ALLOWED_EXTENSIONS))}",
+                'INVALID_FILE', 400
+            )
+        
+        try:
+            file_size = int(file_size)
+        except (TypeError, ValueError):
+            return standard_error_response('file_size must be an integer', 'INVALID_FILE_SIZE', 400)
+        if file_size <= 0:
+            return standard_error_response('File is empty', 'INVALID_FILE_SIZE', 400)
+        
+        user = User.query.filter_by(id=user_id).first()
+        if not user:
+            return standard_error_response('User not found', 'USER_NOT_FOUND', 404)
+        
+        mime_type = data.get('mime_type') or mimetypes.guess_type(file_name)[0] or 'application/octet-stream'
+        try:
+            upload = resumable_uploads.create(
+                user_id, document_type, DocumentValidator.get_safe_filename(file_name), mime_type, file_size
+            )
+        except DocumentTooLargeError:
+            max_size_mb = resumable_uploads.max_size / (1024 * 1024)
+            return standard_error_response(f'File too large. Maximum size: {max_size_mb}MB', 'UPLOAD_TOO_LARGE', 413)
+        db.session.commit()
+        
+        headers = _upload_headers(upload)
+        headers['Location'] = url_for('kyc.get_upload', upload_id=upload.id)
+        return jsonify({'upload': upload.to_dict(camel_case=True)}), 201, headers
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error creating upload: {e}", exc_info=True)
+        return standard_error_response('Failed to start upload', 'UPLOAD_ERROR', 500)
+
+
+@kyc_bp.route('/documents/uploads/<upload_id>', methods=['GET'])
+@require_auth
+def get_upload(upload_id):
+    """
+    Progress of a resumable upload (HEAD returns only the headers).
+    
+    Returns:
+        Upload (camelCase) with Upload-Offset / Upload-Length headers;
+        clients resume by sending the next chunk at Upload-Offset
+    """
+    user_id = request.headers.get('X-User-ID')
+    upload = DocumentUpload.query.filter_by(id=upload_id, user_id=user_id).first()
+    if not upload:
+        return standard_error_response('Upload not found', 'UPLOAD_NOT_FOUND', 404)
+    return jsonify({'upload': upload.to_dict(camel_case=True)}), 200, _upload_headers(upload)
+
+
+@kyc_bp.route('/documents/uploads/<upload_id>', methods=['PATCH'])
+@require_auth
+def upload_chunk(upload_id):
+    """
+    Append a chunk to a resumable upload.
+    
+    Headers:
+        - Content-Type: application/offset+octet-stream
+        - Upload-Offset: Byte offset of the chunk, must equal the upload's offset
+    
+    The body is the raw chunk (at most MAX_CONTENT_LENGTH), written to disk
+    as it is received. If the connection drops, the bytes received so far
+    are kept.
+    
+    Returns:
+        204 with the new Upload-Offset header
+    
+    Errors:
+        - 400: Missing or invalid Upload-Offset
+        - 404: Upload not found
+        - 409: Offset mismatch (Upload-Offset header has the current one), or the upload is closed
+        - 410: Upload expired
+        - 413: Chunk too large or past the declared file size
+        - 415: Wrong Content-Type
+    """
+    try:
+        if request.mimetype != 'application/offset+octet-stream':
+            return standard_error_response(
+                'Content-Type must be application/offset+octet-stream', 'INVALID_CONTENT_TYPE', 415
+            )
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+        except ValueError:
+            return standard_error_response('Upload-Offset header is required', 'INVALID_OFFSET', 400)
+        if request.content_length and request.content_length > Config.MAX_CONTENT_LENGTH:
+            return standard_error_response('Chunk too large', 'CHUNK_TOO_LARGE', 413)
+        
+        upload, error = _find_upload(upload_id)
+        if error:
+            return error
+        if request.content_length is not None and offset + request.content_length > upload.upload_length:
+            response, status = standard_error_response('Chunk exceeds the declared file size', 'CHUNK_TOO_LARGE', 413)
+            response.headers.update(_upload_headers(upload))
+            return response, status
+        
+        try:
+            resumable_uploads.append(upload, offset, request.stream)
+        except UploadConflictError as e:
+            response, status = standard_error_response(str(e), 'OFFSET_MISMATCH', 409)
+            response.headers.update(_upload_headers(upload))
+            return response, status
+        except DocumentTooLargeError:
+            response, status = standard_error_response('Chunk exceeds the declared file size', 'CHUNK_TOO_LARGE', 413)
+            response.headers.update(_upload_headers(upload))
+            return response, status
+        except InvalidContentError as e:
+            # Refused on its first bytes: abort instead of receiving the rest
+            logger.warning(f"Resumable upload content rejected - upload: {upload.id}, error: {e}")
+            upload.status = UploadStatus.ABORTED
+            resumable_uploads.discard(upload)
+            db.session.commit()
+            return standard_error_response(str(e), 'INVALID_FILE', 400)
+        
+        return '', 204, _upload_headers(upload)
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error uploading chunk: {e}", exc_info=True)
+        return standard_error_response('Failed to upload chunk', 'UPLOAD_ERROR', 500)
+
+
+@kyc_bp.route('/documents/uploads/<upload_id>/finalize', methods=['POST'])
+@require_auth
+def finalize_upload(upload_id):
+    """
+    Complete a resumable upload and create its KYC document.
+    
+    The assembled file is validated like a direct upload, then moved into
+    the document store (hashed in chunks and renamed, never read into
+    memory).
+    
+    Returns:
+        201 with the uploaded document data (camelCase format)
+    
+    Errors:
+        - 400: Validation failure (the upload is aborted)
+        - 404: Upload or user not found
+        - 409: Not all bytes received yet, the upload is closed, or another request is writing it
+        - 410: Upload expired
+    """
+    stored = None
+    try:
+        upload, error = _find_upload(upload_id)
+        if error:
+            return error
+        # Held until commit: no chunk or second finalize of this upload runs meanwhile, in any worker
+        with resumable_uploads.claim(upload):
+            if upload.status != UploadStatus.IN_PROGRESS:
+                return standard_error_response(f'Upload is {upload.status.value}', 'UPLOAD_CLOSED', 409)
+            if upload.upload_offset != upload.upload_length:
+                response, status = standard_error_response(
+                    f'Upload incomplete: {upload.upload_offset} of {upload.upload_length} bytes received',
+                    'UPLOAD_INCOMPLETE', 409
+                )
+                response.headers.update(_upload_headers(upload))
+                return response, status
+            
+            user = User.query.filter_by(id=upload.user_id).first()
+            if not user:
+                return standard_error_response('User not found', 'USER_NOT_FOUND', 404)
+            
+            partial_path = resumable_uploads.partial_path(upload.id)
+            with open(partial_path, 'rb') as f:
+                file = FileStorage(stream=f, filename=upload.file_name, content_type=upload.mime_type)
+                is_valid, error = DocumentValidator.validate_document_type(
+                    file, upload.document_type.value, max_size=resumable_uploads.max_size
+                )
+                mime_type = DocumentValidator.detected_mime_type(file)
+            if is_valid and mime_type == 'application/pdf':
+                is_valid, error = DocumentValidator.check_pdf_structure(partial_path)
+            if not is_valid:
+                logger.warning(f"Resumable upload validation failed - upload: {upload.id}, error: {error}")
+                upload.status = UploadStatus.ABORTED
+                resumable_uploads.discard(upload)
+                db.session.commit()
+                return standard_error_response(error or 'Invalid file', 'INVALID_FILE', 400)
+            
+            _ensure_document_workflow(user.id)
+            # Conditional IN_PROGRESS -> COMPLETED: only one finalize creates the document
+            if not resumable_uploads.complete(upload):
+                db.session.rollback()
+                return standard_error_response('Upload is already closed', 'UPLOAD_CLOSED', 409)
+            stored = resumable_uploads.finish(upload)
+            document = _add_document(user, upload.document_type, upload.file_name, mime_type, stored)
+            upload.status = UploadStatus.COMPLETED
+            upload.document_id = document.id
+            db.session.commit()
+            # Content that was already stored left the partial file for retries until now
+            resumable_uploads.discard(upload)
+        document_processor.enqueue(document.id)
+        
+        return jsonify({
+            'message': 'Document uploaded successfully',
+            'document': document.to_dict(camel_case=True)
+        }), 201
+        
+    except UploadConflictError as e:
+        db.session.rollback()
+        return standard_error_response(str(e), 'UPLOAD_BUSY', 409)
+    except Exception as e:
+        db.session.rollback()
+        # Put a newly stored file back so finalize can be retried (a duplicate was never moved).
+        # Linked rather than moved: another upload of the same content may reference the blob by now.
+        if stored is not None and stored.created:
+            try:
+                os.link(stored.file_path, resumable_uploads.partial_path(upload_id))
+            except OSError as link_error:
+                logger.error(f"Could not restore partial file of upload {upload_id}: {link_error}")
+            document_store.remove_unreferenced(stored.sha256, stored.file_path)
+        logger.error(f"Error finalizing upload: {e}", exc_info=True)
+        return standard_error_response('Failed to finalize upload', 'UPLOAD_ERROR', 500)
+
+
+@kyc_bp.route('/documents/uploads/<upload_id>', methods=['DELETE'])
+@require_auth
+def abort_upload(upload_id):
+    """Abort a resumable upload and discard the received bytes"""
+    try:
+        upload, error = _find_upload(upload_id)
+        if error:
+            return error
+        upload.status = UploadStatus.ABORTED
+        resumable_uploads.discard(upload)
+        db.session.commit()
+        return jsonify({'message': 'Upload aborted'}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error aborting upload: {e}", exc_info=True)
+        return standard_error_response('Failed to abort upload', 'UPLOAD_ERROR', 500)
+
+
 @kyc_bp.route('/documents', methods=['GET'])
 @require_auth
 def list_documents():
@@ -354,19 +708,24 @@ def list_documents():
 @require_auth
 def preview_document(document_id):
     """
-    Preview an image document (for displaying thumbnails in UI).
+    Preview of an image or PDF document (for displaying thumbnails in UI).
     
-    Only serves image files (PNG, JPG, JPEG) for security reasons.
-    Validates file path to prevent directory traversal attacks.
+    Serves a size-bounded JPEG/WebP rendering of the image or of the first
+    PDF page from the preview cache, never the original file.
     
     Headers:
         - X-User-ID: Authenticated user's UUID
+        - If-None-Match / Range: Conditional and partial requests
+    
+    Query Parameters:
+        - size: Longest side in pixels, rounded up to a configured size (default: 512)
+        - format: jpeg or webp (default: jpeg)
     
     Returns:
-        Image file stream with appropriate Content-Type header
+        Image stream with ETag and Cache-Control headers (304/206 for conditional/range requests)
     
     Errors:
-        - 400: Document is not an image file (preview only available for images)
+        - 400: Document type can't be previewed, or invalid size/format
         - 400: Invalid file path (security check failed)
         - 404: Document not found or file not found on disk
         - 500: Server error
@@ -380,10 +739,10 @@ def preview_document(document_id):
         if not document:
             return standard_error_response('Document not found', 'DOCUMENT_NOT_FOUND', 404)
         
-        # Only serve image files for preview
-        mime_type = document.mime_type or ''
-        if not mime_type.startswith('image/'):
-            return standard_error_response('Preview only available for image files', 'INVALID_FILE_TYPE', 400)
+        try:
+            size, fmt = document_previews.options_from(request.args)
+        except ValueError as e:
+            return standard_error_response(str(e), 'INVALID_PREVIEW_OPTIONS', 400)
         
         # Validate file path for security
         if not document.file_path or not os.path.exists(document.file_path):
@@ -392,18 +751,14 @@ def preview_document(document_id):
         # Ensure file is within upload directory (prevent path traversal)
         file_path_abs = os.path.abspath(document.file_path)
         upload_dir_abs = os.path.abspath(Config.UPLOAD_FOLDER)
-        if not file_path_abs.startswith(upload_dir_abs):
+        if not (document_store.contains(document.file_path) or file_path_abs.startswith(upload_dir_abs)):
             logger.warning(f"Attempted to access file outside upload directory: {document.file_path}")
             return standard_error_response('Invalid file path', 'INVALID_PATH', 400)
         
-        # Serve file with appropriate headers
-        return send_file(
-            document.file_path,
-            mimetype=mime_type,
-            as_attachment=False,
-            download_name=document.file_name
-        )
+        return document_previews.send(document, size, fmt)
         
+    except PreviewUnavailableError as e:
+        return standard_error_response(str(e), 'INVALID_FILE_TYPE', 400)
     except Exception as e:
         logger.error(f"Error previewing document: {e}", exc_info=True)
         return standard_error_response('Failed to preview document', 'PREVIEW_ERROR', 500)
@@ -424,7 +779,12 @@ def delete_document(document_id):
         
         # Delete file (handle errors gracefully)
         file_deleted = False
-        if document.file_path and os.path.exists(document.file_path):
+        unreferenced_blob = None
+        blob_sha256 = document.sha256
+        if document.sha256 and document.file_path and document_store.contains(document.file_path):
+            # Shared blob: drop this document's reference, the file goes once unused
+            unreferenced_blob = document_store.release(document.sha256)
+        elif document.file_path and os.path.exists(document.file_path):
             try:
                 # Ensure file is within upload directory
                 file_path_abs = os.path.abspath(document.file_path)
@@ -447,9 +807,23 @@ def delete_document(document_id):
                 if doc.get('document_id') != document_id
             ]
         
+        legacy_thumbnail = None
+        if document.thumbnail_path and not document_store.contains(document.thumbnail_path):
+            legacy_thumbnail = document.thumbnail_path
+        
         db.session.delete(document)
+        review_queue.refresh(user_id)
         db.session.commit()
         
+        if unreferenced_blob:
+            file_deleted = document_store.remove_unreferenced(blob_sha256, unreferenced_blob)
+        if legacy_thumbnail:
+            try:
+                os.remove(legacy_thumbnail)
+            except OSError:
+                pass
+        document_previews.invalidate(document_id)
+        
         return jsonify({
             'message': 'Document deleted successfully',
             'file_deleted': file_deleted
@@ -475,19 +849,11 @@ def submit_kyc():
             return standard_error_response('User not found', 'USER_NOT_FOUND', 404)
         
         # Check if all required documents are uploaded
-        required_docs = [
-            DocumentType.COMPANY_REGISTRATION,
-            DocumentType.FINANCIAL_STATEMENT,
-            DocumentType.TAX_CERTIFICATE,
-            DocumentType.EU_ETS_PROOF,
-            DocumentType.POWER_OF_ATTORNEY
-        ]
-        
         uploaded_docs = set(
-            doc.document_type for doc in KYCDocument.query.filter_by(user_id=user_id).all()
+            row[0] for row in db.session.query(KYCDocument.document_type).filter_by(user_id=user_id)
         )
         
-        missing_docs = [doc.value for doc in required_docs if doc not in uploaded_docs]
+        missing_docs = [doc.value for doc in REQUIRED_DOCUMENTS if doc not in uploaded_docs]
         if missing_docs:
             return jsonify({
                 'error': 'Missing required documents',
@@ -505,6 +871,7 @@ def submit_kyc():
             workflow.current_step = WorkflowStep.IDENTITY_VERIFICATION
             workflow.status = WorkflowStatus.IN_PROGRESS
         
+        review_queue.refresh(user_id)
         db.session.commit()
         
         return jsonify({
@@ -564,6 +931,7 @@ def get_kyc_status():
                 is_admin=(username == 'Victor')
             )
             db.session.add(user)
+            review_queue.refresh(user_id)
             db.session.commit()
             logger.info(f"Successfully auto-created user {user_id} ({username})")
         
@@ -619,6 +987,7 @@ def verify_eu_ets():
             if workflow and workflow.current_step == WorkflowStep.EU_ETS_VERIFICATION:
                 workflow.workflow_data['eu_ets_verification'] = verification_result
             
+            review_queue.refresh(user_id)
             db.session.commit()
         
         return jsonify({
@@ -10,9 +10,11 @@ from typing import Dict, Any, Optional
 import logging
 
 from services.market_opportunity_detector import MarketOpportunityDetector
+from services.market_state import market_state
 from services.swap_calculator import SwapCalculator
 from utils.compliance_detector import ComplianceDetector
 from utils.helpers import standard_error_response
+from utils.serializers import to_camel_case
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +25,33 @@ swap_calculator = SwapCalculator()
 compliance_detector = ComplianceDetector()
 
 
+def _historical_trends(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Rolling statistics from the market analytics snapshot (camelCase)"""
+    trends = {}
+    for market in ('eua', 'cea'):
+        state = snapshot[market]
+        trends[market] = {
+            'changeAbsolute24h': state['change_absolute24h'],
+            'changePercent24h': state['change_percent24h'],
+            'high24h': state['high24h'],
+            'low24h': state['low24h'],
+            'samples': state['samples24h'],
+            'lastUpdate': state['timestamp'],
+            'windows': to_camel_case(state['windows'])
+        } if state else None
+    spread = snapshot['spread']
+    trends['spread'] = {
+        'current': spread['current'],
+        'mean': spread['mean'],
+        'std': spread['std'],
+        'zScore': spread['z_score'],
+        'samples': spread['samples'],
+        'windowHours': spread['window_hours'],
+        'windows': to_camel_case(spread['windows'])
+    } if spread else None
+    return trends
+
+
 @market_analysis_bp.route('/analysis', methods=['GET'])
 def get_market_analysis():
     """
@@ -32,15 +61,18 @@ def get_market_analysis():
     - Swap recommendations
     - Historical trends
     
+    Prices, 24h changes and spread statistics come from the market state
+    snapshot kept current by the price updates.
+    
     Query Parameters:
-        - euaPrice: Current EUA price (optional, will use default if not provided)
-        - ceaPrice: Current CEA price (optional, will use default if not provided)
+        - euaPrice: EUA price override (optional, defaults to the latest tick)
+        - ceaPrice: CEA price override (optional, defaults to the latest tick)
     
     Response:
         {
             "currentPrices": {
-                "eua": { "price": number, "currency": "EUR", "change24h": number },
-                "cea": { "price": number, "currency": "EUR", "change24h": number }
+                "eua": { "price": number, "currency": "EUR", "change24h": number (percent) },
+                "cea": { "price": number, "currency": "EUR", "change24h": number (percent) }
             },
             "spread": {
                 "absolute": number,
@@ -49,20 +81,36 @@ def get_market_analysis():
             },
             "arbitrageOpportunities": [...],
             "swapRecommendations": [...],
-            "historicalTrends": {...}
+            "historicalTrends": {
+                "eua": {
+                    "changeAbsolute24h" (EUR), "changePercent24h", "high24h", "low24h", ...,
+                    "windows": {
+                        "24h": { "change", "changePercent", "high", "low", "mean", "std",
+                                 "zScore", "volatility", "twap", "vwap", "samples", "complete" },
+                        "7d": {...}
+                    }
+                },
+                "cea": {...},
+                "spread": { "mean", "std", "zScore", "samples", "windowHours", "windows": {...} }
+            }
         }
+    
+    Returns 503 PRICE_UNAVAILABLE when no price is known yet and none was given.
     """
     try:
-        # Get prices from query params or use defaults
+        # Query params override the live snapshot
+        snapshot = market_state.snapshot()
+        live_eua, live_cea = market_state.prices()
         eua_price = request.args.get('euaPrice', type=float)
         cea_price = request.args.get('ceaPrice', type=float)
-        
-        # In production, these would be fetched from price cache
-        # For now, use defaults if not provided
         if eua_price is None:
-            eua_price = 88.31  # Default EUA price
+            eua_price = live_eua
         if cea_price is None:
-            cea_price = 8.08  # Default CEA price (40% discount)
+            cea_price = live_cea
+        if eua_price is None or cea_price is None:
+            return standard_error_response(
+                'Market prices not available yet', 'PRICE_UNAVAILABLE', 503
+            )
         
         # Calculate spread
         spread_absolute = eua_price - cea_price
@@ -98,18 +146,21 @@ def get_market_analysis():
         market_condition = compliance_detector.get_market_condition()
         days_until_deadline = compliance_detector.days_until_deadline()
         
+        eua_state = snapshot['eua'] or {}
+        cea_state = snapshot['cea'] or {}
+        
         # Build response
         response = {
             'currentPrices': {
                 'eua': {
                     'price': round(eua_price, 2),
                     'currency': 'EUR',
-                    'change24h': None  # Would be fetched from price cache
+                    'change24h': eua_state.get('change_percent24h')
                 },
                 'cea': {
                     'price': round(cea_price, 2),
                     'currency': 'EUR',
-                    'change24h': None  # Would be fetched from price cache
+                    'change24h': cea_state.get('change_percent24h')
                 }
             },
             'spread': {
@@ -122,12 +173,11 @@ def get_market_analysis():
             'marketCondition': {
                 'condition': market_condition,
                 'daysUntilDeadline': days_until_deadline,
+                'businessDaysUntilDeadline': compliance_detector.business_days_until_deadline(),
                 'isCompliancePeriod': compliance_detector.is_compliance_period()
             },
-            'historicalTrends': {
-                # Would include historical data in production
-                'note': 'Historical trends would be included here'
-            }
+            'historicalTrends': _historical_trends(snapshot),
+            'updatedAt': snapshot['updated_at']
         }
         
         return jsonify(response), 200
@@ -3,14 +3,20 @@ Market Opportunities API endpoints
 
 Provides endpoints for market opportunity detection:
 - GET /api/market/opportunities - List detected market opportunities
+- GET /api/market/opportunities/backtest - Replay the signals over stored history
 """
 
+from datetime import date
 from flask import Blueprint, request, jsonify
 from typing import List, Dict, Optional
 import logging
 
+from config import Config
+from services.backtest_engine import SIGNAL_TYPES, backtest_engine
 from services.market_opportunity_detector import MarketOpportunityDetector
+from services.market_state import market_state
 from utils.helpers import standard_error_response
+from utils.serializers import to_camel_case
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +33,11 @@ def get_opportunities():
     Query Parameters:
         - type: Filter by opportunity type ('arbitrage', 'swap_optimization', 'liquidity_crisis')
         - minSavings: Minimum potential savings (optional)
+        - euaPrice / ceaPrice: Price overrides (optional, default to the
+          latest ticks from the market state snapshot)
+    
+    Price-based opportunities are skipped while no price is known; the
+    liquidity crisis check does not need prices.
     
     Response:
         {
@@ -47,10 +58,14 @@ def get_opportunities():
         opportunity_type = request.args.get('type')
         min_savings = request.args.get('minSavings', type=float)
         
-        # Get current prices (would normally fetch from cache/API)
-        # For now, use default values - in production, fetch from price cache
+        # Query params override the live snapshot
+        live_eua, live_cea = market_state.prices()
         eua_price = request.args.get('euaPrice', type=float)
         cea_price = request.args.get('ceaPrice', type=float)
+        if eua_price is None:
+            eua_price = live_eua
+        if cea_price is None:
+            cea_price = live_cea
         
         # Detect opportunities
         opportunities = opportunity_detector.detect_all_opportunities(
@@ -76,3 +91,80 @@ def get_opportunities():
         logger.error(f"Error fetching opportunities: {e}", exc_info=True)
         return standard_error_response('Failed to fetch opportunities', 'FETCH_ERROR', 500)
 
+
+@market_opportunities_bp.route('/opportunities/backtest', methods=['GET'])
+def backtest_opportunities():
+    """
+    Backtest the opportunity signals over the stored daily EUA/CEA history.
+    
+    Each day a signal fired is traded over a fixed holding period: arbitrage
+    and swap optimization swap 1 EUA into CEA at the signal's ratio and
+    compare with holding the EUA; liquidity crisis buys CEA.
+    
+    Query Parameters:
+        - start / end: Signal date range, YYYY-MM-DD (optional, default: all history)
+        - horizonDays: Holding period in calendar days (default: BACKTEST_HORIZON_DAYS)
+        - minPriceGap: Arbitrage threshold EUA/CEA ratio (default: 10.0)
+        - type: Comma-separated signal types (default: all)
+    
+    Response:
+        {
+            "start": string, "end": string, "days": number,
+            "horizonDays": number, "minPriceGap": number,
+            "signals": {
+                "arbitrage" | "swap_optimization" | "liquidity_crisis": {
+                    "signals", "evaluated", "hits", "hitRate",
+                    "meanPnlPercent", "medianPnlPercent", "totalPnlPercent",
+                    "bestPnlPercent", "worstPnlPercent", "baselineMeanPnlPercent",
+                    "firstSignal", "lastSignal"
+                },
+                ...
+            },
+            "elapsedMs": number
+        }
+    """
+    try:
+        try:
+            start = date.fromisoformat(request.args['start']) if request.args.get('start') else None
+            end = date.fromisoformat(request.args['end']) if request.args.get('end') else None
+        except ValueError:
+            return standard_error_response('start and end must be YYYY-MM-DD dates', 'INVALID_DATE', 400)
+        if start and end and start > end:
+            return standard_error_response('start must not be after end', 'INVALID_DATE', 400)
+        
+        horizon_days = request.args.get('horizonDays', Config.BACKTEST_HORIZON_DAYS, type=int)
+        if horizon_days is None or not 1 <= horizon_days <= Config.BACKTEST_MAX_HORIZON_DAYS:
+            return standard_error_response(
+                f'horizonDays must be between 1 and {Config.BACKTEST_MAX_HORIZON_DAYS}', 'INVALID_VALUE', 400
+            )
+        
+        min_price_gap = request.args.get('minPriceGap', 10.0, type=float)
+        if min_price_gap is None or min_price_gap <= 0:
+            return standard_error_response('minPriceGap must be positive', 'INVALID_VALUE', 400)
+        
+        signal_types = None
+        if request.args.get('type'):
+            signal_types = [t.strip() for t in request.args['type'].split(',') if t.strip()]
+            unknown = [t for t in signal_types if t not in SIGNAL_TYPES]
+            if unknown:
+                return standard_error_response(
+                    f'Unknown signal type(s): {", ".join(unknown)}', 'INVALID_TYPE', 400
+                )
+        
+        result = backtest_engine.run(
+            start=start,
+            end=end,
+            horizon_days=horizon_days,
+            min_price_gap=min_price_gap,
+            signal_types=signal_types
+        )
+        if result is None:
+            return standard_error_response('No price history available', 'HISTORY_UNAVAILABLE', 503)
+        
+        # Signal types stay as used in the type parameter; only the stats are camelCased
+        signals = {signal_type: to_camel_case(stats) for signal_type, stats in result.pop('signals').items()}
+        return jsonify(dict(to_camel_case(result), signals=signals)), 200
+        
+    except Exception as e:
+        logger.error(f"Error running opportunity backtest: {e}", exc_info=True)
+        return standard_error_response('Failed to run backtest', 'CALCULATION_ERROR', 500)
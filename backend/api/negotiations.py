@@ -0,0 +1,367 @@
+"""
+Negotiation API endpoints
+Bilateral conversations between sellers and buyers with incremental message sync
+"""
+from flask import Blueprint, request, jsonify
+from database import db
+from models import (
+    Listing, ListingStatus, DemandListing, DemandStatus,
+    Negotiation, NegotiationStatus, MessageSenderType, UserRole
+)
+from utils.helpers import require_auth, standard_error_response
+from utils.identity import (
+    ensure_buyer_code, ensure_seller_code, get_user_identity, is_admin_user,
+    invalidate_user_identity
+)
+from utils.sse import (
+    format_sse, sse_heartbeat, last_event_id, sse_response, stream_slots, stream_capacity_response
+)
+from services.negotiation_service import NegotiationService
+from config import Config
+from datetime import datetime, timedelta
+import time
+import uuid
+
+negotiations_bp = Blueprint('negotiations', __name__)
+
+negotiation_service = NegotiationService()
+
+MAX_MESSAGES_PAGE = 200
+
+
+def _get_negotiation_for_participant(negotiation_id, user_id):
+    """
+    Load a negotiation the user takes part in (admins see all).
+
+    Returns:
+        Tuple of (negotiation, None) or (None, error response)
+    """
+    negotiation = Negotiation.query.get(negotiation_id)
+    if not negotiation:
+        return None, standard_error_response('Negotiation not found', 'NEGOTIATION_NOT_FOUND', 404)
+    if user_id not in (negotiation.initiator_id, negotiation.counterparty_id) and not is_admin_user(user_id):
+        return None, standard_error_response('Access denied', 'ACCESS_DENIED', 403)
+    return negotiation, None
+
+
+def _parse_limit():
+    """Page size from ?limit=, capped at MAX_MESSAGES_PAGE"""
+    try:
+        limit = int(request.args.get('limit', 100))
+    except ValueError:
+        limit = 100
+    return max(1, min(limit, MAX_MESSAGES_PAGE))
+
+
+def _messages_payload(messages, since_sequence, limit):
+    """Response body for an incremental message fetch"""
+    next_cursor = messages[-1].sequence if messages else since_sequence
+    return {
+        'messages': [message.to_dict(camel_case=True) for message in messages],
+        'cursor': next_cursor,
+        'hasMore': len(messages) == limit
+    }
+
+
+@negotiations_bp.route('', methods=['POST'])
+@require_auth
+def create_negotiation():
+    """
+    Open a negotiation on a listing (buyer) or a demand listing (seller).
+
+    Body: listing_id or demand_id, optional message, proposed_volume,
+    proposed_price, proposed_currency.
+    """
+    try:
+        user_id = request.headers.get('X-User-ID')
+        user = get_user_identity(user_id)
+
+        if not user:
+            return standard_error_response('User not found', 'USER_NOT_FOUND', 404)
+
+        data = request.get_json()
+        if not data:
+            return standard_error_response('Request body required', 'MISSING_BODY', 400)
+
+        listing_id = data.get('listing_id')
+        demand_id = data.get('demand_id')
+        if bool(listing_id) == bool(demand_id):
+            return standard_error_response('Exactly one of listing_id or demand_id is required', 'INVALID_TARGET', 400)
+
+        if listing_id:
+            # Buyer approaches a seller's listing
+            if user.role != UserRole.CEA_BUYER and not is_admin_user(user_id):
+                return standard_error_response('Access denied. Buyer role required.', 'ACCESS_DENIED', 403)
+            listing = Listing.query.get(listing_id)
+            if not listing or listing.status != ListingStatus.ACTIVE:
+                return standard_error_response('Active listing not found', 'LISTING_NOT_FOUND', 404)
+            counterparty_id, counterparty_code = listing.seller_id, listing.seller_code
+            initiator_code, code_assigned = ensure_buyer_code(user_id, user)
+            sender_type = MessageSenderType.BUYER
+        else:
+            # Seller answers a buyer's demand
+            if user.role != UserRole.CEA_SELLER and not is_admin_user(user_id):
+                return standard_error_response('Access denied. Seller role required.', 'ACCESS_DENIED', 403)
+            demand = DemandListing.query.get(demand_id)
+            if not demand or demand.status != DemandStatus.ACTIVE:
+                return standard_error_response('Active demand listing not found', 'DEMAND_NOT_FOUND', 404)
+            counterparty_id, counterparty_code = demand.buyer_id, demand.buyer_code
+            initiator_code, code_assigned = ensure_seller_code(user_id, user)
+            sender_type = MessageSenderType.SELLER
+
+        if counterparty_id == user_id:
+            return standard_error_response('Cannot negotiate with yourself', 'INVALID_COUNTERPARTY', 400)
+
+        try:
+            proposed_volume = int(data['proposed_volume']) if data.get('proposed_volume') is not None else None
+            proposed_price = float(data['proposed_price']) if data.get('proposed_price') is not None else None
+        except (TypeError, ValueError):
+            return standard_error_response('Invalid numeric value', 'INVALID_VALUE', 400)
+
+        negotiation = Negotiation(
+            id=str(uuid.uuid4()),
+            listing_id=listing_id,
+            demand_id=demand_id,
+            initiator_id=user_id,
+            initiator_code=initiator_code,
+            counterparty_id=counterparty_id,
+            counterparty_code=counterparty_code,
+            proposed_volume=proposed_volume,
+            proposed_price=proposed_price,
+            proposed_currency=data.get('proposed_currency'),
+            status=NegotiationStatus.OPEN,
+            message_count=0,
+            expires_at=datetime.utcnow() + timedelta(days=7)
+        )
+        db.session.add(negotiation)
+        db.session.commit()
+        if code_assigned:
+            invalidate_user_identity(user_id)
+
+        if data.get('message'):
+            negotiation_service.post_message(
+                negotiation, user_id, sender_type, initiator_code, data['message'],
+                price_proposal=proposed_price, volume_proposal=proposed_volume
+            )
+
+        return jsonify(negotiation.to_dict(camel_case=True)), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return standard_error_response(f'Error creating negotiation: {str(e)}', 'CREATE_NEGOTIATION_ERROR', 500)
+
+
+@negotiations_bp.route('', methods=['GET'])
+@require_auth
+def list_negotiations():
+    """List negotiations the user takes part in (no message bodies)"""
+    try:
+        user_id = request.headers.get('X-User-ID')
+
+        query = Negotiation.query.filter(
+            (Negotiation.initiator_id == user_id) | (Negotiation.counterparty_id == user_id)
+        )
+
+        status = request.args.get('status')
+        if status:
+            try:
+                query = query.filter(Negotiation.status == NegotiationStatus(status))
+            except ValueError:
+                return standard_error_response(f'Invalid status: {status}', 'INVALID_STATUS', 400)
+
+        negotiations = query.order_by(Negotiation.updated_at.desc()).all()
+
+        return jsonify({
+            'negotiations': [negotiation.to_dict(camel_case=True) for negotiation in negotiations],
+            'total': len(negotiations)
+        }), 200
+
+    except Exception as e:
+        return standard_error_response(f'Error listing negotiations: {str(e)}', 'LIST_NEGOTIATIONS_ERROR', 500)
+
+
+@negotiations_bp.route('/<negotiation_id>', methods=['GET'])
+@require_auth
+def get_negotiation(negotiation_id):
+    """Get negotiation details"""
+    try:
+        user_id = request.headers.get('X-User-ID')
+        negotiation, error = _get_negotiation_for_participant(negotiation_id, user_id)
+        if error:
+            return error
+
+        return jsonify(negotiation.to_dict(camel_case=True)), 200
+
+    except Exception as e:
+        return standard_error_response(f'Error getting negotiation: {str(e)}', 'GET_NEGOTIATION_ERROR', 500)
+
+
+@negotiations_bp.route('/<negotiation_id>/messages', methods=['POST'])
+@require_auth
+def post_message(negotiation_id):
+    """
+    Post a message (optionally a price/volume proposal) to an open negotiation.
+
+    Body: message, optional price_proposal, volume_proposal.
+    """
+    try:
+        user_id = request.headers.get('X-User-ID')
+        negotiation, error = _get_negotiation_for_participant(negotiation_id, user_id)
+        if error:
+            return error
+
+        if user_id not in (negotiation.initiator_id, negotiation.counterparty_id):
+            return standard_error_response('Only participants can post messages', 'ACCESS_DENIED', 403)
+
+        if negotiation.status != NegotiationStatus.OPEN:
+            return standard_error_response(
+                f'Negotiation is {negotiation.status.value}', 'NEGOTIATION_NOT_OPEN', 409
+            )
+
+        data = request.get_json()
+        if not data or not data.get('message'):
+            return standard_error_response('Missing required field: message', 'MISSING_MESSAGE', 400)
+
+        try:
+            price_proposal = float(data['price_proposal']) if data.get('price_proposal') is not None else None
+            volume_proposal = int(data['volume_proposal']) if data.get('volume_proposal') is not None else None
+        except (TypeError, ValueError):
+            return standard_error_response('Invalid numeric value', 'INVALID_VALUE', 400)
+
+        sender_code = (negotiation.initiator_code if user_id == negotiation.initiator_id
+                       else negotiation.counterparty_code)
+        sender_type = (MessageSenderType.SELLER if sender_code.startswith('SELLER-')
+                       else MessageSenderType.BUYER)
+
+        message = negotiation_service.post_message(
+            negotiation, user_id, sender_type, sender_code, data['message'],
+            price_proposal=price_proposal, volume_proposal=volume_proposal
+        )
+
+        return jsonify(message.to_dict(camel_case=True)), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return standard_error_response(f'Error posting message: {str(e)}', 'POST_MESSAGE_ERROR', 500)
+
+
+@negotiations_bp.route('/<negotiation_id>/messages', methods=['GET'])
+@require_auth
+def get_messages(negotiation_id):
+    """
+    Incremental message fetch.
+
+    Query params: since (sequence number or message ID, default 0), limit.
+    Returns messages after the cursor and the new cursor to send next time.
+    """
+    try:
+        user_id = request.headers.get('X-User-ID')
+        negotiation, error = _get_negotiation_for_participant(negotiation_id, user_id)
+        if error:
+            return error
+
+        since = negotiation_service.resolve_cursor(negotiation_id, request.args.get('since'))
+        if since is None:
+            return standard_error_response('Invalid cursor', 'INVALID_CURSOR', 400)
+
+        limit = _parse_limit()
+        messages = negotiation_service.get_messages_since(negotiation_id, since, limit)
+
+        return jsonify(_messages_payload(messages, since, limit)), 200
+
+    except Exception as e:
+        return standard_error_response(f'Error getting messages: {str(e)}', 'GET_MESSAGES_ERROR', 500)
+
+
+@negotiations_bp.route('/<negotiation_id>/messages/poll', methods=['GET'])
+@require_auth
+def poll_messages(negotiation_id):
+    """
+    Long-poll for new messages.
+
+    Holds the request until a message after `since` arrives or `timeout`
+    seconds (capped by NEGOTIATION_LONG_POLL_TIMEOUT_SECONDS) elapse; on
+    timeout returns an empty page with the unchanged cursor.
+    """
+    try:
+        user_id = request.headers.get('X-User-ID')
+        negotiation, error = _get_negotiation_for_participant(negotiation_id, user_id)
+        if error:
+            return error
+
+        since = negotiation_service.resolve_cursor(negotiation_id, request.args.get('since'))
+        if since is None:
+            return standard_error_response('Invalid cursor', 'INVALID_CURSOR', 400)
+
+        try:
+            timeout = float(request.args.get('timeout', Config.NEGOTIATION_LONG_POLL_TIMEOUT_SECONDS))
+        except ValueError:
+            timeout = Config.NEGOTIATION_LONG_POLL_TIMEOUT_SECONDS
+        timeout = max(0.0, min(timeout, Config.NEGOTIATION_LONG_POLL_TIMEOUT_SECONDS))
+
+        limit = _parse_limit()
+        if not stream_slots.acquire():
+            return stream_capacity_response()
+        try:
+            messages = negotiation_service.wait_for_messages(negotiation_id, since, timeout, limit)
+        finally:
+            stream_slots.release()
+
+        return jsonify(_messages_payload(messages, since, limit)), 200
+
+    except Exception as e:
+        return standard_error_response(f'Error polling messages: {str(e)}', 'POLL_MESSAGES_ERROR', 500)
+
+
+@negotiations_bp.route('/<negotiation_id>/stream', methods=['GET'])
+@require_auth
+def stream_messages(negotiation_id):
+    """
+    Server-Sent Events stream of new messages.
+
+    Each message is sent as a `message` event whose id is its sequence, so a
+    reconnecting browser resumes via Last-Event-ID. Heartbeat comments keep
+    idle connections open; the stream ends after
+    NEGOTIATION_SSE_MAX_DURATION_SECONDS and the client reconnects. Like the
+    long-poll, it is refused with 503 and Retry-After when the worker already
+    holds STREAM_MAX_CONNECTIONS_PER_WORKER open streams.
+    """
+    user_id = request.headers.get('X-User-ID')
+    negotiation, error = _get_negotiation_for_participant(negotiation_id, user_id)
+    if error:
+        return error
+
+    since = negotiation_service.resolve_cursor(negotiation_id, last_event_id(request))
+    if since is None:
+        return standard_error_response('Invalid cursor', 'INVALID_CURSOR', 400)
+    db.session.rollback()
+    if not stream_slots.acquire():
+        return stream_capacity_response()
+
+    def generate(since):
+        heartbeat = Config.NEGOTIATION_SSE_HEARTBEAT_SECONDS
+        deadline = time.monotonic() + Config.NEGOTIATION_SSE_MAX_DURATION_SECONDS
+        last_sent = time.monotonic()
+        yield format_sse(retry_ms=3000)
+
+        while time.monotonic() < deadline:
+            messages = negotiation_service.get_messages_since(negotiation_id, since, MAX_MESSAGES_PAGE)
+            for message in messages:
+                since = message.sequence
+                yield format_sse(message.to_dict(camel_case=True), event='message', event_id=since)
+            db.session.rollback()
+
+            if messages:
+                last_sent = time.monotonic()
+                continue
+            if time.monotonic() - last_sent >= heartbeat:
+                yield sse_heartbeat()
+                last_sent = time.monotonic()
+
+            negotiation_service.notifier.wait(
+                negotiation_id, since, min(heartbeat, negotiation_service.recheck_seconds)
+            )
+
+    response = sse_response(generate(since))
+    response.call_on_close(stream_slots.release)
+    return response
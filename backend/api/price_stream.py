@@ -0,0 +1,101 @@
+"""
+Price Stream API endpoints
+Push EUA/CEA price ticks to dashboards over Server-Sent Events (and WebSocket when flask-sock is installed)
+"""
+from flask import Blueprint, request
+from config import Config
+from services.price_stream import price_hub, parse_event_id
+from utils.sse import (
+    sse_heartbeat, sse_response, format_sse, last_event_id, stream_slots, stream_capacity_response
+)
+import json
+import time
+
+price_stream_bp = Blueprint('price_stream', __name__)
+
+STREAM_TYPES = ('eua', 'cea')
+
+
+def _requested_types():
+    """Event types requested with ?types=eua,cea (default: all)"""
+    types = request.args.get('types')
+    if not types:
+        return set(STREAM_TYPES)
+    return {t.strip().lower() for t in types.split(',') if t.strip().lower() in STREAM_TYPES}
+
+
+@price_stream_bp.route('/api/prices/stream', methods=['GET'])
+def stream_prices():
+    """
+    Server-Sent Events stream of price ticks.
+
+    Query params:
+        types: Comma-separated event types to receive (eua, cea; default both)
+
+    Each tick is an `eua` or `cea` event carrying the same payload as
+    GET /api/eua/price. New subscribers (and reconnecting ones whose
+    Last-Event-ID is no longer buffered) first get the latest tick of each
+    type. Heartbeat comments are sent every PRICE_STREAM_HEARTBEAT_SECONDS;
+    the stream ends after PRICE_STREAM_MAX_DURATION_SECONDS and the browser
+    reconnects with Last-Event-ID. Beyond STREAM_MAX_CONNECTIONS_PER_WORKER
+    open streams the request is refused with 503 and Retry-After.
+    """
+    if not stream_slots.acquire():
+        return stream_capacity_response()
+    types = _requested_types()
+    resume_from = parse_event_id(last_event_id(request, arg_name='lastEventId'))
+
+    def generate():
+        heartbeat = Config.PRICE_STREAM_HEARTBEAT_SECONDS
+        deadline = time.monotonic() + Config.PRICE_STREAM_MAX_DURATION_SECONDS
+        price_hub.subscribe()
+        try:
+            yield format_sse(retry_ms=Config.PRICE_STREAM_RETRY_MS)
+            events, cursor = price_hub.events_since(resume_from)
+            while True:
+                for event in events:
+                    if event.event in types:
+                        yield event.frame
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                events, cursor = price_hub.wait(cursor, min(heartbeat, remaining))
+                if not events:
+                    yield sse_heartbeat()
+        finally:
+            price_hub.unsubscribe()
+
+    response = sse_response(generate())
+    response.call_on_close(stream_slots.release)
+    return response
+
+
+def serve_price_websocket(ws):
+    """
+    WebSocket variant of the price stream (registered by app.py when
+    flask-sock is available).
+
+    Sends JSON messages {"id", "type", "data"}; heartbeats are
+    {"type": "heartbeat"}. Clients may resume with ?lastEventId=. At
+    capacity the socket is closed with 1013 (try again later).
+    """
+    if not stream_slots.acquire():
+        ws.close(reason=1013, message='Too many open streams, retry later')
+        return
+    types = _requested_types()
+    resume_from = parse_event_id(request.args.get('lastEventId'))
+    heartbeat = Config.PRICE_STREAM_HEARTBEAT_SECONDS
+
+    price_hub.subscribe()
+    try:
+        events, cursor = price_hub.events_since(resume_from)
+        while ws.connected:
+            for event in events:
+                if event.event in types:
+                    ws.send(json.dumps({'id': event.id, 'type': event.event, 'data': event.data}))
+            events, cursor = price_hub.wait(cursor, heartbeat)
+            if not events:
+                ws.send(json.dumps({'type': 'heartbeat'}))
+    finally:
+        price_hub.unsubscribe()
+        stream_slots.release()
@@ -4,66 +4,93 @@ For Chinese entities selling CEA
 """
 from flask import Blueprint, request, jsonify
 from database import db
-from models import Listing, ListingStatus, User, UserRole
+from models import Listing, ListingStatus, UserRole
 from utils.helpers import require_auth, standard_error_response, generate_uuid
+from utils.identity import ensure_seller_code, get_user_identity, is_admin_user, invalidate_user_identity
+from utils.bulk import parse_batch_payload, build_batch_rows, bulk_insert, batch_response_status
+from config import Config
 from datetime import datetime, timedelta
 import uuid
 
 seller_bp = Blueprint('seller', __name__)
 
 
+def _listing_row(data, user_id, seller_code, now):
+    """
+    Validate listing input and build a listings row.
+
+    Returns:
+        Tuple of (row dict, None) or (None, (error message, error code))
+    """
+    required_fields = ['volume', 'price_per_tonne', 'currency', 'timeline']
+    for field in required_fields:
+        if field not in data:
+            return None, (f'Missing required field: {field}', f'MISSING_{field.upper()}')
+
+    try:
+        volume = int(data['volume'])
+        price_per_tonne = float(data['price_per_tonne'])
+        reference_price = float(data.get('reference_price')) if data.get('reference_price') else None
+        premium_expected = float(data.get('premium_expected')) if data.get('premium_expected') else None
+    except (TypeError, ValueError):
+        return None, ('Invalid numeric value', 'INVALID_VALUE')
+
+    if volume <= 0 or price_per_tonne <= 0:
+        return None, ('Volume and price must be positive', 'INVALID_VALUE')
+
+    return {
+        'id': str(uuid.uuid4()),
+        'seller_id': user_id,
+        'seller_code': seller_code,
+        'volume': volume,
+        'price_per_tonne': price_per_tonne,
+        'currency': data['currency'],
+        'timeline': data['timeline'],
+        'reference_price': reference_price,
+        'premium_expected': premium_expected,
+        'settlement_currencies': data.get('settlement_currencies', [data['currency']]),
+        'tax_optimization_requested': data.get('tax_optimization_requested', False),
+        'status': ListingStatus.ACTIVE,
+        'created_at': now,
+        'updated_at': now,
+        'expires_at': now + timedelta(days=30) if data.get('expires_at') is None else None
+    }, None
+
+
 @seller_bp.route('/listings', methods=['POST'])
 @require_auth
 def create_listing():
     """Create a new CEA listing"""
     try:
         user_id = request.headers.get('X-User-ID')
-        user = User.query.get(user_id)
+        user = get_user_identity(user_id)
         
         if not user:
             return standard_error_response('User not found', 'USER_NOT_FOUND'), 404
         
         # Verify user is a seller
-        if user.role != UserRole.CEA_SELLER and not user.is_admin:
+        if user.role != UserRole.CEA_SELLER and not is_admin_user(user_id):
             return standard_error_response('Access denied. Seller role required.', 'ACCESS_DENIED'), 403
         
         data = request.get_json()
         if not data:
             return standard_error_response('Request body required', 'MISSING_BODY'), 400
         
-        # Validate required fields
-        required_fields = ['volume', 'price_per_tonne', 'currency', 'timeline']
-        for field in required_fields:
-            if field not in data:
-                return standard_error_response(f'Missing required field: {field}', f'MISSING_{field.upper()}'), 400
+        # Validate input before assigning a seller code
+        row, error = _listing_row(data, user_id, None, datetime.utcnow())
+        if error:
+            return standard_error_response(error[0], error[1], 400)
         
         # Generate seller code if not exists
-        if not user.seller_code:
-            # Generate unique seller code: SELLER-CN-{4-digit}
-            import random
-            code_number = random.randint(1000, 9999)
-            user.seller_code = f"SELLER-CN-{code_number}"
-            db.session.commit()
+        row['seller_code'], code_assigned = ensure_seller_code(user_id, user)
         
         # Create listing
-        listing = Listing(
-            id=str(uuid.uuid4()),
-            seller_id=user_id,
-            seller_code=user.seller_code,
-            volume=int(data['volume']),
-            price_per_tonne=float(data['price_per_tonne']),
-            currency=data['currency'],
-            timeline=data['timeline'],
-            reference_price=float(data.get('reference_price')) if data.get('reference_price') else None,
-            premium_expected=float(data.get('premium_expected')) if data.get('premium_expected') else None,
-            settlement_currencies=data.get('settlement_currencies', [data['currency']]),
-            tax_optimization_requested=data.get('tax_optimization_requested', False),
-            status=ListingStatus.ACTIVE,
-            expires_at=datetime.utcnow() + timedelta(days=30) if data.get('expires_at') is None else None
-        )
+        listing = Listing(**row)
         
         db.session.add(listing)
         db.session.commit()
+        if code_assigned:
+            invalidate_user_identity(user_id)
         
         return jsonify(listing.to_dict(camel_case=True)), 201
         
@@ -72,19 +99,79 @@ def create_listing():
         return standard_error_response(f'Error creating listing: {str(e)}', 'CREATE_LISTING_ERROR'), 500
 
 
+@seller_bp.route('/listings/batch', methods=['POST'])
+@require_auth
+def create_listings_batch():
+    """
+    Create many CEA listings in one request.
+    
+    Body is a JSON array, {"listings": [...]} or NDJSON. All items are
+    validated first; valid ones are inserted in a single transaction with one
+    bulk INSERT and invalid ones are reported per index.
+    """
+    try:
+        user_id = request.headers.get('X-User-ID')
+        user = get_user_identity(user_id)
+        
+        if not user:
+            return standard_error_response('User not found', 'USER_NOT_FOUND', 404)
+        
+        # Verify user is a seller
+        if user.role != UserRole.CEA_SELLER and not is_admin_user(user_id):
+            return standard_error_response('Access denied. Seller role required.', 'ACCESS_DENIED', 403)
+        
+        items, parse_errors = parse_batch_payload('listings')
+        if items is None:
+            return standard_error_response('Request body must be a JSON array, {"listings": [...]} or NDJSON', 'INVALID_BATCH', 400)
+        if not items:
+            return standard_error_response('Batch is empty', 'EMPTY_BATCH', 400)
+        if len(items) > Config.BULK_MAX_ITEMS:
+            return standard_error_response(
+                f'Batch too large: {len(items)} items (max {Config.BULK_MAX_ITEMS})',
+                'BATCH_TOO_LARGE', 413
+            )
+        
+        now = datetime.utcnow()
+        rows, errors = build_batch_rows(
+            items, lambda data: _listing_row(data, user_id, None, now), parse_errors
+        )
+        
+        code_assigned = False
+        if rows:
+            seller_code, code_assigned = ensure_seller_code(user_id, user)
+            for _, row in rows:
+                row['seller_code'] = seller_code
+            bulk_insert(Listing, [row for _, row in rows])
+            db.session.commit()
+        if code_assigned:
+            invalidate_user_identity(user_id)
+        
+        return jsonify({
+            'created': [{'index': index, 'id': row['id']} for index, row in rows],
+            'errors': errors,
+            'total': len(items),
+            'createdCount': len(rows),
+            'errorCount': len(errors)
+        }), batch_response_status(len(rows), len(errors))
+        
+    except Exception as e:
+        db.session.rollback()
+        return standard_error_response(f'Error creating listings: {str(e)}', 'CREATE_LISTINGS_BATCH_ERROR', 500)
+
+
 @seller_bp.route('/listings', methods=['GET'])
 @require_auth
 def list_listings():
     """List seller's listings"""
     try:
         user_id = request.headers.get('X-User-ID')
-        user = User.query.get(user_id)
+        user = get_user_identity(user_id)
         
         if not user:
             return standard_error_response('User not found', 'USER_NOT_FOUND'), 404
         
         # Verify user is a seller
-        if user.role != UserRole.CEA_SELLER and not user.is_admin:
+        if user.role != UserRole.CEA_SELLER and not is_admin_user(user_id):
             return standard_error_response('Access denied. Seller role required.', 'ACCESS_DENIED'), 403
         
         # Get query parameters
@@ -123,8 +210,7 @@ def get_listing(listing_id):
             return standard_error_response('Listing not found', 'LISTING_NOT_FOUND'), 404
         
         # Verify ownership or admin
-        user = User.query.get(user_id)
-        if listing.seller_id != user_id and not (user and user.is_admin):
+        if listing.seller_id != user_id and not is_admin_user(user_id):
             return standard_error_response('Access denied', 'ACCESS_DENIED'), 403
         
         return jsonify(listing.to_dict(camel_case=True)), 200
@@ -6,9 +6,11 @@ from flask import Blueprint, request, jsonify
 from database import db
 from models import (
     SwapRequest, SwapRequestStatus, SwapQuote, SwapQuoteStatus,
-    User, UserRole
+    UserRole
 )
 from utils.helpers import require_auth, standard_error_response
+from utils.identity import get_user_identity, is_admin_user
+from services.swap_quote_engine import swap_quote_engine
 from datetime import datetime, timedelta
 import uuid
 
@@ -18,16 +20,16 @@ swap_bp = Blueprint('swap', __name__)
 @swap_bp.route('/request', methods=['POST'])
 @require_auth
 def request_swap():
-    """Request a swap quote"""
+    """Request a swap quote (quoted automatically by the swap quote engine)"""
     try:
         user_id = request.headers.get('X-User-ID')
-        user = User.query.get(user_id)
+        user = get_user_identity(user_id)
         
         if not user:
             return standard_error_response('User not found', 'USER_NOT_FOUND'), 404
         
         # Verify user is EUA holder
-        if user.role != UserRole.EUA_HOLDER and not user.is_admin:
+        if user.role != UserRole.EUA_HOLDER and not is_admin_user(user_id):
             return standard_error_response('Access denied. EUA holder role required.', 'ACCESS_DENIED'), 403
         
         data = request.get_json()
@@ -60,6 +62,9 @@ def request_swap():
         db.session.add(swap_request)
         db.session.commit()
         
+        # Quote automatically (picked up by the quote engine worker)
+        swap_quote_engine.enqueue(swap_request.id)
+        
         return jsonify(swap_request.to_dict(camel_case=True)), 201
         
     except Exception as e:
@@ -73,13 +78,13 @@ def list_swap_requests():
     """List swap requests"""
     try:
         user_id = request.headers.get('X-User-ID')
-        user = User.query.get(user_id)
+        user = get_user_identity(user_id)
         
         if not user:
             return standard_error_response('User not found', 'USER_NOT_FOUND'), 404
         
         # Verify user is EUA holder
-        if user.role != UserRole.EUA_HOLDER and not user.is_admin:
+        if user.role != UserRole.EUA_HOLDER and not is_admin_user(user_id):
             return standard_error_response('Access denied. EUA holder role required.', 'ACCESS_DENIED'), 403
         
         # Get user's swap requests
@@ -106,8 +111,7 @@ def get_swap_request(request_id):
             return standard_error_response('Swap request not found', 'SWAP_REQUEST_NOT_FOUND'), 404
         
         # Verify ownership or admin
-        user = User.query.get(user_id)
-        if swap_request.requester_id != user_id and not (user and user.is_admin):
+        if swap_request.requester_id != user_id and not is_admin_user(user_id):
             return standard_error_response('Access denied', 'ACCESS_DENIED'), 403
         
         response_data = swap_request.to_dict(camel_case=True)
@@ -135,8 +139,7 @@ def get_swap_quote(quote_id):
         
         # Verify ownership or admin
         swap_request = SwapRequest.query.get(quote.swap_request_id)
-        user = User.query.get(user_id)
-        if swap_request.requester_id != user_id and not (user and user.is_admin):
+        if swap_request.requester_id != user_id and not is_admin_user(user_id):
             return standard_error_response('Access denied', 'ACCESS_DENIED'), 403
         
         return jsonify(quote.to_dict(camel_case=True)), 200
@@ -191,13 +194,13 @@ def get_swap_portfolio():
     """Get institutional portfolio analytics"""
     try:
         user_id = request.headers.get('X-User-ID')
-        user = User.query.get(user_id)
+        user = get_user_identity(user_id)
         
         if not user:
             return standard_error_response('User not found', 'USER_NOT_FOUND'), 404
         
         # Verify user is EUA holder
-        if user.role != UserRole.EUA_HOLDER and not user.is_admin:
+        if user.role != UserRole.EUA_HOLDER and not is_admin_user(user_id):
             return standard_error_response('Access denied. EUA holder role required.', 'ACCESS_DENIED'), 403
         
         # Get swap requests and quotes
@@ -15,7 +15,18 @@ from historical_data_collector import HistoricalDataCollector
 from config import config
 from database import db
 from models.price_history import PriceHistory
+from services.expiry_sweeper import ExpirySweeper
+from services.resumable_upload import resumable_uploads
+from services.document_processor import document_processor
+from services.sanctions_checker import SanctionsChecker
+from services.sanctions_rescreening import sanctions_rescreening
+from services.review_queue import review_queue
+from services.market_state import market_state
+from services.price_stream import price_hub, price_payload
+from utils.sse import stream_slots
+from services.swap_quote_engine import swap_quote_engine
 from utils.helpers import require_admin
+from utils.serializers import to_camel_case
 
 # Try to import flask_limiter, but don't fail if not installed
 try:
@@ -26,6 +37,13 @@ except ImportError:
     LIMITER_AVAILABLE = False
     logging.warning("Flask-Limiter not installed. Rate limiting disabled.")
 
+# Try to import flask_sock for the optional WebSocket price stream
+try:
+    from flask_sock import Sock
+    SOCK_AVAILABLE = True
+except ImportError:
+    SOCK_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -84,6 +102,8 @@ from api.swap import swap_bp
 from api.calculator import calculator_bp
 from api.market_opportunities import market_opportunities_bp
 from api.market_analysis import market_analysis_bp
+from api.negotiations import negotiations_bp
+from api.price_stream import price_stream_bp, serve_price_websocket
 
 # Register blueprints
 app.register_blueprint(kyc_bp)
@@ -97,12 +117,45 @@ app.register_blueprint(swap_bp, url_prefix='/api/swap')
 app.register_blueprint(calculator_bp)
 app.register_blueprint(market_opportunities_bp)
 app.register_blueprint(market_analysis_bp)
+app.register_blueprint(negotiations_bp, url_prefix='/api/negotiations')
+app.register_blueprint(price_stream_bp)
+
+# Long-lived sync connections are not counted against request rate limits
+if limiter:
+    limiter.exempt(app.view_functions['negotiations.poll_messages'])
+    limiter.exempt(app.view_functions['negotiations.stream_messages'])
+    limiter.exempt(app.view_functions['price_stream.stream_prices'])
+
+# WebSocket upgrade for the price stream (SSE at /api/prices/stream works without it)
+if SOCK_AVAILABLE:
+    sock = Sock(app)
+    sock.route('/api/prices/ws')(serve_price_websocket)
+    logger.info("WebSocket price stream enabled at /api/prices/ws")
 
 # Create database tables
 with app.app_context():
     db.create_all()
     logger.info("Database tables created/verified")
 
+    # Summarise dossiers created before the review queue existed
+    try:
+        review_queue.backfill()
+    except Exception as e:
+        logger.warning(f"Could not backfill KYC review summaries: {e}")
+        db.session.rollback()
+
+    # Seed the market analytics with the stored EUA prices of the longest window
+    try:
+        history_start = datetime.utcnow() - market_state.retention - timedelta(hours=1)
+        market_state.warm_from_history(
+            PriceHistory.query
+            .filter(PriceHistory.timestamp >= history_start)
+            .order_by(PriceHistory.timestamp.asc())
+            .all()
+        )
+    except Exception as e:
+        logger.warning(f"Could not warm market state from price history: {e}")
+
 # Initialize scraper
 scraper = ICEScraper()
 alternative_source = AlternativePriceSource()
@@ -165,6 +218,9 @@ def scheduled_price_update():
                 logger.warning("Scheduled price update: No price data available")
                 return
             
+            # Update the rolling analytics (sets the exact 24h change)
+            apply_market_tick('eua', price_data)
+            
             # Store in database
             price_entry = PriceHistory(
                 price=price_data['price'],
@@ -177,13 +233,22 @@ def scheduled_price_update():
             db.session.commit()
             
             # Update cache
-            global cached_response, last_fetch_time
+            global cached_response, last_fetch_time, cached_cea_response, last_cea_fetch_time
             cached_response = price_data
             last_fetch_time = datetime.now(timezone.utc)
             
             # Update source price history
             update_source_price_history(price_data)
             
+            # Push the tick to stream subscribers, with the CEA price derived from it
+            price_hub.publish('eua', price_payload(price_data))
+            cea_price_data = scraper.scrape_cea_price(price_data['price'])
+            if cea_price_data:
+                apply_market_tick('cea', cea_price_data)
+                cached_cea_response = cea_price_data
+                last_cea_fetch_time = last_fetch_time
+                price_hub.publish('cea', price_payload(cea_price_data))
+            
             logger.info(f"Scheduled price update: Stored price €{price_data['price']} from {price_data.get('source', 'Unknown')}")
         except Exception as e:
             logger.error(f"Scheduled price update failed: {e}", exc_info=True)
@@ -202,10 +267,157 @@ scheduler.add_job(
 )
 logger.info(f"Scheduled price update job: every {update_interval_minutes} minute(s)")
 
+# Expiry sweeper for listings, demand listings, negotiations and swap quotes
+expiry_sweeper = ExpirySweeper(
+    batch_size=int(os.getenv('EXPIRY_SWEEP_BATCH_SIZE', 500)),
+    max_batches=int(os.getenv('EXPIRY_SWEEP_MAX_BATCHES', 20))
+)
+
+
+def scheduled_expiry_sweep():
+    """Background job to expire overdue listings, demands, negotiations and quotes"""
+    with app.app_context():
+        expiry_sweeper.sweep()
+        # Drop stale resumable KYC uploads and their partial files
+        try:
+            purged = resumable_uploads.purge_expired()
+            if purged:
+                logger.info(f"Purged {purged} expired resumable upload(s)")
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Resumable upload purge failed: {e}", exc_info=True)
+
+
+expiry_sweep_interval_minutes = int(os.getenv('EXPIRY_SWEEP_INTERVAL_MINUTES', 5))
+scheduler.add_job(
+    func=scheduled_expiry_sweep,
+    trigger='interval',
+    minutes=expiry_sweep_interval_minutes,
+    id='expiry_sweep',
+    name='Expiry Sweep',
+    replace_existing=True
+)
+logger.info(f"Scheduled expiry sweep job: every {expiry_sweep_interval_minutes} minute(s)")
+
+# Swap quote engine: worker quotes new requests as they arrive, the sweep
+# catches anything the queue missed (other workers, restarts, no price yet)
+swap_quote_engine.start(app)
+
+
+def scheduled_swap_quote_sweep():
+    """Background job to quote swap requests still pending"""
+    with app.app_context():
+        try:
+            swap_quote_engine.quote_pending()
+        except Exception as e:
+            logger.error(f"Swap quote sweep failed: {e}", exc_info=True)
+            db.session.rollback()
+
+
+swap_quote_sweep_interval_seconds = int(os.getenv('SWAP_QUOTE_SWEEP_INTERVAL_SECONDS', 60))
+scheduler.add_job(
+    func=scheduled_swap_quote_sweep,
+    trigger='interval',
+    seconds=swap_quote_sweep_interval_seconds,
+    id='swap_quote_sweep',
+    name='Swap Quote Sweep',
+    replace_existing=True
+)
+logger.info(f"Scheduled swap quote sweep job: every {swap_quote_sweep_interval_seconds} second(s)")
+
+# KYC document processing: worker pool handles new uploads, the sweep catches
+# documents the queue missed and retries those stuck in processing
+document_processor.start(app)
+
+
+def scheduled_document_processing_sweep():
+    """Background job to queue KYC documents still pending processing"""
+    with app.app_context():
+        try:
+            document_processor.process_pending()
+        except Exception as e:
+            logger.error(f"Document processing sweep failed: {e}", exc_info=True)
+            db.session.rollback()
+
+
+document_processing_sweep_interval_minutes = int(os.getenv('DOCUMENT_PROCESSING_SWEEP_INTERVAL_MINUTES', 5))
+scheduler.add_job(
+    func=scheduled_document_processing_sweep,
+    trigger='interval',
+    minutes=document_processing_sweep_interval_minutes,
+    id='document_processing_sweep',
+    name='Document Processing Sweep',
+    replace_existing=True
+)
+logger.info(f"Scheduled document processing sweep job: every {document_processing_sweep_interval_minutes} minute(s)")
+
+
+def scheduled_sanctions_list_sync():
+    """Background job to apply sanctions list updates and rescreen users if anything changed"""
+    with app.app_context():
+        try:
+            result = SanctionsChecker.load_lists()
+            if result.changed:
+                sanctions_rescreening.run()
+        except Exception as e:
+            logger.error(f"Sanctions list sync failed: {e}", exc_info=True)
+            db.session.rollback()
+
+
+sanctions_list_sync_interval_minutes = int(os.getenv('SANCTIONS_LIST_SYNC_INTERVAL_MINUTES', 1440))
+scheduler.add_job(
+    func=scheduled_sanctions_list_sync,
+    trigger='interval',
+    minutes=sanctions_list_sync_interval_minutes,
+    id='sanctions_list_sync',
+    name='Sanctions List Sync',
+    replace_existing=True
+)
+logger.info(f"Scheduled sanctions list sync job: every {sanctions_list_sync_interval_minutes} minute(s)")
+
+
+def scheduled_sanctions_rescreening():
+    """Background job to rescreen users not yet screened against the current sanctions lists"""
+    with app.app_context():
+        try:
+            sanctions_rescreening.run()
+        except Exception as e:
+            logger.error(f"Sanctions rescreening failed: {e}", exc_info=True)
+            db.session.rollback()
+
+
+sanctions_rescreen_interval_minutes = int(os.getenv('SANCTIONS_RESCREEN_INTERVAL_MINUTES', 60))
+scheduler.add_job(
+    func=scheduled_sanctions_rescreening,
+    trigger='interval',
+    minutes=sanctions_rescreen_interval_minutes,
+    id='sanctions_rescreening',
+    name='Sanctions Rescreening',
+    replace_existing=True
+)
+logger.info(f"Scheduled sanctions rescreening job: every {sanctions_rescreen_interval_minutes} minute(s)")
+
 # Register shutdown handler for scheduler
 atexit.register(lambda: scheduler.shutdown())
 
 
+def apply_market_tick(event, price_data):
+    """
+    Feed a fetched price into the market analytics.
+    
+    Sets price_data['change24h'] to the exact change over the analytics
+    change window once the stored ticks cover it; until then a change
+    reported by the source (if any) is kept.
+    
+    Args:
+        event: 'eua' or 'cea'
+        price_data: Price dict from the scraper (modified in place)
+    """
+    state = market_state.on_tick(event, price_payload(price_data))
+    if state and state['change_percent24h'] is not None:
+        price_data['change24h'] = state['change_percent24h']
+
+
 def update_source_price_history(price_data):
     """
     Update source_price_history with price data.
@@ -260,7 +472,8 @@ def get_eua_price():
         - price: Current EUA price in EUR
         - timestamp: ISO 8601 timestamp
         - currency: Currency code ("EUR")
-        - change24h: 24-hour price change percentage (optional)
+        - change24h: Exact 24-hour change percentage from the market analytics
+          (source-reported or None until 24h of ticks are covered)
         - source: Name of data source that provided this price
     
     Source tracking:
@@ -301,10 +514,12 @@ def get_eua_price():
     
     # Track source price history
     update_source_price_history(price_data)
+    apply_market_tick('eua', price_data)
     
     # Update cache
     cached_response = price_data
     last_fetch_time = datetime.now(timezone.utc)
+    price_hub.publish('eua', price_payload(price_data))
     
     # Format response
     response = {
@@ -351,10 +566,12 @@ def refresh_price():
     
     # Track source price history
     update_source_price_history(price_data)
+    apply_market_tick('eua', price_data)
     
     # Update cache
     cached_response = price_data
     last_fetch_time = datetime.now(timezone.utc)
+    price_hub.publish('eua', price_payload(price_data))
     
     response = {
         'price': price_data['price'],
@@ -409,8 +626,10 @@ def get_cea_price():
             }), 503
     
     # Update cache
+    apply_market_tick('cea', cea_price_data)
     cached_cea_response = cea_price_data
     last_cea_fetch_time = datetime.now(timezone.utc)
+    price_hub.publish('cea', price_payload(cea_price_data))
     
     # Format response
     response = {
@@ -752,6 +971,7 @@ def get_price_updates_status():
         JSON response with:
         - eua: EUA price update configuration and status
         - cea: CEA price update configuration and status  
+        - stream: Price stream endpoints and subscriber/publish counters
         - historical: Historical data collector information
     
     Response format:
@@ -868,6 +1088,12 @@ def get_price_updates_status():
             'lastUpdate': cea_last_update,
             'status': cea_status
         },
+        'stream': {
+            'endpoint': '/api/prices/stream',
+            'websocket': '/api/prices/ws' if SOCK_AVAILABLE else None,
+            **to_camel_case(price_hub.get_stats()),
+            'connections': to_camel_case(stream_slots.get_stats())
+        },
         'historical': {
             'libraries': ['requests', 'BeautifulSoup', 'json'],
             'method': 'Realistic generation based on market trends',
@@ -879,6 +1105,34 @@ def get_price_updates_status():
     }), 200
 
 
+@app.route('/api/admin/expiry-sweeper/status', methods=['GET'])
+@require_admin
+def get_expiry_sweeper_status():
+    """
+    Get expiry sweeper counters for admin monitoring.
+    
+    Returns number of runs, last run time/duration, rows expired per target
+    in the last run and in total since process start.
+    """
+    stats = expiry_sweeper.get_stats()
+    stats['interval_minutes'] = expiry_sweep_interval_minutes
+    return jsonify(to_camel_case(stats)), 200
+
+
+@app.route('/api/admin/swap-quotes/status', methods=['GET'])
+@require_admin
+def get_swap_quote_engine_status():
+    """
+    Get swap quote engine counters for admin monitoring.
+    
+    Returns batches run, quotes created, requests skipped for lack of a
+    price, last batch size/duration and the current queue size.
+    """
+    stats = swap_quote_engine.get_stats()
+    stats['sweep_interval_seconds'] = swap_quote_sweep_interval_seconds
+    return jsonify(to_camel_case(stats)), 200
+
+
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
     debug = os.getenv('FLASK_ENV') == 'development'
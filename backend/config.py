@@ -34,15 +34,112 @@ class Config:
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads', 'kyc_documents')
     ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg', 'doc', 'docx'}
+    DOCUMENT_STORE_FOLDER = os.path.join(UPLOAD_FOLDER, 'blobs')  # Content-addressed KYC document blobs
+    UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', 64 * 1024))  # Bytes read per streamed chunk
+    RESUMABLE_UPLOAD_MAX_SIZE = int(os.environ.get('RESUMABLE_UPLOAD_MAX_SIZE', 200 * 1024 * 1024))  # Whole file
+    RESUMABLE_UPLOAD_EXPIRY_HOURS = int(os.environ.get('RESUMABLE_UPLOAD_EXPIRY_HOURS', 24))  # Since last chunk
+    UPLOAD_SNIFF_BYTES = int(os.environ.get('UPLOAD_SNIFF_BYTES', 4096))  # Head of a file checked for magic bytes
+    PDF_CHECK_TIMEOUT_SECONDS = float(os.environ.get('PDF_CHECK_TIMEOUT_SECONDS', 5))  # Structure check time budget
+    PDF_MAX_DECOMPRESSED_SIZE = int(os.environ.get('PDF_MAX_DECOMPRESSED_SIZE', 256 * 1024 * 1024))  # All streams inflated
+    PDF_MAX_OBJECTS = int(os.environ.get('PDF_MAX_OBJECTS', 200000))  # Cross-reference entries
+    
+    # Identity cache (role/is_admin/codes per user ID, 0 disables caching)
+    IDENTITY_CACHE_TTL_SECONDS = int(os.environ.get('IDENTITY_CACHE_TTL_SECONDS', 30))
+    IDENTITY_CACHE_MAX_SIZE = int(os.environ.get('IDENTITY_CACHE_MAX_SIZE', 4096))
+    
+    # Bulk listing/demand endpoints
+    BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', 5000))  # Maximum items per batch request
+    
+    # Negotiation messaging (long-poll / SSE)
+    NEGOTIATION_LONG_POLL_TIMEOUT_SECONDS = int(os.environ.get('NEGOTIATION_LONG_POLL_TIMEOUT_SECONDS', 25))
+    NEGOTIATION_SSE_HEARTBEAT_SECONDS = int(os.environ.get('NEGOTIATION_SSE_HEARTBEAT_SECONDS', 15))
+    NEGOTIATION_SSE_MAX_DURATION_SECONDS = int(os.environ.get('NEGOTIATION_SSE_MAX_DURATION_SECONDS', 300))
+    
+    # Price stream (SSE / WebSocket push of price ticks)
+    PRICE_STREAM_HEARTBEAT_SECONDS = int(os.environ.get('PRICE_STREAM_HEARTBEAT_SECONDS', 15))
+    PRICE_STREAM_MAX_DURATION_SECONDS = int(os.environ.get('PRICE_STREAM_MAX_DURATION_SECONDS', 600))
+    PRICE_STREAM_RETRY_MS = int(os.environ.get('PRICE_STREAM_RETRY_MS', 5000))
+    PRICE_STREAM_BUFFER_SIZE = int(os.environ.get('PRICE_STREAM_BUFFER_SIZE', 256))
+    
+    # Long-lived connections (price/negotiation SSE, WebSocket, long-poll) each hold a worker thread
+    STREAM_MAX_CONNECTIONS_PER_WORKER = int(os.environ.get('STREAM_MAX_CONNECTIONS_PER_WORKER', 48))  # Keep below gunicorn --threads
+    STREAM_RETRY_AFTER_SECONDS = int(os.environ.get('STREAM_RETRY_AFTER_SECONDS', 5))  # Retry-After on 503 when at capacity
+    
+    # Automated swap quoting
+    SWAP_QUOTE_VALIDITY_MINUTES = int(os.environ.get('SWAP_QUOTE_VALIDITY_MINUTES', 1440))  # Quote valid_until
+    SWAP_QUOTE_FEE_PERCENT = float(os.environ.get('SWAP_QUOTE_FEE_PERCENT', 0.5))  # Facilitation fee
+    SWAP_QUOTE_BATCH_SIZE = int(os.environ.get('SWAP_QUOTE_BATCH_SIZE', 200))  # Requests quoted per transaction
+    
+    # Calculator batch and grid endpoints
+    CALCULATOR_BATCH_MAX_SCENARIOS = int(os.environ.get('CALCULATOR_BATCH_MAX_SCENARIOS', 10000))
+    CALCULATOR_GRID_MAX_POINTS = int(os.environ.get('CALCULATOR_GRID_MAX_POINTS', 100000))  # volume x price x category
+    CALCULATOR_GRID_CACHE_TTL_SECONDS = int(os.environ.get('CALCULATOR_GRID_CACHE_TTL_SECONDS', 300))  # 0 disables
+    CALCULATOR_GRID_CACHE_MAX_SIZE = int(os.environ.get('CALCULATOR_GRID_CACHE_MAX_SIZE', 256))
+    BUYER_SWAP_CACHE_SIZE = int(os.environ.get('BUYER_SWAP_CACHE_SIZE', 4096))  # LRU of buyer swap results
+    VALUE_SCENARIO_PAGE_SIZE = int(os.environ.get('VALUE_SCENARIO_PAGE_SIZE', 50))  # Saved scenarios per page
+    VALUE_SCENARIO_MAX_PAGE_SIZE = int(os.environ.get('VALUE_SCENARIO_MAX_PAGE_SIZE', 200))
+    
+    # Monte Carlo risk engine
+    MONTE_CARLO_MAX_PATHS = int(os.environ.get('MONTE_CARLO_MAX_PATHS', 100000))
+    MONTE_CARLO_DEFAULT_PATHS = int(os.environ.get('MONTE_CARLO_DEFAULT_PATHS', 10000))
+    MONTE_CARLO_CHUNK_SIZE = int(os.environ.get('MONTE_CARLO_CHUNK_SIZE', 10000))  # Paths per seeded chunk
+    MONTE_CARLO_WORKERS = int(os.environ.get('MONTE_CARLO_WORKERS', 0))  # Worker processes, 0 = in-process
+    MONTE_CARLO_TIME_BUDGET_MS = int(os.environ.get('MONTE_CARLO_TIME_BUDGET_MS', 2000))  # Per request
+    MONTE_CARLO_LOOKBACK_DAYS = int(os.environ.get('MONTE_CARLO_LOOKBACK_DAYS', 730))  # Calibration window
+    MONTE_CARLO_CALIBRATION_TTL_SECONDS = int(os.environ.get('MONTE_CARLO_CALIBRATION_TTL_SECONDS', 3600))
+    
+    # Market state rolling analytics (price and market endpoints)
+    MARKET_STATE_CHANGE_WINDOW_HOURS = int(os.environ.get('MARKET_STATE_CHANGE_WINDOW_HOURS', 24))
+    MARKET_STATE_SPREAD_WINDOW_HOURS = int(os.environ.get('MARKET_STATE_SPREAD_WINDOW_HOURS', 24))
+    MARKET_STATE_LONG_WINDOW_DAYS = int(os.environ.get('MARKET_STATE_LONG_WINDOW_DAYS', 7))
+    
+    # Market opportunity backtests
+    BACKTEST_HORIZON_DAYS = int(os.environ.get('BACKTEST_HORIZON_DAYS', 30))  # Default holding period
+    BACKTEST_MAX_HORIZON_DAYS = int(os.environ.get('BACKTEST_MAX_HORIZON_DAYS', 365))
+    BACKTEST_HISTORY_TTL_SECONDS = int(os.environ.get('BACKTEST_HISTORY_TTL_SECONDS', 3600))
+    
+    # China ETS compliance calendar (extended automatically for dates outside the range)
+    COMPLIANCE_CALENDAR_START_YEAR = int(os.environ.get('COMPLIANCE_CALENDAR_START_YEAR', 2015))
+    COMPLIANCE_CALENDAR_END_YEAR = int(os.environ.get('COMPLIANCE_CALENDAR_END_YEAR', 2035))
+    COMPLIANCE_DEADLINES = os.environ.get('COMPLIANCE_DEADLINES', '')  # Comma-separated ISO dates overriding Dec 31 of their year
+    COMPLIANCE_HOLIDAYS = os.environ.get('COMPLIANCE_HOLIDAYS', '')  # Comma-separated ISO dates excluded from business days
     
     # KYC Configuration
     KYC_DOCUMENT_MAX_AGE_DAYS = 90  # Maximum age for company registration certificate
+    REVIEW_QUEUE_PAGE_SIZE = int(os.environ.get('REVIEW_QUEUE_PAGE_SIZE', 20))  # Default dossiers per review queue page
+    REVIEW_QUEUE_MAX_PAGE_SIZE = int(os.environ.get('REVIEW_QUEUE_MAX_PAGE_SIZE', 100))  # Largest review queue page
+    REVIEW_QUEUE_BACKFILL_BATCH_SIZE = int(os.environ.get('REVIEW_QUEUE_BACKFILL_BATCH_SIZE', 500))  # Users summarised per batch
+    
+    # KYC document processing (text, dates, registration numbers, thumbnails)
+    DOCUMENT_PROCESSING_WORKERS = int(os.environ.get('DOCUMENT_PROCESSING_WORKERS', 2))  # Worker threads
+    DOCUMENT_PROCESSING_MAX_PAGES = int(os.environ.get('DOCUMENT_PROCESSING_MAX_PAGES', 50))  # Pages read per PDF
+    DOCUMENT_PROCESSING_TIMEOUT_MINUTES = int(os.environ.get('DOCUMENT_PROCESSING_TIMEOUT_MINUTES', 15))  # Then retried
+    DOCUMENT_THUMBNAIL_SIZE = int(os.environ.get('DOCUMENT_THUMBNAIL_SIZE', 256))  # Longest side in pixels, rounded up to a preview size
+    
+    # KYC document previews (rendered on demand, cached on disk)
+    DOCUMENT_PREVIEW_FOLDER = os.path.join(UPLOAD_FOLDER, 'previews')
+    DOCUMENT_PREVIEW_SIZES = os.environ.get('DOCUMENT_PREVIEW_SIZES', '128,256,512,1024')  # Comma-separated longest sides
+    DOCUMENT_PREVIEW_DEFAULT_SIZE = int(os.environ.get('DOCUMENT_PREVIEW_DEFAULT_SIZE', 512))
+    DOCUMENT_PREVIEW_QUALITY = int(os.environ.get('DOCUMENT_PREVIEW_QUALITY', 80))  # JPEG/WebP quality
+    DOCUMENT_PREVIEW_MAX_AGE = int(os.environ.get('DOCUMENT_PREVIEW_MAX_AGE', 86400))  # Cache-Control max-age (seconds)
     
     # Sanctions checker configuration (for future integration)
     SANCTIONS_CHECK_ENABLED = os.environ.get('SANCTIONS_CHECK_ENABLED', 'true').lower() == 'true'
+    SANCTIONS_LISTS_FOLDER = os.environ.get('SANCTIONS_LISTS_FOLDER', os.path.join(BASE_DIR, 'data', 'sanctions'))  # CSV list exports
+    SANCTIONS_MATCH_THRESHOLD = float(os.environ.get('SANCTIONS_MATCH_THRESHOLD', 0.9))  # Name similarity reported as a match
+    SANCTIONS_MAX_CANDIDATES = int(os.environ.get('SANCTIONS_MAX_CANDIDATES', 200))  # Names scored per screened name
+    SANCTIONS_SNAPSHOT_FOLDER = os.environ.get('SANCTIONS_SNAPSHOT_FOLDER', '')  # Default: <SANCTIONS_LISTS_FOLDER>/snapshots
+    SANCTIONS_SNAPSHOT_KEEP = int(os.environ.get('SANCTIONS_SNAPSHOT_KEEP', 3))  # Snapshots kept for cold starts
+    SANCTIONS_MAX_REMOVAL_SHARE = float(os.environ.get('SANCTIONS_MAX_REMOVAL_SHARE', 0.5))  # Larger removals are refused as errors
+    SANCTIONS_RESCREEN_PAGE_SIZE = int(os.environ.get('SANCTIONS_RESCREEN_PAGE_SIZE', 200))  # Users per rescreening batch
+    SANCTIONS_RESCREEN_WORKERS = int(os.environ.get('SANCTIONS_RESCREEN_WORKERS', 4))  # Threads screening names
     
     # EU ETS Registry verification (for future integration)
     EU_ETS_VERIFICATION_ENABLED = os.environ.get('EU_ETS_VERIFICATION_ENABLED', 'true').lower() == 'true'
+    EU_ETS_CACHE_TTLS = os.environ.get('EU_ETS_CACHE_TTLS', 'active:168,inactive:24,suspended:24,unknown:1')  # status:hours
+    EU_ETS_VERIFICATION_WORKERS = int(os.environ.get('EU_ETS_VERIFICATION_WORKERS', 4))  # Parallel registry lookups
+    EU_ETS_LOOKUP_TIMEOUT_SECONDS = int(os.environ.get('EU_ETS_LOOKUP_TIMEOUT_SECONDS', 30))  # Then reported unavailable
+    EU_ETS_BATCH_MAX_ACCOUNTS = int(os.environ.get('EU_ETS_BATCH_MAX_ACCOUNTS', 100))  # Accounts per batch request
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -115,9 +115,12 @@ class HistoricalDataCollector:
         if os.path.exists(file_path):
             try:
                 with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # Convert date strings back to datetime objects for processing
-                    return data
+                    content = f.read()
+                # Tolerate trailing garbage after the array (e.g. an interrupted write)
+                data, end = json.JSONDecoder().raw_decode(content.lstrip())
+                if content.lstrip()[end:].strip():
+                    logger.warning(f"Ignoring trailing data in {file_path}")
+                return data
             except Exception as e:
                 logger.warning(f"Error loading existing data from {file_path}: {e}")
         return []
@@ -408,6 +411,24 @@ class HistoricalDataCollector:
             'eua': eua_data,
             'cea': cea_data
         }
+    
+    def load_aligned_prices(self, lookback_days: Optional[int] = None):
+        """
+        Daily EUA and CEA prices from the stored files, on the dates both have
+        
+        Args:
+            lookback_days: Only keep the last lookback_days of data (default: all)
+            
+        Returns:
+            Tuple of (dates as 'YYYY-MM-DD', eua_prices, cea_prices), oldest first
+        """
+        eua = {entry['date'][:10]: entry['price'] for entry in self.load_existing_data(self.eua_file)}
+        cea = {entry['date'][:10]: entry['price'] for entry in self.load_existing_data(self.cea_file)}
+        dates = sorted(set(eua) & set(cea))
+        if dates and lookback_days is not None:
+            cutoff = (datetime.fromisoformat(dates[-1]) - timedelta(days=lookback_days)).date().isoformat()
+            dates = [d for d in dates if d >= cutoff]
+        return dates, [float(eua[d]) for d in dates], [float(cea[d]) for d in dates]
 
 
 def main():
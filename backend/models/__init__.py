@@ -4,6 +4,8 @@ Database models for KYC system and Trading Platform
 from database import db
 from .user import User, UserRole
 from .kyc_document import KYCDocument
+from .document_blob import DocumentBlob
+from .document_upload import DocumentUpload, UploadStatus
 from .kyc_workflow import KYCWorkflow
 from .access_request import AccessRequest
 from .price_history import PriceHistory
@@ -14,15 +16,17 @@ from .swap import SwapRequest, SwapRequestStatus, SwapQuote, SwapQuoteStatus
 from .transaction import Transaction, TransactionType, TransactionStatus, LegalDocument, LegalDocumentType, CEAPortfolio
 from .value_scenario import ValueScenario
 from .market_opportunity import MarketOpportunity
+from .registry_verification import RegistryVerification
+from .kyc_review_summary import KYCReviewSummary
 
 __all__ = [
     'User', 'UserRole',
-    'KYCDocument', 'KYCWorkflow', 'AccessRequest', 'PriceHistory',
+    'KYCDocument', 'DocumentBlob', 'DocumentUpload', 'UploadStatus', 'KYCWorkflow', 'AccessRequest', 'PriceHistory',
     'Listing', 'ListingStatus',
     'DemandListing', 'DemandStatus', 'IntendedUse',
     'Negotiation', 'NegotiationStatus', 'NegotiationMessage', 'MessageSenderType',
     'SwapRequest', 'SwapRequestStatus', 'SwapQuote', 'SwapQuoteStatus',
     'Transaction', 'TransactionType', 'TransactionStatus', 'LegalDocument', 'LegalDocumentType', 'CEAPortfolio',
-    'ValueScenario', 'MarketOpportunity',
+    'ValueScenario', 'MarketOpportunity', 'RegistryVerification', 'KYCReviewSummary',
 ]
 
@@ -29,6 +29,9 @@ class DemandListing(db.Model):
     Demand listing model for buyer requests
     """
     __tablename__ = 'demand_listings'
+    __table_args__ = (
+        db.Index('idx_demand_listings_status_expires_at', 'status', 'expires_at'),
+    )
     
     id = db.Column(db.String(36), primary_key=True)  # UUID
     buyer_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
@@ -54,7 +57,7 @@ class DemandListing(db.Model):
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
-    expires_at = db.Column(db.DateTime, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=True, index=True)
     
     # Relationships
     buyer = db.relationship('User', backref='demand_listings', lazy=True)
@@ -0,0 +1,34 @@
+"""
+Document Blob Model
+
+One row per distinct uploaded file content in the content-addressed
+document store, with the number of documents referencing it.
+"""
+
+from datetime import datetime
+from database import db
+
+
+class DocumentBlob(db.Model):
+    """Model for stored document contents, keyed by SHA-256"""
+
+    __tablename__ = 'document_blobs'
+
+    sha256 = db.Column(db.String(64), primary_key=True)  # Hex digest of the content
+    file_path = db.Column(db.String(500), nullable=False)
+    file_size = db.Column(db.Integer, nullable=False)  # Size in bytes
+    ref_count = db.Column(db.Integer, nullable=False, default=0)  # KYC documents using this blob
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert to dictionary"""
+        return {
+            'sha256': self.sha256,
+            'file_path': self.file_path,
+            'file_size': self.file_size,
+            'ref_count': self.ref_count,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+    def __repr__(self):
+        return f'<DocumentBlob {self.sha256[:12]} refs={self.ref_count}>'
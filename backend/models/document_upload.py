@@ -0,0 +1,75 @@
+"""
+Resumable document upload model
+
+Tracks a KYC document uploaded in chunks (create, PATCH at an offset,
+finalize) so an interrupted upload resumes from the last received byte.
+"""
+from datetime import datetime
+from sqlalchemy import Enum as SQLEnum
+import enum
+from database import db
+from models.kyc_document import DocumentType
+
+
+class UploadStatus(enum.Enum):
+    """Resumable upload status enumeration"""
+    IN_PROGRESS = 'in_progress'
+    COMPLETED = 'completed'
+    ABORTED = 'aborted'
+    EXPIRED = 'expired'
+
+
+class DocumentUpload(db.Model):
+    """
+    Model for resumable KYC document uploads
+    """
+    __tablename__ = 'document_uploads'
+
+    id = db.Column(db.String(36), primary_key=True)  # UUID as string
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
+
+    # Target document
+    document_type = db.Column(SQLEnum(DocumentType), nullable=False)
+    file_name = db.Column(db.String(255), nullable=False)
+    mime_type = db.Column(db.String(100), nullable=False)
+
+    # Progress
+    upload_length = db.Column(db.BigInteger, nullable=False)  # Declared total size in bytes
+    upload_offset = db.Column(db.BigInteger, nullable=False, default=0)  # Bytes received so far
+    status = db.Column(SQLEnum(UploadStatus), default=UploadStatus.IN_PROGRESS, nullable=False, index=True)
+    document_id = db.Column(db.String(36), nullable=True)  # KYCDocument created on finalize
+
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    __table_args__ = (
+        db.Index('idx_document_uploads_status_expires_at', 'status', 'expires_at'),
+    )
+
+    def to_dict(self, camel_case: bool = True):
+        """
+        Convert upload to dictionary
+        Args:
+            camel_case: If True, convert keys to camelCase for frontend compatibility
+        """
+        data = {
+            'id': self.id,
+            'user_id': self.user_id,
+            'document_type': self.document_type.value if self.document_type else None,
+            'file_name': self.file_name,
+            'mime_type': self.mime_type,
+            'upload_length': self.upload_length,
+            'upload_offset': self.upload_offset,
+            'status': self.status.value if self.status else None,
+            'document_id': self.document_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+        }
+
+        if camel_case:
+            from utils.serializers import to_camel_case
+            return to_camel_case(data)
+        return data
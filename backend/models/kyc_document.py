@@ -26,6 +26,14 @@ class VerificationStatus(enum.Enum):
     REJECTED = 'rejected'
 
 
+class ProcessingStatus(enum.Enum):
+    """Background processing status (text, dates, registration numbers, thumbnail)"""
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+
 class KYCDocument(db.Model):
     """
     Model for KYC documents uploaded by users
@@ -41,6 +49,7 @@ class KYCDocument(db.Model):
     file_name = db.Column(db.String(255), nullable=False)
     file_size = db.Column(db.Integer, nullable=False)  # Size in bytes
     mime_type = db.Column(db.String(100), nullable=False)
+    sha256 = db.Column(db.String(64), nullable=True, index=True)  # Content digest (document_blobs key)
     
     # Verification info
     verification_status = db.Column(SQLEnum(VerificationStatus), 
@@ -49,6 +58,20 @@ class KYCDocument(db.Model):
     verification_notes = db.Column(db.Text, nullable=True)
     verified_by = db.Column(db.String(36), nullable=True)  # Reviewer user ID
     
+    # Background processing results (services/document_processor.py)
+    processing_status = db.Column(SQLEnum(ProcessingStatus),
+                                  default=ProcessingStatus.PENDING,
+                                  nullable=True, index=True)  # NULL for documents uploaded before processing
+    processing_error = db.Column(db.Text, nullable=True)
+    processing_started_at = db.Column(db.DateTime, nullable=True)
+    processed_at = db.Column(db.DateTime, nullable=True)
+    page_count = db.Column(db.Integer, nullable=True)
+    extracted_text = db.deferred(db.Column(db.Text, nullable=True))  # Page texts, only loaded when accessed
+    extracted_dates = db.Column(db.JSON, nullable=True)  # ISO dates found in the text, sorted
+    registration_numbers = db.Column(db.JSON, nullable=True)  # [{'type': ..., 'value': ...}]
+    document_date = db.Column(db.Date, nullable=True)  # Most recent date found (issue date proxy)
+    thumbnail_path = db.Column(db.String(500), nullable=True)
+    
     # Timestamps
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     verified_at = db.Column(db.DateTime, nullable=True)
@@ -67,11 +90,20 @@ class KYCDocument(db.Model):
             'file_name': self.file_name,
             'file_size': self.file_size,
             'mime_type': self.mime_type,
+            'sha256': self.sha256,
             'verification_status': self.verification_status.value if self.verification_status else None,
             'verification_notes': self.verification_notes,
             'verified_by': self.verified_by,
             'uploaded_at': self.uploaded_at.isoformat() if self.uploaded_at else None,
             'verified_at': self.verified_at.isoformat() if self.verified_at else None,
+            'processing_status': self.processing_status.value if self.processing_status else None,
+            'processing_error': self.processing_error,
+            'processed_at': self.processed_at.isoformat() if self.processed_at else None,
+            'page_count': self.page_count,
+            'extracted_dates': self.extracted_dates,
+            'registration_numbers': self.registration_numbers,
+            'document_date': self.document_date.isoformat() if self.document_date else None,
+            'has_thumbnail': bool(self.page_count),  # Rendered on demand by the preview service
         }
         
         if camel_case:
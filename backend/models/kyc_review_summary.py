@@ -0,0 +1,79 @@
+"""
+KYC Review Summary Model
+
+Denormalised summary of a user's KYC dossier for the admin review queue:
+status, document counts per type, missing documents and risk flags, kept
+up to date by services/review_queue.py on upload, submit and review events.
+"""
+
+from datetime import datetime
+from sqlalchemy import Enum as SQLEnum
+from database import db
+from models.user import KYCStatus, RiskLevel
+
+
+class KYCReviewSummary(db.Model):
+    """Model for precomputed KYC dossier summaries, one row per user"""
+
+    __tablename__ = 'kyc_review_summaries'
+    __table_args__ = (
+        # Queue pages: dossiers in review order, keyset-paginated by (queued_at, user_id)
+        db.Index('ix_kyc_review_summaries_queue', 'in_queue', 'queued_at', 'user_id'),
+    )
+
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    username = db.Column(db.String(80), nullable=False)
+    company_name = db.Column(db.String(200), nullable=True)
+
+    kyc_status = db.Column(SQLEnum(KYCStatus), nullable=False)
+    risk_level = db.Column(SQLEnum(RiskLevel), nullable=False)
+    in_queue = db.Column(db.Boolean, nullable=False, default=False)  # Status awaits a reviewer or the user
+    queued_at = db.Column(db.DateTime, nullable=False)  # Entered the current status
+
+    document_counts = db.Column(db.JSON, default=dict, nullable=False)  # {document_type: count}
+    document_total = db.Column(db.Integer, default=0, nullable=False)
+    unverified_documents = db.Column(db.Integer, default=0, nullable=False)  # Pending verification
+    rejected_documents = db.Column(db.Integer, default=0, nullable=False)
+    missing_documents = db.Column(db.JSON, default=list, nullable=False)  # Required types not uploaded
+    documents_expire_on = db.Column(db.Date, nullable=True)  # First day a registration certificate is too old
+    risk_flags = db.Column(db.JSON, default=list, nullable=False)  # e.g. sanctions_flagged, pep
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def to_dict(self, camel_case: bool = True, now: datetime = None):
+        """
+        Convert summary to the review queue payload
+        Args:
+            camel_case: If True, convert keys to camelCase for frontend compatibility
+            now: Reference time for the age in queue and document expiry
+        """
+        now = now or datetime.utcnow()
+        flags = list(self.risk_flags or [])
+        if self.documents_expire_on and self.documents_expire_on <= now.date():
+            flags.append('expired_documents')
+
+        data = {
+            'user_id': self.user_id,
+            'username': self.username,
+            'company_name': self.company_name,
+            'kyc_status': self.kyc_status.value if self.kyc_status else None,
+            'risk_level': self.risk_level.value if self.risk_level else None,
+            'queued_at': self.queued_at.isoformat() if self.queued_at else None,
+            'age_in_queue_hours': round((now - self.queued_at).total_seconds() / 3600, 1) if self.queued_at else None,
+            'document_counts': self.document_counts or {},
+            'document_total': self.document_total,
+            'unverified_documents': self.unverified_documents,
+            'rejected_documents': self.rejected_documents,
+            'missing_documents': self.missing_documents or [],
+            'risk_flags': flags,
+        }
+
+        if camel_case:
+            from utils.serializers import to_camel_case
+            # Document types stay as they are (they're values elsewhere, e.g. in missingDocuments)
+            data = to_camel_case(data)
+            data['documentCounts'] = self.document_counts or {}
+        return data
+
+    def __repr__(self):
+        return f'<KYCReviewSummary {self.user_id} {self.kyc_status}>'
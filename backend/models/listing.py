@@ -21,6 +21,9 @@ class Listing(db.Model):
     CEA listing model for seller offerings
     """
     __tablename__ = 'listings'
+    __table_args__ = (
+        db.Index('idx_listings_status_expires_at', 'status', 'expires_at'),
+    )
     
     id = db.Column(db.String(36), primary_key=True)  # UUID
     seller_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
@@ -48,7 +51,7 @@ class Listing(db.Model):
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
-    expires_at = db.Column(db.DateTime, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=True, index=True)
     
     # Relationships
     seller = db.relationship('User', backref='listings', lazy=True)
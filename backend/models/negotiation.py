@@ -21,6 +21,9 @@ class Negotiation(db.Model):
     Negotiation model for bilateral conversations between sellers and buyers
     """
     __tablename__ = 'negotiations'
+    __table_args__ = (
+        db.Index('idx_negotiations_status_expires_at', 'status', 'expires_at'),
+    )
     
     id = db.Column(db.String(36), primary_key=True)  # UUID
     listing_id = db.Column(db.String(36), db.ForeignKey('listings.id'), nullable=True, index=True)
@@ -40,16 +43,20 @@ class Negotiation(db.Model):
     # Status
     status = db.Column(SQLEnum(NegotiationStatus), default=NegotiationStatus.OPEN, nullable=False, index=True)
     
+    # Denormalised message counter; also the sequence number of the latest message
+    message_count = db.Column(db.Integer, default=0, nullable=False)
+    last_message_at = db.Column(db.DateTime, nullable=True)
+    
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
-    expires_at = db.Column(db.DateTime, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=True, index=True)
     
     # Relationships
     initiator = db.relationship('User', foreign_keys=[initiator_id], backref='initiated_negotiations', lazy=True)
     counterparty = db.relationship('User', foreign_keys=[counterparty_id], backref='received_negotiations', lazy=True)
     messages = db.relationship('NegotiationMessage', backref='negotiation', lazy=True, 
-                              cascade='all, delete-orphan', order_by='NegotiationMessage.created_at')
+                              cascade='all, delete-orphan', order_by='NegotiationMessage.sequence')
     
     def to_dict(self, camel_case: bool = True):
         """Convert negotiation to dictionary"""
@@ -68,7 +75,8 @@ class Negotiation(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'expires_at': self.expires_at.isoformat() if self.expires_at else None,
-            'message_count': len(self.messages) if self.messages else 0,
+            'message_count': self.message_count or 0,
+            'last_message_at': self.last_message_at.isoformat() if self.last_message_at else None,
         }
         
         if camel_case:
@@ -89,10 +97,16 @@ class NegotiationMessage(db.Model):
     Message model for negotiation conversations
     """
     __tablename__ = 'negotiation_messages'
+    __table_args__ = (
+        db.UniqueConstraint('negotiation_id', 'sequence', name='uq_negotiation_messages_sequence'),
+    )
     
     id = db.Column(db.String(36), primary_key=True)  # UUID
     negotiation_id = db.Column(db.String(36), db.ForeignKey('negotiations.id'), nullable=False, index=True)
     
+    # Per-negotiation sequence number (1, 2, ...), used as the sync cursor
+    sequence = db.Column(db.Integer, nullable=False)
+    
     # Sender
     sender_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=True, index=True)  # NULL for NIHAO messages
     sender_type = db.Column(SQLEnum(MessageSenderType), nullable=False)
@@ -116,6 +130,7 @@ class NegotiationMessage(db.Model):
         data = {
             'id': self.id,
             'negotiation_id': self.negotiation_id,
+            'sequence': self.sequence,
             'sender_id': self.sender_id,
             'sender_type': self.sender_type.value if self.sender_type else None,
             'sender_code': self.sender_code,
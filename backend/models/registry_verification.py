@@ -0,0 +1,41 @@
+"""
+Registry Verification Model
+
+Cached result of an EU ETS registry account lookup, one row per
+(country, account number), valid until its status-dependent expiry.
+"""
+
+from datetime import datetime
+from database import db
+
+
+class RegistryVerification(db.Model):
+    """Model for cached EU ETS registry account verifications"""
+
+    __tablename__ = 'registry_verifications'
+
+    country = db.Column(db.String(2), primary_key=True)  # ISO country code of the registry
+    account_number = db.Column(db.String(50), primary_key=True)
+    verified = db.Column(db.Boolean, nullable=False, default=False)
+    status = db.Column(db.String(20), nullable=False)  # active / inactive / suspended / unknown
+    registry = db.Column(db.String(100), nullable=True)  # Adapter that answered
+    verification_method = db.Column(db.String(20), nullable=True)  # api / manual / mock
+    error = db.Column(db.Text, nullable=True)
+    verified_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def to_result(self):
+        """Verification result in the EUETSVerifier format"""
+        return {
+            'verified': self.verified,
+            'account_number': self.account_number,
+            'country': self.country,
+            'status': self.status,
+            'verified_at': self.verified_at.isoformat() if self.verified_at else None,
+            'verification_method': self.verification_method,
+            'registry': self.registry,
+            'error': self.error
+        }
+
+    def __repr__(self):
+        return f'<RegistryVerification {self.country}:{self.account_number} {self.status}>'
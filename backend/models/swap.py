@@ -96,6 +96,9 @@ class SwapQuote(db.Model):
     Swap quote model for EUA→CEA swap quotes
     """
     __tablename__ = 'swap_quotes'
+    __table_args__ = (
+        db.Index('idx_swap_quotes_status_valid_until', 'status', 'valid_until'),
+    )
     
     id = db.Column(db.String(36), primary_key=True)  # UUID
     swap_request_id = db.Column(db.String(36), db.ForeignKey('swap_requests.id'), nullable=False, index=True)
@@ -122,7 +125,7 @@ class SwapQuote(db.Model):
     status = db.Column(SQLEnum(SwapQuoteStatus), default=SwapQuoteStatus.PENDING, nullable=False, index=True)
     
     # Validity
-    valid_until = db.Column(db.DateTime, nullable=False, default=lambda: datetime.utcnow() + timedelta(days=1))
+    valid_until = db.Column(db.DateTime, nullable=False, index=True, default=lambda: datetime.utcnow() + timedelta(days=1))
     
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
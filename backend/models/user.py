@@ -88,6 +88,7 @@ class User(db.Model):
                                        default=SanctionsCheckStatus.PENDING, 
                                        nullable=False)
     sanctions_check_date = db.Column(db.DateTime, nullable=True)
+    sanctions_list_version = db.Column(db.String(64), nullable=True, index=True)  # Lists last screened against
     
     # Review tracking
     last_kyc_review = db.Column(db.DateTime, nullable=True)
@@ -112,6 +113,8 @@ class User(db.Model):
                               cascade='all, delete-orphan')
     workflow = db.relationship('KYCWorkflow', backref='user', lazy=True, 
                              uselist=False, cascade='all, delete-orphan')
+    review_summary = db.relationship('KYCReviewSummary', backref='user', lazy=True,
+                                     uselist=False, cascade='all, delete-orphan')
     
     def to_dict(self, camel_case: bool = True):
         """
@@ -144,6 +147,7 @@ class User(db.Model):
             'pep_status': self.pep_status,
             'sanctions_check_status': self.sanctions_check_status.value if self.sanctions_check_status else None,
             'sanctions_check_date': self.sanctions_check_date.isoformat() if self.sanctions_check_date else None,
+            'sanctions_list_version': self.sanctions_list_version,
             'last_kyc_review': self.last_kyc_review.isoformat() if self.last_kyc_review else None,
             'is_admin': self.is_admin,
             'role': self.role.value if self.role else None,
@@ -13,13 +13,18 @@ class ValueScenario(db.Model):
     """Model for storing calculated value scenarios"""
     
     __tablename__ = 'value_scenarios'
+    __table_args__ = (
+        # Keyset pagination of a user's scenarios, newest first
+        db.Index('idx_value_scenarios_user_created', 'user_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.String(36), primary_key=True)
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
     scenario_type = db.Column(db.String(20), nullable=False)  # 'seller_cea' or 'buyer_swap'
-    input_data = db.Column(db.Text, nullable=False)  # JSON serialized
-    nihao_benefits = db.Column(db.Text, nullable=False)  # JSON serialized
-    alternative_costs = db.Column(db.Text, nullable=False)  # JSON serialized
+    # Payloads are native JSON and only loaded when accessed (or undeferred)
+    input_data = db.deferred(db.Column(db.JSON, nullable=False), group='payload')
+    nihao_benefits = db.deferred(db.Column(db.JSON, nullable=False), group='payload')
+    alternative_costs = db.deferred(db.Column(db.JSON, nullable=False), group='payload')
     savings = db.Column(db.Float, nullable=False)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     
@@ -31,18 +36,26 @@ class ValueScenario(db.Model):
         if not self.created_at:
             self.created_at = datetime.utcnow()
     
-    def to_dict(self, camel_case=False):
-        """Convert to dictionary"""
+    def to_dict(self, camel_case=False, include_payload=True):
+        """
+        Convert to dictionary
+        
+        Args:
+            camel_case: If True, convert keys to camelCase
+            include_payload: If False, omit input_data, nihao_benefits and
+                             alternative_costs (summary view, no payload load)
+        """
         data = {
             'id': self.id,
             'user_id': self.user_id,
             'scenario_type': self.scenario_type,
-            'input_data': self.input_data,
-            'nihao_benefits': self.nihao_benefits,
-            'alternative_costs': self.alternative_costs,
             'savings': self.savings,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+        if include_payload:
+            data['input_data'] = self.input_data
+            data['nihao_benefits'] = self.nihao_benefits
+            data['alternative_costs'] = self.alternative_costs
         
         if camel_case:
             return to_camel_case(data)
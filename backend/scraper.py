@@ -48,7 +48,6 @@ class ICEScraper:
         })
         self.last_price = None
         self.last_timestamp = None
-        self.price_history = []
     
     def _retry_request(self, func, max_retries=3, delay=1, backoff=2):
         """
@@ -91,7 +90,8 @@ class ICEScraper:
                 - price: EUA price in EUR
                 - timestamp: datetime object (timezone-aware UTC)
                 - currency: "EUR"
-                - change24h: 24-hour price change percentage (optional)
+                - change24h: 24-hour change percentage reported by the source (optional;
+                  otherwise None and filled in from the market analytics)
                 - source: Human-readable source name (e.g., "ICE (Intercontinental Exchange)")
             None if all sources fail and no cached price available
         
@@ -136,10 +136,6 @@ class ICEScraper:
                     price_data['source'] = source_map.get(source_func, 'Unknown')
                     self.last_price = price_data['price']
                     self.last_timestamp = price_data['timestamp']
-                    self.price_history.append(price_data['price'])
-                    # Keep only last 100 prices for 24h change calculation
-                    if len(self.price_history) > 100:
-                        self.price_history.pop(0)
                     logger.info(f"Successfully fetched price: €{price_data['price']} from {price_data['source']}")
                     return price_data
             except Exception as e:
@@ -153,7 +149,7 @@ class ICEScraper:
                 'price': self.last_price,
                 'timestamp': self.last_timestamp or datetime.now(timezone.utc),
                 'currency': 'EUR',
-                'change24h': self._calculate_24h_change(),
+                'change24h': None,
                 'source': 'Cached'
             }
         
@@ -287,7 +283,7 @@ class ICEScraper:
                                         'price': round(price, 2),
                                         'timestamp': datetime.now(timezone.utc),
                                         'currency': 'EUR',
-                                        'change24h': self._calculate_24h_change()
+                                        'change24h': None
                                     }
                             except ValueError:
                                 continue
@@ -349,7 +345,7 @@ class ICEScraper:
                                 'price': round(price, 2),
                                 'timestamp': datetime.now(timezone.utc),
                                 'currency': 'EUR',
-                                'change24h': self._calculate_24h_change()
+                                'change24h': None
                             }
                     except ValueError:
                         continue
@@ -377,7 +373,7 @@ class ICEScraper:
                                                 'price': round(price, 2),
                                                 'timestamp': datetime.now(timezone.utc),
                                                 'currency': 'EUR',
-                                                'change24h': self._calculate_24h_change()
+                                                'change24h': None
                                             }
                                     except ValueError:
                                         continue
@@ -399,7 +395,7 @@ class ICEScraper:
                                     'price': round(price, 2),
                                     'timestamp': datetime.now(timezone.utc),
                                     'currency': 'EUR',
-                                    'change24h': self._calculate_24h_change()
+                                    'change24h': None
                                 }
                         except ValueError:
                             continue
@@ -417,7 +413,7 @@ class ICEScraper:
                             'price': round(price, 2),
                             'timestamp': datetime.now(timezone.utc),
                             'currency': 'EUR',
-                            'change24h': self._calculate_24h_change()
+                            'change24h': None
                         }
                 except ValueError:
                     continue
@@ -662,14 +658,11 @@ class ICEScraper:
                     break
         
         if price:
-            # Calculate 24h change if we have history
-            change24h = self._calculate_24h_change()
-            
             return {
                 'price': round(price, 2),
                 'timestamp': datetime.now(timezone.utc),
                 'currency': 'EUR',
-                'change24h': change24h
+                'change24h': None
             }
         
         return None
@@ -708,21 +701,6 @@ class ICEScraper:
                     return result
         return None
     
-    def _calculate_24h_change(self) -> Optional[float]:
-        """Calculate 24h price change percentage"""
-        if len(self.price_history) < 2:
-            return None
-        
-        current = self.price_history[-1]
-        # Use first price in history (or price from 24h ago if available)
-        old_price = self.price_history[0] if len(self.price_history) < 24 else self.price_history[-24]
-        
-        if old_price == 0:
-            return None
-        
-        change = ((current - old_price) / old_price) * 100
-        return round(change, 2)
-    
     def get_cached_price(self) -> Optional[Dict]:
         """Get the last known price from cache"""
         if self.last_price is None:
@@ -732,7 +710,7 @@ class ICEScraper:
             'price': self.last_price,
             'timestamp': self.last_timestamp or datetime.now(timezone.utc),
             'currency': 'EUR',
-            'change24h': self._calculate_24h_change(),
+            'change24h': None,
             'source': 'Cached'
         }
     
@@ -769,24 +747,14 @@ class ICEScraper:
             # Ensure CEA price stays in realistic range (typically 20-60 EUR)
             cea_price = max(20.0, min(60.0, cea_price))
             
-            # Calculate 24h change
-            if len(self.price_history) > 0:
-                # Use CEA price history if available, otherwise estimate from EUA change
-                old_price = self.price_history[0] if len(self.price_history) < 24 else self.price_history[-24]
-                if old_price > 0:
-                    change24h = ((cea_price - old_price) / old_price) * 100
-                else:
-                    change24h = random.uniform(-3.0, 3.0)
-            else:
-                change24h = random.uniform(-3.0, 3.0)
-            
-            logger.info(f"Generated CEA price: €{cea_price:.2f} (24h: {change24h:.2f}%)")
+            logger.info(f"Generated CEA price: €{cea_price:.2f}")
             
+            # The exact 24h change is filled in by the market analytics
             return {
                 'price': round(cea_price, 2),
                 'timestamp': current_time,
                 'currency': 'EUR',
-                'change24h': round(change24h, 2)
+                'change24h': None
             }
         except Exception as e:
             logger.debug(f"CEA price generation failed: {e}")
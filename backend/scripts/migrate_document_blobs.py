@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Database Migration Script - Content-Addressed Document Store
+
+Prepares an existing database for streamed, deduplicated KYC uploads:
+1. Adds kyc_documents.sha256 and its index
+2. Creates the document_blobs table (one row per stored content, with its
+   reference count)
+
+Documents uploaded before the migration keep their original file and a
+NULL sha256; they are deleted the old way.
+
+Usage:
+    python migrate_document_blobs.py [--dry-run] [--database PATH]
+
+Options:
+    --dry-run    Show what would be done without making changes
+    --database   Path to database file (default: kyc_database_dev.db in backend directory)
+"""
+
+import sys
+import os
+import argparse
+import sqlite3
+from pathlib import Path
+
+CREATE_BLOBS_TABLE = """
+CREATE TABLE document_blobs (
+    sha256 VARCHAR(64) NOT NULL PRIMARY KEY,
+    file_path VARCHAR(500) NOT NULL,
+    file_size INTEGER NOT NULL,
+    ref_count INTEGER NOT NULL,
+    created_at DATETIME NOT NULL
+)
+"""
+
+
+def check_table_exists(cursor, table_name):
+    """Check if a table exists"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
+    return cursor.fetchone() is not None
+
+
+def check_column_exists(cursor, table_name, column_name):
+    """Check if a column exists in a table"""
+    cursor.execute(f"PRAGMA table_info({table_name})")
+    return any(row[1] == column_name for row in cursor.fetchall())
+
+
+def check_index_exists(cursor, index_name):
+    """Check if an index exists"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name=?", (index_name,))
+    return cursor.fetchone() is not None
+
+
+def migrate_database(database_path, dry_run=False):
+    """Perform the migration"""
+    print(f"Connecting to database: {database_path}")
+
+    if not os.path.exists(database_path):
+        print(f"ERROR: Database file not found: {database_path}")
+        return False
+
+    conn = sqlite3.connect(database_path)
+    cursor = conn.cursor()
+
+    try:
+        print("\n=== Checking Current Database State ===")
+
+        if not check_table_exists(cursor, 'kyc_documents'):
+            print("⚠️  Table 'kyc_documents' does not exist. Run init_db.py instead.")
+            return False
+
+        has_column = check_column_exists(cursor, 'kyc_documents', 'sha256')
+        has_index = check_index_exists(cursor, 'ix_kyc_documents_sha256')
+        has_table = check_table_exists(cursor, 'document_blobs')
+        print(f"kyc_documents.sha256: {'exists' if has_column else 'missing'}")
+        print(f"ix_kyc_documents_sha256: {'exists' if has_index else 'missing'}")
+        print(f"document_blobs: {'exists' if has_table else 'missing'}")
+
+        steps = []
+        if not has_column:
+            steps.append(("Add column kyc_documents.sha256",
+                          "ALTER TABLE kyc_documents ADD COLUMN sha256 VARCHAR(64)"))
+        if not has_index:
+            steps.append(("Create index ix_kyc_documents_sha256",
+                          "CREATE INDEX IF NOT EXISTS ix_kyc_documents_sha256 ON kyc_documents (sha256)"))
+        if not has_table:
+            steps.append(("Create table document_blobs", CREATE_BLOBS_TABLE))
+
+        if not steps:
+            print("\n✅ Document store schema already present. No migration needed.")
+            return True
+
+        print("\n=== Migration Plan ===")
+        for description, _ in steps:
+            print(f"- {description}")
+
+        if dry_run:
+            print("\n[DRY RUN] Would execute the above changes.")
+            return True
+
+        print("\n=== Executing Migration ===")
+        for description, statement in steps:
+            cursor.execute(statement)
+            print(f"✅ {description}")
+        conn.commit()
+
+        print("\n✅ Migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Error during migration: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        conn.rollback()
+        return False
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Add the content-addressed document store schema'
+    )
+    parser.add_argument('--dry-run', action='store_true', help='Show what would be done')
+    parser.add_argument('--database', type=str, default=None, help='Path to database file')
+
+    args = parser.parse_args()
+
+    if args.database:
+        database_path = args.database
+    else:
+        backend_dir = Path(__file__).parent.parent
+        database_path = backend_dir / 'kyc_database_dev.db'
+
+    print("=" * 60)
+    print("Document Store - Database Migration")
+    print("=" * 60)
+
+    success = migrate_database(str(database_path), dry_run=args.dry_run)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Database Migration Script - KYC Document Processing
+
+Adds the columns holding background processing results to kyc_documents
+(status, page count, extracted text, dates, registration numbers, document
+date, thumbnail) and the processing status index.
+
+Existing documents keep a NULL processing status and are not processed
+unless --process-existing is given, which marks them pending for the
+processing sweep.
+
+Usage:
+    python migrate_document_processing.py [--dry-run] [--database PATH] [--process-existing]
+
+Options:
+    --dry-run            Show what would be done without making changes
+    --database           Path to database file (default: kyc_database_dev.db in backend directory)
+    --process-existing   Queue documents uploaded before the migration for processing
+"""
+
+import sys
+import os
+import argparse
+import sqlite3
+from pathlib import Path
+
+# (column, type)
+COLUMNS = [
+    ('processing_status', 'VARCHAR(10)'),
+    ('processing_error', 'TEXT'),
+    ('processing_started_at', 'DATETIME'),
+    ('processed_at', 'DATETIME'),
+    ('page_count', 'INTEGER'),
+    ('extracted_text', 'TEXT'),
+    ('extracted_dates', 'JSON'),
+    ('registration_numbers', 'JSON'),
+    ('document_date', 'DATE'),
+    ('thumbnail_path', 'VARCHAR(500)'),
+]
+
+INDEX = ('ix_kyc_documents_processing_status', 'processing_status')
+
+
+def check_table_exists(cursor, table_name):
+    """Check if a table exists"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
+    return cursor.fetchone() is not None
+
+
+def check_column_exists(cursor, table_name, column_name):
+    """Check if a column exists in a table"""
+    cursor.execute(f"PRAGMA table_info({table_name})")
+    return any(row[1] == column_name for row in cursor.fetchall())
+
+
+def check_index_exists(cursor, index_name):
+    """Check if an index exists"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name=?", (index_name,))
+    return cursor.fetchone() is not None
+
+
+def migrate_database(database_path, dry_run=False, process_existing=False):
+    """Perform the migration"""
+    print(f"Connecting to database: {database_path}")
+
+    if not os.path.exists(database_path):
+        print(f"ERROR: Database file not found: {database_path}")
+        return False
+
+    conn = sqlite3.connect(database_path)
+    cursor = conn.cursor()
+
+    try:
+        print("\n=== Checking Current Database State ===")
+
+        if not check_table_exists(cursor, 'kyc_documents'):
+            print("⚠️  Table 'kyc_documents' does not exist. Run init_db.py instead.")
+            return False
+
+        steps = []
+        for column, column_type in COLUMNS:
+            exists = check_column_exists(cursor, 'kyc_documents', column)
+            print(f"kyc_documents.{column}: {'exists' if exists else 'missing'}")
+            if not exists:
+                steps.append((f"Add column kyc_documents.{column}",
+                              f"ALTER TABLE kyc_documents ADD COLUMN {column} {column_type}"))
+
+        index_name, columns = INDEX
+        if not check_index_exists(cursor, index_name):
+            steps.append((f"Create index {index_name}",
+                          f"CREATE INDEX IF NOT EXISTS {index_name} ON kyc_documents ({columns})"))
+
+        if process_existing:
+            steps.append(("Mark existing documents pending processing",
+                          "UPDATE kyc_documents SET processing_status = 'PENDING' WHERE processing_status IS NULL"))
+
+        if not steps:
+            print("\n✅ Document processing columns already present. No migration needed.")
+            return True
+
+        print("\n=== Migration Plan ===")
+        for description, _ in steps:
+            print(f"- {description}")
+
+        if dry_run:
+            print("\n[DRY RUN] Would execute the above changes.")
+            return True
+
+        print("\n=== Executing Migration ===")
+        for description, statement in steps:
+            cursor.execute(statement)
+            print(f"✅ {description}")
+        conn.commit()
+
+        print("\n✅ Migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Error during migration: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        conn.rollback()
+        return False
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Add KYC document processing columns'
+    )
+    parser.add_argument('--dry-run', action='store_true', help='Show what would be done')
+    parser.add_argument('--database', type=str, default=None, help='Path to database file')
+    parser.add_argument('--process-existing', action='store_true',
+                        help='Queue documents uploaded before the migration for processing')
+
+    args = parser.parse_args()
+
+    if args.database:
+        database_path = args.database
+    else:
+        backend_dir = Path(__file__).parent.parent
+        database_path = backend_dir / 'kyc_database_dev.db'
+
+    print("=" * 60)
+    print("KYC Document Processing - Database Migration")
+    print("=" * 60)
+
+    success = migrate_database(str(database_path), dry_run=args.dry_run, process_existing=args.process_existing)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == '__main__':
+    main()
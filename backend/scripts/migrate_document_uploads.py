@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Database Migration Script - Resumable Document Uploads
+
+Creates the document_uploads table that tracks tus-style chunked KYC
+uploads (declared size, received offset, status, expiry), with its indexes.
+
+Usage:
+    python migrate_document_uploads.py [--dry-run] [--database PATH]
+
+Options:
+    --dry-run    Show what would be done without making changes
+    --database   Path to database file (default: kyc_database_dev.db in backend directory)
+"""
+
+import sys
+import os
+import argparse
+import sqlite3
+from pathlib import Path
+
+CREATE_UPLOADS_TABLE = """
+CREATE TABLE document_uploads (
+    id VARCHAR(36) NOT NULL PRIMARY KEY,
+    user_id VARCHAR(36) NOT NULL REFERENCES users (id),
+    document_type VARCHAR(20) NOT NULL,
+    file_name VARCHAR(255) NOT NULL,
+    mime_type VARCHAR(100) NOT NULL,
+    upload_length BIGINT NOT NULL,
+    upload_offset BIGINT NOT NULL,
+    status VARCHAR(11) NOT NULL,
+    document_id VARCHAR(36),
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    expires_at DATETIME NOT NULL
+)
+"""
+
+# (index name, columns)
+INDEXES = [
+    ('ix_document_uploads_user_id', 'user_id'),
+    ('ix_document_uploads_status', 'status'),
+    ('ix_document_uploads_expires_at', 'expires_at'),
+    ('idx_document_uploads_status_expires_at', 'status, expires_at'),
+]
+
+
+def check_table_exists(cursor, table_name):
+    """Check if a table exists"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
+    return cursor.fetchone() is not None
+
+
+def check_index_exists(cursor, index_name):
+    """Check if an index exists"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name=?", (index_name,))
+    return cursor.fetchone() is not None
+
+
+def migrate_database(database_path, dry_run=False):
+    """Perform the migration"""
+    print(f"Connecting to database: {database_path}")
+
+    if not os.path.exists(database_path):
+        print(f"ERROR: Database file not found: {database_path}")
+        return False
+
+    conn = sqlite3.connect(database_path)
+    cursor = conn.cursor()
+
+    try:
+        print("\n=== Checking Current Database State ===")
+
+        has_table = check_table_exists(cursor, 'document_uploads')
+        print(f"document_uploads: {'exists' if has_table else 'missing'}")
+
+        steps = []
+        if not has_table:
+            steps.append(("Create table document_uploads", CREATE_UPLOADS_TABLE))
+        for index_name, columns in INDEXES:
+            if not check_index_exists(cursor, index_name):
+                steps.append((f"Create index {index_name}",
+                              f"CREATE INDEX IF NOT EXISTS {index_name} ON document_uploads ({columns})"))
+
+        if not steps:
+            print("\n✅ document_uploads already present. No migration needed.")
+            return True
+
+        print("\n=== Migration Plan ===")
+        for description, _ in steps:
+            print(f"- {description}")
+
+        if dry_run:
+            print("\n[DRY RUN] Would execute the above changes.")
+            return True
+
+        print("\n=== Executing Migration ===")
+        for description, statement in steps:
+            cursor.execute(statement)
+            print(f"✅ {description}")
+        conn.commit()
+
+        print("\n✅ Migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Error during migration: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        conn.rollback()
+        return False
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Create the resumable document uploads table'
+    )
+    parser.add_argument('--dry-run', action='store_true', help='Show what would be done')
+    parser.add_argument('--database', type=str, default=None, help='Path to database file')
+
+    args = parser.parse_args()
+
+    if args.database:
+        database_path = args.database
+    else:
+        backend_dir = Path(__file__).parent.parent
+        database_path = backend_dir / 'kyc_database_dev.db'
+
+    print("=" * 60)
+    print("Resumable Document Uploads - Database Migration")
+    print("=" * 60)
+
+    success = migrate_database(str(database_path), dry_run=args.dry_run)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == '__main__':
+    main()
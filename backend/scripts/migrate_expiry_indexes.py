@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Database Migration Script - Expiry Indexes
+
+Creates the indexes used by the expiry sweeper to find overdue rows with
+range scans instead of full table scans:
+1. listings(expires_at), listings(status, expires_at)
+2. demand_listings(expires_at), demand_listings(status, expires_at)
+3. negotiations(expires_at), negotiations(status, expires_at)
+4. swap_quotes(valid_until), swap_quotes(status, valid_until)
+
+Usage:
+    python migrate_expiry_indexes.py [--dry-run] [--database PATH]
+
+Options:
+    --dry-run    Show what would be done without making changes
+    --database   Path to database file (default: kyc_database_dev.db in backend directory)
+"""
+
+import sys
+import os
+import argparse
+import sqlite3
+from pathlib import Path
+
+# (index name, table, columns)
+INDEXES = [
+    ('ix_listings_expires_at', 'listings', 'expires_at'),
+    ('idx_listings_status_expires_at', 'listings', 'status, expires_at'),
+    ('ix_demand_listings_expires_at', 'demand_listings', 'expires_at'),
+    ('idx_demand_listings_status_expires_at', 'demand_listings', 'status, expires_at'),
+    ('ix_negotiations_expires_at', 'negotiations', 'expires_at'),
+    ('idx_negotiations_status_expires_at', 'negotiations', 'status, expires_at'),
+    ('ix_swap_quotes_valid_until', 'swap_quotes', 'valid_until'),
+    ('idx_swap_quotes_status_valid_until', 'swap_quotes', 'status, valid_until'),
+]
+
+
+def check_table_exists(cursor, table_name):
+    """Check if a table exists"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
+    return cursor.fetchone() is not None
+
+
+def check_index_exists(cursor, index_name):
+    """Check if an index exists"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name=?", (index_name,))
+    return cursor.fetchone() is not None
+
+
+def migrate_database(database_path, dry_run=False):
+    """Perform the migration"""
+    print(f"Connecting to database: {database_path}")
+
+    if not os.path.exists(database_path):
+        print(f"ERROR: Database file not found: {database_path}")
+        return False
+
+    conn = sqlite3.connect(database_path)
+    cursor = conn.cursor()
+
+    try:
+        print("\n=== Checking Current Database State ===")
+
+        pending = []
+        for index_name, table, columns in INDEXES:
+            if not check_table_exists(cursor, table):
+                print(f"⚠️  Table '{table}' does not exist, skipping {index_name}")
+                continue
+            exists = check_index_exists(cursor, index_name)
+            print(f"{index_name}: {'exists' if exists else 'missing'}")
+            if not exists:
+                pending.append((index_name, table, columns))
+
+        if not pending:
+            print("\n✅ All expiry indexes already exist. No migration needed.")
+            return True
+
+        print("\n=== Migration Plan ===")
+        for index_name, table, columns in pending:
+            print(f"- Create index {index_name} ON {table}({columns})")
+
+        if dry_run:
+            print("\n[DRY RUN] Would execute the above changes.")
+            return True
+
+        print("\n=== Executing Migration ===")
+        for index_name, table, columns in pending:
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table}({columns})")
+            print(f"✅ {index_name} created")
+        conn.commit()
+
+        print("\n✅ Migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Error during migration: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        conn.rollback()
+        return False
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Create expiry indexes for the expiry sweeper'
+    )
+    parser.add_argument('--dry-run', action='store_true', help='Show what would be done')
+    parser.add_argument('--database', type=str, default=None, help='Path to database file')
+
+    args = parser.parse_args()
+
+    if args.database:
+        database_path = args.database
+    else:
+        backend_dir = Path(__file__).parent.parent
+        database_path = backend_dir / 'kyc_database_dev.db'
+
+    print("=" * 60)
+    print("Expiry Indexes - Database Migration")
+    print("=" * 60)
+
+    success = migrate_database(str(database_path), dry_run=args.dry_run)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Database Migration Script - Negotiation Message Sync
+
+Adds the columns used by the negotiation API for incremental message sync:
+1. negotiations.message_count (denormalised counter, backfilled)
+2. negotiations.last_message_at (backfilled)
+3. negotiation_messages.sequence (per-negotiation sequence, backfilled by created_at)
+4. Unique index uq_negotiation_messages_sequence ON negotiation_messages(negotiation_id, sequence)
+
+Usage:
+    python migrate_negotiation_sync.py [--dry-run] [--database PATH]
+
+Options:
+    --dry-run    Show what would be done without making changes
+    --database   Path to database file (default: kyc_database_dev.db in backend directory)
+"""
+
+import sys
+import os
+import argparse
+import sqlite3
+from pathlib import Path
+
+
+def check_table_exists(cursor, table_name):
+    """Check if a table exists"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
+    return cursor.fetchone() is not None
+
+
+def check_column_exists(cursor, table_name, column_name):
+    """Check if a column exists in a table"""
+    cursor.execute(f"PRAGMA table_info({table_name})")
+    return any(row[1] == column_name for row in cursor.fetchall())
+
+
+def check_index_exists(cursor, index_name):
+    """Check if an index exists"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name=?", (index_name,))
+    return cursor.fetchone() is not None
+
+
+def migrate_database(database_path, dry_run=False):
+    """Perform the migration"""
+    print(f"Connecting to database: {database_path}")
+
+    if not os.path.exists(database_path):
+        print(f"ERROR: Database file not found: {database_path}")
+        return False
+
+    conn = sqlite3.connect(database_path)
+    cursor = conn.cursor()
+
+    try:
+        print("\n=== Checking Current Database State ===")
+
+        for table in ('negotiations', 'negotiation_messages'):
+            if not check_table_exists(cursor, table):
+                print(f"⚠️  Table '{table}' does not exist. Run migrate_transformation_models.py first.")
+                return False
+
+        has_message_count = check_column_exists(cursor, 'negotiations', 'message_count')
+        has_last_message_at = check_column_exists(cursor, 'negotiations', 'last_message_at')
+        has_sequence = check_column_exists(cursor, 'negotiation_messages', 'sequence')
+        has_index = check_index_exists(cursor, 'uq_negotiation_messages_sequence')
+
+        print(f"negotiations.message_count exists: {has_message_count}")
+        print(f"negotiations.last_message_at exists: {has_last_message_at}")
+        print(f"negotiation_messages.sequence exists: {has_sequence}")
+        print(f"uq_negotiation_messages_sequence exists: {has_index}")
+
+        if has_message_count and has_last_message_at and has_sequence and has_index:
+            print("\n✅ Database is already up to date. No migration needed.")
+            return True
+
+        print("\n=== Migration Plan ===")
+        if not has_message_count:
+            print("- Add negotiations.message_count INTEGER NOT NULL DEFAULT 0")
+        if not has_last_message_at:
+            print("- Add negotiations.last_message_at DATETIME")
+        if not has_sequence:
+            print("- Add negotiation_messages.sequence INTEGER")
+        print("- Backfill sequence, message_count and last_message_at from existing messages")
+        if not has_index:
+            print("- Create unique index uq_negotiation_messages_sequence")
+
+        if dry_run:
+            print("\n[DRY RUN] Would execute the above changes.")
+            return True
+
+        print("\n=== Executing Migration ===")
+        if not has_message_count:
+            cursor.execute("ALTER TABLE negotiations ADD COLUMN message_count INTEGER NOT NULL DEFAULT 0")
+            print("✅ negotiations.message_count added")
+        if not has_last_message_at:
+            cursor.execute("ALTER TABLE negotiations ADD COLUMN last_message_at DATETIME")
+            print("✅ negotiations.last_message_at added")
+        if not has_sequence:
+            cursor.execute("ALTER TABLE negotiation_messages ADD COLUMN sequence INTEGER")
+            print("✅ negotiation_messages.sequence added")
+
+        # Number messages 1..n per negotiation in creation order
+        cursor.execute("""
+            SELECT id, negotiation_id FROM negotiation_messages
+            ORDER BY negotiation_id, created_at, id
+        """)
+        updates = []
+        current_negotiation, sequence = None, 0
+        for message_id, negotiation_id in cursor.fetchall():
+            if negotiation_id != current_negotiation:
+                current_negotiation, sequence = negotiation_id, 0
+            sequence += 1
+            updates.append((sequence, message_id))
+        cursor.executemany("UPDATE negotiation_messages SET sequence = ? WHERE id = ?", updates)
+        print(f"✅ Backfilled sequence for {len(updates)} messages")
+
+        cursor.execute("""
+            UPDATE negotiations SET
+                message_count = (
+                    SELECT COUNT(*) FROM negotiation_messages m WHERE m.negotiation_id = negotiations.id
+                ),
+                last_message_at = (
+                    SELECT MAX(created_at) FROM negotiation_messages m WHERE m.negotiation_id = negotiations.id
+                )
+        """)
+        print("✅ Backfilled message_count and last_message_at")
+
+        if not has_index:
+            cursor.execute("""
+                CREATE UNIQUE INDEX uq_negotiation_messages_sequence
+                ON negotiation_messages(negotiation_id, sequence)
+            """)
+            print("✅ uq_negotiation_messages_sequence created")
+
+        conn.commit()
+        print("\n✅ Migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Error during migration: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        conn.rollback()
+        return False
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Add negotiation message sync columns'
+    )
+    parser.add_argument('--dry-run', action='store_true', help='Show what would be done')
+    parser.add_argument('--database', type=str, default=None, help='Path to database file')
+
+    args = parser.parse_args()
+
+    if args.database:
+        database_path = args.database
+    else:
+        backend_dir = Path(__file__).parent.parent
+        database_path = backend_dir / 'kyc_database_dev.db'
+
+    print("=" * 60)
+    print("Negotiation Message Sync - Database Migration")
+    print("=" * 60)
+
+    success = migrate_database(str(database_path), dry_run=args.dry_run)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == '__main__':
+    main()
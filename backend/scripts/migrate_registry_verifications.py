@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Database Migration Script - EU ETS Registry Verification Cache
+
+Creates the registry_verifications table caching EU ETS registry lookups
+per (country, account number), and the index on their expiry.
+
+Usage:
+    python migrate_registry_verifications.py [--dry-run] [--database PATH]
+
+Options:
+    --dry-run    Show what would be done without making changes
+    --database   Path to database file (default: kyc_database_dev.db in backend directory)
+"""
+
+import sys
+import os
+import argparse
+import sqlite3
+from pathlib import Path
+
+CREATE_VERIFICATIONS_TABLE = """
+CREATE TABLE registry_verifications (
+    country VARCHAR(2) NOT NULL,
+    account_number VARCHAR(50) NOT NULL,
+    verified BOOLEAN NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    registry VARCHAR(100),
+    verification_method VARCHAR(20),
+    error TEXT,
+    verified_at DATETIME NOT NULL,
+    expires_at DATETIME NOT NULL,
+    PRIMARY KEY (country, account_number)
+)
+"""
+
+INDEX = ('ix_registry_verifications_expires_at', 'expires_at')
+
+
+def check_table_exists(cursor, table_name):
+    """Check if a table exists"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
+    return cursor.fetchone() is not None
+
+
+def check_index_exists(cursor, index_name):
+    """Check if an index exists"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name=?", (index_name,))
+    return cursor.fetchone() is not None
+
+
+def migrate_database(database_path, dry_run=False):
+    """Perform the migration"""
+    print(f"Connecting to database: {database_path}")
+
+    if not os.path.exists(database_path):
+        print(f"ERROR: Database file not found: {database_path}")
+        return False
+
+    conn = sqlite3.connect(database_path)
+    cursor = conn.cursor()
+
+    try:
+        print("\n=== Checking Current Database State ===")
+
+        has_table = check_table_exists(cursor, 'registry_verifications')
+        index_name, columns = INDEX
+        has_index = check_index_exists(cursor, index_name)
+        print(f"registry_verifications: {'exists' if has_table else 'missing'}")
+        print(f"{index_name}: {'exists' if has_index else 'missing'}")
+
+        steps = []
+        if not has_table:
+            steps.append(("Create table registry_verifications", CREATE_VERIFICATIONS_TABLE))
+        if not has_index:
+            steps.append((f"Create index {index_name}",
+                          f"CREATE INDEX IF NOT EXISTS {index_name} ON registry_verifications ({columns})"))
+
+        if not steps:
+            print("\n✅ Registry verification cache already present. No migration needed.")
+            return True
+
+        print("\n=== Migration Plan ===")
+        for description, _ in steps:
+            print(f"- {description}")
+
+        if dry_run:
+            print("\n[DRY RUN] Would execute the above changes.")
+            return True
+
+        print("\n=== Executing Migration ===")
+        for description, statement in steps:
+            cursor.execute(statement)
+            print(f"✅ {description}")
+        conn.commit()
+
+        print("\n✅ Migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Error during migration: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        conn.rollback()
+        return False
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Add the EU ETS registry verification cache table'
+    )
+    parser.add_argument('--dry-run', action='store_true', help='Show what would be done')
+    parser.add_argument('--database', type=str, default=None, help='Path to database file')
+
+    args = parser.parse_args()
+
+    if args.database:
+        database_path = args.database
+    else:
+        backend_dir = Path(__file__).parent.parent
+        database_path = backend_dir / 'kyc_database_dev.db'
+
+    print("=" * 60)
+    print("EU ETS Registry Verification Cache - Database Migration")
+    print("=" * 60)
+
+    success = migrate_database(str(database_path), dry_run=args.dry_run)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == '__main__':
+    main()
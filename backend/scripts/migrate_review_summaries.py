@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Database Migration Script - KYC Review Queue Summaries
+
+Creates the kyc_review_summaries table holding the precomputed dossier
+summary of each user for the admin review queue, and the queue index.
+The summaries themselves are backfilled by the application at startup
+(services/review_queue.py).
+
+Usage:
+    python migrate_review_summaries.py [--dry-run] [--database PATH]
+
+Options:
+    --dry-run    Show what would be done without making changes
+    --database   Path to database file (default: kyc_database_dev.db in backend directory)
+"""
+
+import sys
+import os
+import argparse
+import sqlite3
+from pathlib import Path
+
+CREATE_SUMMARIES_TABLE = """
+CREATE TABLE kyc_review_summaries (
+    user_id VARCHAR(36) NOT NULL PRIMARY KEY REFERENCES users (id) ON DELETE CASCADE,
+    username VARCHAR(80) NOT NULL,
+    company_name VARCHAR(200),
+    kyc_status VARCHAR(12) NOT NULL,
+    risk_level VARCHAR(6) NOT NULL,
+    in_queue BOOLEAN NOT NULL,
+    queued_at DATETIME NOT NULL,
+    document_counts JSON NOT NULL,
+    document_total INTEGER NOT NULL,
+    unverified_documents INTEGER NOT NULL,
+    rejected_documents INTEGER NOT NULL,
+    missing_documents JSON NOT NULL,
+    documents_expire_on DATE,
+    risk_flags JSON NOT NULL,
+    updated_at DATETIME NOT NULL
+)
+"""
+
+INDEX = ('ix_kyc_review_summaries_queue', 'in_queue, queued_at, user_id')
+
+
+def check_table_exists(cursor, table_name):
+    """Check if a table exists"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
+    return cursor.fetchone() is not None
+
+
+def check_index_exists(cursor, index_name):
+    """Check if an index exists"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name=?", (index_name,))
+    return cursor.fetchone() is not None
+
+
+def migrate_database(database_path, dry_run=False):
+    """Perform the migration"""
+    print(f"Connecting to database: {database_path}")
+
+    if not os.path.exists(database_path):
+        print(f"ERROR: Database file not found: {database_path}")
+        return False
+
+    conn = sqlite3.connect(database_path)
+    cursor = conn.cursor()
+
+    try:
+        print("\n=== Checking Current Database State ===")
+
+        has_table = check_table_exists(cursor, 'kyc_review_summaries')
+        index_name, columns = INDEX
+        has_index = check_index_exists(cursor, index_name)
+        print(f"kyc_review_summaries: {'exists' if has_table else 'missing'}")
+        print(f"{index_name}: {'exists' if has_index else 'missing'}")
+
+        steps = []
+        if not has_table:
+            steps.append(("Create table kyc_review_summaries", CREATE_SUMMARIES_TABLE))
+        if not has_index:
+            steps.append((f"Create index {index_name}",
+                          f"CREATE INDEX IF NOT EXISTS {index_name} ON kyc_review_summaries ({columns})"))
+
+        if not steps:
+            print("\n✅ KYC review summaries already present. No migration needed.")
+            return True
+
+        print("\n=== Migration Plan ===")
+        for description, _ in steps:
+            print(f"- {description}")
+
+        if dry_run:
+            print("\n[DRY RUN] Would execute the above changes.")
+            return True
+
+        print("\n=== Executing Migration ===")
+        for description, statement in steps:
+            cursor.execute(statement)
+            print(f"✅ {description}")
+        conn.commit()
+
+        print("\n✅ Migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Error during migration: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        conn.rollback()
+        return False
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Add the KYC review queue summaries table'
+    )
+    parser.add_argument('--dry-run', action='store_true', help='Show what would be done')
+    parser.add_argument('--database', type=str, default=None, help='Path to database file')
+
+    args = parser.parse_args()
+
+    if args.database:
+        database_path = args.database
+    else:
+        backend_dir = Path(__file__).parent.parent
+        database_path = backend_dir / 'kyc_database_dev.db'
+
+    print("=" * 60)
+    print("KYC Review Queue Summaries - Database Migration")
+    print("=" * 60)
+
+    success = migrate_database(str(database_path), dry_run=args.dry_run)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Database Migration Script - Sanctions List Version
+
+Adds users.sanctions_list_version, the version of the sanctions/PEP lists a
+user was last screened against, and its index. The rescreening job skips
+users already screened against the current version.
+
+Existing users keep a NULL version, so the first rescreening run screens
+all of them.
+
+Usage:
+    python migrate_sanctions_list_version.py [--dry-run] [--database PATH]
+
+Options:
+    --dry-run    Show what would be done without making changes
+    --database   Path to database file (default: kyc_database_dev.db in backend directory)
+"""
+
+import sys
+import os
+import argparse
+import sqlite3
+from pathlib import Path
+
+COLUMN = ('sanctions_list_version', 'VARCHAR(64)')
+
+INDEX = ('ix_users_sanctions_list_version', 'sanctions_list_version')
+
+
+def check_table_exists(cursor, table_name):
+    """Check if a table exists"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
+    return cursor.fetchone() is not None
+
+
+def check_column_exists(cursor, table_name, column_name):
+    """Check if a column exists in a table"""
+    cursor.execute(f"PRAGMA table_info({table_name})")
+    return any(row[1] == column_name for row in cursor.fetchall())
+
+
+def check_index_exists(cursor, index_name):
+    """Check if an index exists"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name=?", (index_name,))
+    return cursor.fetchone() is not None
+
+
+def migrate_database(database_path, dry_run=False):
+    """Perform the migration"""
+    print(f"Connecting to database: {database_path}")
+
+    if not os.path.exists(database_path):
+        print(f"ERROR: Database file not found: {database_path}")
+        return False
+
+    conn = sqlite3.connect(database_path)
+    cursor = conn.cursor()
+
+    try:
+        print("\n=== Checking Current Database State ===")
+
+        if not check_table_exists(cursor, 'users'):
+            print("⚠️  Table 'users' does not exist. Run init_db.py instead.")
+            return False
+
+        steps = []
+        column, column_type = COLUMN
+        exists = check_column_exists(cursor, 'users', column)
+        print(f"users.{column}: {'exists' if exists else 'missing'}")
+        if not exists:
+            steps.append((f"Add column users.{column}",
+                          f"ALTER TABLE users ADD COLUMN {column} {column_type}"))
+
+        index_name, columns = INDEX
+        if not check_index_exists(cursor, index_name):
+            steps.append((f"Create index {index_name}",
+                          f"CREATE INDEX IF NOT EXISTS {index_name} ON users ({columns})"))
+
+        if not steps:
+            print("\n✅ Sanctions list version column already present. No migration needed.")
+            return True
+
+        print("\n=== Migration Plan ===")
+        for description, _ in steps:
+            print(f"- {description}")
+
+        if dry_run:
+            print("\n[DRY RUN] Would execute the above changes.")
+            return True
+
+        print("\n=== Executing Migration ===")
+        for description, statement in steps:
+            cursor.execute(statement)
+            print(f"✅ {description}")
+        conn.commit()
+
+        print("\n✅ Migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Error during migration: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        conn.rollback()
+        return False
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Add the sanctions list version column to users'
+    )
+    parser.add_argument('--dry-run', action='store_true', help='Show what would be done')
+    parser.add_argument('--database', type=str, default=None, help='Path to database file')
+
+    args = parser.parse_args()
+
+    if args.database:
+        database_path = args.database
+    else:
+        backend_dir = Path(__file__).parent.parent
+        database_path = backend_dir / 'kyc_database_dev.db'
+
+    print("=" * 60)
+    print("Sanctions List Version - Database Migration")
+    print("=" * 60)
+
+    success = migrate_database(str(database_path), dry_run=args.dry_run)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Database Migration Script - Value Scenario JSON Payloads
+
+Prepares value_scenarios for native JSON payload columns and cursor pagination:
+1. Validates input_data, nihao_benefits and alternative_costs as JSON
+   (unparseable payloads are replaced by {} so JSON columns can load them)
+2. Creates index idx_value_scenarios_user_created ON value_scenarios(user_id, created_at, id)
+
+SQLite stores JSON columns as TEXT, so no column type change is needed.
+
+Usage:
+    python migrate_value_scenarios_json.py [--dry-run] [--database PATH]
+
+Options:
+    --dry-run    Show what would be done without making changes
+    --database   Path to database file (default: kyc_database_dev.db in backend directory)
+"""
+
+import sys
+import os
+import argparse
+import json
+import sqlite3
+from pathlib import Path
+
+PAYLOAD_COLUMNS = ('input_data', 'nihao_benefits', 'alternative_costs')
+
+
+def check_table_exists(cursor, table_name):
+    """Check if a table exists"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
+    return cursor.fetchone() is not None
+
+
+def check_index_exists(cursor, index_name):
+    """Check if an index exists"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name=?", (index_name,))
+    return cursor.fetchone() is not None
+
+
+def find_invalid_payloads(cursor):
+    """Return (id, column) pairs whose payload is not valid JSON"""
+    cursor.execute(f"SELECT id, {', '.join(PAYLOAD_COLUMNS)} FROM value_scenarios")
+    invalid = []
+    for row in cursor.fetchall():
+        for column, value in zip(PAYLOAD_COLUMNS, row[1:]):
+            try:
+                json.loads(value)
+            except (TypeError, ValueError):
+                invalid.append((row[0], column))
+    return invalid
+
+
+def migrate_database(database_path, dry_run=False):
+    """Perform the migration"""
+    print(f"Connecting to database: {database_path}")
+
+    if not os.path.exists(database_path):
+        print(f"ERROR: Database file not found: {database_path}")
+        return False
+
+    conn = sqlite3.connect(database_path)
+    cursor = conn.cursor()
+
+    try:
+        print("\n=== Checking Current Database State ===")
+
+        if not check_table_exists(cursor, 'value_scenarios'):
+            print("⚠️  Table 'value_scenarios' does not exist. Run migrate_0026_value_scenarios.py first.")
+            return False
+
+        has_index = check_index_exists(cursor, 'idx_value_scenarios_user_created')
+        invalid = find_invalid_payloads(cursor)
+
+        print(f"idx_value_scenarios_user_created exists: {has_index}")
+        print(f"Invalid JSON payloads: {len(invalid)}")
+
+        if has_index and not invalid:
+            print("\n✅ Database is already up to date. No migration needed.")
+            return True
+
+        print("\n=== Migration Plan ===")
+        if invalid:
+            print(f"- Replace {len(invalid)} unparseable payload(s) with {{}}")
+            for scenario_id, column in invalid[:10]:
+                print(f"    {scenario_id}.{column}")
+        if not has_index:
+            print("- Create index idx_value_scenarios_user_created")
+
+        if dry_run:
+            print("\n[DRY RUN] Would execute the above changes.")
+            return True
+
+        print("\n=== Executing Migration ===")
+        for scenario_id, column in invalid:
+            cursor.execute(f"UPDATE value_scenarios SET {column} = '{{}}' WHERE id = ?", (scenario_id,))
+        if invalid:
+            print(f"✅ Replaced {len(invalid)} invalid payload(s)")
+
+        if not has_index:
+            cursor.execute("""
+                CREATE INDEX idx_value_scenarios_user_created
+                ON value_scenarios(user_id, created_at, id)
+            """)
+            print("✅ idx_value_scenarios_user_created created")
+
+        conn.commit()
+        print("\n✅ Migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Error during migration: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        conn.rollback()
+        return False
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Prepare value scenarios for JSON payloads and cursor pagination'
+    )
+    parser.add_argument('--dry-run', action='store_true', help='Show what would be done')
+    parser.add_argument('--database', type=str, default=None, help='Path to database file')
+
+    args = parser.parse_args()
+
+    if args.database:
+        database_path = args.database
+    else:
+        backend_dir = Path(__file__).parent.parent
+        database_path = backend_dir / 'kyc_database_dev.db'
+
+    print("=" * 60)
+    print("Value Scenario JSON Payloads - Database Migration")
+    print("=" * 60)
+
+    success = migrate_database(str(database_path), dry_run=args.dry_run)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+"""
+Buyer Swap Calculator
+
+Calculates benefits for EUA holders swapping into CEA through Nihao
+compared with a direct swap (own WFOE in China).
+"""
+
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Optional
+import copy
+import logging
+
+import numpy as np
+
+from services.swap_calculator import SwapCalculator
+from utils.compliance_detector import ComplianceDetector
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+USE_CASES = ('compliance', 'cbam', 'investment', 'divestment')
+
+# Direct swap cost assumptions
+WFOE_SETUP_COST = 75000  # EUR, €50k-100k average
+FX_SPREAD = 0.015  # 1.5% FX spread on the transaction value
+NIHAO_FEE_RATE = 0.015  # 1.5% intermediation fee
+TIME_VALUE_RATE = 0.05  # Time value of money without China operations
+TIME_VALUE_RATE_CHINA_OPS = 0.01  # With existing China operations
+CBAM_SAVINGS_PER_TON = 40  # EUR per ton of CEA
+CEA_TO_EUA_FALLBACK_RATIO = 0.6  # CEA estimate: 40% discount from EUA
+LARGE_VOLUME_THRESHOLD = 1000000  # EUA volume above which the ratio gets a volume discount
+
+
+def market_conditions(eua_volume: float, in_compliance_period: bool) -> Dict:
+    """Market condition adjustments for SwapCalculator.calculate_swap_ratio"""
+    return {
+        'liquidity_premium': 0.1,
+        'compliance_adjustment': 0.2 if in_compliance_period else 0.0,
+        'volume_discount': 0.1 if eua_volume > LARGE_VOLUME_THRESHOLD else 0.0
+    }
+
+
+@lru_cache(maxsize=Config.BUYER_SWAP_CACHE_SIZE)
+def _buyer_swap_benefits(
+    eua_volume: float,
+    eua_price: float,
+    cea_price: float,
+    swap_ratio: Optional[float],
+    use_case: str,
+    has_china_operations: bool,
+    in_compliance_period: bool
+) -> Dict:
+    """Pure buyer swap calculation on normalized inputs (memoized)"""
+    # Calculate swap ratio if not provided
+    if swap_ratio is None:
+        swap_ratio = SwapCalculator().calculate_swap_ratio(
+            eua_price, cea_price, market_conditions(eua_volume, in_compliance_period)
+        )
+
+    # Direct swap costs
+    wfoe_setup = WFOE_SETUP_COST if not has_china_operations else 0
+    time_to_market = "6-12 months" if not has_china_operations else "2-4 weeks"
+    transaction_value = eua_volume * eua_price
+    fx_exposure = transaction_value * FX_SPREAD
+
+    # Nihao swap
+    nihao_fee = transaction_value * NIHAO_FEE_RATE
+
+    # Benefits
+    time_rate = TIME_VALUE_RATE if not has_china_operations else TIME_VALUE_RATE_CHINA_OPS
+    time_value = time_rate * transaction_value  # Time value of money
+    cbam_optimization = 0
+    if use_case == 'cbam':
+        cbam_optimization = eua_volume * swap_ratio * CBAM_SAVINGS_PER_TON
+
+    total_savings = wfoe_setup + time_value - nihao_fee + cbam_optimization
+    savings_percentage = (total_savings / transaction_value * 100) if transaction_value > 0 else 0
+
+    benefits = {
+        'wfoe_savings': round(wfoe_setup, 2),
+        'time_savings': f"{'5-11 months' if not has_china_operations else '2-4 weeks'} faster",
+        'risk_reduction': 'Eliminated capital controls and FX exposure'
+    }
+    if use_case == 'cbam':
+        benefits['cbam_optimization'] = round(cbam_optimization, 2)
+
+    return {
+        'direct_swap_costs': {
+            'wfoe_setup': round(wfoe_setup, 2),
+            'time_to_market': time_to_market,
+            'capital_controls_risk': True,
+            'fx_exposure': round(fx_exposure, 2)
+        },
+        'nihao_swap': {
+            'fee': round(nihao_fee, 2),
+            'execution_time': "48 hours",
+            'no_wfoe_needed': True,
+            'no_capital_controls': True
+        },
+        'benefits': benefits,
+        'total_savings': round(total_savings, 2),
+        'savings_percentage': round(savings_percentage, 2)
+    }
+
+
+class BuyerSwapCalculator:
+    """
+    Calculate value and benefits for EUA -> CEA swap buyers.
+
+    Compares a Nihao swap with setting up a direct swap:
+    - WFOE setup cost and time to market
+    - FX exposure and intermediation fee
+    - Time value of faster execution
+    - CBAM optimization for CBAM use cases
+    """
+
+    def __init__(self):
+        """Initialize buyer swap calculator"""
+        self.swap_calculator = SwapCalculator()
+
+    def calculate_buyer_swap_benefits(
+        self,
+        eua_volume: float,
+        eua_price: float,
+        cea_price: Optional[float] = None,
+        swap_ratio: Optional[float] = None,
+        use_case: str = 'compliance',
+        has_china_operations: bool = False,
+        check_date: Optional[date] = None
+    ) -> Dict:
+        """
+        Calculate benefits for a buyer swapping EUA into CEA through Nihao.
+
+        Deterministic for given inputs and compliance state; results are
+        kept in an LRU cache keyed on the normalized inputs and whether
+        check_date falls in the compliance period.
+
+        Args:
+            eua_volume: EUA volume to swap
+            eua_price: EUA price in EUR
+            cea_price: CEA price in EUR (default: 60% of the EUA price)
+            swap_ratio: EUA:CEA ratio (default: SwapCalculator with current
+                        market conditions)
+            use_case: 'compliance', 'cbam', 'investment' or 'divestment'
+            has_china_operations: Whether the buyer already operates in China
+            check_date: Date for the compliance state (defaults to today)
+
+        Returns:
+            Dict with direct_swap_costs, nihao_swap, benefits, total_savings
+            and savings_percentage
+        """
+        eua_volume = float(eua_volume)
+        eua_price = float(eua_price)
+        cea_price = float(cea_price) if cea_price is not None else eua_price * CEA_TO_EUA_FALLBACK_RATIO
+        swap_ratio = float(swap_ratio) if swap_ratio is not None else None
+        # The compliance state only matters when the ratio is calculated
+        in_compliance_period = swap_ratio is None and ComplianceDetector.is_compliance_period(check_date)
+
+        result = _buyer_swap_benefits(
+            eua_volume,
+            eua_price,
+            cea_price,
+            swap_ratio,
+            use_case if use_case in USE_CASES else 'compliance',
+            bool(has_china_operations),
+            in_compliance_period
+        )
+        # Callers get their own copy so they can't modify the cached result
+        return copy.deepcopy(result)
+
+    @staticmethod
+    def cache_info() -> Dict:
+        """Return LRU cache counters for monitoring"""
+        info = _buyer_swap_benefits.cache_info()
+        return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'maxsize': info.maxsize}
+
+    def calculate_buyer_swap_batch(
+        self,
+        eua_volumes,
+        eua_prices,
+        cea_prices=None,
+        swap_ratios=None,
+        use_cases='compliance',
+        has_china_operations=False,
+        in_compliance_period: Optional[bool] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Vectorized buyer swap benefits for many scenarios at once.
+
+        All arguments are scalars or 1-D arrays broadcast against each other.
+
+        Args:
+            eua_volumes: EUA volumes to swap
+            eua_prices: EUA prices in EUR
+            cea_prices: CEA prices in EUR (default: 60% of the EUA price)
+            swap_ratios: EUA:CEA ratios (default: SwapCalculator with
+                         current market conditions)
+            use_cases: 'compliance', 'cbam', 'investment' or 'divestment'
+            has_china_operations: Whether the buyer already operates in China
+            in_compliance_period: Compliance state used for default ratios
+                                  (default: today's)
+
+        Returns:
+            Dict of column arrays: swap_ratio, transaction_value, wfoe_setup,
+            fx_exposure, nihao_fee, time_value, cbam_optimization,
+            total_savings, savings_percentage
+        """
+        eua_volumes, eua_prices, use_cases, has_china_operations = np.broadcast_arrays(
+            np.asarray(eua_volumes, dtype=float),
+            np.asarray(eua_prices, dtype=float),
+            np.asarray(use_cases, dtype=object),
+            np.asarray(has_china_operations, dtype=bool)
+        )
+
+        if cea_prices is None:
+            cea_prices = eua_prices * CEA_TO_EUA_FALLBACK_RATIO
+        if swap_ratios is None:
+            if in_compliance_period is None:
+                in_compliance_period = ComplianceDetector.is_compliance_period()
+            swap_ratios = self.swap_calculator.calculate_swap_ratios(
+                eua_prices,
+                cea_prices,
+                liquidity_premium=0.1,
+                compliance_adjustment=0.2 if in_compliance_period else 0.0,
+                volume_discount=np.where(eua_volumes > LARGE_VOLUME_THRESHOLD, 0.1, 0.0)
+            )
+        swap_ratios = np.broadcast_to(np.asarray(swap_ratios, dtype=float), eua_volumes.shape)
+
+        transaction_value = eua_volumes * eua_prices
+        wfoe_setup = np.where(has_china_operations, 0.0, WFOE_SETUP_COST)
+        fx_exposure = transaction_value * FX_SPREAD
+        nihao_fee = transaction_value * NIHAO_FEE_RATE
+        time_value = transaction_value * np.where(has_china_operations, TIME_VALUE_RATE_CHINA_OPS, TIME_VALUE_RATE)
+        cbam_optimization = np.where(use_cases == 'cbam', eua_volumes * swap_ratios * CBAM_SAVINGS_PER_TON, 0.0)
+
+        total_savings = wfoe_setup + time_value - nihao_fee + cbam_optimization
+        savings_percentage = np.divide(
+            total_savings * 100, transaction_value,
+            out=np.zeros_like(transaction_value), where=transaction_value > 0
+        )
+
+        return {
+            'swap_ratio': swap_ratios,
+            'transaction_value': np.round(transaction_value, 2),
+            'wfoe_setup': wfoe_setup,
+            'fx_exposure': np.round(fx_exposure, 2),
+            'nihao_fee': np.round(nihao_fee, 2),
+            'time_value': np.round(time_value, 2),
+            'cbam_optimization': np.round(cbam_optimization, 2),
+            'total_savings': np.round(total_savings, 2),
+            'savings_percentage': np.round(savings_percentage, 2)
+        }
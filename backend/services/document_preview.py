@@ -0,0 +1,201 @@
+"""
+Document Preview Service
+
+Size-bounded JPEG/WebP previews of KYC documents: images are scaled down and
+PDFs rendered from their first page with PyMuPDF. Previews are cached on disk
+by document id and size and served with ETag, Cache-Control and Range
+support, so review screens don't download the original scans again.
+"""
+
+from typing import NamedTuple, Optional
+import io
+import os
+import shutil
+import tempfile
+
+import fitz  # PyMuPDF
+from flask import current_app, request, send_file
+
+from services.document_processor import file_type_of, render_first_page
+from config import Config
+
+# Pillow is optional: without it previews are JPEG only
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+MIME_TYPES = {'jpeg': 'image/jpeg', 'webp': 'image/webp'}
+EXTENSIONS = {'jpeg': 'jpg', 'webp': 'webp'}
+
+# Part of every ETag; bump when rendering changes so clients drop old previews
+RENDER_VERSION = 1
+
+
+class PreviewUnavailableError(ValueError):
+    """Raised when a document's type can't be previewed (e.g. DOCX)"""
+
+
+class Preview(NamedTuple):
+    """A rendered preview on disk"""
+    path: str
+    mimetype: str
+    etag: str
+
+
+class DocumentPreviewService:
+    """
+    Renders and caches document previews.
+
+    Requested sizes are rounded up to one of a few configured sizes, so the
+    cache holds at most one file per document, size and format under
+    ``root/<document_id>/``. Documents never change after upload, which
+    makes the cached file valid until the document is deleted and lets the
+    ETag be derived from the content digest without touching the disk.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        sizes=(128, 256, 512, 1024),
+        default_size: int = 512,
+        quality: int = 80,
+        max_age: int = 86400
+    ):
+        """
+        Initialize preview service
+
+        Args:
+            root: Directory of the preview cache
+            sizes: Allowed longest sides in pixels
+            default_size: Size served when none is requested
+            quality: JPEG/WebP quality (1-100)
+            max_age: Cache-Control max-age of previews in seconds
+        """
+        self.root = root
+        self.sizes = sorted(sizes)
+        self.default_size = default_size
+        self.quality = quality
+        self.max_age = max_age
+
+    @property
+    def formats(self):
+        """Output formats available"""
+        return ('jpeg', 'webp') if PIL_AVAILABLE else ('jpeg',)
+
+    def bound_size(self, requested: Optional[int] = None) -> int:
+        """Smallest allowed size at least as large as requested (the largest if none is)"""
+        requested = requested or self.default_size
+        for size in self.sizes:
+            if size >= requested:
+                return size
+        return self.sizes[-1]
+
+    def options_from(self, args):
+        """
+        Bounded (size, format) from request arguments ``size`` and ``format``.
+
+        Raises:
+            ValueError: If size isn't a positive integer or the format is unsupported
+        """
+        size = args.get('size', type=int)
+        if 'size' in args and (size is None or size <= 0):
+            raise ValueError('size must be a positive integer')
+        fmt = (args.get('format') or 'jpeg').lower()
+        if fmt == 'jpg':
+            fmt = 'jpeg'
+        if fmt not in self.formats:
+            raise ValueError(f"format must be one of: {', '.join(self.formats)}")
+        return self.bound_size(size), fmt
+
+    def cache_path(self, document_id: str, size: int, fmt: str) -> str:
+        """Location of a cached preview"""
+        return os.path.join(self.root, document_id, f'{size}.{EXTENSIONS[fmt]}')
+
+    def etag(self, document, size: int, fmt: str) -> str:
+        """ETag of a preview, derived from the document content"""
+        return f'{document.sha256 or document.id}-{size}-{fmt}-v{RENDER_VERSION}'
+
+    def render(self, file_path: str, file_type: str, size: int, fmt: str) -> bytes:
+        """Encode the first page of a file, longest side size pixels"""
+        doc = fitz.open(file_path, filetype=file_type)
+        try:
+            if doc.needs_pass or not doc.page_count:
+                raise PreviewUnavailableError('Document has no viewable page')
+            pixmap = render_first_page(doc, size)
+        finally:
+            doc.close()
+
+        if fmt == 'webp':
+            image = Image.frombytes('RGB', (pixmap.width, pixmap.height), pixmap.samples)
+            buffer = io.BytesIO()
+            image.save(buffer, 'WEBP', quality=self.quality)
+            return buffer.getvalue()
+        return pixmap.tobytes('jpeg', jpg_quality=self.quality)
+
+    def get(self, document, size: int, fmt: str = 'jpeg') -> Preview:
+        """
+        Cached preview of a document, rendered on first use.
+
+        Raises:
+            PreviewUnavailableError: If the document type can't be previewed
+        """
+        file_type = file_type_of(document.mime_type, document.file_name)
+        if file_type is None:
+            raise PreviewUnavailableError('Preview only available for PDF and image files')
+
+        path = self.cache_path(document.id, size, fmt)
+        if not os.path.exists(path):
+            data = self.render(document.file_path, file_type, size, fmt)
+            # Write next to the target and rename, so readers never see a partial file
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        return Preview(path, MIME_TYPES[fmt], self.etag(document, size, fmt))
+
+    def send(self, document, size: int, fmt: str = 'jpeg'):
+        """
+        Response serving a preview of a document.
+
+        Answers ``If-None-Match`` revalidations with 304 before rendering or
+        opening anything; otherwise serves the cached file with Range support.
+        Previews of KYC documents are cacheable by the browser only.
+        """
+        etag = self.etag(document, size, fmt)
+        if etag in request.if_none_match:
+            response = current_app.response_class(status=304)
+            response.set_etag(etag)
+        else:
+            preview = self.get(document, size, fmt)
+            response = send_file(
+                preview.path,
+                mimetype=preview.mimetype,
+                etag=preview.etag,
+                conditional=True,
+                max_age=self.max_age
+            )
+        response.cache_control.public = False
+        response.cache_control.private = True
+        response.cache_control.max_age = self.max_age
+        return response
+
+    def invalidate(self, document_id: str):
+        """Remove every cached preview of a document"""
+        shutil.rmtree(os.path.join(self.root, document_id), ignore_errors=True)
+
+
+document_previews = DocumentPreviewService(
+    root=Config.DOCUMENT_PREVIEW_FOLDER,
+    sizes=[int(size) for size in Config.DOCUMENT_PREVIEW_SIZES.split(',') if size.strip()],
+    default_size=Config.DOCUMENT_PREVIEW_DEFAULT_SIZE,
+    quality=Config.DOCUMENT_PREVIEW_QUALITY,
+    max_age=Config.DOCUMENT_PREVIEW_MAX_AGE
+)
@@ -0,0 +1,300 @@
+"""
+Document Processor
+
+Background processing of uploaded KYC documents: PyMuPDF text extraction
+page by page, the page count, and dates and registration numbers found in
+the text. Results are stored on the KYCDocument so admin reviews read them
+instead of opening the files. Page images (thumbnails, previews) are
+rendered on demand by services/document_preview.py.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import logging
+import queue
+import threading
+import time
+
+import fitz  # PyMuPDF
+from sqlalchemy import update
+from sqlalchemy.orm import undefer
+
+from database import db
+from models.kyc_document import KYCDocument, ProcessingStatus
+from services.review_queue import review_queue
+from utils.document_text import extract_dates, extract_registration_numbers
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# PyMuPDF file types by MIME type; other types (DOC/DOCX) are not analysed
+FILE_TYPES = {
+    'application/pdf': 'pdf',
+    'image/png': 'png',
+    'image/jpeg': 'jpeg',
+    'image/jpg': 'jpeg',
+}
+
+# Separates page texts in KYCDocument.extracted_text
+PAGE_SEPARATOR = '\f'
+
+RESULT_FIELDS = (
+    'page_count', 'extracted_text', 'extracted_dates', 'registration_numbers',
+    'document_date'
+)
+
+
+def file_type_of(mime_type: Optional[str], file_name: Optional[str] = None) -> Optional[str]:
+    """PyMuPDF file type of a document (None if it can't be analysed)"""
+    file_type = FILE_TYPES.get((mime_type or '').lower())
+    if file_type is None and file_name and '.' in file_name:
+        extension = file_name.rsplit('.', 1)[1].lower()
+        file_type = {'pdf': 'pdf', 'png': 'png', 'jpg': 'jpeg', 'jpeg': 'jpeg'}.get(extension)
+    return file_type
+
+
+def extract_page_texts(doc, max_pages: int) -> List[str]:
+    """Text of the first max_pages pages, one entry per page"""
+    return [doc.load_page(index).get_text() for index in range(min(doc.page_count, max_pages))]
+
+
+def render_first_page(doc, size: int):
+    """RGB pixmap of the first page, scaled so its longest side is size pixels"""
+    page = doc.load_page(0)
+    zoom = size / max(page.rect.width, page.rect.height, 1)
+    return page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+
+
+class DocumentProcessor:
+    """
+    Asynchronous processing queue for KYC documents.
+
+    New document ids are pushed onto an in-process queue drained by a pool
+    of worker threads. A worker claims a document by flipping it from
+    PENDING to PROCESSING with a conditional UPDATE, analyses the file
+    outside any transaction and stores the results. Documents sharing a
+    content digest reuse the results of one already processed. A periodic
+    ``process_pending`` sweep picks up documents the queue missed (other
+    processes, restarts) and retries those stuck in PROCESSING.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_pages: int = 50,
+        timeout_minutes: int = 15
+    ):
+        """
+        Initialize document processor
+
+        Args:
+            workers: Number of worker threads
+            max_pages: Pages of a PDF whose text is extracted
+            timeout_minutes: After this long in PROCESSING a document is retried
+        """
+        self.workers = workers
+        self.max_pages = max_pages
+        self.timeout_minutes = timeout_minutes
+
+        self._queue = queue.Queue()
+        self._threads = []
+        self._app = None
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'processed': 0,
+            'reused': 0,
+            'failed': 0,
+            'last_processed_at': None,
+            'last_duration_ms': None,
+        }
+
+    def analyze(self, file_path: str, file_type: Optional[str]) -> Dict:
+        """
+        Analyse one file.
+
+        Returns:
+            Dict of RESULT_FIELDS values (None where not applicable)
+
+        Raises:
+            ValueError: If the document is password protected
+        """
+        results = dict.fromkeys(RESULT_FIELDS)
+        if file_type is None:
+            return results
+
+        doc = fitz.open(file_path, filetype=file_type)
+        try:
+            if doc.needs_pass:
+                raise ValueError('Document is password protected')
+            results['page_count'] = doc.page_count
+            if file_type == 'pdf':
+                text = PAGE_SEPARATOR.join(extract_page_texts(doc, self.max_pages))
+                dates = extract_dates(text)
+                results['extracted_text'] = text
+                results['extracted_dates'] = [day.isoformat() for day in dates]
+                results['registration_numbers'] = extract_registration_numbers(text)
+                # Most recent date on or before today: issue date rather than a validity end
+                past_dates = [day for day in dates if day <= datetime.utcnow().date()]
+                results['document_date'] = past_dates[-1] if past_dates else None
+        finally:
+            doc.close()
+        return results
+
+    def _claim(self, document_id: str, now: datetime) -> bool:
+        """Flip a PENDING document to PROCESSING; False if another worker has it"""
+        result = db.session.execute(
+            update(KYCDocument)
+            .where(KYCDocument.id == document_id)
+            .where(KYCDocument.processing_status == ProcessingStatus.PENDING)
+            .values(processing_status=ProcessingStatus.PROCESSING, processing_started_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return (result.rowcount or 0) == 1
+
+    def _processed_twin(self, document: KYCDocument) -> Optional[KYCDocument]:
+        """Another processed document with the same content"""
+        if not document.sha256:
+            return None
+        return (
+            KYCDocument.query
+            .options(undefer(KYCDocument.extracted_text))
+            .filter(KYCDocument.sha256 == document.sha256)
+            .filter(KYCDocument.id != document.id)
+            .filter(KYCDocument.processing_status == ProcessingStatus.COMPLETED)
+            .first()
+        )
+
+    def process_document(self, document_id: str) -> bool:
+        """
+        Process one PENDING document and store the results.
+
+        Returns:
+            True if this call processed it (successfully or not), False if
+            it wasn't pending
+        """
+        started = time.monotonic()
+        if not self._claim(document_id, datetime.utcnow()):
+            return False
+
+        document = KYCDocument.query.filter_by(id=document_id).first()
+        if document is None:
+            return False
+
+        reused = False
+        try:
+            twin = self._processed_twin(document)
+            if twin is not None:
+                results = {field: getattr(twin, field) for field in RESULT_FIELDS}
+                reused = True
+            else:
+                file_path, file_type = document.file_path, file_type_of(document.mime_type, document.file_name)
+                db.session.commit()  # Don't hold a transaction open while reading the file
+                results = self.analyze(file_path, file_type)
+
+            for field, value in results.items():
+                setattr(document, field, value)
+            document.processing_status = ProcessingStatus.COMPLETED
+            document.processing_error = None
+            document.processed_at = datetime.utcnow()
+            if document.document_date is not None:
+                # The date found decides when a registration certificate expires
+                review_queue.refresh(document.user_id)
+            db.session.commit()
+            outcome = 'reused' if reused else 'processed'
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"Processing document {document_id} failed: {e}")
+            document = KYCDocument.query.filter_by(id=document_id).first()
+            if document is None:
+                return True
+            document.processing_status = ProcessingStatus.FAILED
+            document.processing_error = str(e)[:500]
+            document.processed_at = datetime.utcnow()
+            db.session.commit()
+            outcome = 'failed'
+
+        duration_ms = (time.monotonic() - started) * 1000
+        with self._stats_lock:
+            self._stats[outcome] += 1
+            self._stats['last_processed_at'] = datetime.utcnow().isoformat()
+            self._stats['last_duration_ms'] = round(duration_ms, 1)
+        return True
+
+    def reset_stale(self, now: Optional[datetime] = None) -> int:
+        """Put documents stuck in PROCESSING (e.g. after a crash) back to PENDING"""
+        now = now or datetime.utcnow()
+        result = db.session.execute(
+            update(KYCDocument)
+            .where(KYCDocument.processing_status == ProcessingStatus.PROCESSING)
+            .where(KYCDocument.processing_started_at < now - timedelta(minutes=self.timeout_minutes))
+            .values(processing_status=ProcessingStatus.PENDING)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount or 0
+
+    def process_pending(self, limit: int = 100) -> int:
+        """
+        Scheduled sweep: queue (or, without workers, process) pending documents.
+
+        Returns:
+            Number of documents queued or processed
+        """
+        self.reset_stale()
+        ids = [
+            row[0] for row in db.session.query(KYCDocument.id)
+            .filter(KYCDocument.processing_status == ProcessingStatus.PENDING)
+            .order_by(KYCDocument.uploaded_at)
+            .limit(limit)
+            .all()
+        ]
+        db.session.commit()
+        if self._threads:
+            for document_id in ids:
+                self._queue.put(document_id)
+            return len(ids)
+        return sum(1 for document_id in ids if self.process_document(document_id))
+
+    def enqueue(self, document_id: str):
+        """Queue a new document for processing (no-op unless the workers are running)"""
+        if self._threads:
+            self._queue.put(document_id)
+
+    def start(self, app):
+        """Start the worker pool that drains the queue"""
+        if self._threads:
+            return
+        self._app = app
+        for index in range(max(self.workers, 1)):
+            thread = threading.Thread(target=self._run, name=f'document-processor-{index}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _run(self):
+        """Worker loop: process queued documents one at a time"""
+        while True:
+            document_id = self._queue.get()
+            with self._app.app_context():
+                try:
+                    self.process_document(document_id)
+                except Exception as e:
+                    logger.error(f"Document processing failed: {e}", exc_info=True)
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+
+    def get_stats(self) -> Dict:
+        """Return processing counters for monitoring"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['queue_size'] = self._queue.qsize()
+        stats['workers'] = len(self._threads)
+        return stats
+
+
+document_processor = DocumentProcessor(
+    workers=Config.DOCUMENT_PROCESSING_WORKERS,
+    max_pages=Config.DOCUMENT_PROCESSING_MAX_PAGES,
+    timeout_minutes=Config.DOCUMENT_PROCESSING_TIMEOUT_MINUTES
+)
@@ -0,0 +1,433 @@
+"""
+Document Store
+
+Content-addressed storage for KYC document files. Uploads are streamed in
+chunks to a temporary file while their SHA-256 and size are computed, then
+renamed atomically to <root>/<ab>/<cd>/<sha256>. Multipart uploads can be
+spooled by the form parser straight into such a temporary file
+(spool_factory), so the body is hashed and stored as it is received. Identical contents share
+one file, tracked by a reference-counted DocumentBlob row.
+"""
+
+from datetime import datetime
+from typing import BinaryIO, NamedTuple, Optional
+import glob
+import hashlib
+import logging
+import os
+import tempfile
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from database import db
+from models.document_blob import DocumentBlob
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentTooLargeError(ValueError):
+    """Raised when a streamed upload exceeds the allowed size"""
+
+
+class StoredBlob(NamedTuple):
+    """A file written to the store"""
+    sha256: str
+    file_path: str
+    file_size: int
+    created: bool  # False when identical content was already stored
+
+
+class HashingSpool:
+    """
+    Temporary file in the store that hashes and sizes what is written to it.
+
+    Used as the form parser's file container: Werkzeug writes the part into
+    it while the request body is received, then seeks back to the start so
+    validators can read the head. Past max_size the content is dropped and
+    the rest of the part is only counted (too_large is set). With a ``check``,
+    the first sniff_size bytes are checked as soon as they are written, like
+    the resumable append does; on a mismatch the content is dropped the
+    same way and ``error`` says why. Closing a spool that was not placed into
+    the store removes its file.
+    """
+
+    def __init__(self, tmp_dir: str, max_size: Optional[int] = None, check=None, sniff_size: Optional[int] = None):
+        """
+        Args:
+            tmp_dir: Directory of the temporary file (inside the store)
+            max_size: Maximum accepted size in bytes (default: no limit)
+            check: Callable(head) -> (is_valid, error_message) run on the
+                   first sniff_size bytes
+            sniff_size: Bytes passed to check (default: UPLOAD_SNIFF_BYTES)
+        """
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(dir=tmp_dir, suffix='.part')
+        self._file = os.fdopen(fd, 'w+b')
+        self._digest = hashlib.sha256()
+        self.size = 0
+        self.max_size = max_size
+        self.check = check
+        self.sniff_size = sniff_size or Config.UPLOAD_SNIFF_BYTES
+        self.head_checked = check is None
+        self.too_large = False
+        self.error = None  # Set when the content check failed
+        self.placed = False
+
+    @property
+    def sha256(self) -> str:
+        """Hex digest of everything written so far"""
+        return self._digest.hexdigest()
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        if self.too_large or self.error:
+            return len(data)
+        if self.max_size is not None and self.size > self.max_size:
+            self.too_large = True
+            self._discard()
+            return len(data)
+        self._digest.update(data)
+        written = self._file.write(data)
+        if not self.head_checked and self._file.tell() >= self.sniff_size:
+            self.check_head()
+        return written
+
+    def check_head(self):
+        """Run the content check on what has been written so far (at most sniff_size bytes)"""
+        self.head_checked = True
+        self._file.seek(0)
+        is_valid, error = self.check(self._file.read(self.sniff_size))
+        self._file.seek(0, os.SEEK_END)
+        if not is_valid:
+            self.error = error or 'Invalid file'
+            self._discard()
+
+    def _discard(self):
+        """
+        Drop what was written and stop writing, but keep the file open:
+        Werkzeug seeks back to the start once the part ends, and a closed
+        container would make it drop the part (and the flags with it)
+        """
+        self._file.seek(0)
+        self._file.truncate()
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        return self._file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+    def readline(self, size: int = -1) -> bytes:
+        return self._file.readline(size)
+
+    def finish(self):
+        """Flush the received content to disk and close the file (before renaming it)"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+        if not self.placed and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class DocumentStore:
+    """
+    Content-addressed, deduplicated file store.
+
+    Writing a stream touches the disk only (write_stream); the reference
+    count is kept in the current database session (add_reference / release)
+    so it commits or rolls back with the KYCDocument rows using the blob.
+    Counts change with single UPDATE / INSERT ... ON CONFLICT statements,
+    never read-modify-write, so concurrent uploads and deletions of the same
+    content don't lose references. Files are only removed once no document
+    references them (remove_unreferenced).
+
+    Uploads (store, place_spool, import_file) count their reference before
+    deciding whether to keep the existing file or rename theirs into place,
+    so the DocumentBlob row is locked by their transaction; a concurrent
+    remove_unreferenced waits for it and then sees the reference.
+    """
+
+    def __init__(self, root: str, chunk_size: int = 64 * 1024):
+        """
+        Initialize document store
+
+        Args:
+            root: Directory holding the blobs (and their temporary files)
+            chunk_size: Bytes read from upload streams at a time
+        """
+        self.root = os.path.abspath(root)
+        self.chunk_size = chunk_size
+
+    @property
+    def tmp_dir(self) -> str:
+        """Temporary files live under the root so the final rename is atomic"""
+        return os.path.join(self.root, 'tmp')
+
+    def blob_path(self, sha256: str) -> str:
+        """Path of the blob with the given digest"""
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def contains(self, path: str) -> bool:
+        """Whether a path lies inside the store"""
+        return os.path.abspath(path).startswith(self.root + os.sep)
+
+    def write_stream(self, stream: BinaryIO, max_size: Optional[int] = None) -> StoredBlob:
+        """
+        Stream content into the store, hashing it on the way.
+
+        Args:
+            stream: Readable binary stream positioned at the start of the content
+            max_size: Maximum accepted size in bytes (default: no limit)
+
+        Returns:
+            StoredBlob of the content
+
+        Raises:
+            DocumentTooLargeError: If the content exceeds max_size
+        """
+        tmp_path, sha256, size = self._write_temp(stream, max_size)
+        try:
+            return self._place(tmp_path, sha256, size)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _write_temp(self, stream: BinaryIO, max_size: Optional[int] = None):
+        """Copy a stream to a temporary file in tmp_dir; returns (path, sha256, size)"""
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                while True:
+                    chunk = stream.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise DocumentTooLargeError(f'Content exceeds {max_size} bytes')
+                    digest.update(chunk)
+                    out.write(chunk)
+                out.flush()
+                os.fsync(out.fileno())
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return tmp_path, digest.hexdigest(), size
+
+    def spool_factory(self, max_size: Optional[int] = None, check=None):
+        """
+        stream_factory for Werkzeug's form parser that writes file parts to
+        HashingSpools in tmp_dir (see place_spool)
+
+        Args:
+            max_size: Maximum accepted size of a part
+            check: Callable(head, filename, content_type) -> (is_valid,
+                   error_message) run on the head of each part as it arrives
+        """
+        def factory(total_content_length, content_type, filename=None, content_length=None):
+            part_check = None
+            if check is not None:
+                part_check = lambda head: check(head, filename, content_type)
+            return HashingSpool(self.tmp_dir, max_size=max_size, check=part_check)
+        return factory
+
+    def place_spool(self, spool: HashingSpool) -> StoredBlob:
+        """
+        Move a fully received spool into the store and count a reference to
+        it (in the session, not committed); it was hashed while written, so
+        the content is not read again.
+
+        Raises:
+            DocumentTooLargeError: If the part exceeded the spool's max_size
+        """
+        if spool.too_large:
+            raise DocumentTooLargeError(f'Content exceeds {spool.max_size} bytes')
+        spool.finish()
+        stored = self._reference_and_place(spool.path, spool.sha256, spool.size)
+        spool.placed = True
+        return stored
+
+    def import_file(self, path: str, keep_duplicate: bool = False) -> StoredBlob:
+        """
+        Move a file already on disk (e.g. an assembled chunked upload) into
+        the store and count a reference to it (in the session, not
+        committed). It is hashed in chunks and renamed, never copied, so it
+        must be on the store's filesystem.
+
+        Args:
+            keep_duplicate: Leave the file where it is when its content is
+                            already stored, so the caller can still retry
+                            until the reference is committed
+        """
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                digest.update(chunk)
+        return self._reference_and_place(path, digest.hexdigest(), size, keep_duplicate=keep_duplicate)
+
+    def _reference_and_place(self, tmp_path: str, sha256: str, size: int, keep_duplicate: bool = False) -> StoredBlob:
+        """
+        Count a reference, then keep the existing file or rename tmp_path
+        into place. The reference is written first so this transaction holds
+        the row: a concurrent remove_unreferenced can't delete the file
+        between the existence check and the commit.
+        """
+        self.add_reference(StoredBlob(sha256, self.blob_path(sha256), size, False))
+        return self._place(tmp_path, sha256, size, keep_duplicate=keep_duplicate)
+
+    def _place(self, tmp_path: str, sha256: str, size: int, keep_duplicate: bool = False) -> StoredBlob:
+        """Rename a hashed file to its blob path, or drop it (unless keep_duplicate) if the blob exists"""
+        path = self.blob_path(sha256)
+        if os.path.exists(path):
+            if not keep_duplicate:
+                os.remove(tmp_path)
+            return StoredBlob(sha256, path, size, False)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+        return StoredBlob(sha256, path, size, True)
+
+    def add_reference(self, stored: StoredBlob):
+        """
+        Count one more document using a blob (in the current session, not
+        committed). The first reference inserts the row; a concurrent or
+        later one increments it in the same statement.
+        """
+        table = DocumentBlob.__table__
+        statement = self._insert()(table).values(
+            sha256=stored.sha256,
+            file_path=stored.file_path,
+            file_size=stored.file_size,
+            ref_count=1,
+            created_at=datetime.utcnow()
+        ).on_conflict_do_update(
+            index_elements=[table.c.sha256],
+            set_={'ref_count': table.c.ref_count + 1}
+        )
+        db.session.execute(statement)
+
+    @staticmethod
+    def _insert():
+        """INSERT construct with ON CONFLICT support for the session's database"""
+        dialect = db.session.get_bind().dialect.name
+        return postgresql.insert if dialect == 'postgresql' else sqlite.insert
+
+    def store(self, stream: BinaryIO, max_size: Optional[int] = None) -> StoredBlob:
+        """Write a stream and add a reference to its blob"""
+        tmp_path, sha256, size = self._write_temp(stream, max_size)
+        try:
+            return self._reference_and_place(tmp_path, sha256, size)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def release(self, sha256: str) -> Optional[str]:
+        """
+        Drop one reference to a blob (in the current session, not committed).
+
+        Returns:
+            Path of the file to pass to remove_unreferenced() after commit
+            once no document uses it, otherwise None
+        """
+        result = db.session.execute(
+            update(DocumentBlob)
+            .where(DocumentBlob.sha256 == sha256)
+            .values(ref_count=DocumentBlob.ref_count - 1)
+            .execution_options(synchronize_session=False)
+        )
+        if not result.rowcount:
+            return None
+        # The UPDATE holds the row's write lock, so the count read back is ours
+        file_path, ref_count = db.session.execute(
+            select(DocumentBlob.file_path, DocumentBlob.ref_count).where(DocumentBlob.sha256 == sha256)
+        ).one()
+        if ref_count > 0:
+            return None
+        db.session.execute(
+            delete(DocumentBlob)
+            .where(DocumentBlob.sha256 == sha256)
+            .execution_options(synchronize_session=False)
+        )
+        return file_path
+
+    def remove_unreferenced(self, sha256: str, path: Optional[str]) -> bool:
+        """
+        Delete a blob file unless a document references it again, in a
+        transaction of its own (call after the commit or rollback that
+        dropped the last reference).
+
+        Between that commit and now a concurrent upload of the same content
+        may have counted a reference, so the DocumentBlob row is claimed and
+        re-checked inside the transaction before the file goes.
+        """
+        if not path:
+            return False
+        try:
+            # Upsert the row first: this waits for an upload that is counting a reference
+            # (its INSERT or UPDATE holds the row) and locks the row until commit
+            table = DocumentBlob.__table__
+            db.session.execute(
+                self._insert()(table).values(
+                    sha256=sha256, file_path=path, file_size=0, ref_count=0, created_at=datetime.utcnow()
+                ).on_conflict_do_update(
+                    index_elements=[table.c.sha256],
+                    set_={'ref_count': table.c.ref_count}
+                )
+            )
+            ref_count = db.session.execute(
+                select(DocumentBlob.ref_count).where(DocumentBlob.sha256 == sha256)
+            ).scalar()
+            removed = False
+            if ref_count <= 0:
+                db.session.execute(
+                    delete(DocumentBlob)
+                    .where(DocumentBlob.sha256 == sha256)
+                    .execution_options(synchronize_session=False)
+                )
+                removed = self.remove_file(path)
+            db.session.commit()
+            return removed
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error removing unreferenced blob {sha256}: {e}")
+            return False
+
+    def remove_file(self, path: Optional[str]) -> bool:
+        """Delete a blob file and its derived files (e.g. thumbnails of older releases); only paths inside the store are touched"""
+        if not path or not self.contains(path):
+            return False
+        for derived in glob.glob(glob.escape(path) + '.*'):
+            try:
+                os.remove(derived)
+            except OSError:
+                pass
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logger.error(f"Error deleting blob {path}: {e}")
+            return False
+
+
+document_store = DocumentStore(Config.DOCUMENT_STORE_FOLDER, chunk_size=Config.UPLOAD_CHUNK_SIZE)
@@ -2,18 +2,58 @@
 Document validation service
 """
 import os
+import re
+import time
+import zlib
 from werkzeug.utils import secure_filename
 from datetime import datetime
 import fitz  # PyMuPDF
 from config import Config
 
 
+def _inflate(chunks, piece_size=64 * 1024):
+    """Inflate zlib data lazily, at most piece_size bytes at a time; stops at corrupt data"""
+    decompressor = zlib.decompressobj()
+    try:
+        for chunk in chunks:
+            data = chunk
+            while data:
+                piece = decompressor.decompress(data, piece_size)
+                if piece:
+                    yield piece
+                data = decompressor.unconsumed_tail
+            if decompressor.eof:
+                return
+    except zlib.error:
+        return
+
+
 class DocumentValidator:
     """Service for validating KYC documents"""
     
     ALLOWED_EXTENSIONS = Config.ALLOWED_EXTENSIONS
     MAX_FILE_SIZE = Config.MAX_CONTENT_LENGTH
     
+    # File types by extension and by declared content type, and the canonical MIME type of each
+    EXTENSION_TYPES = {'pdf': 'pdf', 'png': 'png', 'jpg': 'jpeg', 'jpeg': 'jpeg', 'doc': 'doc', 'docx': 'docx'}
+    CONTENT_TYPES = {
+        'application/pdf': 'pdf',
+        'image/png': 'png',
+        'image/jpeg': 'jpeg',
+        'image/jpg': 'jpeg',
+        'image/pjpeg': 'jpeg',
+        'application/msword': 'doc',
+        'application/vnd.openxmlformats-officedocument.wordprocessingml.document': 'docx',
+    }
+    MIME_TYPES = {
+        'pdf': 'application/pdf',
+        'png': 'image/png',
+        'jpeg': 'image/jpeg',
+        'doc': 'application/msword',
+        'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    }
+    OOXML_PARTS = (b'[Content_Types].xml', b'_rels/.rels', b'word/', b'docProps/')
+    
     @staticmethod
     def allowed_file(filename):
         """Check if file extension is allowed"""
@@ -21,121 +61,205 @@ class DocumentValidator:
                filename.rsplit('.', 1)[1].lower() in DocumentValidator.ALLOWED_EXTENSIONS
     
     @staticmethod
-    def validate_file(file):
+    def sniff_type(head):
+        """
+        File type from the magic bytes at the start of a file
+        Returns: 'pdf', 'png', 'jpeg', 'doc', 'docx' or None
+        """
+        # Readers accept the PDF header anywhere in the first KB
+        if b'%PDF-' in head[:1024]:
+            return 'pdf'
+        if head.startswith(b'\x89PNG\r\n\x1a\n'):
+            return 'png'
+        if head.startswith(b'\xff\xd8\xff'):
+            return 'jpeg'
+        if head.startswith(b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'):
+            return 'doc'
+        # DOCX is a ZIP whose first entries are the OOXML package parts
+        if head.startswith(b'PK\x03\x04') and any(part in head for part in DocumentValidator.OOXML_PARTS):
+            return 'docx'
+        return None
+    
+    @staticmethod
+    def read_head(file, size=None):
+        """First bytes of an uploaded file, leaving the stream at the start"""
+        file.seek(0)
+        head = file.read(size or Config.UPLOAD_SNIFF_BYTES)
+        file.seek(0)
+        return head
+    
+    @staticmethod
+    def check_content(head, filename, content_type=None):
+        """
+        Check the magic bytes of a file against its name and declared content type
+        
+        The content type is only compared when it names one of the allowed
+        types; generic types such as application/octet-stream are ignored.
+        Names with an extension outside ALLOWED_EXTENSIONS are rejected
+        before the content is looked at; names without one are judged on
+        their content alone.
+        Returns: (is_valid, error_message)
+        """
+        extension = filename.rsplit('.', 1)[1].lower() if filename and '.' in filename else ''
+        if extension and extension not in DocumentValidator.ALLOWED_EXTENSIONS:
+            return False, "File type not allowed"
+        
+        file_type = DocumentValidator.sniff_type(head)
+        if file_type is None:
+            return False, "File content is not a PDF, PNG, JPEG or Word document"
+        
+        expected = DocumentValidator.EXTENSION_TYPES.get(extension)
+        if expected and expected != file_type:
+            return False, "File extension doesn't match file content"
+        
+        declared = (content_type or '').split(';')[0].strip().lower()
+        expected = DocumentValidator.CONTENT_TYPES.get(declared)
+        if expected and expected != file_type:
+            return False, "Content type doesn't match file content"
+        
+        return True, None
+    
+    @staticmethod
+    def detected_mime_type(file):
+        """MIME type of an uploaded file from its magic bytes (None if unrecognised)"""
+        file_type = DocumentValidator.sniff_type(DocumentValidator.read_head(file))
+        return DocumentValidator.MIME_TYPES.get(file_type)
+    
+    @staticmethod
+    def validate_file(file, max_size=None):
         """
         Validate uploaded file
+        
+        Only the first UPLOAD_SNIFF_BYTES are read: the file type is decided
+        by its magic bytes, which must agree with the extension and the
+        declared content type. Files with a disallowed extension are
+        rejected; files without an extension are accepted on their content
+        alone.
+        Args:
+            max_size: Size limit in bytes (default: MAX_FILE_SIZE)
         Returns: (is_valid, error_message)
         """
         if not file or not file.filename:
             return False, "No file provided"
         
-        # Check file extension or content-type
-        content_type = file.content_type or ''
-        has_valid_extension = DocumentValidator.allowed_file(file.filename)
-        
-        # If extension is not valid, try to validate based on content-type
-        if not has_valid_extension:
-            # Allow files based on content-type if extension is missing or invalid
-            content_type_lower = content_type.lower()
-            if 'pdf' in content_type_lower or 'application/pdf' in content_type_lower:
-                # PDF file - allow it
-                pass  # Will be validated later by content-type check
-            elif 'image/png' in content_type_lower or 'image/jpeg' in content_type_lower or 'image/jpg' in content_type_lower:
-                # Image file - allow it
-                pass  # Will be validated later by content-type check
-            elif '.' not in file.filename:
-                # No extension in filename - try content-type
-                if not content_type:
-                    return False, f"File type not allowed. Allowed types: {', '.join(sorted(DocumentValidator.ALLOWED_EXTENSIONS))}"
-                # If we have content-type, let it pass to be validated later
-            else:
-                # Has extension but not in allowed list
-                return False, f"File type not allowed. Allowed types: {', '.join(sorted(DocumentValidator.ALLOWED_EXTENSIONS))}"
-        
         # Check file size
         file.seek(0, os.SEEK_END)
         file_size = file.tell()
         file.seek(0)  # Reset file pointer
         
-        if file_size > DocumentValidator.MAX_FILE_SIZE:
-            max_size_mb = DocumentValidator.MAX_FILE_SIZE / (1024 * 1024)
+        max_size = max_size or DocumentValidator.MAX_FILE_SIZE
+        if file_size > max_size:
+            max_size_mb = max_size / (1024 * 1024)
             return False, f"File too large. Maximum size: {max_size_mb}MB"
         
         if file_size == 0:
             return False, "File is empty"
         
-        return True, None
+        return DocumentValidator.check_content(
+            DocumentValidator.read_head(file), file.filename, file.content_type
+        )
     
     @staticmethod
-    def validate_document_type(file, document_type):
+    def validate_document_type(file, document_type, max_size=None):
         """
         Validate document based on its type
         
         All document types (including company_registration) accept all allowed file types:
         PDF, PNG, JPG, JPEG. There are no document-type-specific file type restrictions.
         
+        Args:
+            max_size: Size limit in bytes (default: MAX_FILE_SIZE; resumable uploads allow more)
+        Returns: (is_valid, error_message)
+        """
+        return DocumentValidator.validate_file(file, max_size=max_size)
+    
+    @staticmethod
+    def check_pdf_structure(file_path, timeout=None, max_decompressed=None, max_objects=None):
+        """
+        Bounded-time check of a PDF for decompression bombs
+        
+        Inflates every Flate-encoded stream (including nested Flate filters)
+        in small pieces without keeping the output, and stops as soon as the
+        total exceeds max_decompressed, the cross-reference table has more
+        than max_objects entries or the time budget runs out. Files PyMuPDF
+        can't parse pass; background processing reports them.
         Returns: (is_valid, error_message)
         """
-        is_valid, error = DocumentValidator.validate_file(file)
-        if not is_valid:
-            return False, error
-        
-        # Additional validation based on document type
-        filename = secure_filename(file.filename)
-        extension = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
-        
-        # Validate file extension matches content type (if content type is provided)
-        # Note: Some browsers/clients may not send content-type or may send generic types,
-        # so we're lenient and only validate when content-type is clearly mismatched
-        content_type = file.content_type or ''
-        if content_type:  # Only validate if content-type is provided
-            content_type_lower = content_type.lower()
-            # For PDF files, accept application/pdf or any content-type containing 'pdf'
-            if extension == 'pdf' and 'pdf' not in content_type_lower and 'application' not in content_type_lower:
-                # Only fail if content-type is clearly wrong (e.g., image/* for PDF)
-                if content_type_lower.startswith('image/') or content_type_lower.startswith('text/'):
-                    return False, "File extension doesn't match content type"
-            # For image files, accept image/* types
-            if extension in ['png', 'jpg', 'jpeg'] and 'image' not in content_type_lower:
-                # Only fail if content-type is clearly wrong (e.g., application/pdf for image)
-                if 'pdf' in content_type_lower or 'application' in content_type_lower:
-                    return False, "File extension doesn't match content type"
+        timeout = timeout if timeout is not None else Config.PDF_CHECK_TIMEOUT_SECONDS
+        max_decompressed = max_decompressed or Config.PDF_MAX_DECOMPRESSED_SIZE
+        max_objects = max_objects or Config.PDF_MAX_OBJECTS
+        deadline = time.monotonic() + timeout
+        
+        try:
+            doc = fitz.open(file_path, filetype='pdf')
+        except Exception:
+            return True, None
+        
+        with doc:
+            if doc.xref_length() > max_objects:
+                return False, "PDF has too many objects"
+            
+            total = 0
+            for xref in range(1, doc.xref_length()):
+                if time.monotonic() > deadline:
+                    return False, "PDF is too complex to validate"
+                if not doc.xref_is_stream(xref):
+                    continue
+                filters = re.findall(r'/(\w+)', doc.xref_get_key(xref, 'Filter')[1])
+                layers = 0
+                while layers < len(filters) and filters[layers] in ('FlateDecode', 'Fl'):
+                    layers += 1
+                if not layers:
+                    total += len(doc.xref_stream_raw(xref) or b'')
+                    continue
+                
+                chunks = [doc.xref_stream_raw(xref) or b'']
+                for _ in range(layers):
+                    chunks = _inflate(chunks)
+                for chunk in chunks:
+                    total += len(chunk)
+                    if total > max_decompressed:
+                        return False, "PDF expands to too much data when decompressed"
+                    if time.monotonic() > deadline:
+                        return False, "PDF is too complex to validate"
         
         return True, None
     
     @staticmethod
     def extract_text_from_pdf(file_path):
         """
-        Extract text from PDF file
+        Extract text from PDF file, page by page
         Returns: extracted text or None if error
         """
         try:
-            doc = fitz.open(file_path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            doc.close()
-            return text
+            with fitz.open(file_path) as doc:
+                return '\n'.join(page.get_text() for page in doc)
         except Exception as e:
             print(f"Error extracting text from PDF: {e}")
             return None
     
     @staticmethod
-    def check_document_expiry(document_type, file_path):
+    def check_document_expiry(document_type, file_path=None, document_date=None):
         """
         Check if document has expired (for documents with expiry dates)
         Currently only checks company registration certificate age
-        Returns: (is_valid, days_old, error_message)
+        
+        Args:
+            document_date: Date found in the document by background processing
+                           (KYCDocument.document_date). Without it, the file
+                           modification time is used as a proxy if file_path is given.
+        Returns: (is_valid, days_old, error_message); days_old is None when
+                 the document date is unknown
         """
         if document_type != 'company_registration':
             return True, 0, None
         
         try:
-            # Get file modification time as proxy for document date
-            # In production, this should extract date from PDF metadata or OCR
-            file_mtime = os.path.getmtime(file_path)
-            file_date = datetime.fromtimestamp(file_mtime)
-            days_old = (datetime.now() - file_date).days
+            if document_date is None:
+                if not file_path:
+                    return True, None, None
+                document_date = datetime.fromtimestamp(os.path.getmtime(file_path)).date()
+            days_old = (datetime.now().date() - document_date).days
             
             max_age_days = Config.KYC_DOCUMENT_MAX_AGE_DAYS
             
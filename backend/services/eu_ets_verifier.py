@@ -1,24 +1,329 @@
 """
 EU ETS Registry verification service
-Mock implementation - to be replaced with real API integration
+Looks up registry accounts through pluggable registry adapters, with results
+cached in the database per (country, account number)
 """
-from datetime import datetime
-from typing import Dict, Optional
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Tuple
+import logging
+import threading
+
+from sqlalchemy.orm import Session
+
+from database import db
+from models.registry_verification import RegistryVerification
+from services.registry_adapters import RegistryAdapter, StubRegistryAdapter
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ('active', 'inactive', 'suspended', 'unknown')
+
+# Error of results the registry couldn't provide (never cached)
+REGISTRY_UNAVAILABLE = 'Registry unavailable, try again later'
+
+
+def parse_ttls(value: str) -> Dict[str, timedelta]:
+    """Cache lifetimes from "status:hours" pairs separated by commas"""
+    ttls = {}
+    for pair in value.split(','):
+        if pair.strip():
+            status, hours = pair.split(':')
+            ttls[status.strip().lower()] = timedelta(hours=float(hours))
+    return ttls
+
+
+class RegistryVerifier:
+    """
+    Cached, batched registry account verification.
+
+    Results are cached in ``registry_verifications`` for a lifetime
+    depending on their status (a suspended account is rechecked sooner than
+    an active one); lookups the registry couldn't answer are not cached.
+    Uncached accounts are grouped by country and each group is sent to the
+    country's adapter in batches, all groups in parallel on a thread pool.
+    A lookup already in flight for the same account, from any request, is
+    awaited instead of being sent again.
+
+    Adapters run on the pool threads and never touch the database; cache
+    reads and writes happen in the calling request.
+    """
+
+    def __init__(
+        self,
+        default_adapter: RegistryAdapter,
+        ttls: Dict[str, timedelta],
+        workers: int = 4,
+        lookup_timeout: float = 30
+    ):
+        """
+        Initialize registry verifier
+
+        Args:
+            default_adapter: Adapter for countries without their own
+            ttls: Cache lifetime per status (statuses without one aren't cached)
+            workers: Registry lookups run in parallel
+            lookup_timeout: Seconds to wait for a registry before giving up
+        """
+        self.default_adapter = default_adapter
+        self.ttls = ttls
+        self.workers = workers
+        self.lookup_timeout = lookup_timeout
+
+        self._adapters: Dict[str, RegistryAdapter] = {}
+        self._inflight: Dict[Tuple[str, str], Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {'cache_hits': 0, 'lookups': 0, 'coalesced': 0, 'registry_errors': 0}
+
+    def register_adapter(self, adapter: RegistryAdapter, countries: Iterable[str]):
+        """Use an adapter for the registries of some countries"""
+        for country in countries:
+            self._adapters[country.upper()] = adapter
+
+    def adapter_for(self, country: str) -> RegistryAdapter:
+        """Adapter querying a country's registry"""
+        return self._adapters.get(country, self.default_adapter)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='registry-lookup')
+            return self._executor
+
+    def _count(self, name: str, amount: int = 1):
+        if amount:
+            with self._stats_lock:
+                self._stats[name] += amount
+
+    @staticmethod
+    def _error_result(account_number, country, error: str) -> Dict:
+        return {
+            'verified': False,
+            'account_number': account_number,
+            'country': country.upper() if country else None,
+            'status': 'unknown',
+            'verified_at': datetime.utcnow().isoformat(),
+            'verification_method': None,
+            'registry': None,
+            'error': error,
+            'cached': False
+        }
+
+    def _cached(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict]:
+        """Unexpired cached results of some (country, account number) keys"""
+        if not keys:
+            return {}
+        rows = RegistryVerification.query.filter(
+            RegistryVerification.country.in_({country for country, _ in keys}),
+            RegistryVerification.account_number.in_({account for _, account in keys}),
+            RegistryVerification.expires_at > datetime.utcnow()
+        ).all()
+        wanted = set(keys)
+        return {
+            (row.country, row.account_number): dict(row.to_result(), cached=True)
+            for row in rows if (row.country, row.account_number) in wanted
+        }
+
+    def _lookup(self, adapter: RegistryAdapter, country: str, account_numbers: List[str]) -> Dict[str, Dict]:
+        """Query a registry for a batch of accounts (runs on the pool)"""
+        answers = adapter.lookup(country, account_numbers)
+        now = datetime.utcnow().isoformat()
+        results = {}
+        for account_number in account_numbers:
+            answer = answers.get(account_number) or {
+                'verified': False, 'status': 'unknown', 'error': 'Account not found in registry'
+            }
+            status = answer.get('status') if answer.get('status') in STATUSES else 'unknown'
+            results[account_number] = {
+                'verified': bool(answer.get('verified')) and status == 'active',
+                'account_number': account_number,
+                'country': country,
+                'status': status,
+                'verified_at': now,
+                'verification_method': adapter.verification_method,
+                'registry': adapter.name,
+                'error': answer.get('error'),
+                'cached': False
+            }
+        return results
+
+    def _fetch(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict]:
+        """
+        Look up keys in their registries, grouped by country and in parallel.
+        Results the registry couldn't provide carry an error and aren't cached.
+        """
+        groups: Dict[str, List[str]] = {}
+        for country, account_number in keys:
+            groups.setdefault(country, []).append(account_number)
+
+        pool = self._pool()
+        batches = {}
+        for country, account_numbers in groups.items():
+            adapter = self.adapter_for(country)
+            for start in range(0, len(account_numbers), adapter.max_batch_size):
+                batch = account_numbers[start:start + adapter.max_batch_size]
+                batches[pool.submit(self._lookup, adapter, country, batch)] = (country, batch)
+        self._count('lookups', len(batches))
+
+        done, _ = wait(batches, timeout=self.lookup_timeout)
+        results = {}
+        for future, (country, batch) in batches.items():
+            try:
+                if future not in done:
+                    raise TimeoutError('registry lookup timed out')
+                for account_number, result in future.result().items():
+                    results[(country, account_number)] = result
+            except Exception as e:
+                logger.warning(f"Registry lookup failed for {country} ({len(batch)} accounts): {e}")
+                self._count('registry_errors')
+                for account_number in batch:
+                    results[(country, account_number)] = dict(
+                        self._error_result(account_number, country, REGISTRY_UNAVAILABLE),
+                        registry=self.adapter_for(country).name
+                    )
+        return results
+
+    def _store(self, results: Dict[Tuple[str, str], Dict]):
+        """
+        Cache results for the lifetime of their status, in a session of
+        their own so the caller's transaction is neither committed nor
+        rolled back
+        """
+        now = datetime.utcnow()
+        rows = []
+        for (country, account_number), result in results.items():
+            ttl = self.ttls.get(result['status'])
+            if not ttl or result['error'] == REGISTRY_UNAVAILABLE:
+                continue
+            rows.append(RegistryVerification(
+                country=country,
+                account_number=account_number,
+                verified=result['verified'],
+                status=result['status'],
+                registry=result['registry'],
+                verification_method=result['verification_method'],
+                error=result['error'],
+                verified_at=now,
+                expires_at=now + ttl
+            ))
+        if not rows:
+            return
+        try:
+            with Session(db.engine) as session:
+                for row in rows:
+                    session.merge(row)
+                session.commit()
+        except Exception as e:
+            logger.error(f"Failed to cache registry verifications: {e}", exc_info=True)
+
+    def verify_many(self, accounts: Iterable[Tuple[str, str]], refresh: bool = False) -> List[Dict]:
+        """
+        Verify several (account number, country) pairs.
+
+        Args:
+            accounts: (account number, country) pairs
+            refresh: Ignore cached results
+
+        Returns:
+            One result per pair, in order, each with ``cached`` telling
+            whether it came from the cache
+        """
+        accounts = list(accounts)
+        results: Dict[Tuple[str, str], Dict] = {}
+        keys = []
+        for account_number, country in accounts:
+            if not account_number or not country:
+                keys.append(None)
+                continue
+            keys.append((country.strip().upper()[:2], str(account_number).strip()))
+        wanted = list(dict.fromkeys(key for key in keys if key))
+
+        if not refresh:
+            results.update(self._cached(wanted))
+            self._count('cache_hits', len(results))
+
+        # Claim the keys nobody is looking up yet; wait for the others
+        owned, awaited = {}, {}
+        with self._inflight_lock:
+            for key in wanted:
+                if key in results:
+                    continue
+                if key in self._inflight:
+                    awaited[key] = self._inflight[key]
+                else:
+                    owned[key] = self._inflight[key] = Future()
+        self._count('coalesced', len(awaited))
+
+        if owned:
+            fetched = {}
+            try:
+                fetched = self._fetch(list(owned))
+                self._store(fetched)
+            finally:
+                with self._inflight_lock:
+                    for key, future in owned.items():
+                        del self._inflight[key]
+                        if key in fetched:
+                            future.set_result(fetched[key])
+                        else:
+                            future.set_exception(RuntimeError('registry lookup failed'))
+            results.update(fetched)
+
+        for key, future in awaited.items():
+            try:
+                results[key] = future.result(timeout=self.lookup_timeout)
+            except Exception:
+                results[key] = self._error_result(key[1], key[0], REGISTRY_UNAVAILABLE)
+
+        return [
+            dict(results[key]) if key else self._error_result(account_number, country,
+                                                              'Account number and country are required')
+            for key, (account_number, country) in zip(keys, accounts)
+        ]
+
+    def verify(self, account_number: str, country: str, refresh: bool = False) -> Dict:
+        """Verify one registry account"""
+        return self.verify_many([(account_number, country)], refresh=refresh)[0]
+
+    def invalidate(self, account_number: str, country: str) -> bool:
+        """Drop the cached result of an account"""
+        deleted = RegistryVerification.query.filter_by(
+            country=country.strip().upper()[:2], account_number=account_number.strip()
+        ).delete()
+        db.session.commit()
+        return bool(deleted)
+
+    def get_stats(self) -> Dict:
+        """Return cache and lookup counters for monitoring"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['inflight'] = len(self._inflight)
+        stats['workers'] = self.workers
+        return stats
+
+
+registry_verifier = RegistryVerifier(
+    default_adapter=StubRegistryAdapter(),
+    ttls=parse_ttls(Config.EU_ETS_CACHE_TTLS),
+    workers=Config.EU_ETS_VERIFICATION_WORKERS,
+    lookup_timeout=Config.EU_ETS_LOOKUP_TIMEOUT_SECONDS
+)
 
 
 class EUETSVerifier:
     """
     Service for verifying EU ETS Registry accounts
-    Currently a mock implementation
+
+    Lookups go through registry_verifier: the stub registry answers unless
+    an adapter for the country's national registry is registered.
     """
-    
-    # Mock registry accounts (in production, this would query real registries)
-    MOCK_REGISTRY_ACCOUNTS = {
-        # Format: 'account_number': {'country': 'RO', 'status': 'active', 'verified': True}
-    }
-    
+
     @staticmethod
-    def verify_registry_account(account_number: str, country: str) -> Dict:
+    def verify_registry_account(account_number: str, country: str, refresh: bool = False) -> Dict:
         """
         Verify EU ETS Registry account
         Returns: {
@@ -28,58 +333,21 @@ class EUETSVerifier:
             'status': 'active' | 'inactive' | 'suspended' | 'unknown',
             'verified_at': datetime,
             'verification_method': 'api' | 'manual' | 'mock',
-            'error': Optional[str]
+            'registry': str,
+            'error': Optional[str],
+            'cached': bool
         }
         """
-        result = {
-            'verified': False,
-            'account_number': account_number,
-            'country': country.upper() if country else None,
-            'status': 'unknown',
-            'verified_at': datetime.utcnow().isoformat(),
-            'verification_method': 'mock',
-            'error': None
-        }
-        
-        # Mock implementation - in production, this would:
-        # 1. Try to connect to the national registry API (if available)
-        # 2. Query the account status
-        # 3. Verify account ownership
-        # 4. Fall back to manual verification if API unavailable
-        
-        if not account_number or not country:
-            result['error'] = 'Account number and country are required'
-            return result
-        
-        # Normalize country code
-        country_code = country.upper()[:2]
-        
-        # Mock verification logic
-        # In production, this would call the appropriate national registry API
-        # Examples:
-        # - UK: UK ETS Registry API
-        # - Germany: DEHSt Registry API
-        # - Romania: Romanian Registry API
-        # etc.
-        
-        # For now, accept any account number that looks valid (alphanumeric, 8-20 chars)
-        if len(account_number) >= 8 and len(account_number) <= 20 and account_number.isalnum():
-            result['verified'] = True
-            result['status'] = 'active'
-            result['verification_method'] = 'mock'
-        else:
-            result['error'] = 'Invalid account number format'
-            result['status'] = 'unknown'
-        
-        # Check mock registry (if account exists in mock data)
-        if account_number in EUETSVerifier.MOCK_REGISTRY_ACCOUNTS:
-            mock_account = EUETSVerifier.MOCK_REGISTRY_ACCOUNTS[account_number]
-            if mock_account.get('country') == country_code:
-                result['verified'] = mock_account.get('verified', False)
-                result['status'] = mock_account.get('status', 'unknown')
-        
-        return result
-    
+        return registry_verifier.verify(account_number, country, refresh=refresh)
+
+    @staticmethod
+    def verify_registry_accounts(accounts: List[Tuple[str, str]], refresh: bool = False) -> List[Dict]:
+        """
+        Verify several (account number, country) pairs, grouped by registry
+        Returns: one result per pair, in order (see verify_registry_account)
+        """
+        return registry_verifier.verify_many(accounts, refresh=refresh)
+
     @staticmethod
     def get_registry_info(country: str) -> Dict:
         """
@@ -100,7 +368,7 @@ class EUETSVerifier:
             'api_endpoint': None,
             'manual_verification_required': True
         }
-        
+
         # In production, this would map to actual registry information
         # Example mappings:
         registry_mappings = {
@@ -116,9 +384,8 @@ class EUETSVerifier:
             },
             # ... etc
         }
-        
+
         if country and country.upper() in registry_mappings:
             registry_info.update(registry_mappings[country.upper()])
-        
-        return registry_info
 
+        return registry_info
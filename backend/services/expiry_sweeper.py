@@ -0,0 +1,170 @@
+"""
+Expiry Sweeper Service
+
+Periodically expires listings, demand listings, negotiations and swap quotes
+whose expiry timestamp has passed.
+"""
+
+from datetime import datetime
+from typing import Dict, Optional
+import logging
+import threading
+
+from sqlalchemy import update
+
+from database import db
+from models import (
+    Listing, ListingStatus, DemandListing, DemandStatus,
+    Negotiation, NegotiationStatus, SwapQuote, SwapQuoteStatus
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ExpirySweeper:
+    """
+    Expire stale rows with set-based bulk UPDATEs.
+
+    Each target is swept in bounded batches: the ids of up to ``batch_size``
+    expired rows are selected with a range scan on the (status, expiry)
+    index, then flipped to EXPIRED with a single UPDATE and committed. This
+    keeps lock times short and lets the sweep run alongside request traffic.
+    """
+
+    # name -> (model, expiry column, statuses that can expire, expired status)
+    TARGETS = {
+        'listings': (
+            Listing, Listing.expires_at,
+            (ListingStatus.ACTIVE, ListingStatus.PENDING), ListingStatus.EXPIRED
+        ),
+        'demand_listings': (
+            DemandListing, DemandListing.expires_at,
+            (DemandStatus.ACTIVE,), DemandStatus.EXPIRED
+        ),
+        'negotiations': (
+            Negotiation, Negotiation.expires_at,
+            (NegotiationStatus.OPEN,), NegotiationStatus.EXPIRED
+        ),
+        'swap_quotes': (
+            SwapQuote, SwapQuote.valid_until,
+            (SwapQuoteStatus.PENDING,), SwapQuoteStatus.EXPIRED
+        ),
+    }
+
+    def __init__(self, batch_size: int = 500, max_batches: int = 20):
+        """
+        Initialize expiry sweeper
+
+        Args:
+            batch_size: Maximum rows updated per UPDATE statement
+            max_batches: Maximum batches per target in a single run, so one
+                         run never monopolises the database
+        """
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self._lock = threading.Lock()
+        self._stats = {
+            'runs': 0,
+            'last_run_at': None,
+            'last_run_duration_ms': None,
+            'last_run_counts': {},
+            'total_expired': {name: 0 for name in self.TARGETS},
+        }
+
+    def sweep_target(self, name: str, now: Optional[datetime] = None) -> int:
+        """
+        Expire all overdue rows for a single target.
+
+        Args:
+            name: Target name (key of TARGETS)
+            now: Reference time (defaults to datetime.utcnow())
+
+        Returns:
+            Number of rows expired
+        """
+        model, expiry_column, active_statuses, expired_status = self.TARGETS[name]
+        if now is None:
+            now = datetime.utcnow()
+
+        expired = 0
+        for _ in range(self.max_batches):
+            ids = [
+                row[0] for row in db.session.query(model.id)
+                .filter(model.status.in_(active_statuses))
+                .filter(expiry_column < now)
+                .order_by(expiry_column)
+                .limit(self.batch_size)
+                .all()
+            ]
+            if not ids:
+                break
+
+            # Re-check status in the UPDATE so rows changed concurrently
+            # (e.g. a quote accepted in the meantime) are left untouched
+            result = db.session.execute(
+                update(model)
+                .where(model.id.in_(ids))
+                .where(model.status.in_(active_statuses))
+                .values(status=expired_status, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            expired += result.rowcount or 0
+
+            if len(ids) < self.batch_size:
+                break
+
+        return expired
+
+    def sweep(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Run one sweep over all targets.
+
+        Args:
+            now: Reference time (defaults to datetime.utcnow())
+
+        Returns:
+            Dict mapping target name to number of rows expired
+        """
+        if not self._lock.acquire(blocking=False):
+            logger.info("Expiry sweep already running, skipping")
+            return {}
+
+        try:
+            started = datetime.utcnow()
+            if now is None:
+                now = started
+
+            counts = {}
+            for name in self.TARGETS:
+                try:
+                    counts[name] = self.sweep_target(name, now)
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"Expiry sweep failed for {name}: {e}", exc_info=True)
+                    counts[name] = 0
+
+            duration_ms = (datetime.utcnow() - started).total_seconds() * 1000
+            self._stats['runs'] += 1
+            self._stats['last_run_at'] = started.isoformat()
+            self._stats['last_run_duration_ms'] = round(duration_ms, 1)
+            self._stats['last_run_counts'] = counts
+            for name, count in counts.items():
+                self._stats['total_expired'][name] += count
+
+            if any(counts.values()):
+                logger.info(f"Expiry sweep: {counts} in {duration_ms:.0f}ms")
+            return counts
+        finally:
+            self._lock.release()
+
+    def get_stats(self) -> Dict:
+        """Return sweep counters for monitoring"""
+        return {
+            'runs': self._stats['runs'],
+            'last_run_at': self._stats['last_run_at'],
+            'last_run_duration_ms': self._stats['last_run_duration_ms'],
+            'last_run_counts': dict(self._stats['last_run_counts']),
+            'total_expired': dict(self._stats['total_expired']),
+            'batch_size': self.batch_size,
+        }
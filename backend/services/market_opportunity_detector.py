@@ -5,9 +5,11 @@ Detects arbitrage opportunities and market conditions for trading.
 """
 
 from typing import List, Dict, Optional
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import logging
 
+import numpy as np
+
 from utils.compliance_detector import ComplianceDetector
 from services.swap_calculator import SwapCalculator
 
@@ -33,7 +35,8 @@ class MarketOpportunityDetector:
         self,
         eua_price: float,
         cea_price: float,
-        min_price_gap: float = 10.0
+        min_price_gap: float = 10.0,
+        check_date: Optional[date] = None
     ) -> List[Dict]:
         """
         Detect arbitrage opportunities based on price gap.
@@ -42,6 +45,7 @@ class MarketOpportunityDetector:
             eua_price: Current EUA price in EUR
             cea_price: Current CEA price in EUR
             min_price_gap: Minimum price gap ratio to consider (default 10.0)
+            check_date: Date for the compliance state (defaults to today)
             
         Returns:
             List of opportunity dicts with:
@@ -62,7 +66,7 @@ class MarketOpportunityDetector:
             # Calculate swap ratio
             market_conditions = {
                 'liquidity_premium': 0.1,
-                'compliance_adjustment': 0.2 if self.compliance_detector.is_compliance_period() else 0.0,
+                'compliance_adjustment': 0.2 if self.compliance_detector.is_compliance_period(check_date) else 0.0,
                 'volume_discount': 0.0
             }
             swap_ratio = self.swap_calculator.calculate_swap_ratio(
@@ -85,10 +89,13 @@ class MarketOpportunityDetector:
         
         return opportunities
     
-    def detect_liquidity_crisis(self) -> List[Dict]:
+    def detect_liquidity_crisis(self, check_date: Optional[date] = None) -> List[Dict]:
         """
         Detect liquidity crisis periods (compliance deadline approaching).
         
+        Args:
+            check_date: Date to check (defaults to today)
+        
         Returns:
             List of opportunity dicts with:
                 - type: 'liquidity_crisis'
@@ -99,12 +106,13 @@ class MarketOpportunityDetector:
         """
         opportunities = []
         
-        market_condition = self.compliance_detector.get_market_condition()
-        days_until = self.compliance_detector.days_until_deadline()
+        market_condition = self.compliance_detector.get_market_condition(check_date)
+        days_until = self.compliance_detector.days_until_deadline(check_date)
         
         if market_condition == 'panic' and days_until <= 30:
             # Panic selling period - buyers can get premium
-            expires_at = datetime.now() + timedelta(days=days_until)
+            reference = datetime.combine(check_date, datetime.min.time()) if check_date else datetime.now()
+            expires_at = reference + timedelta(days=days_until)
             
             opportunities.append({
                 'type': 'liquidity_crisis',
@@ -121,7 +129,8 @@ class MarketOpportunityDetector:
     def detect_swap_optimization(
         self,
         eua_price: float,
-        cea_price: float
+        cea_price: float,
+        check_date: Optional[date] = None
     ) -> List[Dict]:
         """
         Detect swap optimization opportunities.
@@ -129,6 +138,7 @@ class MarketOpportunityDetector:
         Args:
             eua_price: Current EUA price
             cea_price: Current CEA price
+            check_date: Date for the compliance state (defaults to today)
             
         Returns:
             List of opportunity dicts with swap recommendations
@@ -139,7 +149,7 @@ class MarketOpportunityDetector:
             return opportunities
         
         # Check if we're in compliance period (better swap ratios)
-        is_compliance = self.compliance_detector.is_compliance_period()
+        is_compliance = self.compliance_detector.is_compliance_period(check_date)
         
         if is_compliance:
             market_conditions = {
@@ -166,7 +176,8 @@ class MarketOpportunityDetector:
     def detect_all_opportunities(
         self,
         eua_price: Optional[float] = None,
-        cea_price: Optional[float] = None
+        cea_price: Optional[float] = None,
+        check_date: Optional[date] = None
     ) -> List[Dict]:
         """
         Detect all market opportunities.
@@ -174,6 +185,7 @@ class MarketOpportunityDetector:
         Args:
             eua_price: Current EUA price (optional, will fetch if not provided)
             cea_price: Current CEA price (optional, will fetch if not provided)
+            check_date: Date for the compliance state (defaults to today)
             
         Returns:
             Combined list of all detected opportunities
@@ -181,12 +193,76 @@ class MarketOpportunityDetector:
         opportunities = []
         
         # Detect liquidity crisis (doesn't need prices)
-        opportunities.extend(self.detect_liquidity_crisis())
+        opportunities.extend(self.detect_liquidity_crisis(check_date))
         
         # Detect arbitrage and swap optimization (needs prices)
         if eua_price is not None and cea_price is not None:
-            opportunities.extend(self.detect_arbitrage_opportunities(eua_price, cea_price))
-            opportunities.extend(self.detect_swap_optimization(eua_price, cea_price))
+            opportunities.extend(self.detect_arbitrage_opportunities(eua_price, cea_price, check_date=check_date))
+            opportunities.extend(self.detect_swap_optimization(eua_price, cea_price, check_date))
         
         return opportunities
-
+    
+    def arbitrage_signals(self, eua_prices, cea_prices, dates, min_price_gap: float = 10.0) -> Dict[str, np.ndarray]:
+        """
+        Vectorized detect_arbitrage_opportunities over a price history.
+        
+        Args:
+            eua_prices: EUA prices in EUR
+            cea_prices: CEA prices in EUR
+            dates: Date of each price pair (for the compliance state)
+            min_price_gap: Minimum price gap ratio to consider
+            
+        Returns:
+            Dict of arrays: fired, price_gap, swap_ratio
+        """
+        eua_prices = np.asarray(eua_prices, dtype=float)
+        cea_prices = np.asarray(cea_prices, dtype=float)
+        valid = (eua_prices > 0) & (cea_prices > 0)
+        price_gap = np.divide(eua_prices, cea_prices, out=np.zeros_like(eua_prices), where=valid)
+        compliance = self.compliance_detector.compliance_periods(dates)
+        swap_ratio = self.swap_calculator.calculate_swap_ratios(
+            eua_prices,
+            cea_prices,
+            liquidity_premium=0.1,
+            compliance_adjustment=np.where(compliance, 0.2, 0.0)
+        )
+        return {
+            'fired': valid & (price_gap >= min_price_gap),
+            'price_gap': price_gap,
+            'swap_ratio': swap_ratio
+        }
+    
+    def swap_optimization_signals(self, eua_prices, cea_prices, dates) -> Dict[str, np.ndarray]:
+        """
+        Vectorized detect_swap_optimization over a price history.
+        
+        Returns:
+            Dict of arrays: fired, swap_ratio
+        """
+        eua_prices = np.asarray(eua_prices, dtype=float)
+        cea_prices = np.asarray(cea_prices, dtype=float)
+        valid = (eua_prices > 0) & (cea_prices > 0)
+        swap_ratio = self.swap_calculator.calculate_swap_ratios(
+            eua_prices,
+            cea_prices,
+            liquidity_premium=0.15,
+            compliance_adjustment=0.3
+        )
+        return {
+            'fired': valid & self.compliance_detector.compliance_periods(dates),
+            'swap_ratio': swap_ratio
+        }
+    
+    def liquidity_crisis_signals(self, dates) -> Dict[str, np.ndarray]:
+        """
+        Vectorized detect_liquidity_crisis over a range of dates.
+        
+        Returns:
+            Dict of arrays: fired, days_until_deadline
+        """
+        days_until = self.compliance_detector.days_until_deadlines(dates)
+        conditions = self.compliance_detector.market_conditions(dates)
+        return {
+            'fired': (conditions == 'panic') & (days_until <= 30),
+            'days_until_deadline': days_until
+        }
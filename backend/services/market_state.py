@@ -0,0 +1,224 @@
+"""
+Market State
+
+Rolling analytics over EUA/CEA price ticks: exact 24h/7d change, high/low,
+mean/std, volatility, time- and volume-weighted averages and EUA-CEA spread
+z-scores, updated incrementally per tick so the price and market endpoints
+read a precomputed snapshot.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+import logging
+import threading
+
+from config import Config
+from services.price_stream import price_hub
+from utils.rolling_window import RollingWindow
+
+logger = logging.getLogger(__name__)
+
+MARKET_TYPES = ('eua', 'cea')
+
+
+def parse_tick_time(value) -> datetime:
+    """Tick timestamp as naive UTC datetime (now if missing or invalid)"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            value = None
+    if not isinstance(value, datetime):
+        return datetime.utcnow()
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def window_label(window: timedelta) -> str:
+    """Short label of a window ('24h', '7d')"""
+    hours = window.total_seconds() / 3600
+    if hours >= 48 and hours % 24 == 0:
+        return f"{int(hours // 24)}d"
+    return f"{hours:g}h"
+
+
+class MarketState:
+    """
+    Latest market snapshot built from EUA/CEA ticks.
+
+    Every tick (price hub listener or ``on_tick`` called directly by the
+    price fetchers) is added to one RollingWindow per market and window
+    (change window, e.g. 24h, and the long window, e.g. 7d) and, once both
+    markets have a price, to the EUA-CEA spread windows. Each window update
+    is amortised O(1); afterwards a fresh snapshot dict is swapped in, so
+    ``snapshot`` is a plain read. Re-applying the latest tick (same
+    timestamp and price) is a no-op.
+    """
+
+    def __init__(
+        self,
+        change_window_hours: float = 24,
+        spread_window_hours: float = 24,
+        long_window_days: float = 7
+    ):
+        """
+        Initialize market state
+
+        Args:
+            change_window_hours: Window for the headline change / high / low
+            spread_window_hours: Window for the headline spread statistics
+            long_window_days: Longer window tracked alongside (e.g. 7d change)
+        """
+        self.change_window = timedelta(hours=change_window_hours)
+        self.spread_window = timedelta(hours=spread_window_hours)
+        self.long_window = timedelta(days=long_window_days)
+        self._lock = threading.Lock()
+        self._init_windows()
+
+    def _init_windows(self):
+        self._price_windows = {
+            event: {
+                window_label(window): RollingWindow(window)
+                for window in (self.change_window, self.long_window)
+            }
+            for event in MARKET_TYPES
+        }
+        self._spread_windows = {
+            window_label(window): RollingWindow(window)
+            for window in (self.spread_window, self.long_window)
+        }
+        self._latest = {}
+        self._sources = {}
+        self._ticks = 0
+        self._snapshot = self._build_snapshot(None)
+
+    @property
+    def retention(self) -> timedelta:
+        """Longest window kept (how much history warm-up needs)"""
+        return max(self.change_window, self.spread_window, self.long_window)
+
+    def on_tick(self, event: str, data: Dict) -> Optional[Dict]:
+        """
+        Apply one price tick.
+
+        Args:
+            event: 'eua' or 'cea'
+            data: Tick payload with price, timestamp and optional source/volume
+
+        Returns:
+            The market's snapshot entry after the tick, None for unknown events
+        """
+        if event not in MARKET_TYPES or not data or data.get('price') is None:
+            return None
+        timestamp = parse_tick_time(data.get('timestamp'))
+        price = float(data['price'])
+        volume = data.get('volume')
+
+        with self._lock:
+            latest = self._latest.get(event)
+            if latest is not None:
+                if latest == (timestamp, price):
+                    return self._snapshot[event]
+                if timestamp < latest[0]:
+                    # Out-of-order tick (e.g. stale cache re-publish); keep the windows ordered
+                    timestamp = latest[0]
+            for window in self._price_windows[event].values():
+                window.add(timestamp, price, volume)
+            self._latest[event] = (timestamp, price)
+            self._sources[event] = data.get('source')
+            self._ticks += 1
+
+            if len(self._latest) == len(MARKET_TYPES):
+                spread_time = max(tick_time for tick_time, _ in self._latest.values())
+                spread = self._latest['eua'][1] - self._latest['cea'][1]
+                for window in self._spread_windows.values():
+                    window.add(spread_time, spread)
+
+            self._snapshot = self._build_snapshot(timestamp)
+            return self._snapshot[event]
+
+    def _price_state(self, event: str) -> Optional[Dict]:
+        if event not in self._latest:
+            return None
+        timestamp, price = self._latest[event]
+        windows = {label: window.stats() for label, window in self._price_windows[event].items()}
+        headline = windows[window_label(self.change_window)]
+        return {
+            'price': round(price, 2),
+            'timestamp': timestamp.isoformat(),
+            'source': self._sources.get(event),
+            'change_absolute24h': headline['change'],  # EUR; change24h elsewhere is a percentage
+            'change_percent24h': headline['change_percent'],
+            'high24h': headline['high'],
+            'low24h': headline['low'],
+            'samples24h': headline['samples'],
+            'windows': windows,
+        }
+
+    def _spread_state(self) -> Optional[Dict]:
+        headline_window = self._spread_windows[window_label(self.spread_window)]
+        if not len(headline_window):
+            return None
+        windows = {
+            label: {
+                key: value for key, value in window.stats(digits=4).items()
+                if key in ('mean', 'std', 'z_score', 'high', 'low', 'samples', 'window_hours')
+            }
+            for label, window in self._spread_windows.items()
+        }
+        headline = windows[window_label(self.spread_window)]
+        return {
+            'current': round(headline_window.latest[1], 2),
+            'mean': headline['mean'],
+            'std': headline['std'],
+            'z_score': headline['z_score'],
+            'samples': headline['samples'],
+            'window_hours': headline['window_hours'],
+            'windows': windows,
+        }
+
+    def _build_snapshot(self, updated_at: Optional[datetime]) -> Dict:
+        """Build the immutable snapshot dict (called with the lock held)"""
+        return {
+            'eua': self._price_state('eua'),
+            'cea': self._price_state('cea'),
+            'spread': self._spread_state(),
+            'ticks': self._ticks,
+            'updated_at': updated_at.isoformat() if updated_at else None,
+        }
+
+    def snapshot(self) -> Dict:
+        """Current market snapshot (do not modify)"""
+        return self._snapshot
+
+    def prices(self):
+        """Latest (eua_price, cea_price); None for a type without ticks"""
+        snapshot = self._snapshot
+        return (
+            snapshot['eua']['price'] if snapshot['eua'] else None,
+            snapshot['cea']['price'] if snapshot['cea'] else None,
+        )
+
+    def warm_from_history(self, rows):
+        """
+        Seed the EUA windows from stored prices (cold start).
+
+        Args:
+            rows: Iterable of PriceHistory rows, oldest first
+        """
+        for row in rows:
+            self.on_tick('eua', {'price': row.price, 'timestamp': row.timestamp, 'source': row.source})
+
+    def reset(self):
+        """Drop all state"""
+        with self._lock:
+            self._init_windows()
+
+
+market_state = MarketState(
+    change_window_hours=Config.MARKET_STATE_CHANGE_WINDOW_HOURS,
+    spread_window_hours=Config.MARKET_STATE_SPREAD_WINDOW_HOURS,
+    long_window_days=Config.MARKET_STATE_LONG_WINDOW_DAYS
+)
+price_hub.add_listener(market_state.on_tick)
@@ -0,0 +1,374 @@
+"""
+Monte Carlo Risk Engine
+
+Simulates EUA/CEA prices with a correlated geometric Brownian motion
+calibrated from the stored price history, and values the seller and
+buyer-swap scenarios on every path to report savings distributions and VaR.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Optional, Tuple
+import logging
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from services.buyer_swap_calculator import (
+    WFOE_SETUP_COST, NIHAO_FEE_RATE, CBAM_SAVINGS_PER_TON, market_conditions
+)
+from services.swap_calculator import SwapCalculator
+from services.value_calculator import ValueCalculatorService
+from utils.cache import TTLCache
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+DAYS_PER_YEAR = 365
+MIN_CALIBRATION_OBSERVATIONS = 30
+
+# Used when the stored history is too short to calibrate from
+DEFAULT_CALIBRATION = {
+    'eua_drift': 0.0,
+    'cea_drift': 0.0,
+    'eua_volatility': 0.35,
+    'cea_volatility': 0.25,
+    'correlation': 0.3,
+    'observations': 0,
+    'source': 'default',
+}
+
+# Direct swap time to market used as default horizon (days)
+DIRECT_SWAP_HORIZON_DAYS = 270  # 6-12 months without China operations
+DIRECT_SWAP_HORIZON_DAYS_CHINA_OPS = 21  # 2-4 weeks with China operations
+
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+
+SCENARIO_TYPES = ('seller', 'buyerSwap')
+
+
+def calibrate(eua_prices, cea_prices, period_days: float = 1.0) -> Dict:
+    """
+    Estimate annualised GBM drift, volatility and correlation.
+
+    Args:
+        eua_prices: EUA prices aligned with cea_prices (oldest first)
+        cea_prices: CEA prices
+        period_days: Calendar days between observations
+
+    Returns:
+        Calibration dict (eua/cea drift and volatility, correlation,
+        observations, source); DEFAULT_CALIBRATION if there are too few
+        observations
+    """
+    eua_prices = np.asarray(eua_prices, dtype=float)
+    cea_prices = np.asarray(cea_prices, dtype=float)
+    valid = (eua_prices > 0) & (cea_prices > 0)
+    eua_prices, cea_prices = eua_prices[valid], cea_prices[valid]
+    if eua_prices.size <= MIN_CALIBRATION_OBSERVATIONS:
+        return dict(DEFAULT_CALIBRATION)
+
+    returns = np.diff(np.log(np.vstack([eua_prices, cea_prices])), axis=1)
+    periods_per_year = DAYS_PER_YEAR / period_days
+    volatility = returns.std(axis=1, ddof=1) * np.sqrt(periods_per_year)
+    # GBM: E[log return] = (mu - sigma^2 / 2) dt
+    drift = returns.mean(axis=1) * periods_per_year + volatility ** 2 / 2
+    correlation = float(np.corrcoef(returns)[0, 1]) if volatility.all() else 0.0
+
+    return {
+        'eua_drift': round(float(drift[0]), 6),
+        'cea_drift': round(float(drift[1]), 6),
+        'eua_volatility': round(float(volatility[0]), 6),
+        'cea_volatility': round(float(volatility[1]), 6),
+        'correlation': round(float(np.clip(correlation, -0.999, 0.999)), 6),
+        'observations': int(returns.shape[1]),
+        'source': 'history',
+    }
+
+
+def load_history(lookback_days: int) -> Tuple[List[float], List[float]]:
+    """
+    Aligned daily EUA and CEA closes from the stored history files.
+
+    Returns:
+        Tuple of (eua_prices, cea_prices), oldest first, over the last
+        lookback_days of data
+    """
+    from historical_data_collector import HistoricalDataCollector
+
+    collector = HistoricalDataCollector(data_dir=os.getenv('HISTORICAL_DATA_DIR', 'backend/data'))
+    _, eua, cea = collector.load_aligned_prices(lookback_days)
+    return eua, cea
+
+
+def seller_savings(scenario: Dict, cea_terminal: np.ndarray) -> np.ndarray:
+    """
+    Seller savings per path: Nihao executes now at the discounted current
+    price, the Shanghai alternative executes at the horizon price less
+    market impact.
+    """
+    volume = scenario['volume']
+    nihao_discount = 0.02 if scenario['urgency'] == 'normal' else 0.03
+    nihao_total = scenario['current_price'] * (1 - nihao_discount) * volume
+    market_impact = ValueCalculatorService().calculate_market_impact(volume)
+    return nihao_total - cea_terminal * (1 - market_impact) * volume
+
+
+def buyer_swap_savings(scenario: Dict, eua_terminal: np.ndarray, cea_terminal: np.ndarray) -> np.ndarray:
+    """
+    Buyer swap savings per path: the Nihao swap locks today's ratio, the
+    direct swap gets the ratio at the horizon (after WFOE setup). The price
+    risk replaces the flat time-value estimate of the single-point calculator.
+    """
+    eua_volume = scenario['eua_volume']
+    conditions = market_conditions(eua_volume, scenario['in_compliance_period'])
+    swap_calculator = SwapCalculator()
+    ratio_now = swap_calculator.calculate_swap_ratio(scenario['eua_price'], scenario['cea_price'], conditions)
+    ratio_terminal = swap_calculator.calculate_swap_ratios(eua_terminal, cea_terminal, **conditions)
+
+    wfoe_setup = 0.0 if scenario['has_china_operations'] else WFOE_SETUP_COST
+    nihao_fee = eua_volume * scenario['eua_price'] * NIHAO_FEE_RATE
+    cbam_optimization = eua_volume * ratio_now * CBAM_SAVINGS_PER_TON if scenario['use_case'] == 'cbam' else 0.0
+    ratio_advantage = eua_volume * (ratio_now - ratio_terminal) * cea_terminal
+    return wfoe_setup - nihao_fee + cbam_optimization + ratio_advantage
+
+
+def simulate_chunk(
+    scenario_type: str,
+    scenario: Dict,
+    calibration: Dict,
+    horizon_years: float,
+    n_paths: int,
+    seed_sequence: np.random.SeedSequence
+) -> np.ndarray:
+    """
+    Simulate one chunk of paths and value the scenario on each.
+
+    The payoffs only depend on prices at the horizon, so GBM is sampled
+    exactly at the horizon instead of stepping through intermediate days.
+    Top-level so it can run in a worker process.
+    """
+    rng = np.random.default_rng(seed_sequence)
+    z = rng.standard_normal((2, n_paths))
+    rho = calibration['correlation']
+    z_cea = rho * z[0] + np.sqrt(1 - rho ** 2) * z[1]
+
+    def terminal(start, drift, volatility, shocks):
+        return start * np.exp((drift - volatility ** 2 / 2) * horizon_years + volatility * np.sqrt(horizon_years) * shocks)
+
+    if scenario_type == 'seller':
+        cea_terminal = terminal(scenario['current_price'], calibration['cea_drift'], calibration['cea_volatility'], z_cea)
+        return seller_savings(scenario, cea_terminal)
+
+    eua_terminal = terminal(scenario['eua_price'], calibration['eua_drift'], calibration['eua_volatility'], z[0])
+    cea_terminal = terminal(scenario['cea_price'], calibration['cea_drift'], calibration['cea_volatility'], z_cea)
+    return buyer_swap_savings(scenario, eua_terminal, cea_terminal)
+
+
+def summarize(savings: np.ndarray) -> Dict:
+    """
+    Distribution summary of simulated savings.
+
+    VaR is the shortfall of the savings quantile below the expected
+    savings; expected shortfall is the mean shortfall beyond the 95% VaR.
+    """
+    mean = float(savings.mean())
+    quantiles = np.percentile(savings, PERCENTILES)
+    q01, q05 = np.percentile(savings, [1, 5])
+    tail = savings[savings <= q05]
+    return {
+        'mean': round(mean, 2),
+        'std': round(float(savings.std()), 2),
+        'min': round(float(savings.min()), 2),
+        'max': round(float(savings.max()), 2),
+        'percentiles': {f'p{p}': round(float(q), 2) for p, q in zip(PERCENTILES, quantiles)},
+        'var_95': round(mean - float(q05), 2),
+        'var_99': round(mean - float(q01), 2),
+        'expected_shortfall_95': round(mean - float(tail.mean()), 2),
+        'probability_of_loss': round(float((savings < 0).mean()), 4),
+    }
+
+
+class MonteCarloEngine:
+    """
+    Monte Carlo valuation of calculator scenarios.
+
+    Paths are generated in fixed-size chunks, each with its own child of the
+    request's SeedSequence, so a given seed produces the same paths whether
+    chunks run in-process or in a worker pool. Chunks are processed until
+    the time budget runs out; a truncated run reports ``truncated`` and how
+    many paths it completed. How many chunks fit in the budget depends on
+    load, so only untruncated runs are reproducible from the seed; as the
+    completed chunks are always a prefix, re-running with the reported
+    ``paths`` and seed reproduces a truncated result.
+    """
+
+    def __init__(
+        self,
+        max_paths: int = 100000,
+        chunk_size: int = 10000,
+        workers: int = 0,
+        lookback_days: int = 730,
+        calibration_ttl: float = 3600,
+        history_loader=None
+    ):
+        """
+        Initialize engine
+
+        Args:
+            max_paths: Upper bound on paths per run
+            chunk_size: Paths per chunk (unit of work and of seeding)
+            workers: Worker processes (0 runs chunks in-process)
+            lookback_days: History window used for calibration
+            calibration_ttl: How long a calibration is reused (seconds)
+            history_loader: Callable(lookback_days) -> (eua_prices, cea_prices)
+        """
+        self.max_paths = max_paths
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.lookback_days = lookback_days
+        self.history_loader = history_loader or load_history
+        self._calibration_cache = TTLCache(maxsize=1, ttl=calibration_ttl)
+        self._pool = None
+
+    def get_calibration(self) -> Dict:
+        """Calibration from the stored history (cached)"""
+        calibration = self._calibration_cache.get('calibration')
+        if calibration is None:
+            try:
+                eua_prices, cea_prices = self.history_loader(self.lookback_days)
+                calibration = calibrate(eua_prices, cea_prices)
+            except Exception as e:
+                logger.warning(f"Monte Carlo calibration failed, using defaults: {e}")
+                calibration = dict(DEFAULT_CALIBRATION)
+            self._calibration_cache.set('calibration', calibration)
+        return calibration
+
+    @staticmethod
+    def default_horizon_days(scenario_type: str, scenario: Dict) -> float:
+        """Execution horizon of the alternative to Nihao"""
+        if scenario_type == 'seller':
+            min_weeks, max_weeks = ValueCalculatorService().calculate_execution_weeks(
+                scenario['volume'], scenario['urgency']
+            )
+            return (min_weeks + max_weeks) / 2 * 7
+        if scenario['has_china_operations']:
+            return DIRECT_SWAP_HORIZON_DAYS_CHINA_OPS
+        return DIRECT_SWAP_HORIZON_DAYS
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: safe to start from a threaded server process
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._pool
+
+    def run(
+        self,
+        scenario_type: str,
+        scenario: Dict,
+        paths: int = 10000,
+        seed: Optional[int] = None,
+        horizon_days: Optional[float] = None,
+        time_budget_ms: Optional[float] = None,
+        calibration: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Simulate a scenario and summarize its savings distribution.
+
+        Args:
+            scenario_type: 'seller' or 'buyerSwap'
+            scenario: Normalized scenario inputs (see seller_savings /
+                      buyer_swap_savings)
+            paths: Number of paths (capped at max_paths)
+            seed: Seed for reproducible runs (random if None; the seed used
+                  is returned). Truncated runs are only reproducible with
+                  the paths they report
+            horizon_days: Simulation horizon (default: alternative's execution time)
+            time_budget_ms: Stop starting new chunks after this long
+            calibration: Override the history calibration
+
+        Returns:
+            Dict with summary statistics, calibration, seed, horizon and
+            the number of paths actually simulated
+        """
+        started = time.monotonic()
+        paths = max(1, min(int(paths), self.max_paths))
+        if seed is None:
+            seed = int(np.random.SeedSequence().entropy % (2 ** 63))
+        calibration = calibration or self.get_calibration()
+        if horizon_days is None:
+            horizon_days = self.default_horizon_days(scenario_type, scenario)
+        horizon_years = horizon_days / DAYS_PER_YEAR
+        deadline = started + time_budget_ms / 1000 if time_budget_ms else None
+
+        chunk_sizes = [self.chunk_size] * (paths // self.chunk_size)
+        if paths % self.chunk_size:
+            chunk_sizes.append(paths % self.chunk_size)
+        seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+        jobs = [
+            (scenario_type, scenario, calibration, horizon_years, size, child)
+            for size, child in zip(chunk_sizes, seeds)
+        ]
+
+        if self.workers > 0 and len(jobs) > 1:
+            results = self._run_pool(jobs, deadline)
+        else:
+            results = []
+            for job in jobs:
+                if results and deadline and time.monotonic() >= deadline:
+                    break
+                results.append(simulate_chunk(*job))
+
+        savings = np.concatenate(results)
+        summary = summarize(savings)
+        summary.update({
+            'scenario_type': scenario_type,
+            'paths': int(savings.size),
+            'requested_paths': paths,
+            'truncated': bool(savings.size < paths),
+            'seed': seed,
+            'horizon_days': round(float(horizon_days), 2),
+            'calibration': calibration,
+            'duration_ms': round((time.monotonic() - started) * 1000, 1),
+        })
+        return summary
+
+    def close(self):
+        """Shut down the worker pool (if one was started)"""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def _run_pool(self, jobs: List[Tuple], deadline: Optional[float]) -> List[np.ndarray]:
+        """Run chunks in the worker pool, keeping chunk order; stop at the deadline"""
+        pool = self._get_pool()
+        futures = [pool.submit(simulate_chunk, *job) for job in jobs]
+        pending = set(futures)
+        while pending:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                if futures[0].done():
+                    break
+                remaining = None  # always complete at least the first chunk
+            _, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in pending:
+            future.cancel()
+        results = []
+        for future in futures:
+            # Use the completed prefix so results stay in seed order
+            if not future.done() or future.cancelled():
+                break
+            results.append(future.result())
+        return results
+
+
+monte_carlo_engine = MonteCarloEngine(
+    max_paths=Config.MONTE_CARLO_MAX_PATHS,
+    chunk_size=Config.MONTE_CARLO_CHUNK_SIZE,
+    workers=Config.MONTE_CARLO_WORKERS,
+    lookback_days=Config.MONTE_CARLO_LOOKBACK_DAYS,
+    calibration_ttl=Config.MONTE_CARLO_CALIBRATION_TTL_SECONDS
+)
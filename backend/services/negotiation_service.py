@@ -0,0 +1,249 @@
+"""
+Negotiation Service
+
+Posting negotiation messages and incremental (cursor-based) message sync,
+with an in-process notifier for long-poll and SSE waiters.
+"""
+
+from datetime import datetime
+from typing import List, Optional
+import logging
+import threading
+import time
+import uuid
+
+from sqlalchemy import update
+
+from database import db
+from models import Negotiation, NegotiationMessage, MessageSenderType
+
+logger = logging.getLogger(__name__)
+
+
+class NegotiationNotifier:
+    """
+    Wake waiters when a negotiation receives a new message.
+
+    Keeps the latest known sequence per negotiation behind a single
+    Condition. Waiters re-check the database after every wake-up (or after
+    ``recheck_seconds``), so messages written by another worker process are
+    still picked up, just with a bounded delay.
+
+    An announced sequence only matters to waiters, so entries of
+    negotiations nobody is waiting on are dropped ``retention_seconds``
+    after their last message; the map stays bounded by the active ones.
+    """
+
+    def __init__(self, retention_seconds: float = 60.0):
+        """
+        Initialize notifier
+
+        Args:
+            retention_seconds: How long an announced sequence is kept for a
+                               negotiation without waiters
+        """
+        self.retention_seconds = retention_seconds
+        self._condition = threading.Condition()
+        self._latest = {}  # negotiation_id -> (sequence, announced at)
+        self._waiters = {}  # negotiation_id -> number of waiting threads
+        self._last_prune = time.monotonic()
+
+    def notify(self, negotiation_id: str, sequence: int):
+        """Record a new message sequence and wake all waiters"""
+        with self._condition:
+            now = time.monotonic()
+            if sequence > self._sequence(negotiation_id):
+                self._latest[negotiation_id] = (sequence, now)
+            if now - self._last_prune >= self.retention_seconds:
+                self._prune(now)
+            self._condition.notify_all()
+
+    def wait(self, negotiation_id: str, after_sequence: int, timeout: float) -> bool:
+        """
+        Block until a message newer than after_sequence is announced.
+
+        Returns:
+            True if a newer message was announced, False on timeout
+        """
+        with self._condition:
+            self._waiters[negotiation_id] = self._waiters.get(negotiation_id, 0) + 1
+            try:
+                return self._condition.wait_for(
+                    lambda: self._sequence(negotiation_id) > after_sequence,
+                    timeout=timeout
+                )
+            finally:
+                self._waiters[negotiation_id] -= 1
+                if not self._waiters[negotiation_id]:
+                    del self._waiters[negotiation_id]
+
+    def __len__(self) -> int:
+        """Number of negotiations with a retained sequence"""
+        with self._condition:
+            return len(self._latest)
+
+    def _sequence(self, negotiation_id: str) -> int:
+        """Latest announced sequence of a negotiation (0 if none is retained)"""
+        entry = self._latest.get(negotiation_id)
+        return entry[0] if entry else 0
+
+    def _prune(self, now: float):
+        """Drop retained sequences that are old and have no waiters (lock held)"""
+        cutoff = now - self.retention_seconds
+        for negotiation_id in [
+            key for key, (_, announced_at) in self._latest.items()
+            if announced_at < cutoff and key not in self._waiters
+        ]:
+            del self._latest[negotiation_id]
+        self._last_prune = now
+
+
+negotiation_notifier = NegotiationNotifier()
+
+
+class NegotiationService:
+    """
+    Negotiation messaging.
+
+    Every message gets a per-negotiation ``sequence`` taken from the
+    denormalised ``Negotiation.message_count`` counter, which is incremented
+    with an atomic UPDATE in the same transaction as the message insert.
+    Clients sync with "messages after sequence N" instead of re-reading the
+    whole thread.
+    """
+
+    def __init__(self, notifier: NegotiationNotifier = None, recheck_seconds: float = 5.0):
+        """
+        Initialize negotiation service
+
+        Args:
+            notifier: Notifier used to wake waiters (defaults to the shared one)
+            recheck_seconds: Maximum time a waiter sleeps before re-checking
+                             the database (covers other worker processes)
+        """
+        self.notifier = notifier or negotiation_notifier
+        self.recheck_seconds = recheck_seconds
+
+    def post_message(
+        self,
+        negotiation: Negotiation,
+        sender_id: Optional[str],
+        sender_type: MessageSenderType,
+        sender_code: Optional[str],
+        message_text: str,
+        price_proposal: Optional[float] = None,
+        volume_proposal: Optional[int] = None
+    ) -> NegotiationMessage:
+        """
+        Append a message to a negotiation and commit.
+
+        A price/volume proposal also becomes the negotiation's current
+        proposal.
+
+        Returns:
+            The created NegotiationMessage
+        """
+        now = datetime.utcnow()
+        values = {
+            'message_count': Negotiation.message_count + 1,
+            'last_message_at': now,
+            'updated_at': now,
+        }
+        if price_proposal is not None:
+            values['proposed_price'] = price_proposal
+        if volume_proposal is not None:
+            values['proposed_volume'] = volume_proposal
+
+        try:
+            # The UPDATE takes the row (or database) write lock, so concurrent
+            # posters are serialised and each gets a distinct sequence
+            db.session.execute(
+                update(Negotiation)
+                .where(Negotiation.id == negotiation.id)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            sequence = db.session.query(Negotiation.message_count).filter(
+                Negotiation.id == negotiation.id
+            ).scalar()
+
+            message = NegotiationMessage(
+                id=str(uuid.uuid4()),
+                negotiation_id=negotiation.id,
+                sequence=sequence,
+                sender_id=sender_id,
+                sender_type=sender_type,
+                sender_code=sender_code,
+                message_text=message_text,
+                price_proposal=price_proposal,
+                volume_proposal=volume_proposal,
+                created_at=now
+            )
+            db.session.add(message)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        self.notifier.notify(negotiation.id, sequence)
+        return message
+
+    def get_messages_since(
+        self,
+        negotiation_id: str,
+        since_sequence: int = 0,
+        limit: int = 100
+    ) -> List[NegotiationMessage]:
+        """
+        Fetch messages with sequence > since_sequence, oldest first.
+
+        Served by the (negotiation_id, sequence) unique index.
+        """
+        return NegotiationMessage.query.filter(
+            NegotiationMessage.negotiation_id == negotiation_id,
+            NegotiationMessage.sequence > since_sequence
+        ).order_by(NegotiationMessage.sequence).limit(limit).all()
+
+    def resolve_cursor(self, negotiation_id: str, cursor: Optional[str]) -> Optional[int]:
+        """
+        Turn a client cursor into a sequence number.
+
+        Accepts a sequence number or a message ID ("messages since id X").
+
+        Returns:
+            Sequence number, 0 for no cursor, or None if the cursor is invalid
+        """
+        if cursor is None or cursor == '':
+            return 0
+        if str(cursor).isdigit():
+            return int(cursor)
+        sequence = db.session.query(NegotiationMessage.sequence).filter(
+            NegotiationMessage.negotiation_id == negotiation_id,
+            NegotiationMessage.id == cursor
+        ).scalar()
+        return sequence
+
+    def wait_for_messages(
+        self,
+        negotiation_id: str,
+        since_sequence: int,
+        timeout: float,
+        limit: int = 100
+    ) -> List[NegotiationMessage]:
+        """
+        Long-poll: return new messages as soon as any exist, or [] on timeout.
+
+        The database session is released while waiting so an idle waiter
+        does not hold a connection or a read transaction open.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            messages = self.get_messages_since(negotiation_id, since_sequence, limit)
+            if messages:
+                return messages
+            db.session.rollback()
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            self.notifier.wait(negotiation_id, since_sequence, min(remaining, self.recheck_seconds))
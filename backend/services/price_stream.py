@@ -0,0 +1,193 @@
+"""
+Price Stream Hub
+
+In-process fan-out of price ticks to SSE / WebSocket subscribers.
+"""
+
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+import itertools
+import logging
+import threading
+
+from config import Config
+from utils.sse import format_sse
+
+logger = logging.getLogger(__name__)
+
+
+def price_payload(price_data: Dict) -> Dict:
+    """
+    Public representation of a price tick (same shape as GET /api/eua/price).
+    """
+    timestamp = price_data.get('timestamp')
+    return {
+        'price': price_data['price'],
+        'timestamp': timestamp.isoformat() if isinstance(timestamp, datetime) else timestamp,
+        'currency': price_data.get('currency', 'EUR'),
+        'change24h': price_data.get('change24h'),
+        'source': price_data.get('source')
+    }
+
+
+class PriceEvent:
+    """A published tick; the SSE frame is rendered once and shared by all subscribers"""
+
+    __slots__ = ('id', 'event', 'data', 'frame')
+
+    def __init__(self, event_id: int, event: str, data: Dict):
+        self.id = event_id
+        self.event = event
+        self.data = data
+        self.frame = format_sse(data, event=event, event_id=event_id)
+
+
+class PriceStreamHub:
+    """
+    Broadcast price ticks to any number of subscribers.
+
+    Publishing appends to a bounded ring buffer of recent events and wakes
+    all waiters through a single Condition; there is no per-subscriber queue,
+    so an idle subscriber costs one blocked thread and nothing else.
+    Subscribers resume from their last seen event id; if that id has fallen
+    out of the buffer (or belongs to a previous process) they get the latest
+    tick of each type instead. Listeners registered with add_listener() are
+    called with each new tick, e.g. to keep derived market state current.
+    """
+
+    def __init__(self, buffer_size: int = 256):
+        """
+        Initialize hub
+
+        Args:
+            buffer_size: Number of recent events kept for resume
+        """
+        self._condition = threading.Condition()
+        self._events = deque(maxlen=buffer_size)
+        self._latest: Dict[str, PriceEvent] = {}
+        self._ids = itertools.count(1)
+        self._last_id = 0
+        self._subscribers = 0
+        self._published = 0
+        self._listeners = []
+
+    def add_listener(self, callback: Callable[[str, Dict], None]):
+        """
+        Register a callback(event, data) invoked for every new tick.
+
+        Callbacks run on the publishing thread after the tick is buffered;
+        exceptions are logged and do not affect other listeners.
+        """
+        with self._condition:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[str, Dict], None]):
+        """Unregister a callback added with add_listener()"""
+        with self._condition:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def publish(self, event: str, data: Dict) -> int:
+        """
+        Publish a tick to all subscribers.
+
+        Args:
+            event: Event type ('eua' or 'cea')
+            data: JSON-serialisable payload
+
+        Returns:
+            The event id (the previous one if data is unchanged)
+        """
+        with self._condition:
+            previous = self._latest.get(event)
+            if previous is not None and previous.data == data:
+                # Re-fetch of the same tick, nothing new to broadcast
+                return previous.id
+            price_event = PriceEvent(next(self._ids), event, data)
+            self._events.append(price_event)
+            self._latest[event] = price_event
+            self._last_id = price_event.id
+            self._published += 1
+            self._condition.notify_all()
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(event, data)
+            except Exception as e:
+                logger.error(f"Price listener failed for {event}: {e}", exc_info=True)
+        return price_event.id
+
+    def events_since(self, last_id: Optional[int]) -> Tuple[List[PriceEvent], int]:
+        """
+        Events a subscriber has not seen yet.
+
+        Args:
+            last_id: Last event id received, or None for a new subscriber
+
+        Returns:
+            Tuple of (events in publish order, cursor to pass on the next call)
+        """
+        with self._condition:
+            return self._events_since_locked(last_id), self._last_id
+
+    def _events_since_locked(self, last_id: Optional[int]) -> List[PriceEvent]:
+        if last_id is not None and last_id == self._last_id:
+            return []
+        oldest_id = self._events[0].id if self._events else None
+        if last_id is None or last_id > self._last_id or oldest_id is None or last_id < oldest_id - 1:
+            # New subscriber, unknown id (e.g. server restart) or gap: snapshot
+            return sorted(self._latest.values(), key=lambda e: e.id)
+        return [e for e in self._events if e.id > last_id]
+
+    def wait(self, cursor: int, timeout: float) -> Tuple[List[PriceEvent], int]:
+        """
+        Block until events newer than cursor exist or timeout elapses.
+
+        Args:
+            cursor: Cursor returned by events_since() or a previous wait()
+
+        Returns:
+            Tuple of (new events, [] on timeout; next cursor)
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._last_id != cursor, timeout=timeout)
+            return self._events_since_locked(cursor), self._last_id
+
+    def latest(self, event: str) -> Optional[Dict]:
+        """Payload of the most recent tick of a type, None if none published yet"""
+        with self._condition:
+            price_event = self._latest.get(event)
+            return price_event.data if price_event else None
+
+    def subscribe(self):
+        """Register a subscriber (for stats only)"""
+        with self._condition:
+            self._subscribers += 1
+
+    def unsubscribe(self):
+        """Unregister a subscriber"""
+        with self._condition:
+            self._subscribers = max(0, self._subscribers - 1)
+
+    def get_stats(self) -> Dict:
+        """Return hub counters for monitoring"""
+        with self._condition:
+            return {
+                'subscribers': self._subscribers,
+                'published': self._published,
+                'last_event_id': self._last_id,
+                'buffered': len(self._events),
+            }
+
+
+def parse_event_id(value) -> Optional[int]:
+    """Parse a Last-Event-ID value, None if missing or invalid"""
+    try:
+        return int(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+price_hub = PriceStreamHub(buffer_size=Config.PRICE_STREAM_BUFFER_SIZE)
@@ -0,0 +1,92 @@
+"""
+EU ETS Registry Adapters
+
+An adapter looks up account numbers in one or more national EU ETS
+registries. EUETSVerifier picks the adapter registered for a country and
+sends it every uncached account of that country in one batch; adapters for
+real registries subclass RegistryAdapter and implement ``lookup``.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+import threading
+import time
+
+
+class RegistryUnavailableError(Exception):
+    """Raised when a registry can't be queried (outage, timeout, rate limit)"""
+    pass
+
+
+class RegistryAdapter:
+    """
+    Base class of registry adapters.
+
+    ``lookup`` receives up to ``max_batch_size`` account numbers of one
+    country and returns, per account number, a dict with ``verified``
+    (bool), ``status`` (active / inactive / suspended / unknown) and
+    ``error`` (None or a message). Accounts missing from the answer are
+    reported as unknown. Lookups may run on several threads at once.
+    """
+
+    name = 'registry'
+    verification_method = 'api'
+    max_batch_size = 50
+
+    def lookup(self, country: str, account_numbers: List[str]) -> Dict[str, Dict]:
+        raise NotImplementedError
+
+
+class StubRegistryAdapter(RegistryAdapter):
+    """
+    Local stand-in for the national registries.
+
+    Accounts given up front answer with their configured status; any other
+    alphanumeric account number of 8-20 characters is active. ``delay``
+    simulates the latency of a remote registry. With ``record_calls``
+    (for tests) every lookup is recorded in ``calls``; the default adapter
+    keeps nothing, so it doesn't grow with traffic.
+    """
+
+    name = 'stub'
+    verification_method = 'mock'
+
+    def __init__(
+        self,
+        accounts: Optional[Dict[Tuple[str, str], str]] = None,
+        delay: float = 0.0,
+        record_calls: bool = False
+    ):
+        """
+        Initialize stub registry
+
+        Args:
+            accounts: Status per (country, account number)
+            delay: Seconds each lookup takes
+            record_calls: Keep every lookup in ``calls``
+        """
+        self.accounts = dict(accounts or {})
+        self.delay = delay
+        self.record_calls = record_calls
+        self.calls: List[Tuple[str, Tuple[str, ...]]] = []
+        self._lock = threading.Lock()
+
+    def lookup(self, country: str, account_numbers: Iterable[str]) -> Dict[str, Dict]:
+        account_numbers = tuple(account_numbers)
+        if self.record_calls:
+            with self._lock:
+                self.calls.append((country, account_numbers))
+        if self.delay:
+            time.sleep(self.delay)
+
+        results = {}
+        for account_number in account_numbers:
+            status = self.accounts.get((country, account_number))
+            if status is not None:
+                results[account_number] = {'verified': status == 'active', 'status': status, 'error': None}
+            elif 8 <= len(account_number) <= 20 and account_number.isalnum():
+                results[account_number] = {'verified': True, 'status': 'active', 'error': None}
+            else:
+                results[account_number] = {
+                    'verified': False, 'status': 'unknown', 'error': 'Invalid account number format'
+                }
+        return results
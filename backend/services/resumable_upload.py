@@ -0,0 +1,308 @@
+"""
+Resumable Upload Service
+
+tus-style chunked uploads of KYC documents: an upload is created with its
+total size, chunks are appended with PATCH at the current offset, and the
+finished file is moved into the document store. Chunks are appended to one
+partial file on disk as they arrive, so assembling a file never holds it in
+memory and an interrupted upload resumes from the last byte written.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import BinaryIO, Optional
+import logging
+import os
+import threading
+
+from sqlalchemy import update
+
+from database import db
+from models.document_upload import DocumentUpload, UploadStatus
+from models.kyc_document import DocumentType
+from services.document_store import DocumentStore, DocumentTooLargeError, StoredBlob, document_store
+from services.document_validator import DocumentValidator
+from utils.helpers import generate_uuid
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+except ImportError:  # Not POSIX: uploads are only guarded within this process
+    fcntl = None
+
+
+class UploadConflictError(ValueError):
+    """Raised when a chunk does not start at the current offset or the upload is busy"""
+
+
+class InvalidContentError(ValueError):
+    """Raised when the first bytes of an upload don't match its declared type"""
+
+
+class ResumableUploadManager:
+    """
+    Manage partial files and progress of resumable uploads.
+
+    Progress (upload_offset) is committed after every chunk, and the
+    partial file is truncated to that offset before appending, so bytes
+    written by a chunk that failed to commit are never counted twice.
+    A chunk or finalize holds an exclusive flock on the partial file
+    (claim), so one writer at a time is accepted across all worker
+    processes, and the new offset is committed with a conditional UPDATE
+    on the offset the chunk started from.
+    """
+
+    def __init__(self, store: DocumentStore, max_size: int = 200 * 1024 * 1024, expiry_hours: int = 24):
+        """
+        Initialize resumable upload manager
+
+        Args:
+            store: Document store finished uploads are moved into
+            max_size: Maximum declared size of an upload in bytes
+            expiry_hours: How long an upload stays resumable after its last chunk
+        """
+        self.store = store
+        self.max_size = max_size
+        self.expiry_hours = expiry_hours
+        self.sniff_size = Config.UPLOAD_SNIFF_BYTES
+        self._lock = threading.Lock()
+        self._busy = set()
+
+    @property
+    def partial_dir(self) -> str:
+        """Partial files live under the store root so finishing is a rename"""
+        return os.path.join(self.store.root, 'partial')
+
+    def partial_path(self, upload_id: str) -> str:
+        return os.path.join(self.partial_dir, f'{upload_id}.part')
+
+    def _expiry(self, now: datetime) -> datetime:
+        return now + timedelta(hours=self.expiry_hours)
+
+    def create(
+        self,
+        user_id: str,
+        document_type: DocumentType,
+        file_name: str,
+        mime_type: str,
+        upload_length: int
+    ) -> DocumentUpload:
+        """
+        Start an upload (added to the session, not committed)
+
+        Raises:
+            DocumentTooLargeError: If upload_length exceeds max_size
+        """
+        if upload_length > self.max_size:
+            raise DocumentTooLargeError(f'Upload exceeds {self.max_size} bytes')
+
+        now = datetime.utcnow()
+        upload = DocumentUpload(
+            id=generate_uuid(),
+            user_id=user_id,
+            document_type=document_type,
+            file_name=file_name,
+            mime_type=mime_type,
+            upload_length=upload_length,
+            upload_offset=0,
+            status=UploadStatus.IN_PROGRESS,
+            created_at=now,
+            updated_at=now,
+            expires_at=self._expiry(now)
+        )
+        os.makedirs(self.partial_dir, exist_ok=True)
+        open(self.partial_path(upload.id), 'wb').close()
+        db.session.add(upload)
+        return upload
+
+    def is_expired(self, upload: DocumentUpload, now: Optional[datetime] = None) -> bool:
+        return upload.status == UploadStatus.EXPIRED or (
+            upload.status == UploadStatus.IN_PROGRESS and upload.expires_at < (now or datetime.utcnow())
+        )
+
+    @contextmanager
+    def claim(self, upload: DocumentUpload):
+        """
+        Hold an upload's partial file exclusively, across threads and
+        worker processes, and reload the upload's progress once held.
+
+        Yields:
+            The partial file, opened for reading and writing
+
+        Raises:
+            UploadConflictError: If another request holds the upload or its
+                                 partial file is gone (upload closed)
+        """
+        with self._lock:
+            if upload.id in self._busy:
+                raise UploadConflictError('Another chunk is being uploaded')
+            self._busy.add(upload.id)
+        try:
+            try:
+                handle = open(self.partial_path(upload.id), 'r+b')
+            except FileNotFoundError:
+                raise UploadConflictError('Upload is closed')
+            with handle:
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        raise UploadConflictError('Another chunk is being uploaded')
+                # Another worker may have committed progress since the upload was loaded
+                db.session.refresh(upload)
+                yield handle
+        finally:
+            with self._lock:
+                self._busy.discard(upload.id)
+
+    def append(self, upload: DocumentUpload, offset: int, stream: BinaryIO) -> int:
+        """
+        Append a chunk at offset and commit the new offset.
+
+        The chunk is written as it is read. If the stream breaks off, the
+        bytes received so far are kept and committed, so the client resumes
+        from there.
+
+        Returns:
+            New upload offset
+
+        The magic bytes are checked as soon as the first sniff_size bytes
+        (or the whole file, if smaller) are on disk, so a file whose content
+        doesn't match its name and type is refused without reading the rest
+        of the request body.
+
+        Raises:
+            UploadConflictError: If offset isn't the current offset, another
+                                 chunk is being written or the upload closed
+            DocumentTooLargeError: If the chunk runs past upload_length
+            InvalidContentError: If the file's magic bytes don't match it
+        """
+        with self.claim(upload) as out:
+            if upload.status != UploadStatus.IN_PROGRESS:
+                raise UploadConflictError(f'Upload is {upload.status.value}')
+            if offset != upload.upload_offset:
+                raise UploadConflictError(f'Upload offset is {upload.upload_offset}')
+
+            remaining = upload.upload_length - offset
+            head_size = min(self.sniff_size, upload.upload_length)
+            head_checked = offset >= head_size
+            failure = None
+            out.seek(offset)
+            out.truncate()
+            try:
+                while True:
+                    chunk = stream.read(self.store.chunk_size)
+                    if not chunk:
+                        break
+                    if len(chunk) > remaining:
+                        failure = DocumentTooLargeError('Chunk exceeds the declared upload length')
+                        break
+                    out.write(chunk)
+                    remaining -= len(chunk)
+                    if not head_checked and out.tell() >= head_size:
+                        head_checked = True
+                        out.seek(0)
+                        is_valid, error = DocumentValidator.check_content(
+                            out.read(head_size), upload.file_name, upload.mime_type
+                        )
+                        out.seek(0, os.SEEK_END)
+                        if not is_valid:
+                            failure = InvalidContentError(error)
+                            break
+            except Exception as e:
+                # Keep what arrived before the stream broke off
+                logger.warning(f"Upload {upload.id} chunk interrupted: {e}")
+                failure = e
+            out.flush()
+            os.fsync(out.fileno())
+            new_offset = out.tell()
+
+            # Only counts if nothing else moved or closed the upload meanwhile
+            now = datetime.utcnow()
+            result = db.session.execute(
+                update(DocumentUpload)
+                .where(
+                    DocumentUpload.id == upload.id,
+                    DocumentUpload.upload_offset == offset,
+                    DocumentUpload.status == UploadStatus.IN_PROGRESS
+                )
+                .values(upload_offset=new_offset, updated_at=now, expires_at=self._expiry(now))
+                .execution_options(synchronize_session=False)
+            )
+            if not result.rowcount:
+                db.session.rollback()
+                raise UploadConflictError('Upload changed while the chunk was written')
+            db.session.commit()
+
+        if failure is not None:
+            raise failure
+        return new_offset
+
+    def complete(self, upload: DocumentUpload) -> bool:
+        """
+        Flip a fully received upload from in progress to completed (in the
+        session, not committed). Call while holding claim().
+
+        Returns:
+            False if another request already closed it
+        """
+        result = db.session.execute(
+            update(DocumentUpload)
+            .where(
+                DocumentUpload.id == upload.id,
+                DocumentUpload.status == UploadStatus.IN_PROGRESS,
+                DocumentUpload.upload_offset == DocumentUpload.upload_length
+            )
+            .values(status=UploadStatus.COMPLETED, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        return bool(result.rowcount)
+
+    def finish(self, upload: DocumentUpload) -> StoredBlob:
+        """
+        Move the assembled file into the document store and count a
+        reference to it (in the session, not committed).
+
+        If the content is already stored the partial file is left in place
+        so a failed commit can be retried; discard() it after the commit.
+        """
+        return self.store.import_file(self.partial_path(upload.id), keep_duplicate=True)
+
+    def discard(self, upload: DocumentUpload):
+        """Remove the partial file of an upload"""
+        try:
+            os.remove(self.partial_path(upload.id))
+        except FileNotFoundError:
+            pass
+
+    def purge_expired(self, now: Optional[datetime] = None, limit: int = 500) -> int:
+        """
+        Delete expired and aborted uploads with their partial files.
+
+        Returns:
+            Number of uploads purged
+        """
+        now = now or datetime.utcnow()
+        uploads = (
+            DocumentUpload.query
+            .filter(db.or_(
+                DocumentUpload.status.in_((UploadStatus.EXPIRED, UploadStatus.ABORTED)),
+                db.and_(DocumentUpload.status == UploadStatus.IN_PROGRESS, DocumentUpload.expires_at < now)
+            ))
+            .limit(limit)
+            .all()
+        )
+        for upload in uploads:
+            self.discard(upload)
+            db.session.delete(upload)
+        db.session.commit()
+        return len(uploads)
+
+
+resumable_uploads = ResumableUploadManager(
+    document_store,
+    max_size=Config.RESUMABLE_UPLOAD_MAX_SIZE,
+    expiry_hours=Config.RESUMABLE_UPLOAD_EXPIRY_HOURS
+)
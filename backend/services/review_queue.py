@@ -0,0 +1,246 @@
+"""
+KYC Review Queue
+
+Maintains KYCReviewSummary rows, a denormalised summary of each user's KYC
+dossier (document counts per type, missing documents, risk flags, time in
+the current status), so the admin review queue is served one indexed query
+per page instead of loading every user's documents and JSON columns.
+
+Summaries are refreshed in the transaction of the event that changes them:
+uploads and deletions, submission, reviews, sanctions checks and document
+processing. ``backfill`` summarises users that have none yet (e.g. after
+the table was added).
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+from sqlalchemy import and_, or_
+from sqlalchemy.dialects import postgresql, sqlite
+
+from database import db
+from models import User, KYCDocument
+from models.kyc_document import DocumentType, VerificationStatus
+from models.kyc_review_summary import KYCReviewSummary
+from models.user import KYCStatus, SanctionsCheckStatus
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Documents a dossier needs before it can be submitted
+REQUIRED_DOCUMENTS = (
+    DocumentType.COMPANY_REGISTRATION,
+    DocumentType.FINANCIAL_STATEMENT,
+    DocumentType.TAX_CERTIFICATE,
+    DocumentType.EU_ETS_PROOF,
+    DocumentType.POWER_OF_ATTORNEY,
+)
+
+# Statuses listed in the review queue
+QUEUE_STATUSES = (KYCStatus.PENDING, KYCStatus.IN_REVIEW, KYCStatus.NEEDS_UPDATE)
+
+
+def queued_since(user: User) -> datetime:
+    """When the user's dossier entered its current KYC status"""
+    entered = {
+        KYCStatus.IN_REVIEW: user.kyc_submitted_at,
+        KYCStatus.NEEDS_UPDATE: user.last_kyc_review,
+        KYCStatus.REJECTED: user.last_kyc_review,
+        KYCStatus.APPROVED: user.kyc_approved_at,
+    }.get(user.kyc_status)
+    return entered or user.created_at or datetime.utcnow()
+
+
+def risk_flags(user: User) -> List[str]:
+    """Screening and registry flags of a user (document flags are counted separately)"""
+    flags = []
+    if user.sanctions_check_status == SanctionsCheckStatus.FLAGGED:
+        flags.append('sanctions_flagged')
+    elif user.sanctions_check_status == SanctionsCheckStatus.PENDING:
+        flags.append('sanctions_unchecked')
+    if user.pep_status:
+        flags.append('pep')
+    if not user.eu_ets_registry_verified:
+        flags.append('eu_ets_unverified')
+    return flags
+
+
+def summarize(user: User, documents: Iterable[Tuple]) -> Dict:
+    """
+    Summary column values of a user's dossier
+
+    Args:
+        user: The user
+        documents: (document_type, verification_status, document_date) of
+                   each of the user's documents
+    """
+    counts: Dict[str, int] = {}
+    unverified = rejected = 0
+    expire_on = None
+    max_age = timedelta(days=Config.KYC_DOCUMENT_MAX_AGE_DAYS + 1)
+    for document_type, verification_status, document_date in documents:
+        counts[document_type.value] = counts.get(document_type.value, 0) + 1
+        if verification_status == VerificationStatus.PENDING:
+            unverified += 1
+        elif verification_status == VerificationStatus.REJECTED:
+            rejected += 1
+        # Same rule as DocumentValidator.check_document_expiry, as the first expired day
+        if document_type == DocumentType.COMPANY_REGISTRATION and document_date is not None:
+            expires = document_date + max_age
+            expire_on = min(expire_on, expires) if expire_on else expires
+
+    return {
+        'username': user.username,
+        'company_name': user.company_name,
+        'kyc_status': user.kyc_status,
+        'risk_level': user.risk_level,
+        'in_queue': user.kyc_status in QUEUE_STATUSES,
+        'queued_at': queued_since(user),
+        'document_counts': counts,
+        'document_total': sum(counts.values()),
+        'unverified_documents': unverified,
+        'rejected_documents': rejected,
+        'missing_documents': [doc.value for doc in REQUIRED_DOCUMENTS if doc.value not in counts],
+        'documents_expire_on': expire_on,
+        'risk_flags': risk_flags(user),
+    }
+
+
+class ReviewQueue:
+    """
+    Keeps dossier summaries current and pages through the review queue.
+
+    ``refresh`` and ``refresh_many`` write in the current session without
+    committing, so a summary is written in the same transaction as the
+    change it reflects. They upsert, so two requests summarising the same
+    new user at once don't collide on the primary key.
+    """
+
+    def __init__(self, batch_size: int = 500):
+        """
+        Initialize review queue
+
+        Args:
+            batch_size: Users summarised per query when refreshing in bulk
+        """
+        self.batch_size = batch_size
+
+    def refresh(self, user_id: str) -> bool:
+        """Recompute one user's summary (False for admins and unknown users)"""
+        return self.refresh_many([user_id]) == 1
+
+    def refresh_many(self, user_ids: Iterable[str]) -> int:
+        """
+        Recompute the summaries of several users with two queries (users,
+        their documents) and one INSERT ... ON CONFLICT DO UPDATE per batch.
+        Pending changes in the session, such as a document just added or
+        deleted, are flushed first so they're included.
+
+        Returns:
+            Number of summaries written
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        table = KYCReviewSummary.__table__
+        dialect = db.session.get_bind().dialect.name
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        written = 0
+        for start in range(0, len(user_ids), self.batch_size):
+            batch = user_ids[start:start + self.batch_size]
+            users = User.query.filter(User.id.in_(batch), User.is_admin.is_(False)).all()
+            if not users:
+                continue
+            ids = [user.id for user in users]
+
+            documents: Dict[str, List[Tuple]] = {user_id: [] for user_id in ids}
+            rows = db.session.query(
+                KYCDocument.user_id, KYCDocument.document_type,
+                KYCDocument.verification_status, KYCDocument.document_date
+            ).filter(KYCDocument.user_id.in_(ids))
+            for user_id, *document in rows:
+                documents[user_id].append(tuple(document))
+
+            now = datetime.utcnow()
+            values = [
+                dict(summarize(user, documents[user.id]), user_id=user.id, updated_at=now)
+                for user in users
+            ]
+            statement = insert(table).values(values)
+            statement = statement.on_conflict_do_update(
+                index_elements=[table.c.user_id],
+                set_={field: statement.excluded[field] for field in values[0] if field != 'user_id'}
+            )
+            db.session.execute(statement)
+            written += len(values)
+
+        if written:
+            # Summaries already in the session are stale now
+            for summary in [obj for obj in db.session.identity_map.values() if isinstance(obj, KYCReviewSummary)]:
+                db.session.expire(summary)
+        return written
+
+    def backfill(self) -> int:
+        """
+        Summarise every non-admin user without a summary, a batch per
+        transaction
+
+        Returns:
+            Number of summaries created
+        """
+        created = 0
+        while True:
+            user_ids = [
+                row[0] for row in db.session.query(User.id)
+                .outerjoin(KYCReviewSummary, KYCReviewSummary.user_id == User.id)
+                .filter(User.is_admin.is_(False), KYCReviewSummary.user_id.is_(None))
+                .limit(self.batch_size)
+                .all()
+            ]
+            if not user_ids:
+                break
+            self.refresh_many(user_ids)
+            db.session.commit()
+            created += len(user_ids)
+        if created:
+            logger.info(f"Backfilled {created} KYC review summaries")
+        return created
+
+    def page(
+        self,
+        limit: int,
+        after: Optional[Tuple[datetime, str]] = None,
+        status: Optional[KYCStatus] = None,
+        risk_level=None
+    ) -> Tuple[List[KYCReviewSummary], bool]:
+        """
+        One page of the queue, longest waiting first, with a single query on
+        the (in_queue, queued_at, user_id) index
+
+        Args:
+            limit: Page size
+            after: (queued_at, user_id) of the last dossier of the previous page
+            status: Only dossiers in this queue status
+            risk_level: Only dossiers with this risk level
+
+        Returns:
+            (summaries, has_more)
+        """
+        query = KYCReviewSummary.query.filter(KYCReviewSummary.in_queue.is_(True))
+        if status is not None:
+            query = query.filter(KYCReviewSummary.kyc_status == status)
+        if risk_level is not None:
+            query = query.filter(KYCReviewSummary.risk_level == risk_level)
+        if after is not None:
+            queued_at, user_id = after
+            query = query.filter(or_(
+                KYCReviewSummary.queued_at > queued_at,
+                and_(KYCReviewSummary.queued_at == queued_at, KYCReviewSummary.user_id > user_id)
+            ))
+
+        summaries = query.order_by(
+            KYCReviewSummary.queued_at.asc(), KYCReviewSummary.user_id.asc()
+        ).limit(limit + 1).all()
+        return summaries[:limit], len(summaries) > limit
+
+
+review_queue = ReviewQueue(batch_size=Config.REVIEW_QUEUE_BACKFILL_BATCH_SIZE)
@@ -1,26 +1,101 @@
 """
 Sanctions and PEP screening service
-Mock implementation - to be replaced with real API integration
+Screens names against sanctions and PEP list exports loaded into an
+in-memory ScreeningIndex (fuzzy matching on names and aliases)
 """
 from datetime import datetime
 from typing import Dict, List, Optional
+import logging
+import os
+import threading
+
+from services.screening_index import ScreeningIndex
+from services.sanctions_list_loader import SanctionsListLoader, SyncResult
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+screening_index = ScreeningIndex(
+    threshold=Config.SANCTIONS_MATCH_THRESHOLD,
+    max_candidates=Config.SANCTIONS_MAX_CANDIDATES
+)
+list_loader = SanctionsListLoader(
+    screening_index,
+    snapshot_keep=Config.SANCTIONS_SNAPSHOT_KEEP,
+    max_removal_share=Config.SANCTIONS_MAX_REMOVAL_SHARE
+)
+_load_lock = threading.Lock()
+_loaded = False
 
 
 class SanctionsChecker:
     """
     Service for checking sanctions lists and PEP status
-    Currently a mock implementation
+    
+    Lists are CSV/XML exports in SANCTIONS_LISTS_FOLDER (in production, from
+    World-Check, Dow Jones, the EU/UN consolidated lists, etc.), indexed on
+    first use and kept up to date incrementally by SanctionsListLoader.
+    Files with "pep" in their name hold PEP entries unless a list_type
+    column says otherwise.
     """
     
-    # Mock sanctions lists (in production, these would be from external APIs)
-    MOCK_SANCTIONS_LIST = [
-        # Example entries - in production, this would be from World-Check, Dow Jones, etc.
-    ]
+    @staticmethod
+    def snapshot_folder(folder: Optional[str] = None) -> str:
+        """Folder of list snapshots (default: "snapshots" in the lists folder)"""
+        return Config.SANCTIONS_SNAPSHOT_FOLDER or os.path.join(folder or Config.SANCTIONS_LISTS_FOLDER, 'snapshots')
+    
+    @staticmethod
+    def load_lists(folder: Optional[str] = None, force: bool = False, accept_removals: bool = False) -> SyncResult:
+        """
+        Bring the screening index up to date with the list files in a folder
+        
+        The first load restores the newest snapshot, if any, then applies
+        whatever changed in the files since; later loads only apply the
+        entries added, changed or removed. A sync removing more than
+        SANCTIONS_MAX_REMOVAL_SHARE of the entries is refused unless
+        accept_removals is set.
+        Returns: SyncResult with the list version and the changes applied
+        """
+        global _loaded
+        folder = folder or Config.SANCTIONS_LISTS_FOLDER
+        snapshot_folder = SanctionsChecker.snapshot_folder(folder)
+        with _load_lock:
+            if not _loaded:
+                list_loader.reset()
+                list_loader.load_snapshot(snapshot_folder)
+            result = list_loader.sync(folder, snapshot_folder, force=force, accept_removals=accept_removals)
+            _loaded = True
+        return result
+    
+    @staticmethod
+    def get_index() -> ScreeningIndex:
+        """The screening index, loaded from the list folder on first use"""
+        if not _loaded:
+            SanctionsChecker.load_lists()
+        return screening_index
+    
+    @staticmethod
+    def list_version() -> str:
+        """Version of the loaded lists, recorded on users screened against them"""
+        SanctionsChecker.get_index()
+        return list_loader.version
     
-    # Mock PEP database (in production, this would be from external APIs)
-    MOCK_PEP_LIST = [
-        # Example entries - in production, this would be from external PEP databases
-    ]
+    @staticmethod
+    def lists_unavailable() -> Optional[str]:
+        """
+        Why screening results can't be trusted right now (None if they can):
+        no list entries are loaded, or the last sync of the list files failed.
+        An empty index clears every name, so nothing should be recorded as
+        screened against it.
+        """
+        SanctionsChecker.get_index()
+        stats = list_loader.get_stats()
+        if not stats['entries']:
+            return 'No sanctions list entries are loaded'
+        last_sync = stats['last_sync']
+        if last_sync and last_sync['errors']:
+            return f"Last sanctions list sync failed: {'; '.join(last_sync['errors'])}"
+        return None
     
     @staticmethod
     def check_sanctions(name: str, date_of_birth: Optional[str] = None, 
@@ -43,23 +118,18 @@ class SanctionsChecker:
             'checked_at': datetime.utcnow().isoformat()
         }
         
-        # Mock implementation - in production, this would call external APIs
-        # Examples: World-Check, Dow Jones Risk & Compliance, etc.
-        
-        # Normalize name for comparison
-        normalized_name = name.lower().strip()
-        
-        # Check against mock sanctions list
-        for entry in SanctionsChecker.MOCK_SANCTIONS_LIST:
-            if normalized_name in entry.get('name', '').lower():
-                results['sanctions_match'] = True
-                results['risk_level'] = 'high'
-                results['matches'].append({
-                    'type': 'sanctions',
-                    'source': entry.get('source', 'unknown'),
-                    'name': entry.get('name'),
-                    'details': entry.get('details')
-                })
+        # Fuzzy match against names and aliases on the sanctions lists
+        for match in SanctionsChecker.get_index().search(name or '', list_types=('sanctions',)):
+            results['sanctions_match'] = True
+            results['risk_level'] = 'high'
+            results['matches'].append({
+                'type': 'sanctions',
+                'source': match.entry.source,
+                'name': match.entry.name,
+                'matched_name': match.matched_name,
+                'score': match.score,
+                'details': match.entry.details
+            })
         
         # Check PEP status
         pep_result = SanctionsChecker.check_pep(name, date_of_birth, nationality)
@@ -94,22 +164,20 @@ class SanctionsChecker:
             'checked_at': datetime.utcnow().isoformat()
         }
         
-        # Mock implementation - in production, this would call external PEP databases
-        # Examples: World-Check PEP database, Dow Jones PEP database, etc.
-        
-        normalized_name = name.lower().strip()
-        
-        # Check against mock PEP list
-        for entry in SanctionsChecker.MOCK_PEP_LIST:
-            if normalized_name in entry.get('name', '').lower():
-                results['is_pep'] = True
-                results['source'] = entry.get('source', 'mock_database')
-                results['details'] = {
-                    'position': entry.get('position'),
-                    'country': entry.get('country'),
-                    'status': entry.get('status')
-                }
-                break
+        # Best fuzzy match on the PEP lists
+        matches = SanctionsChecker.get_index().search(name or '', list_types=('pep',), limit=1)
+        if matches:
+            entry = matches[0].entry
+            details = entry.details or {}
+            results['is_pep'] = True
+            results['source'] = entry.source
+            results['details'] = {
+                'name': entry.name,
+                'score': matches[0].score,
+                'position': details.get('position'),
+                'country': details.get('country'),
+                'status': details.get('status')
+            }
         
         return results
     
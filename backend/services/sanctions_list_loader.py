@@ -0,0 +1,337 @@
+"""
+Sanctions List Loader
+
+Keeps the screening index in step with the sanctions/PEP list files. Files
+are parsed as streams and compared entry by entry with what is indexed, so
+a daily update only adds, replaces and removes the entries that changed
+while searches keep running. Every synced version is written to a gzip
+snapshot that a cold start loads instead of parsing the exports again.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional
+import glob
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from services.screening_index import ScreeningEntry, ScreeningIndex, iter_csv_entries, iter_xml_entries
+
+logger = logging.getLogger(__name__)
+
+# List file readers by extension
+READERS = {
+    '.csv': iter_csv_entries,
+    '.xml': iter_xml_entries,
+}
+
+SNAPSHOT_PREFIX = 'screening-'
+SNAPSHOT_SUFFIX = '.jsonl.gz'
+
+
+class SyncResult(NamedTuple):
+    """Changes applied by one sync"""
+    version: str
+    added: int
+    updated: int
+    removed: int
+    unchanged: int
+    errors: List[str]
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+
+def iter_list_entries(path: str) -> Iterator[ScreeningEntry]:
+    """Entries of a list file; files with "pep" in their name default to PEP entries"""
+    reader = READERS[os.path.splitext(path)[1].lower()]
+    list_type = 'pep' if 'pep' in os.path.basename(path).lower() else 'sanctions'
+    return reader(path, list_type=list_type)
+
+
+def entry_fingerprint(entry: ScreeningEntry) -> str:
+    """Digest of everything screening uses from an entry"""
+    payload = json.dumps(
+        [entry.name, entry.list_type, entry.source, list(entry.aliases), entry.details or {}],
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class SanctionsListLoader:
+    """
+    Incremental loader of list files into a ScreeningIndex.
+
+    The loader remembers a fingerprint per indexed entry. ``sync`` streams
+    every ``*.csv``/``*.xml`` file in the folder and indexes an entry only
+    when its id is new or its fingerprint changed; ids no longer present
+    are removed at the end. Each change is a single locked index operation,
+    so the index is never rebuilt or emptied. If the files' names, sizes
+    and modification times are those of the last sync, nothing is parsed.
+
+    The list version is derived from the sorted fingerprints, so it is the
+    same whether the lists were parsed or restored from a snapshot, and
+    changes exactly when an entry does.
+
+    A folder without list files, or files that would remove more than
+    ``max_removal_share`` of the indexed entries (an unmounted volume, a
+    truncated export), is reported as a sync error and nothing is applied,
+    so the index and version stay as they were.
+    """
+
+    def __init__(self, index: ScreeningIndex, snapshot_keep: int = 3, max_removal_share: float = 0.5):
+        """
+        Initialize list loader
+
+        Args:
+            index: Screening index kept in sync
+            snapshot_keep: Number of snapshots kept per snapshot folder
+            max_removal_share: Largest share of indexed entries one sync may remove
+        """
+        self.index = index
+        self.snapshot_keep = snapshot_keep
+        self.max_removal_share = max_removal_share
+        self.version: Optional[str] = None
+
+        self._lock = threading.Lock()
+        self._fingerprints: Dict[str, str] = {}
+        self._files = None
+        self._stats = {
+            'syncs': 0,
+            'last_sync_at': None,
+            'last_sync_duration_ms': None,
+            'last_sync': None,
+            'snapshot_loaded': None,
+        }
+
+    @staticmethod
+    def list_files(folder: str) -> List[str]:
+        """List files in a folder, in a stable order"""
+        return sorted(
+            path for extension in READERS
+            for path in glob.glob(os.path.join(folder, f'*{extension}'))
+        )
+
+    @staticmethod
+    def file_signature(paths: List[str]) -> List[List]:
+        """Names, sizes and modification times of the list files"""
+        signature = []
+        for path in paths:
+            stat = os.stat(path)
+            signature.append([os.path.basename(path), stat.st_size, stat.st_mtime_ns])
+        return signature
+
+    @staticmethod
+    def compute_version(fingerprints: Dict[str, str]) -> str:
+        """List version of a set of entry fingerprints"""
+        digest = hashlib.sha256()
+        for entry_id in sorted(fingerprints):
+            digest.update(f'{entry_id}\0{fingerprints[entry_id]}\n'.encode('utf-8'))
+        return digest.hexdigest()[:16]
+
+    def reset(self):
+        """Forget all loaded entries and empty the index"""
+        with self._lock:
+            self.index.clear()
+            self._fingerprints.clear()
+            self._files = None
+            self.version = None
+
+    def sync(
+        self,
+        folder: str,
+        snapshot_folder: Optional[str] = None,
+        force: bool = False,
+        accept_removals: bool = False
+    ) -> SyncResult:
+        """
+        Apply the differences between the list files and the index.
+
+        Args:
+            folder: Folder holding the list files
+            snapshot_folder: Where to write a snapshot of the new version (None: no snapshot)
+            force: Parse the files even if they look unchanged
+            accept_removals: Apply removals beyond max_removal_share (a list
+                             that really shrank)
+
+        Returns:
+            SyncResult with the new version and the number of entries
+            added, updated, removed and unchanged. If a file can't be read,
+            its error is reported, nothing is removed and the next sync
+            parses the files again. If the folder has no list files, or the
+            sync would remove more than max_removal_share of the entries,
+            the error is reported and no change at all is applied.
+        """
+        with self._lock:
+            started = datetime.utcnow()
+            paths = self.list_files(folder)
+            files = self.file_signature(paths)
+            if not force and files == self._files and self.version is not None:
+                return SyncResult(self.version, 0, 0, 0, len(self._fingerprints), [])
+
+            unchanged = 0
+            errors = []
+            seen = set()
+            changes = []  # (entry, fingerprint, is_new), applied once the sync is known to be sane
+            if not paths and self._fingerprints:
+                errors.append(f'No list files found in {folder}')
+            for path in paths:
+                try:
+                    for entry in iter_list_entries(path):
+                        fingerprint = entry_fingerprint(entry)
+                        previous = self._fingerprints.get(entry.entry_id)
+                        seen.add(entry.entry_id)
+                        if previous == fingerprint:
+                            unchanged += 1
+                        else:
+                            changes.append((entry, fingerprint, previous is None))
+                except Exception as e:
+                    logger.error(f"Failed to read sanctions list {path}: {e}", exc_info=True)
+                    errors.append(f'{os.path.basename(path)}: {e}')
+
+            stale = set(self._fingerprints) - seen
+            too_many = len(stale) > self.max_removal_share * len(self._fingerprints)
+            if not errors and too_many and not accept_removals:
+                errors.append(
+                    f'Sync would remove {len(stale)} of {len(self._fingerprints)} entries '
+                    f'(more than {self.max_removal_share:.0%}), not applied'
+                )
+                changes = []
+
+            added = updated = 0
+            for entry, fingerprint, is_new in changes:
+                self.index.add(entry)
+                self._fingerprints[entry.entry_id] = fingerprint
+                if is_new:
+                    added += 1
+                else:
+                    updated += 1
+
+            removed = 0
+            if not errors:
+                for entry_id in stale:
+                    self.index.remove(entry_id)
+                    del self._fingerprints[entry_id]
+                    removed += 1
+
+            self.version = self.compute_version(self._fingerprints)
+            self._files = None if errors else files
+            result = SyncResult(self.version, added, updated, removed, unchanged, errors)
+
+            if snapshot_folder and not errors and (result.changed or not self._has_snapshot(snapshot_folder)):
+                try:
+                    self.write_snapshot(snapshot_folder)
+                except OSError as e:
+                    logger.error(f"Failed to write sanctions list snapshot: {e}", exc_info=True)
+
+            duration_ms = (datetime.utcnow() - started).total_seconds() * 1000
+            self._stats['syncs'] += 1
+            self._stats['last_sync_at'] = started.isoformat()
+            self._stats['last_sync_duration_ms'] = round(duration_ms, 1)
+            self._stats['last_sync'] = {
+                'added': added, 'updated': updated, 'removed': removed,
+                'unchanged': unchanged, 'errors': errors,
+            }
+            if result.changed or errors:
+                logger.info(
+                    f"Sanctions lists synced to {self.version}: +{added} ~{updated} -{removed} "
+                    f"in {duration_ms:.0f}ms"
+                )
+            return result
+
+    def snapshot_path(self, snapshot_folder: str, version: str) -> str:
+        """Snapshot file of a list version"""
+        return os.path.join(snapshot_folder, f'{SNAPSHOT_PREFIX}{version}{SNAPSHOT_SUFFIX}')
+
+    def _has_snapshot(self, snapshot_folder: str) -> bool:
+        return os.path.exists(self.snapshot_path(snapshot_folder, self.version))
+
+    def _snapshots(self, snapshot_folder: str) -> List[str]:
+        """Snapshot files, newest first"""
+        paths = glob.glob(os.path.join(snapshot_folder, f'{SNAPSHOT_PREFIX}*{SNAPSHOT_SUFFIX}'))
+        return sorted(paths, key=os.path.getmtime, reverse=True)
+
+    def write_snapshot(self, snapshot_folder: str) -> str:
+        """
+        Write the indexed entries as gzip JSON lines: a header with the
+        version and file signature, then one entry per line. Older
+        snapshots beyond snapshot_keep are deleted.
+        """
+        os.makedirs(snapshot_folder, exist_ok=True)
+        path = self.snapshot_path(snapshot_folder, self.version)
+        entries = self.index.entries()
+
+        # Write next to the target and rename, so a cold start never reads a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=snapshot_folder, suffix='.tmp')
+        os.close(fd)
+        try:
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                header = {
+                    'version': self.version,
+                    'created_at': datetime.utcnow().isoformat(),
+                    'files': self._files,
+                    'entries': len(entries),
+                }
+                f.write(json.dumps(header) + '\n')
+                for entry in entries:
+                    f.write(json.dumps(list(entry), ensure_ascii=False) + '\n')
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        for old_path in self._snapshots(snapshot_folder)[self.snapshot_keep:]:
+            os.remove(old_path)
+        return path
+
+    def load_snapshot(self, snapshot_folder: str) -> bool:
+        """
+        Replace the index contents with the newest valid snapshot.
+
+        A snapshot whose entries don't reproduce its version is skipped.
+        Returns False if no usable snapshot exists.
+        """
+        with self._lock:
+            for path in self._snapshots(snapshot_folder):
+                try:
+                    with gzip.open(path, 'rt', encoding='utf-8') as f:
+                        header = json.loads(f.readline())
+                        entries = [ScreeningEntry(
+                            entry_id, name, list_type, source, tuple(aliases), details
+                        ) for entry_id, name, list_type, source, aliases, details in map(json.loads, f)]
+                except (OSError, ValueError, TypeError) as e:
+                    logger.warning(f"Unreadable sanctions list snapshot {path}: {e}")
+                    continue
+
+                fingerprints = {entry.entry_id: entry_fingerprint(entry) for entry in entries}
+                if self.compute_version(fingerprints) != header.get('version'):
+                    logger.warning(f"Sanctions list snapshot {path} doesn't match its version, skipped")
+                    continue
+
+                self.index.clear()
+                self.index.add_all(entries)
+                self._fingerprints = fingerprints
+                self.version = header['version']
+                self._files = header.get('files')
+                self._stats['snapshot_loaded'] = os.path.basename(path)
+                logger.info(f"Sanctions lists {self.version} loaded from snapshot ({len(entries)} entries)")
+                return True
+            return False
+
+    def get_stats(self) -> Dict:
+        """Return loader counters for monitoring"""
+        return {
+            'version': self.version,
+            'entries': len(self._fingerprints),
+            'syncs': self._stats['syncs'],
+            'last_sync_at': self._stats['last_sync_at'],
+            'last_sync_duration_ms': self._stats['last_sync_duration_ms'],
+            'last_sync': self._stats['last_sync'],
+            'snapshot_loaded': self._stats['snapshot_loaded'],
+        }
@@ -0,0 +1,253 @@
+"""
+Sanctions Rescreening
+
+Batch job screening every user's company name and beneficial owners against
+the current sanctions/PEP list version. Users already screened against that
+version are skipped, so running it after each list update (or periodically)
+only touches what is stale.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+import logging
+import threading
+
+from sqlalchemy import or_, true, update
+
+from database import db
+from models import User
+from models.user import RiskLevel, SanctionsCheckStatus
+from services.sanctions_checker import SanctionsChecker
+from services.review_queue import review_queue
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def owner_names(beneficial_owners) -> List[str]:
+    """Non-empty names of a user's beneficial owners"""
+    names = []
+    for owner in beneficial_owners or []:
+        name = owner.get('name') if isinstance(owner, dict) else None
+        if name and name.strip():
+            names.append(name.strip())
+    return names
+
+
+class SanctionsRescreening:
+    """
+    Stream users in pages and rescreen them in parallel.
+
+    Each page of up to ``page_size`` users not yet screened against the
+    current list version is read by keyset pagination on the user id
+    (only the columns screening needs). The distinct company and owner
+    names of the page are screened on a thread pool, each name once per
+    run, and the outcomes are written with one UPDATE per distinct
+    (status, PEP) combination, conditional on the user still being stale
+    so a concurrent manual check isn't overwritten. Risk levels are only
+    ever raised, never lowered, by the job.
+    """
+
+    def __init__(self, page_size: int = 200, workers: int = 4):
+        """
+        Initialize rescreening job
+
+        Args:
+            page_size: Users read and updated per batch
+            workers: Threads screening names in parallel
+        """
+        self.page_size = page_size
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._stats = {
+            'runs': 0,
+            'running': False,
+            'last_run_at': None,
+            'last_run_duration_ms': None,
+            'last_run_list_version': None,
+            'last_run_counts': {},
+            'last_run_skipped': None,
+        }
+
+    @staticmethod
+    def _stale(list_version: str):
+        """Users not screened against list_version"""
+        return or_(User.sanctions_list_version.is_(None), User.sanctions_list_version != list_version)
+
+    def _users(self, list_version: str, after_id: Optional[str], force: bool):
+        """Next page of users to screen"""
+        query = db.session.query(
+            User.id, User.company_name, User.username, User.beneficial_owners
+        ).filter(User.is_admin.is_(False))
+        if not force:
+            query = query.filter(self._stale(list_version))
+        if after_id is not None:
+            query = query.filter(User.id > after_id)
+        return query.order_by(User.id).limit(self.page_size).all()
+
+    def _screen_names(self, names, results: Dict[str, Dict], executor: ThreadPoolExecutor):
+        """Screen names not screened yet in this run"""
+        pending = [name for name in dict.fromkeys(names) if name not in results]
+        for name, result in zip(pending, executor.map(SanctionsChecker.check_sanctions, pending)):
+            results[name] = result
+
+    def _apply(self, outcomes: Dict[str, tuple], list_version: str, now: datetime, force: bool):
+        """Write outcomes with one UPDATE per distinct (flagged, PEP) combination"""
+        groups = {}
+        for user_id, (flagged, pep) in outcomes.items():
+            groups.setdefault((flagged, pep), []).append(user_id)
+
+        # Users screened concurrently (e.g. a manual check) are left as they are
+        stale = true() if force else self._stale(list_version)
+        for (flagged, pep), user_ids in groups.items():
+            status = SanctionsCheckStatus.FLAGGED if flagged else SanctionsCheckStatus.CLEARED
+            values = {
+                'sanctions_check_status': status,
+                'pep_status': pep,
+                'sanctions_check_date': now,
+                'sanctions_list_version': list_version,
+                'updated_at': now,
+            }
+            if flagged:
+                values['risk_level'] = RiskLevel.HIGH
+            elif pep:
+                db.session.execute(
+                    update(User).where(User.id.in_(user_ids)).where(stale)
+                    .where(User.risk_level == RiskLevel.LOW)
+                    .values(risk_level=RiskLevel.MEDIUM)
+                    .execution_options(synchronize_session=False)
+                )
+            db.session.execute(
+                update(User).where(User.id.in_(user_ids)).where(stale).values(**values)
+                .execution_options(synchronize_session=False)
+            )
+        db.session.commit()
+
+        # Summaries are recomputed from the committed rows (the UPDATEs bypass the session)
+        review_queue.refresh_many(outcomes)
+        db.session.commit()
+
+    def run(self, force: bool = False) -> Dict:
+        """
+        Rescreen all users not yet screened against the current lists.
+
+        Args:
+            force: Rescreen every user, even those already screened against
+                   the current list version
+
+        Returns:
+            Counts of users screened, flagged and PEP, names screened and
+            users skipped, plus the list version (empty if a run is already
+            in progress; only ``lists_unavailable`` with the reason if no
+            usable lists are loaded, in which case nobody is updated)
+        """
+        if not self._lock.acquire(blocking=False):
+            logger.info("Sanctions rescreening already running, skipping")
+            return {}
+
+        try:
+            self._stats['running'] = True
+            started = datetime.utcnow()
+
+            # Never clear users against missing or partly read lists; they stay as they are
+            unavailable = SanctionsChecker.lists_unavailable()
+            self._stats['last_run_skipped'] = unavailable
+            if unavailable:
+                logger.warning(f"Sanctions rescreening skipped: {unavailable}")
+                return {'lists_unavailable': unavailable}
+
+            list_version = SanctionsChecker.list_version()
+
+            counts = {'users': 0, 'flagged': 0, 'pep': 0, 'names': 0, 'skipped': 0}
+            if not force:
+                counts['skipped'] = (
+                    db.session.query(User.id)
+                    .filter(User.is_admin.is_(False), User.sanctions_list_version == list_version)
+                    .count()
+                )
+
+            results: Dict[str, Dict] = {}
+            after_id = None
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='sanctions-rescreening') as executor:
+                while True:
+                    users = self._users(list_version, after_id, force)
+                    if not users:
+                        break
+                    after_id = users[-1].id
+
+                    names = {user.id: [user.company_name or user.username] + owner_names(user.beneficial_owners)
+                             for user in users}
+                    self._screen_names([name for user_names in names.values() for name in user_names],
+                                       results, executor)
+
+                    outcomes = {}
+                    for user_id, user_names in names.items():
+                        flagged = any(results[name]['sanctions_match'] for name in user_names)
+                        pep = any(results[name]['pep_match'] for name in user_names)
+                        outcomes[user_id] = (flagged, pep)
+                        counts['flagged'] += flagged
+                        counts['pep'] += pep
+                    self._apply(outcomes, list_version, datetime.utcnow(), force)
+                    counts['users'] += len(users)
+
+                    if len(users) < self.page_size:
+                        break
+            counts['names'] = len(results)
+
+            duration_ms = (datetime.utcnow() - started).total_seconds() * 1000
+            self._stats['runs'] += 1
+            self._stats['last_run_at'] = started.isoformat()
+            self._stats['last_run_duration_ms'] = round(duration_ms, 1)
+            self._stats['last_run_list_version'] = list_version
+            self._stats['last_run_counts'] = counts
+            if counts['users']:
+                logger.info(f"Sanctions rescreening against {list_version}: {counts} in {duration_ms:.0f}ms")
+            return dict(counts, list_version=list_version)
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            self._stats['running'] = False
+            self._lock.release()
+
+    def start(self, app, force: bool = False) -> bool:
+        """
+        Run in a background thread; returns False if a run is already in progress
+        """
+        if self._lock.locked():
+            return False
+
+        def run():
+            with app.app_context():
+                try:
+                    self.run(force=force)
+                except Exception as e:
+                    logger.error(f"Sanctions rescreening failed: {e}", exc_info=True)
+                finally:
+                    db.session.remove()
+
+        threading.Thread(target=run, name='sanctions-rescreening', daemon=True).start()
+        return True
+
+    def get_stats(self) -> Dict:
+        """Return rescreening counters for monitoring"""
+        return {
+            'runs': self._stats['runs'],
+            'running': self._stats['running'],
+            'last_run_at': self._stats['last_run_at'],
+            'last_run_duration_ms': self._stats['last_run_duration_ms'],
+            'last_run_list_version': self._stats['last_run_list_version'],
+            'last_run_counts': dict(self._stats['last_run_counts']),
+            'last_run_skipped': self._stats['last_run_skipped'],
+            'lists_unavailable': SanctionsChecker.lists_unavailable(),
+            'list_version': SanctionsChecker.list_version(),
+            'page_size': self.page_size,
+            'workers': self.workers,
+        }
+
+
+sanctions_rescreening = SanctionsRescreening(
+    page_size=Config.SANCTIONS_RESCREEN_PAGE_SIZE,
+    workers=Config.SANCTIONS_RESCREEN_WORKERS
+)
@@ -0,0 +1,166 @@
+"""
+Scenario Grid Service
+
+Evaluates the seller and buyer-swap calculators over a Cartesian grid of
+volume x price x (urgency | use case) in one vectorized pass, for
+sensitivity charts.
+"""
+
+from typing import Dict, List, Optional, Sequence
+import hashlib
+import json
+import logging
+
+import numpy as np
+
+from services.buyer_swap_calculator import BuyerSwapCalculator
+from services.value_calculator import ValueCalculatorService
+from utils.cache import TTLCache
+from utils.compliance_detector import ComplianceDetector
+from utils.serializers import snake_to_camel
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Third grid axis of each calculation
+GRID_CATEGORY_AXIS = {
+    'seller': 'urgency',
+    'buyerSwap': 'useCase',
+}
+
+# Numeric result columns that can be requested per calculation
+GRID_METRICS = {
+    'seller': (
+        'nihao_price', 'nihao_total', 'shanghai_price', 'shanghai_total',
+        'market_impact', 'total_savings', 'savings_percentage'
+    ),
+    'buyerSwap': (
+        'swap_ratio', 'transaction_value', 'wfoe_setup', 'fx_exposure', 'nihao_fee',
+        'time_value', 'cbam_optimization', 'total_savings', 'savings_percentage'
+    ),
+}
+
+DEFAULT_METRICS = ('total_savings', 'savings_percentage')
+
+
+class ScenarioGridService:
+    """
+    Sensitivity surfaces for the value calculators.
+
+    The grid is flattened into arrays of length
+    len(volumes) * len(prices) * len(categories), evaluated with the batch
+    calculators and reshaped into one matrix per metric. Results are
+    memoized by a hash of the normalized parameters (and, for buyer swaps,
+    the compliance state the default ratio depends on).
+    """
+
+    def __init__(self, cache: Optional[TTLCache] = None):
+        """
+        Initialize grid service
+
+        Args:
+            cache: Result cache (default: no caching)
+        """
+        self.cache = cache if cache is not None else TTLCache(ttl=0)
+        self.value_calculator = ValueCalculatorService()
+        self.buyer_swap_calculator = BuyerSwapCalculator()
+
+    @staticmethod
+    def cache_key(params: Dict) -> str:
+        """Stable hash of normalized grid parameters"""
+        encoded = json.dumps(params, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def evaluate(
+        self,
+        calculation: str,
+        volumes: Sequence[float],
+        prices: Sequence[float],
+        categories: Sequence[str],
+        fixed: Optional[Dict] = None,
+        metrics: Optional[List[str]] = None
+    ) -> Dict:
+        """
+        Evaluate a calculation over the full grid.
+
+        Args:
+            calculation: 'seller' or 'buyerSwap'
+            volumes: Volume axis values (tons / EUA)
+            prices: Price axis values (CEA price for sellers, EUA price for swaps)
+            categories: Urgency (seller) or use case (buyerSwap) axis values
+            fixed: Scalar inputs shared by every point (buyerSwap:
+                   ceaPriceRatio, hasChinaOperations)
+            metrics: snake_case result columns from GRID_METRICS (default:
+                     total_savings, savings_percentage)
+
+        Returns:
+            Dict with axes, shape and one nested list per metric indexed
+            [volume][price][category]; 'cached' tells whether it was served
+            from the memo
+        """
+        fixed = fixed or {}
+        metrics = list(metrics or DEFAULT_METRICS)
+        params = {
+            'calculation': calculation,
+            'volumes': [float(v) for v in volumes],
+            'prices': [float(p) for p in prices],
+            'categories': list(categories),
+            'fixed': fixed,
+            'metrics': metrics,
+        }
+        if calculation == 'buyerSwap':
+            params['in_compliance_period'] = ComplianceDetector.is_compliance_period()
+
+        key = self.cache_key(params)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return dict(cached, cached=True)
+
+        shape = (len(volumes), len(prices), len(categories))
+        volume_grid, price_grid, category_grid = np.meshgrid(
+            np.asarray(volumes, dtype=float),
+            np.asarray(prices, dtype=float),
+            np.asarray(categories, dtype=object),
+            indexing='ij'
+        )
+
+        if calculation == 'seller':
+            columns = self.value_calculator.calculate_seller_benefits_batch(
+                volume_grid.ravel(), price_grid.ravel(), category_grid.ravel()
+            )
+        else:
+            eua_prices = price_grid.ravel()
+            cea_ratio = fixed.get('ceaPriceRatio')
+            columns = self.buyer_swap_calculator.calculate_buyer_swap_batch(
+                volume_grid.ravel(),
+                eua_prices,
+                cea_prices=eua_prices * cea_ratio if cea_ratio is not None else None,
+                use_cases=category_grid.ravel(),
+                has_china_operations=bool(fixed.get('hasChinaOperations', False)),
+                in_compliance_period=params['in_compliance_period']
+            )
+
+        result = {
+            'calculation': calculation,
+            'axes': {
+                'volume': params['volumes'],
+                'price': params['prices'],
+                GRID_CATEGORY_AXIS[calculation]: params['categories'],
+            },
+            'shape': list(shape),
+            'metrics': {
+                snake_to_camel(metric): columns[metric].reshape(shape).tolist()
+                for metric in metrics
+            },
+        }
+        self.cache.set(key, result)
+        return dict(result, cached=False)
+
+    def get_stats(self) -> Dict:
+        """Return memo counters for monitoring"""
+        return self.cache.stats()
+
+
+scenario_grid_service = ScenarioGridService(
+    cache=TTLCache(maxsize=Config.CALCULATOR_GRID_CACHE_MAX_SIZE, ttl=Config.CALCULATOR_GRID_CACHE_TTL_SECONDS)
+)
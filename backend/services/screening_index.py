@@ -0,0 +1,316 @@
+"""
+Screening Index
+
+In-memory index of sanctions and PEP list entries for fuzzy name screening.
+Every entry name and alias is indexed by character trigrams and by Soundex
+keys of its tokens. A search collects candidates from those inverted
+indexes and scores only them with Jaro-Winkler/Levenshtein, so a lookup
+touches a few hundred names instead of scanning the whole list.
+"""
+
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import csv
+import logging
+import os
+import threading
+import xml.etree.ElementTree as ET
+
+from utils.name_matching import name_tokens, name_similarity, soundex, trigrams
+
+logger = logging.getLogger(__name__)
+
+LIST_TYPES = ('sanctions', 'pep')
+
+# Votes a shared phonetic key adds to a candidate, relative to one shared trigram
+PHONETIC_WEIGHT = 3
+
+# Elements holding one list entry in XML exports
+XML_ENTRY_TAGS = ('entry', 'record')
+
+
+class ScreeningEntry(NamedTuple):
+    """One person or organisation on a sanctions or PEP list"""
+    entry_id: str
+    name: str
+    list_type: str
+    source: str
+    aliases: Tuple[str, ...] = ()
+    details: Optional[Dict] = None
+
+
+class ScreeningMatch(NamedTuple):
+    """A list entry matching a screened name"""
+    entry: ScreeningEntry
+    matched_name: str
+    score: float
+
+
+class ScreeningIndex:
+    """
+    Trigram and phonetic inverted index over list entry names.
+
+    Candidate generation counts, for every indexed name, the query trigrams
+    and Soundex keys it shares. Grams found in more than
+    ``common_gram_ratio`` of all names (e.g. ``"an "``) are skipped as long
+    as rarer ones remain, which keeps the counting cheap on large lists.
+    Of the best ``max_candidates``, those sharing at least ``min_overlap``
+    of their trigrams (Dice coefficient) with the query are scored with
+    ``name_similarity``, and those reaching ``threshold`` are returned.
+
+    Entries can be added and removed one at a time under one lock, so
+    searches never see a half-applied change. A search holds the lock only
+    while it picks its candidates; scoring runs on that snapshot outside
+    the lock, so concurrent screenings don't queue behind each other.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        max_candidates: int = 200,
+        min_overlap: float = 0.3,
+        common_gram_ratio: float = 0.05
+    ):
+        """
+        Initialize screening index
+
+        Args:
+            threshold: Minimum similarity (0..1) reported as a match
+            max_candidates: Names considered per search
+            min_overlap: Trigram Dice coefficient below which a candidate isn't scored
+            common_gram_ratio: Share of names above which a trigram is too common to vote
+        """
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+        self.min_overlap = min_overlap
+        self.common_gram_ratio = common_gram_ratio
+
+        self._lock = threading.RLock()
+        self._entries: Dict[str, ScreeningEntry] = {}
+        self._names: Dict[int, Tuple[str, str, List[str]]] = {}  # name id -> (entry id, name, tokens)
+        self._entry_names: Dict[str, List[int]] = {}
+        self._grams = defaultdict(set)
+        self._phonetic = defaultdict(set)
+        self._next_name_id = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, entry_id: str) -> bool:
+        return entry_id in self._entries
+
+    def get(self, entry_id: str) -> Optional[ScreeningEntry]:
+        """Entry by id"""
+        return self._entries.get(entry_id)
+
+    def entries(self) -> List[ScreeningEntry]:
+        """All indexed entries"""
+        with self._lock:
+            return list(self._entries.values())
+
+    def add(self, entry: ScreeningEntry):
+        """Index an entry, replacing any entry with the same id"""
+        with self._lock:
+            self.remove(entry.entry_id)
+            name_ids = []
+            for name in dict.fromkeys((entry.name,) + tuple(entry.aliases)):
+                tokens = name_tokens(name)
+                if not tokens:
+                    continue
+                name_id = self._next_name_id
+                self._next_name_id += 1
+                self._names[name_id] = (entry.entry_id, name, tokens)
+                for gram in trigrams(tokens):
+                    self._grams[gram].add(name_id)
+                for key in {soundex(token) for token in tokens}:
+                    self._phonetic[key].add(name_id)
+                name_ids.append(name_id)
+            self._entries[entry.entry_id] = entry
+            self._entry_names[entry.entry_id] = name_ids
+
+    def add_all(self, entries: Iterable[ScreeningEntry]) -> int:
+        """Index several entries; returns how many"""
+        count = 0
+        with self._lock:
+            for entry in entries:
+                self.add(entry)
+                count += 1
+        return count
+
+    def remove(self, entry_id: str) -> bool:
+        """Drop an entry and its names from the index"""
+        with self._lock:
+            if entry_id not in self._entries:
+                return False
+            for name_id in self._entry_names.pop(entry_id):
+                _, _, tokens = self._names.pop(name_id)
+                for gram in trigrams(tokens):
+                    self._discard(self._grams, gram, name_id)
+                for key in {soundex(token) for token in tokens}:
+                    self._discard(self._phonetic, key, name_id)
+            del self._entries[entry_id]
+            return True
+
+    @staticmethod
+    def _discard(postings, key, name_id):
+        names = postings.get(key)
+        if names is not None:
+            names.discard(name_id)
+            if not names:
+                del postings[key]
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._names.clear()
+            self._entry_names.clear()
+            self._grams.clear()
+            self._phonetic.clear()
+
+    def _candidates(self, tokens: List[str]) -> List[int]:
+        """Name ids sharing the most trigrams and phonetic keys with the query"""
+        common = max(50, int(len(self._names) * self.common_gram_ratio))
+        postings = [self._grams[gram] for gram in trigrams(tokens) if gram in self._grams]
+        selective = [names for names in postings if len(names) <= common] or postings
+
+        votes = Counter()
+        for names in selective:
+            votes.update(names)
+        for key in {soundex(token) for token in tokens}:
+            names = self._phonetic.get(key)
+            if names and len(names) <= common:
+                votes.update(dict.fromkeys(names, PHONETIC_WEIGHT))
+        return [name_id for name_id, _ in votes.most_common(self.max_candidates)]
+
+    def search(
+        self,
+        name: str,
+        list_types: Optional[Iterable[str]] = None,
+        threshold: Optional[float] = None,
+        limit: int = 10
+    ) -> List[ScreeningMatch]:
+        """
+        Entries whose name or an alias matches a name.
+
+        Args:
+            name: Name to screen
+            list_types: Restrict to these list types (default: all)
+            threshold: Minimum score (default: the index threshold)
+            limit: Maximum matches returned
+
+        Returns:
+            Best match per entry, highest score first
+        """
+        tokens = name_tokens(name)
+        if not tokens:
+            return []
+        threshold = self.threshold if threshold is None else threshold
+        list_types = set(list_types or LIST_TYPES)
+
+        # Only candidate selection needs the lock; indexed names and entries are never
+        # modified in place, so the snapshot is scored without blocking searches or updates
+        with self._lock:
+            candidates = []
+            for name_id in self._candidates(tokens):
+                entry_id, candidate_name, candidate_tokens = self._names[name_id]
+                entry = self._entries[entry_id]
+                if entry.list_type in list_types:
+                    candidates.append((entry, candidate_name, candidate_tokens))
+
+        grams = trigrams(tokens)
+        best: Dict[str, ScreeningMatch] = {}
+        for entry, candidate_name, candidate_tokens in candidates:
+            # Cheap Dice coefficient on trigrams before the expensive scoring
+            candidate_grams = trigrams(candidate_tokens)
+            if 2 * len(grams & candidate_grams) < self.min_overlap * (len(grams) + len(candidate_grams)):
+                continue
+            score = name_similarity(tokens, candidate_tokens, cutoff=threshold)
+            if score >= threshold and (entry.entry_id not in best or score > best[entry.entry_id].score):
+                best[entry.entry_id] = ScreeningMatch(entry, candidate_name, score)
+        return sorted(best.values(), key=lambda match: -match.score)[:limit]
+
+    def get_stats(self) -> Dict:
+        """Index size for monitoring"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'names': len(self._names),
+                'trigrams': len(self._grams),
+                'phonetic_keys': len(self._phonetic),
+            }
+
+
+def iter_csv_entries(path: str, list_type: Optional[str] = None, source: Optional[str] = None) -> Iterator[ScreeningEntry]:
+    """
+    Read list entries from a CSV export, one row at a time.
+
+    Columns: ``id``, ``name``, optional ``aliases`` (separated by ``;``),
+    ``list_type`` (``sanctions`` / ``pep``, default: list_type) and
+    ``source`` (default: source or the file name). Other non-empty columns
+    become the entry details.
+    """
+    default_source = source or os.path.splitext(os.path.basename(path))[0]
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            name = (row.pop('name', None) or '').strip()
+            if not name:
+                logger.warning(f"{path}:{line}: entry without a name skipped")
+                continue
+            entry_source = (row.pop('source', None) or default_source).strip()
+            entry_id = (row.pop('id', None) or '').strip() or f'{line}'
+            aliases = tuple(alias.strip() for alias in (row.pop('aliases', None) or '').split(';') if alias.strip())
+            entry_type = (row.pop('list_type', None) or list_type or 'sanctions').strip().lower()
+            details = {key: value.strip() for key, value in row.items() if key and value and value.strip()}
+            yield ScreeningEntry(f'{entry_source}:{entry_id}', name, entry_type, entry_source, aliases, details or None)
+
+
+def _local_name(tag: str) -> str:
+    """Tag without its XML namespace"""
+    return tag.rsplit('}', 1)[-1].lower()
+
+
+def iter_xml_entries(path: str, list_type: Optional[str] = None, source: Optional[str] = None) -> Iterator[ScreeningEntry]:
+    """
+    Read list entries from an XML export, one element at a time.
+
+    Each ``<entry>`` (or ``<record>``) element is one entry, with the same
+    fields as the CSV columns given as attributes or child elements;
+    aliases may also be repeated ``<alias>`` children. Parsed elements are
+    dropped from the tree right away, so memory stays flat on large files.
+    """
+    default_source = source or os.path.splitext(os.path.basename(path))[0]
+    parents = []
+    position = 0
+    for event, element in ET.iterparse(path, events=('start', 'end')):
+        if event == 'start':
+            parents.append(element)
+            continue
+        parents.pop()
+        if _local_name(element.tag) not in XML_ENTRY_TAGS:
+            continue
+        position += 1
+
+        fields = {_local_name(key): value for key, value in element.attrib.items()}
+        aliases = []
+        for child in element:
+            name = _local_name(child.tag)
+            text = (child.text or '').strip()
+            if name == 'alias':
+                aliases.append(text)
+            elif text:
+                fields[name] = text
+        aliases.extend((fields.pop('aliases', None) or '').split(';'))
+        if parents:
+            parents[-1].remove(element)
+
+        name = (fields.pop('name', None) or '').strip()
+        if not name:
+            logger.warning(f"{path}: entry {position} without a name skipped")
+            continue
+        entry_source = (fields.pop('source', None) or default_source).strip()
+        entry_id = (fields.pop('id', None) or '').strip() or f'{position}'
+        entry_type = (fields.pop('list_type', None) or list_type or 'sanctions').strip().lower()
+        aliases = tuple(alias.strip() for alias in aliases if alias.strip())
+        details = {key: value.strip() for key, value in fields.items() if value and value.strip()}
+        yield ScreeningEntry(f'{entry_source}:{entry_id}', name, entry_type, entry_source, aliases, details or None)
@@ -7,6 +7,8 @@ Calculates EUA:CEA swap ratios and swap-related benefits.
 from typing import Dict, Optional
 import logging
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 
@@ -112,4 +114,80 @@ class SwapCalculator:
             'value_difference': round(value_difference, 2),
             'swap_ratio': swap_ratio
         }
-
+    
+    def calculate_swap_ratios(
+        self,
+        eua_prices,
+        cea_prices,
+        liquidity_premium=0.1,
+        compliance_adjustment=0.0,
+        volume_discount=0.0
+    ) -> np.ndarray:
+        """
+        Vectorized calculate_swap_ratio over arrays of prices and conditions.
+        
+        All arguments are scalars or 1-D arrays broadcast against each other;
+        per-element semantics (clamping, invalid prices -> 0.0, rounding)
+        match calculate_swap_ratio, except that NumPy rounds exact ties
+        to even.
+        
+        Args:
+            eua_prices: EUA prices in EUR
+            cea_prices: CEA prices in EUR
+            liquidity_premium: Liquidity premium(s) (clamped to 0.0-0.3)
+            compliance_adjustment: Compliance adjustment(s) (clamped to 0.0-0.5)
+            volume_discount: Volume discount(s) (clamped to 0.0-0.2)
+        
+        Returns:
+            Array of swap ratios
+        """
+        eua_prices, cea_prices, liquidity, compliance, volume = np.broadcast_arrays(
+            np.asarray(eua_prices, dtype=float),
+            np.asarray(cea_prices, dtype=float),
+            np.clip(np.asarray(liquidity_premium, dtype=float), 0.0, 0.3),
+            np.clip(np.asarray(compliance_adjustment, dtype=float), 0.0, 0.5),
+            np.clip(np.asarray(volume_discount, dtype=float), 0.0, 0.2)
+        )
+        
+        valid = (eua_prices > 0) & (cea_prices > 0)
+        base_ratio = np.divide(eua_prices, cea_prices, out=np.zeros_like(eua_prices), where=valid)
+        ratios = np.clip(base_ratio + liquidity + compliance - volume, 1.0, 20.0)
+        
+        return np.where(valid, np.round(ratios, 2), 0.0)
+    
+    def calculate_swap_values(
+        self,
+        eua_volumes,
+        eua_prices,
+        swap_ratios
+    ) -> Dict[str, np.ndarray]:
+        """
+        Vectorized calculate_swap_value.
+        
+        Args:
+            eua_volumes: Volumes of EUA to swap
+            eua_prices: EUA prices
+            swap_ratios: EUA:CEA swap ratios (must be > 0)
+        
+        Returns:
+            Dict of column arrays: eua_value, cea_volume, cea_value,
+            value_difference, swap_ratio
+        """
+        eua_volumes, eua_prices, swap_ratios = np.broadcast_arrays(
+            np.asarray(eua_volumes, dtype=float),
+            np.asarray(eua_prices, dtype=float),
+            np.asarray(swap_ratios, dtype=float)
+        )
+        
+        eua_value = eua_volumes * eua_prices
+        cea_volume = eua_volumes * swap_ratios
+        cea_price = np.divide(eua_prices, swap_ratios, out=np.zeros_like(eua_prices), where=swap_ratios != 0)
+        cea_value = cea_volume * cea_price
+        
+        return {
+            'eua_value': np.round(eua_value, 2),
+            'cea_volume': np.round(cea_volume, 2),
+            'cea_value': np.round(cea_value, 2),
+            'value_difference': np.round(eua_value - cea_value, 2),
+            'swap_ratio': swap_ratios
+        }
@@ -0,0 +1,274 @@
+"""
+Swap Quote Engine
+
+Generates SwapQuote rows for pending SwapRequests from the latest EUA/CEA
+prices, SwapCalculator and the China ETS compliance calendar.
+"""
+
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+import queue
+import threading
+import time
+import uuid
+
+from sqlalchemy import insert, update
+
+from database import db
+from models import PriceHistory, SwapRequest, SwapRequestStatus, SwapQuote, SwapQuoteStatus
+from services.buyer_swap_calculator import CEA_TO_EUA_FALLBACK_RATIO, market_conditions
+from services.price_stream import price_hub
+from services.swap_calculator import SwapCalculator
+from utils.compliance_detector import ComplianceDetector
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def latest_cached_prices() -> Tuple[Optional[float], Optional[float]]:
+    """
+    Latest EUA and CEA prices.
+
+    Uses the ticks last published to the price stream hub; on a cold start
+    falls back to the most recent stored EUA price and derives CEA from it.
+
+    Returns:
+        Tuple of (eua_price, cea_price); (None, None) if no price is known
+    """
+    eua_tick = price_hub.latest('eua')
+    cea_tick = price_hub.latest('cea')
+    eua_price = eua_tick['price'] if eua_tick else None
+    cea_price = cea_tick['price'] if cea_tick else None
+
+    if eua_price is None:
+        row = db.session.query(PriceHistory.price).order_by(PriceHistory.timestamp.desc()).first()
+        eua_price = float(row[0]) if row else None
+    if eua_price is not None and cea_price is None:
+        cea_price = eua_price * CEA_TO_EUA_FALLBACK_RATIO
+    return eua_price, cea_price
+
+
+class SwapQuoteEngine:
+    """
+    Automated quoting for swap requests.
+
+    New request ids are pushed onto an in-process queue and a worker thread
+    drains it in batches: prices and compliance state are read once per
+    batch, quotes are written with one bulk INSERT and the requests are
+    flipped to QUOTED with one conditional UPDATE, all in one transaction.
+    A periodic ``quote_pending`` sweep picks up requests the queue missed
+    (other worker processes, restarts, stale prices at submit time).
+    """
+
+    def __init__(
+        self,
+        validity_minutes: int = 1440,
+        fee_percent: float = 0.5,
+        batch_size: int = 200,
+        batch_wait_seconds: float = 0.05,
+        price_provider: Callable[[], Tuple[Optional[float], Optional[float]]] = None
+    ):
+        """
+        Initialize quote engine
+
+        Args:
+            validity_minutes: Quote validity (sets SwapQuote.valid_until)
+            fee_percent: Facilitation fee in percent of EUA value
+            batch_size: Maximum requests quoted per transaction
+            batch_wait_seconds: How long the worker waits to fill a batch
+            price_provider: Callable returning (eua_price, cea_price)
+        """
+        self.validity_minutes = validity_minutes
+        self.fee_percent = fee_percent
+        self.batch_size = batch_size
+        self.batch_wait_seconds = batch_wait_seconds
+        self.price_provider = price_provider or latest_cached_prices
+        self.swap_calculator = SwapCalculator()
+
+        self._queue = queue.Queue()
+        self._worker = None
+        self._app = None
+        self._lock = threading.Lock()
+        self._stats = {
+            'batches': 0,
+            'quoted': 0,
+            'skipped_no_price': 0,
+            'last_batch_at': None,
+            'last_batch_size': 0,
+            'last_batch_duration_ms': None,
+        }
+
+    def build_quote_row(
+        self,
+        swap_request: SwapRequest,
+        eua_price: float,
+        cea_price: float,
+        in_compliance_period: bool,
+        now: datetime
+    ) -> Dict:
+        """
+        Build a swap_quotes row for one request.
+
+        Returns:
+            Column dictionary for a bulk INSERT
+        """
+        eua_volume = int(swap_request.eua_volume)
+        ratio = self.swap_calculator.calculate_swap_ratio(
+            eua_price, cea_price, market_conditions(eua_volume, in_compliance_period)
+        )
+
+        cea_volume = int(eua_volume * ratio)
+        cea_value = cea_volume * cea_price
+        eua_value = eua_volume * eua_price
+        fee_amount = eua_value * self.fee_percent / 100
+
+        return {
+            'id': str(uuid.uuid4()),
+            'swap_request_id': swap_request.id,
+            'offered_ratio': ratio,
+            'cea_volume': cea_volume,
+            'cea_price': round(cea_price, 2),
+            'cea_value': round(cea_value, 2),
+            'eua_value': round(eua_value, 2),
+            'premium': round(cea_value - eua_value, 2),
+            'facilitation_fee_percent': self.fee_percent,
+            'facilitation_fee_amount': round(fee_amount, 2),
+            'settlement_timeline': swap_request.settlement_timeline,
+            'insurance_included': bool(swap_request.insurance_required),
+            'status': SwapQuoteStatus.PENDING,
+            'valid_until': now + timedelta(minutes=self.validity_minutes),
+            'created_at': now,
+            'updated_at': now,
+        }
+
+    def quote_requests(self, request_ids: Optional[Iterable[str]] = None) -> int:
+        """
+        Quote a batch of pending requests in one transaction.
+
+        Args:
+            request_ids: Requests to quote; None quotes the oldest pending
+                         requests (up to batch_size)
+
+        Returns:
+            Number of quotes created
+        """
+        with self._lock:
+            started = time.monotonic()
+            query = SwapRequest.query.filter(SwapRequest.status == SwapRequestStatus.PENDING)
+            if request_ids is not None:
+                request_ids = list(request_ids)
+                if not request_ids:
+                    return 0
+                query = query.filter(SwapRequest.id.in_(request_ids))
+            swap_requests = query.order_by(SwapRequest.created_at).limit(self.batch_size).all()
+            if not swap_requests:
+                return 0
+
+            eua_price, cea_price = self.price_provider()
+            if not eua_price or not cea_price:
+                logger.warning(f"Swap quoting skipped for {len(swap_requests)} request(s): no price available")
+                self._stats['skipped_no_price'] += len(swap_requests)
+                db.session.rollback()
+                return 0
+
+            now = datetime.utcnow()
+            in_compliance_period = ComplianceDetector.is_compliance_period(now.date())
+            ids = [swap_request.id for swap_request in swap_requests]
+            rows = {
+                swap_request.id: self.build_quote_row(swap_request, eua_price, cea_price, in_compliance_period, now)
+                for swap_request in swap_requests
+            }
+
+            try:
+                # Claim all requests with one conditional UPDATE; only fall back
+                # to per-row claims if another worker got to some of them first
+                claimed = self._claim(ids, now)
+                if claimed != len(ids):
+                    db.session.rollback()
+                    ids = [request_id for request_id in ids if self._claim([request_id], now) == 1]
+                if ids:
+                    db.session.execute(insert(SwapQuote), [rows[request_id] for request_id in ids])
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+            duration_ms = (time.monotonic() - started) * 1000
+            self._stats['batches'] += 1
+            self._stats['quoted'] += len(ids)
+            self._stats['last_batch_at'] = now.isoformat()
+            self._stats['last_batch_size'] = len(ids)
+            self._stats['last_batch_duration_ms'] = round(duration_ms, 1)
+            logger.info(f"Quoted {len(ids)} swap request(s) in {duration_ms:.0f}ms")
+            return len(ids)
+
+    def _claim(self, ids: List[str], now: datetime) -> int:
+        """Flip PENDING requests to QUOTED, returning the number claimed"""
+        result = db.session.execute(
+            update(SwapRequest)
+            .where(SwapRequest.id.in_(ids))
+            .where(SwapRequest.status == SwapRequestStatus.PENDING)
+            .values(status=SwapRequestStatus.QUOTED, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount or 0
+
+    def quote_pending(self) -> int:
+        """Quote all pending requests in batches (scheduled sweep)"""
+        total = 0
+        while True:
+            quoted = self.quote_requests()
+            total += quoted
+            if quoted < self.batch_size:
+                return total
+
+    def enqueue(self, request_id: str):
+        """Queue a new request for quoting (no-op unless the worker is running)"""
+        if self._worker is not None:
+            self._queue.put(request_id)
+
+    def start(self, app):
+        """Start the background worker that drains the queue"""
+        if self._worker is not None:
+            return
+        self._app = app
+        self._worker = threading.Thread(target=self._run, name='swap-quote-engine', daemon=True)
+        self._worker.start()
+
+    def _run(self):
+        """Worker loop: collect ids for up to batch_wait_seconds, then quote them together"""
+        while True:
+            request_ids = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_wait_seconds
+            while len(request_ids) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request_ids.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            with self._app.app_context():
+                try:
+                    self.quote_requests(request_ids)
+                except Exception as e:
+                    logger.error(f"Swap quoting failed: {e}", exc_info=True)
+                finally:
+                    db.session.remove()
+
+    def get_stats(self) -> Dict:
+        """Return engine counters for monitoring"""
+        stats = dict(self._stats)
+        stats['queue_size'] = self._queue.qsize()
+        stats['validity_minutes'] = self.validity_minutes
+        stats['batch_size'] = self.batch_size
+        return stats
+
+
+swap_quote_engine = SwapQuoteEngine(
+    validity_minutes=Config.SWAP_QUOTE_VALIDITY_MINUTES,
+    fee_percent=Config.SWAP_QUOTE_FEE_PERCENT,
+    batch_size=Config.SWAP_QUOTE_BATCH_SIZE
+)
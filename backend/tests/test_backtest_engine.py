@@ -0,0 +1,136 @@
+"""
+Unit tests for the market opportunity backtest engine
+
+Tests ensure that:
+- Vectorized signals match the scalar detectors on every historical date
+- Signal trades are valued over the holding horizon
+- Years of daily history replay well under a second
+- The backtest endpoint validates its parameters
+"""
+import pytest
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask
+from api.market_opportunities import market_opportunities_bp
+from services.backtest_engine import BacktestEngine, backtest_engine
+from services.market_opportunity_detector import MarketOpportunityDetector
+
+
+def synthetic_history(years=10, seed=3):
+    """Daily EUA/CEA random walks with the EUA/CEA ratio moving around 10"""
+    rng = np.random.default_rng(seed)
+    days = years * 365
+    dates = [(date(2015, 1, 1) + timedelta(days=i)).isoformat() for i in range(days)]
+    eua = 60 * np.exp(np.cumsum(rng.normal(0, 0.015, days)))
+    ratio = 10 + np.cumsum(rng.normal(0, 0.05, days)).clip(-3, 3)
+    return dates, eua.tolist(), (eua / ratio).tolist()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Create test client backed by synthetic history"""
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.register_blueprint(market_opportunities_bp)
+    monkeypatch.setattr(backtest_engine, 'history_loader', lambda: synthetic_history(years=3))
+    backtest_engine.history_cache.clear()
+    yield app.test_client()
+    backtest_engine.history_cache.clear()
+
+
+def test_signals_match_scalar_detectors():
+    """Each date fires exactly when the scalar detector reports an opportunity"""
+    dates, eua, cea = synthetic_history(years=2)
+    detector = MarketOpportunityDetector()
+    arbitrage = detector.arbitrage_signals(eua, cea, dates)
+    swap = detector.swap_optimization_signals(eua, cea, dates)
+    crisis = detector.liquidity_crisis_signals(dates)
+
+    for i in range(0, len(dates), 7):
+        check_date = date.fromisoformat(dates[i])
+        scalar = detector.detect_arbitrage_opportunities(eua[i], cea[i], check_date=check_date)
+        assert arbitrage['fired'][i] == bool(scalar)
+        if scalar:
+            assert arbitrage['swap_ratio'][i] == pytest.approx(scalar[0]['swap_ratio'], abs=0.0101)
+
+        scalar = detector.detect_swap_optimization(eua[i], cea[i], check_date)
+        assert swap['fired'][i] == bool(scalar)
+        if scalar:
+            assert swap['swap_ratio'][i] == pytest.approx(scalar[0]['swap_ratio'], abs=0.0101)
+
+        assert crisis['fired'][i] == bool(detector.detect_liquidity_crisis(check_date))
+
+
+def test_signal_pnl_over_horizon():
+    """Trades exit at the first date at least horizon_days later"""
+    dates = ['2024-12-01', '2024-12-10', '2024-12-20', '2025-01-15']
+    eua = [80.0, 80.0, 70.0, 90.0]
+    cea = [8.0, 8.0, 10.0, 9.0]
+    engine = BacktestEngine(history_loader=lambda: (dates, eua, cea))
+
+    result = engine.run(horizon_days=15, signal_types=['liquidity_crisis'])
+    crisis = result['signals']['liquidity_crisis']
+
+    # Signals on Dec 1/10/20; Dec 1 exits on Dec 20, the others on Jan 15
+    assert crisis['signals'] == 3
+    assert crisis['evaluated'] == 3
+    assert crisis['hits'] == 2
+    assert crisis['best_pnl_percent'] == 25.0
+    assert crisis['worst_pnl_percent'] == -10.0
+    assert result['days'] == 4
+
+    result = engine.run(start=date(2024, 12, 5), end=date(2024, 12, 31), horizon_days=15, signal_types=['arbitrage'])
+    arbitrage = result['signals']['arbitrage']
+    # Dec 10: ratio 80/8 + 0.1 + 0.2 = 10.3 CEA, worth 92.7 vs 90 for the EUA on Jan 15
+    assert arbitrage['signals'] == 1
+    assert arbitrage['mean_pnl_percent'] == pytest.approx((10.3 * 9 - 90) / 80 * 100)
+
+
+def test_years_of_history_under_a_second():
+    """Ten years of daily history replay in well under a second"""
+    history = synthetic_history(years=10)
+    engine = BacktestEngine(history_loader=lambda: history)
+    engine.get_history()
+
+    started = time.perf_counter()
+    result = engine.run()
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.5
+    assert result['days'] == 3650
+    assert set(result['signals']) == {'arbitrage', 'swap_optimization', 'liquidity_crisis'}
+    assert result['signals']['arbitrage']['signals'] > 0
+
+
+def test_backtest_endpoint(client):
+    """The endpoint returns camelCase statistics for the requested signals"""
+    response = client.get('/api/market/opportunities/backtest', query_string={
+        'start': '2016-01-01', 'horizonDays': 10, 'type': 'arbitrage,liquidity_crisis'
+    })
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['start'] == '2016-01-01'
+    assert data['horizonDays'] == 10
+    assert set(data['signals']) == {'arbitrage', 'liquidity_crisis'}
+    assert 'hitRate' in data['signals']['arbitrage']
+
+
+def test_backtest_endpoint_validation(client, monkeypatch):
+    """Bad parameters are rejected; missing history is reported"""
+    for params in ({'start': 'yesterday'}, {'start': '2017-01-01', 'end': '2016-01-01'},
+                   {'horizonDays': 0}, {'minPriceGap': -1}, {'type': 'momentum'}):
+        response = client.get('/api/market/opportunities/backtest', query_string=params)
+        assert response.status_code == 400, params
+
+    monkeypatch.setattr(backtest_engine, 'history_loader', lambda: ([], [], []))
+    backtest_engine.history_cache.clear()
+    response = client.get('/api/market/opportunities/backtest')
+    assert response.status_code == 503
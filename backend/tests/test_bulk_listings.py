@@ -0,0 +1,142 @@
+"""
+Unit tests for the bulk listing and demand endpoints
+
+Tests ensure that:
+- JSON array, wrapped object and NDJSON payloads are accepted
+- Valid items are inserted together and invalid items are reported per index
+- The seller/buyer code is assigned once and shared by the whole batch
+- Oversized batches and wrong roles are rejected
+"""
+import json
+import pytest
+import sys
+import uuid
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask
+from database import db
+from models import User, UserRole, Listing, DemandListing, IntendedUse
+from api.seller import seller_bp
+from api.buyer import buyer_bp
+from config import Config
+from utils.identity import identity_cache
+
+
+@pytest.fixture
+def app():
+    """Create Flask app for testing"""
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+
+    app.register_blueprint(seller_bp, url_prefix='/api/seller')
+    app.register_blueprint(buyer_bp, url_prefix='/api/buyer')
+
+    with app.app_context():
+        db.create_all()
+        identity_cache.clear()
+        yield app
+        identity_cache.clear()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+
+def _create_user(role):
+    user_id = str(uuid.uuid4())
+    db.session.add(User(
+        id=user_id, username=f'user-{user_id[:8]}', email=f'{user_id[:8]}@example.com',
+        password_hash='x', role=role
+    ))
+    db.session.commit()
+    return user_id
+
+
+def _listing(volume=1000, price=8.5):
+    return {'volume': volume, 'price_per_tonne': price, 'currency': 'EUR', 'timeline': 'T+2'}
+
+
+def test_listing_batch_partial_success(client, app):
+    """Valid listings are created; invalid ones are reported by index"""
+    seller_id = _create_user(UserRole.CEA_SELLER)
+    items = [_listing(), {'volume': 500}, _listing(volume='abc'), _listing(volume=-1), _listing(2000, 9.0)]
+
+    response = client.post('/api/seller/listings/batch', json=items, headers={'X-User-ID': seller_id})
+
+    assert response.status_code == 207
+    data = response.get_json()
+    assert data['createdCount'] == 2
+    assert [item['index'] for item in data['created']] == [0, 4]
+    assert [(e['index'], e['code']) for e in data['errors']] == [
+        (1, 'MISSING_PRICE_PER_TONNE'), (2, 'INVALID_VALUE'), (3, 'INVALID_VALUE')
+    ]
+
+    listings = Listing.query.filter_by(seller_id=seller_id).all()
+    assert len(listings) == 2
+    seller = db.session.get(User, seller_id)
+    assert seller.seller_code is not None
+    assert {listing.seller_code for listing in listings} == {seller.seller_code}
+    assert all(listing.expires_at is not None for listing in listings)
+
+
+def test_listing_batch_ndjson(client, app):
+    """NDJSON lines are parsed individually; malformed lines become item errors"""
+    seller_id = _create_user(UserRole.CEA_SELLER)
+    body = '\n'.join([json.dumps(_listing()), '{not json', '', json.dumps(_listing(300))])
+
+    response = client.post(
+        '/api/seller/listings/batch', data=body,
+        content_type='application/x-ndjson', headers={'X-User-ID': seller_id}
+    )
+
+    assert response.status_code == 207
+    data = response.get_json()
+    assert data['total'] == 3
+    assert data['createdCount'] == 2
+    assert data['errors'][0]['index'] == 1
+    assert data['errors'][0]['code'] == 'INVALID_JSON'
+
+
+def test_demand_batch_wrapped_object(client, app):
+    """{"demands": [...]} payloads are accepted for buyers"""
+    buyer_id = _create_user(UserRole.CEA_BUYER)
+    demand = {'volume_needed': 5000, 'max_price': 9.5, 'currency': 'EUR', 'timeline': 'T+5',
+              'intended_use': 'cbam_hedge'}
+
+    response = client.post(
+        '/api/buyer/demand/batch',
+        json={'demands': [demand, dict(demand, intended_use='bogus')]},
+        headers={'X-User-ID': buyer_id}
+    )
+
+    assert response.status_code == 207
+    data = response.get_json()
+    assert data['errors'][0]['code'] == 'INVALID_INTENDED_USE'
+    demand = DemandListing.query.filter_by(buyer_id=buyer_id).one()
+    assert demand.intended_use == IntendedUse.CBAM_HEDGE
+
+
+def test_batch_rejections(client, app, monkeypatch):
+    """Wrong role, malformed body and oversized batches are rejected"""
+    buyer_id = _create_user(UserRole.CEA_BUYER)
+    seller_id = _create_user(UserRole.CEA_SELLER)
+
+    response = client.post('/api/seller/listings/batch', json=[_listing()], headers={'X-User-ID': buyer_id})
+    assert response.status_code == 403
+
+    response = client.post('/api/seller/listings/batch', json={'foo': 1}, headers={'X-User-ID': seller_id})
+    assert response.status_code == 400
+
+    monkeypatch.setattr(Config, 'BULK_MAX_ITEMS', 2)
+    response = client.post('/api/seller/listings/batch', json=[_listing()] * 3, headers={'X-User-ID': seller_id})
+    assert response.status_code == 413
+    assert Listing.query.count() == 0
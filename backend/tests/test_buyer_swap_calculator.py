@@ -0,0 +1,92 @@
+"""
+Unit tests for the buyer swap calculator service
+
+Tests ensure that:
+- Results match the buyer-swap-scenario formulas
+- Identical (normalized) inputs are served from the LRU cache
+- The compliance state of the day is part of the cache key
+- Callers can't modify cached results
+"""
+import pytest
+import sys
+import uuid
+from datetime import date
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask
+from api.calculator import calculator_bp
+from services.buyer_swap_calculator import BuyerSwapCalculator, _buyer_swap_benefits
+
+OFF_SEASON = date(2024, 6, 1)
+COMPLIANCE_PERIOD = date(2024, 11, 1)
+
+
+@pytest.fixture
+def calculator():
+    """Buyer swap calculator with an empty cache"""
+    _buyer_swap_benefits.cache_clear()
+    return BuyerSwapCalculator()
+
+
+def test_cbam_scenario_values(calculator):
+    """Savings follow the documented cost assumptions"""
+    result = calculator.calculate_buyer_swap_benefits(
+        10000, 80.0, cea_price=8.0, use_case='cbam', check_date=OFF_SEASON
+    )
+
+    # ratio = 80 / 8 + 0.1 liquidity premium
+    assert result['direct_swap_costs'] == {
+        'wfoe_setup': 75000, 'time_to_market': '6-12 months', 'capital_controls_risk': True, 'fx_exposure': 12000.0
+    }
+    assert result['nihao_swap']['fee'] == 12000.0
+    assert result['benefits']['cbam_optimization'] == 4040000.0
+    # 75000 + 5% of 800000 - 12000 + 4040000
+    assert result['total_savings'] == 4143000.0
+    assert result['savings_percentage'] == 517.88
+
+    ops = calculator.calculate_buyer_swap_benefits(10000, 80.0, has_china_operations=True, check_date=OFF_SEASON)
+    assert ops['direct_swap_costs']['wfoe_setup'] == 0
+    assert 'cbam_optimization' not in ops['benefits']
+    assert ops['total_savings'] == -4000.0
+
+
+def test_repeated_inputs_hit_cache(calculator):
+    """Equivalent inputs share one cache entry; the compliance state splits them"""
+    calculator.calculate_buyer_swap_benefits(10000, 80.0, check_date=OFF_SEASON)
+    calculator.calculate_buyer_swap_benefits(10000.0, '80', use_case='unknown', check_date=OFF_SEASON)
+    assert calculator.cache_info()['hits'] == 1
+
+    off_season = calculator.calculate_buyer_swap_benefits(10000, 80.0, use_case='cbam', check_date=OFF_SEASON)
+    in_period = calculator.calculate_buyer_swap_benefits(10000, 80.0, use_case='cbam', check_date=COMPLIANCE_PERIOD)
+    assert in_period['benefits']['cbam_optimization'] > off_season['benefits']['cbam_optimization']
+    assert calculator.cache_info()['misses'] == 3
+
+
+def test_cached_result_is_not_shared(calculator):
+    """Modifying a returned result doesn't change later results"""
+    first = calculator.calculate_buyer_swap_benefits(10000, 80.0, check_date=OFF_SEASON)
+    first['benefits']['wfoe_savings'] = 0
+    second = calculator.calculate_buyer_swap_benefits(10000, 80.0, check_date=OFF_SEASON)
+    assert second['benefits']['wfoe_savings'] == 75000
+
+
+def test_endpoint_uses_service(calculator):
+    """The endpoint returns the service result in camelCase"""
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.register_blueprint(calculator_bp)
+
+    response = app.test_client().post(
+        '/api/calculator/buyer-swap-scenario',
+        json={'euaVolume': 10000, 'euaPrice': 80.0, 'ceaPrice': 8.0, 'swapRatio': 10.5, 'useCase': 'cbam'},
+        headers={'X-User-ID': str(uuid.uuid4())}
+    )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['directSwapCosts']['timeToMarket'] == '6-12 months'
+    assert data['benefits']['cbamOptimization'] == 4200000.0
+    assert data['totalSavings'] == 4303000.0
@@ -0,0 +1,142 @@
+"""
+Unit tests for the vectorized calculators and the calculator batch endpoint
+
+Tests ensure that:
+- Batch swap ratios/values and seller benefits match the scalar methods
+- The batch endpoint broadcasts scalar inputs and returns column-oriented results
+- Invalid inputs are reported with the offending index; oversized batches are rejected
+"""
+import pytest
+import sys
+import uuid
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask
+from config import Config
+from api.calculator import calculator_bp
+from services.swap_calculator import SwapCalculator
+from services.value_calculator import ValueCalculatorService
+
+USER_ID = str(uuid.uuid4())
+
+# NumPy rounds exact half-cent ties to even, Python's round() may not
+CENT = 0.0101
+
+
+@pytest.fixture
+def client():
+    """Create test client"""
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.register_blueprint(calculator_bp)
+    return app.test_client()
+
+
+def test_swap_batch_matches_scalar():
+    """calculate_swap_ratios/values agree with the scalar methods element-wise (to the cent)"""
+    calculator = SwapCalculator()
+    eua_prices = [88.0, 70.0, 50.0, 0.0, 88.0]
+    cea_prices = [8.0, 10.0, 60.0, 8.0, 1.0]
+    liquidity = [0.1, 0.5, 0.0, 0.1, 0.1]
+    compliance = [0.2, 0.0, 0.0, 0.0, 0.0]
+    volume_discount = [0.0, 0.1, 0.0, 0.0, 0.0]
+
+    ratios = calculator.calculate_swap_ratios(eua_prices, cea_prices, liquidity, compliance, volume_discount)
+    for i in range(len(eua_prices)):
+        expected = calculator.calculate_swap_ratio(eua_prices[i], cea_prices[i], {
+            'liquidity_premium': liquidity[i],
+            'compliance_adjustment': compliance[i],
+            'volume_discount': volume_discount[i]
+        })
+        assert ratios[i] == pytest.approx(expected, abs=CENT)
+
+    values = calculator.calculate_swap_values([1000, 2500], [88.0, 70.0], ratios[:2])
+    for i, volume in enumerate([1000, 2500]):
+        expected = calculator.calculate_swap_value(volume, [88.0, 70.0][i], float(ratios[i]))
+        for key in ('eua_value', 'cea_volume', 'cea_value', 'value_difference'):
+            assert values[key][i] == pytest.approx(expected[key], abs=CENT)
+
+
+def test_seller_batch_matches_scalar():
+    """calculate_seller_benefits_batch agrees with calculate_seller_benefits (to the cent)"""
+    service = ValueCalculatorService()
+    volumes = [100000, 1500000, 2500000, 800000]
+    prices = [8.0, 8.5, 7.2, 9.1]
+    urgencies = ['normal', 'urgent', 'panic', 'normal']
+
+    batch = service.calculate_seller_benefits_batch(volumes, prices, urgencies)
+    for i in range(len(volumes)):
+        scalar = service.calculate_seller_benefits(volumes[i], prices[i], urgencies[i])
+        assert batch['nihao_price'][i] == pytest.approx(scalar['nihao_offer']['price'], abs=CENT)
+        assert batch['nihao_total'][i] == pytest.approx(scalar['nihao_offer']['total_value'], abs=CENT)
+        assert batch['shanghai_price'][i] == pytest.approx(scalar['shanghai_alternative']['price'], abs=CENT)
+        assert batch['shanghai_total'][i] == pytest.approx(scalar['shanghai_alternative']['total_value'], abs=CENT)
+        assert batch['shanghai_execution_time'][i] == scalar['shanghai_alternative']['execution_time']
+        assert batch['market_impact'][i] == pytest.approx(scalar['shanghai_alternative']['market_impact'], abs=CENT)
+        assert batch['total_savings'][i] == pytest.approx(scalar['total_savings'], abs=CENT)
+        assert batch['savings_percentage'][i] == pytest.approx(scalar['savings_percentage'], abs=CENT)
+
+
+def test_batch_endpoint_broadcasts_scalars(client):
+    """Scalar inputs apply to every scenario; results are columns"""
+    volumes = list(range(100000, 3100000, 1000))
+    response = client.post(
+        '/api/calculator/batch',
+        json={'calculation': 'seller', 'inputs': {'volume': volumes, 'currentPrice': 8.0, 'urgency': 'bogus'}},
+        headers={'X-User-ID': USER_ID}
+    )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['count'] == len(volumes)
+    assert len(data['results']['totalSavings']) == len(volumes)
+    assert data['results']['marketImpact'][0] == 7.5
+    assert data['results']['marketImpact'][-1] == 25.0
+    # Unknown urgency falls back to normal (2% Nihao discount)
+    assert set(data['results']['nihaoPrice']) == {7.84}
+
+
+def test_batch_endpoint_swap_defaults(client):
+    """Swap batches default CEA price and volume discount like the single endpoint"""
+    response = client.post(
+        '/api/calculator/batch',
+        json={'calculation': 'swap', 'inputs': {
+            'euaVolume': [1000, 2000000], 'euaPrice': 88.0, 'complianceAdjustment': 0.0
+        }},
+        headers={'X-User-ID': USER_ID}
+    )
+
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert results['ceaPrice'] == [52.8, 52.8]
+    # 88 / 52.8 = 1.67; +0.1 liquidity, -0.1 discount above 1M EUA
+    assert results['swapRatio'] == [1.77, 1.67]
+    assert results['euaValue'] == [88000.0, 176000000.0]
+
+
+def test_batch_endpoint_validation(client, monkeypatch):
+    """Invalid values name the index; mismatched and oversized batches are rejected"""
+    headers = {'X-User-ID': USER_ID}
+
+    response = client.post('/api/calculator/batch', json={
+        'calculation': 'seller', 'inputs': {'volume': [1000, -5, 2000], 'currentPrice': 8.0}
+    }, headers=headers)
+    assert response.status_code == 400
+    assert 'volume[1]' in response.get_json()['error']
+
+    response = client.post('/api/calculator/batch', json={
+        'calculation': 'seller', 'inputs': {'volume': [1000, 2000], 'currentPrice': [8.0]}
+    }, headers=headers)
+    assert response.status_code == 400
+
+    response = client.post('/api/calculator/batch', json={'calculation': 'nope', 'inputs': {}}, headers=headers)
+    assert response.status_code == 400
+
+    monkeypatch.setattr(Config, 'CALCULATOR_BATCH_MAX_SCENARIOS', 2)
+    response = client.post('/api/calculator/batch', json={
+        'calculation': 'seller', 'inputs': {'volume': [1, 2, 3], 'currentPrice': 8.0}
+    }, headers=headers)
+    assert response.status_code == 413
@@ -0,0 +1,115 @@
+"""
+Unit tests for the calculator grid (sensitivity surface) endpoint
+
+Tests ensure that:
+- Seller grids match calculate_seller_benefits at every point
+- Buyer-swap grids match the buyer-swap-scenario endpoint
+- Repeated grids are served from the memo
+- Invalid axes/metrics and oversized grids are rejected
+"""
+import pytest
+import sys
+import uuid
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask
+from config import Config
+from api.calculator import calculator_bp
+from services.scenario_grid import scenario_grid_service
+from services.value_calculator import ValueCalculatorService
+
+HEADERS = {'X-User-ID': str(uuid.uuid4())}
+
+
+@pytest.fixture
+def client():
+    """Create test client"""
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.register_blueprint(calculator_bp)
+    scenario_grid_service.cache.clear()
+    yield app.test_client()
+    scenario_grid_service.cache.clear()
+
+
+def test_seller_grid_matches_scalar(client):
+    """Each grid point equals the single-scenario calculation"""
+    response = client.post('/api/calculator/grid', json={
+        'calculation': 'seller',
+        'axes': {
+            'volume': {'min': 100000, 'max': 3000000, 'steps': 4},
+            'price': [7.5, 8.0, 9.25],
+            'urgency': ['normal', 'panic']
+        },
+        'metrics': ['totalSavings', 'marketImpact']
+    }, headers=HEADERS)
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['shape'] == [4, 3, 2]
+    assert data['axes']['urgency'] == ['normal', 'panic']
+    assert set(data['metrics']) == {'totalSavings', 'marketImpact'}
+
+    service = ValueCalculatorService()
+    for i, volume in enumerate(data['axes']['volume']):
+        for j, price in enumerate(data['axes']['price']):
+            for k, urgency in enumerate(data['axes']['urgency']):
+                scalar = service.calculate_seller_benefits(volume, price, urgency)
+                assert data['metrics']['totalSavings'][i][j][k] == pytest.approx(scalar['total_savings'], abs=0.0101)
+                assert data['metrics']['marketImpact'][i][j][k] == scalar['shanghai_alternative']['market_impact']
+
+
+def test_buyer_swap_grid_matches_endpoint(client):
+    """Buyer-swap grid points equal the buyer-swap-scenario endpoint"""
+    response = client.post('/api/calculator/grid', json={
+        'calculation': 'buyerSwap',
+        'axes': {'volume': [10000, 2000000], 'price': [70.0, 88.0], 'useCase': ['compliance', 'cbam']}
+    }, headers=HEADERS)
+
+    assert response.status_code == 200
+    data = response.get_json()
+    for i, volume in enumerate(data['axes']['volume']):
+        for j, price in enumerate(data['axes']['price']):
+            for k, use_case in enumerate(data['axes']['useCase']):
+                single = client.post('/api/calculator/buyer-swap-scenario', json={
+                    'euaVolume': volume, 'euaPrice': price, 'useCase': use_case
+                }, headers=HEADERS).get_json()
+                assert data['metrics']['totalSavings'][i][j][k] == pytest.approx(single['totalSavings'], abs=0.0101)
+
+
+def test_repeated_grid_served_from_cache(client):
+    """The same parameters hit the memo; different ones miss"""
+    body = {'calculation': 'seller', 'axes': {'volume': [100000, 200000], 'price': [8.0]}}
+
+    first = client.post('/api/calculator/grid', json=body, headers=HEADERS).get_json()
+    second = client.post('/api/calculator/grid', json=body, headers=HEADERS).get_json()
+    body['axes']['price'] = [8.5]
+    third = client.post('/api/calculator/grid', json=body, headers=HEADERS).get_json()
+
+    assert first['cached'] is False
+    assert second['cached'] is True
+    assert second['metrics'] == first['metrics']
+    assert third['cached'] is False
+
+
+def test_grid_validation(client, monkeypatch):
+    """Bad axes, unknown metrics and oversized grids are rejected"""
+    response = client.post('/api/calculator/grid', json={
+        'calculation': 'seller', 'axes': {'volume': [-1], 'price': [8.0]}
+    }, headers=HEADERS)
+    assert response.status_code == 400
+
+    response = client.post('/api/calculator/grid', json={
+        'calculation': 'seller', 'axes': {'volume': [1000], 'price': [8.0]}, 'metrics': ['swapRatio']
+    }, headers=HEADERS)
+    assert response.status_code == 400
+
+    monkeypatch.setattr(Config, 'CALCULATOR_GRID_MAX_POINTS', 100)
+    response = client.post('/api/calculator/grid', json={
+        'calculation': 'seller',
+        'axes': {'volume': {'min': 1000, 'max': 100000, 'steps': 20}, 'price': {'min': 5, 'max': 10, 'steps': 10}}
+    }, headers=HEADERS)
+    assert response.status_code == 413
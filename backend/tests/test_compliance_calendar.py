@@ -0,0 +1,101 @@
+"""
+Unit tests for the precomputed compliance calendar
+
+Tests ensure that:
+- Calendar lookups match the date arithmetic they replace
+- Dates outside the precomputed range extend it
+- Per-year deadlines and holidays are honoured
+- Vectorized lookups equal the single-date ones
+"""
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.compliance_calendar import ComplianceCalendar
+from utils.compliance_detector import ComplianceDetector
+
+
+def reference_days_until(check_date):
+    """Days to the next December 31 (the original calculation)"""
+    days_until = (date(check_date.year, 12, 31) - check_date).days
+    if days_until < 0:
+        days_until = (date(check_date.year + 1, 12, 31) - check_date).days
+    return days_until
+
+
+def reference_condition(days_until):
+    if days_until <= 30:
+        return 'panic'
+    if days_until <= 90:
+        return 'compliance'
+    return 'normal'
+
+
+def test_matches_date_arithmetic():
+    """Default calendar reproduces the December 31 rules for every day"""
+    calendar = ComplianceCalendar(2020, 2022)
+    day = date(2020, 1, 1)
+    while day <= date(2022, 12, 31):
+        days_until = reference_days_until(day)
+        assert calendar.days_until_deadline(day) == days_until
+        assert calendar.market_condition(day) == reference_condition(days_until)
+        assert calendar.is_compliance_period(day) == (day.month >= 10)
+        day += timedelta(days=1)
+
+
+def test_extends_outside_range():
+    """Lookups before or after the range rebuild it once"""
+    calendar = ComplianceCalendar(2024, 2024)
+    assert calendar.days_until_deadline(date(2030, 12, 1)) == 30
+    assert calendar.market_condition(date(2010, 11, 1)) == 'compliance'
+    assert (calendar.start_year, calendar.end_year) == (2010, 2030)
+    assert calendar.days_until_deadline(date(2024, 12, 30)) == 1
+
+
+def test_custom_deadlines_and_holidays():
+    """Per-year deadlines move the countdown; holidays only affect business days"""
+    calendar = ComplianceCalendar(
+        2024, 2025,
+        deadlines={2024: date(2024, 11, 30)},
+        holidays=[date(2024, 11, 25), date(2024, 11, 26)]
+    )
+    assert calendar.days_until_deadline(date(2024, 11, 1)) == 29
+    assert calendar.market_condition(date(2024, 11, 1)) == 'panic'
+    # After the moved deadline the next one is December 31, 2025
+    assert calendar.days_until_deadline(date(2024, 12, 15)) == 381
+    assert calendar.is_compliance_period(date(2024, 12, 15)) is False
+
+    # Nov 18 (Mon) to Nov 30: 10 weekdays, 2 of them holidays
+    assert calendar.business_days_until_deadline(date(2024, 11, 18)) == 8
+
+
+def test_vectorized_lookups():
+    """Whole-array lookups equal the single-date lookups"""
+    calendar = ComplianceCalendar(2021, 2023)
+    dates = np.arange(np.datetime64('2020-06-01'), np.datetime64('2024-03-01'))
+    days_until = calendar.days_until_deadlines(dates)
+    conditions = calendar.market_conditions(dates)
+    compliance = calendar.compliance_periods(dates)
+    business = calendar.business_days_until_deadlines(dates)
+
+    for i in range(0, len(dates), 11):
+        day = dates[i].astype(date)
+        assert days_until[i] == calendar.days_until_deadline(day)
+        assert conditions[i] == calendar.market_condition(day)
+        assert compliance[i] == calendar.is_compliance_period(day)
+        assert business[i] == calendar.business_days_until_deadline(day)
+
+
+def test_detector_delegates_to_calendar():
+    """ComplianceDetector keeps its API on top of the shared calendar"""
+    assert ComplianceDetector.days_until_deadline(date(2025, 12, 1)) == 30
+    assert ComplianceDetector.get_market_condition(date(2025, 12, 1)) == 'panic'
+    assert ComplianceDetector.is_compliance_period(date(2025, 9, 30)) is False
+    assert list(ComplianceDetector.market_conditions(['2025-01-01', '2025-10-15', '2025-12-31'])) == [
+        'normal', 'compliance', 'panic'
+    ]
@@ -0,0 +1,190 @@
+"""
+Unit tests for cached KYC document previews
+
+Tests ensure that:
+- Images and the first page of PDFs are rendered as size-bounded JPEG/WebP
+- Previews are cached on disk per document and size and reused
+- Responses carry ETag/Cache-Control and honour If-None-Match and Range
+- Unsupported documents and options are rejected; deleting a document drops its previews
+"""
+import io
+import os
+import pytest
+import sys
+import uuid
+import zipfile
+from pathlib import Path
+
+import fitz
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask
+from database import db
+from models import User
+from api.kyc import kyc_bp
+from services.document_preview import document_previews
+from services.document_store import document_store
+
+
+def make_png(width, height):
+    """PNG bytes of a blank RGB image"""
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, width, height), False)
+    pixmap.clear_with(200)
+    return pixmap.tobytes('png')
+
+
+def make_pdf():
+    """PDF bytes with one A4 page"""
+    doc = fitz.open()
+    doc.new_page(width=595, height=842).insert_text((72, 72), 'Certificate of incorporation')
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def make_docx():
+    """Bytes of a minimal Word document package"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as package:
+        package.writestr('[Content_Types].xml', '<Types/>')
+        package.writestr('word/document.xml', '<document/>')
+    return buffer.getvalue()
+
+
+def image_size(data):
+    """(width, height) of encoded image bytes"""
+    pixmap = fitz.Pixmap(data)
+    return pixmap.width, pixmap.height
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Create Flask app for testing with the store and preview cache in a temporary directory"""
+    monkeypatch.setattr(document_store, 'root', str(tmp_path / 'blobs'))
+    monkeypatch.setattr(document_previews, 'root', str(tmp_path / 'previews'))
+
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    app.register_blueprint(kyc_bp)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+
+@pytest.fixture
+def user_id(app):
+    """Create a user and return its ID"""
+    user_id = str(uuid.uuid4())
+    db.session.add(User(id=user_id, username='uploader', email='uploader@example.com', password_hash='x'))
+    db.session.commit()
+    return user_id
+
+
+def upload(client, user_id, content, filename, content_type):
+    response = client.post(
+        '/api/kyc/documents/upload',
+        data={'file': (io.BytesIO(content), filename, content_type), 'document_type': 'id_document'},
+        headers={'X-User-ID': user_id},
+        content_type='multipart/form-data'
+    )
+    assert response.status_code == 201
+    return response.get_json()['document']['id']
+
+
+def test_image_preview_is_bounded_and_cached(client, user_id, monkeypatch):
+    """A large scan is served as a small JPEG, rendered once"""
+    document_id = upload(client, user_id, make_png(3000, 1500), 'passport.png', 'image/png')
+    url = f'/api/kyc/documents/{document_id}/preview'
+
+    response = client.get(url, headers={'X-User-ID': user_id})
+    assert response.status_code == 200
+    assert response.mimetype == 'image/jpeg'
+    assert image_size(response.data) == (512, 256)
+    assert response.headers['ETag']
+    assert 'private' in response.headers['Cache-Control']
+    assert f'max-age={document_previews.max_age}' in response.headers['Cache-Control']
+    assert os.path.exists(document_previews.cache_path(document_id, 512, 'jpeg'))
+    response.close()
+
+    def fail(*args, **kwargs):
+        raise AssertionError('preview rendered again')
+    monkeypatch.setattr(document_previews, 'render', fail)
+
+    again = client.get(url, headers={'X-User-ID': user_id})
+    assert again.status_code == 200
+    assert again.headers['ETag'] == response.headers['ETag']
+    again.close()
+
+
+def test_conditional_and_range_requests(client, user_id, monkeypatch):
+    """Revalidation answers 304 without rendering; Range returns partial content"""
+    document_id = upload(client, user_id, make_png(800, 600), 'passport.png', 'image/png')
+    url = f'/api/kyc/documents/{document_id}/preview?size=256'
+
+    full = client.get(url, headers={'X-User-ID': user_id})
+    etag = full.headers['ETag']
+    data = full.data
+    full.close()
+
+    partial = client.get(url, headers={'X-User-ID': user_id, 'Range': 'bytes=0-99'})
+    assert partial.status_code == 206
+    assert partial.data == data[:100]
+    assert partial.headers['Content-Range'] == f'bytes 0-99/{len(data)}'
+    partial.close()
+
+    def fail(*args, **kwargs):
+        raise AssertionError('preview opened for a revalidation')
+    monkeypatch.setattr(document_previews, 'get', fail)
+
+    response = client.get(url, headers={'X-User-ID': user_id, 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert not response.data
+
+
+def test_pdf_first_page_as_webp(client, user_id):
+    """PDFs are previewed from their first page; sizes round up to a configured size"""
+    document_id = upload(client, user_id, make_pdf(), 'certificate.pdf', 'application/pdf')
+
+    response = client.get(
+        f'/api/kyc/documents/{document_id}/preview?size=100&format=webp', headers={'X-User-ID': user_id}
+    )
+    assert response.status_code == 200
+    assert response.mimetype == 'image/webp'
+    assert response.data[:4] == b'RIFF' and response.data[8:12] == b'WEBP'
+    assert os.path.exists(document_previews.cache_path(document_id, 128, 'webp'))
+    response.close()
+
+
+def test_rejected_previews_and_invalidation(client, user_id):
+    """Bad options and unsupported types are rejected; deletion removes cached previews"""
+    document_id = upload(client, user_id, make_png(400, 400), 'passport.png', 'image/png')
+    url = f'/api/kyc/documents/{document_id}/preview'
+    headers = {'X-User-ID': user_id}
+
+    assert client.get(url + '?format=gif', headers=headers).status_code == 400
+    assert client.get(url + '?size=0', headers=headers).status_code == 400
+
+    docx_id = upload(client, user_id, make_docx(), 'statement.docx',
+                     'application/vnd.openxmlformats-officedocument.wordprocessingml.document')
+    response = client.get(f'/api/kyc/documents/{docx_id}/preview', headers=headers)
+    assert response.status_code == 400
+    assert response.get_json()['code'] == 'INVALID_FILE_TYPE'
+
+    client.get(url, headers=headers).close()
+    assert os.path.isdir(os.path.join(document_previews.root, document_id))
+    assert client.delete(f'/api/kyc/documents/{document_id}', headers=headers).status_code == 200
+    assert not os.path.exists(os.path.join(document_previews.root, document_id))
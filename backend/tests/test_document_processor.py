@@ -0,0 +1,212 @@
+"""
+Unit tests for background KYC document processing
+
+Tests ensure that:
+- Dates and registration numbers are found in document text
+- Uploaded PDFs are processed page by page into text, dates and numbers
+- Documents with identical content reuse the stored results
+- Unreadable files are marked failed; the worker pool drains the queue
+- Admin reviews read the precomputed results; thumbnails come from the preview cache
+"""
+import io
+import pytest
+import sys
+import time
+import uuid
+from datetime import date
+from pathlib import Path
+
+import fitz
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask
+from database import db
+from models import User, KYCDocument
+from models.kyc_document import ProcessingStatus
+from api.kyc import kyc_bp
+from api.admin_kyc import admin_kyc_bp
+from services.document_processor import DocumentProcessor, document_processor
+from services.document_store import document_store
+from services.document_preview import document_previews
+from config import Config
+from utils.document_text import extract_dates, extract_registration_numbers, is_valid_uscc
+
+
+def make_pdf(*pages):
+    """PDF bytes with one page per text"""
+    doc = fitz.open()
+    for text in pages:
+        doc.new_page(width=595, height=842).insert_text((72, 72), text)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+CERTIFICATE = make_pdf(
+    'Certificat constatator nr. 12345 din 15.03.2024',
+    'Nr. ORC J40/1234/2020, CUI: RO 12345678, valabil pana la 2099-12-31'
+)
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Create Flask app for testing with the store in a temporary directory"""
+    monkeypatch.setattr(document_store, 'root', str(tmp_path / 'blobs'))
+    monkeypatch.setattr(document_previews, 'root', str(tmp_path / 'previews'))
+
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    app.register_blueprint(kyc_bp)
+    app.register_blueprint(admin_kyc_bp)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+
+@pytest.fixture
+def user_id(app):
+    """Create a user and return its ID"""
+    user_id = str(uuid.uuid4())
+    db.session.add(User(id=user_id, username='uploader', email='uploader@example.com', password_hash='x'))
+    db.session.commit()
+    return user_id
+
+
+def upload(client, user_id, content=CERTIFICATE, filename='certificate.pdf', content_type='application/pdf'):
+    response = client.post(
+        '/api/kyc/documents/upload',
+        data={'file': (io.BytesIO(content), filename, content_type), 'document_type': 'company_registration'},
+        headers={'X-User-ID': user_id},
+        content_type='multipart/form-data'
+    )
+    assert response.status_code == 201
+    return response.get_json()['document']['id']
+
+
+def test_extracts_dates_and_registration_numbers():
+    """Numeric, named-month and Chinese dates; ONRC, CUI, USCC and LEI numbers"""
+    text = ('Emis la 2 martie 2023, valid until March 5, 2025. 日期 2024年1月9日. Invalid 31.02.2024.\n'
+            'J 40/1234/2020 · CIF: 87654321 · 统一社会信用代码91350100M000100Y43 · 91350100M000100Y44')
+    assert extract_dates(text) == [date(2023, 3, 2), date(2024, 1, 9), date(2025, 3, 5)]
+    assert extract_registration_numbers(text) == [
+        {'type': 'trade_register', 'value': 'J40/1234/2020'},
+        {'type': 'tax_id', 'value': '87654321'},
+        {'type': 'uscc', 'value': '91350100M000100Y43'},
+    ]
+    assert not is_valid_uscc('91350100M000100Y44')
+
+
+def test_processes_uploaded_pdf(client, user_id):
+    """Pending uploads are processed into stored results"""
+    document_id = upload(client, user_id)
+    document = KYCDocument.query.filter_by(id=document_id).first()
+    assert document.processing_status == ProcessingStatus.PENDING
+
+    assert document_processor.process_pending() == 1
+    document = KYCDocument.query.filter_by(id=document_id).first()
+    assert document.processing_status == ProcessingStatus.COMPLETED
+    assert document.page_count == 2
+    assert 'Certificat constatator' in document.extracted_text.split('\f')[0]
+    assert document.extracted_dates == ['2024-03-15', '2099-12-31']
+    assert document.document_date == date(2024, 3, 15)  # Future validity dates aren't issue dates
+    assert {'type': 'trade_register', 'value': 'J40/1234/2020'} in document.registration_numbers
+
+    assert document.thumbnail_path is None  # Thumbnails come from the preview cache
+
+    # Nothing left to do
+    assert document_processor.process_pending() == 0
+
+
+def test_identical_content_reuses_results(client, user_id, monkeypatch):
+    """A second upload of the same file copies the results instead of re-reading it"""
+    first_id = upload(client, user_id)
+    document_processor.process_pending()
+    second_id = upload(client, user_id, filename='copy.pdf')
+
+    def fail(*args, **kwargs):
+        raise AssertionError('file analysed again')
+    monkeypatch.setattr(document_processor, 'analyze', fail)
+
+    assert document_processor.process_document(second_id) is True
+    first = KYCDocument.query.filter_by(id=first_id).first()
+    second = KYCDocument.query.filter_by(id=second_id).first()
+    assert second.processing_status == ProcessingStatus.COMPLETED
+    assert second.extracted_text == first.extracted_text
+    assert second.page_count == first.page_count
+
+
+def test_unreadable_file_is_marked_failed(client, user_id):
+    """A corrupt PDF ends in FAILED with the error recorded"""
+    document_id = upload(client, user_id, content=b'%PDF-1.4 this is not really a pdf')
+    assert document_processor.process_document(document_id) is True
+    document = KYCDocument.query.filter_by(id=document_id).first()
+    assert document.processing_status == ProcessingStatus.FAILED
+    assert document.processing_error
+
+    # Already handled: a second claim does nothing
+    assert document_processor.process_document(document_id) is False
+
+
+def test_worker_pool_drains_queue(app, client, user_id):
+    """Queued documents are processed by the worker threads"""
+    processor = DocumentProcessor(workers=1)
+    document_id = upload(client, user_id)
+    processor.start(app)
+    processor.enqueue(document_id)
+
+    deadline = time.monotonic() + 10
+    while processor.get_stats()['processed'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert processor.get_stats()['processed'] == 1
+    db.session.expire_all()
+    assert KYCDocument.query.filter_by(id=document_id).first().processing_status == ProcessingStatus.COMPLETED
+
+
+def test_admin_review_reads_precomputed_results(client, user_id):
+    """Review endpoints serve stored results, thumbnail and the date-based expiry check"""
+    admin_id = str(uuid.uuid4())
+    db.session.add(User(id=admin_id, username='reviewer', email='reviewer@example.com', password_hash='x', is_admin=True))
+    db.session.commit()
+    headers = {'X-Admin-ID': admin_id}
+
+    document_id = upload(client, user_id)
+    document_processor.process_pending()
+
+    details = client.get(f'/api/admin/kyc/{user_id}', headers=headers).get_json()
+    reviewed = details['documents'][0]
+    assert reviewed['processingStatus'] == 'completed'
+    assert reviewed['documentDate'] == '2024-03-15'
+    assert reviewed['expiryCheck']['isValid'] is False  # Older than KYC_DOCUMENT_MAX_AGE_DAYS
+    assert reviewed['expiryCheck']['daysOld'] == (date.today() - date(2024, 3, 15)).days
+
+    analysis = client.get(f'/api/admin/kyc/{user_id}/documents/{document_id}/analysis', headers=headers).get_json()
+    assert len(analysis['document']['pages']) == 2
+    assert 'J40/1234/2020' in analysis['document']['pages'][1]
+
+    url = f'/api/admin/kyc/{user_id}/documents/{document_id}/thumbnail'
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'image/jpeg'
+    thumbnail = fitz.Pixmap(response.data)
+    assert max(thumbnail.width, thumbnail.height) == document_previews.bound_size(Config.DOCUMENT_THUMBNAIL_SIZE)
+    etag = response.headers['ETag']
+    response.close()
+    response = client.get(url, headers=dict(headers, **{'If-None-Match': etag}))
+    assert response.status_code == 304
+
+    response = client.post(f'/api/admin/kyc/{user_id}/documents/{document_id}/reprocess', headers=headers)
+    assert response.status_code == 202
+    assert KYCDocument.query.filter_by(id=document_id).first().processing_status == ProcessingStatus.PENDING
@@ -0,0 +1,225 @@
+"""
+Unit tests for magic-byte content checks of KYC uploads
+
+Tests ensure that:
+- File types are recognised from their first bytes and checked against name and Content-Type
+- Mismatched uploads are rejected before anything is stored, checked as the head is spooled
+- Resumable uploads are refused on their first chunk
+- PDF decompression bombs are rejected within bounded time and memory
+"""
+import io
+import os
+import pytest
+import sys
+import uuid
+import zipfile
+import zlib
+from pathlib import Path
+
+import fitz
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask
+from database import db
+from models import User, KYCDocument, DocumentBlob
+from models.kyc_document import DocumentType
+from api.kyc import kyc_bp
+from config import Config
+from services.document_store import document_store, HashingSpool
+from services.document_validator import DocumentValidator
+from services.resumable_upload import resumable_uploads, InvalidContentError
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 100
+JPEG = b'\xff\xd8\xff\xe0' + b'\x00' * 100
+
+
+def make_pdf():
+    """PDF bytes with one page"""
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), 'Bank statement')
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def make_pdf_bomb(inflated_size):
+    """Small PDF with a doubly Flate-encoded stream of inflated_size zero bytes"""
+    doc = fitz.open()
+    doc.new_page()
+    xref = doc.get_new_xref()
+    doc.update_object(xref, '<<>>')
+    doc.update_stream(xref, zlib.compress(zlib.compress(b'\0' * inflated_size, 9), 9), compress=False)
+    doc.xref_set_key(xref, 'Filter', '[/FlateDecode /FlateDecode]')
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Create Flask app for testing with the store in a temporary directory"""
+    monkeypatch.setattr(document_store, 'root', str(tmp_path / 'blobs'))
+
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    app.register_blueprint(kyc_bp)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+
+@pytest.fixture
+def user_id(app):
+    """Create a user and return its ID"""
+    user_id = str(uuid.uuid4())
+    db.session.add(User(id=user_id, username='uploader', email='uploader@example.com', password_hash='x'))
+    db.session.commit()
+    return user_id
+
+
+def upload(client, user_id, content, filename, content_type):
+    return client.post(
+        '/api/kyc/documents/upload',
+        data={'file': (io.BytesIO(content), filename, content_type), 'document_type': 'financial_statement'},
+        headers={'X-User-ID': user_id},
+        content_type='multipart/form-data'
+    )
+
+
+def test_sniff_and_check_content():
+    """Magic bytes decide the type; extension and specific Content-Types must agree"""
+    docx = io.BytesIO()
+    with zipfile.ZipFile(docx, 'w') as package:
+        package.writestr('[Content_Types].xml', '<Types/>')
+    plain_zip = io.BytesIO()
+    with zipfile.ZipFile(plain_zip, 'w') as package:
+        package.writestr('payload.exe', 'MZ')
+
+    assert DocumentValidator.sniff_type(make_pdf()) == 'pdf'
+    assert DocumentValidator.sniff_type(b'\r\n%PDF-1.7') == 'pdf'
+    assert DocumentValidator.sniff_type(PNG) == 'png'
+    assert DocumentValidator.sniff_type(JPEG) == 'jpeg'
+    assert DocumentValidator.sniff_type(docx.getvalue()) == 'docx'
+    assert DocumentValidator.sniff_type(plain_zip.getvalue()) is None
+    assert DocumentValidator.sniff_type(b'<html>') is None
+
+    assert DocumentValidator.check_content(PNG, 'scan.png', 'image/png') == (True, None)
+    assert DocumentValidator.check_content(JPEG, 'scan', 'application/octet-stream') == (True, None)
+    assert DocumentValidator.check_content(PNG, 'scan.pdf', 'application/pdf')[0] is False
+    assert DocumentValidator.check_content(PNG, 'scan.png', 'application/pdf')[0] is False
+    assert DocumentValidator.check_content(b'MZ\x90\x00', 'scan.pdf', 'application/pdf')[0] is False
+    assert DocumentValidator.check_content(make_pdf(), 'payload.exe', 'application/pdf') == (False, 'File type not allowed')
+    assert DocumentValidator.check_content(make_pdf(), 'page.html', None) == (False, 'File type not allowed')
+
+
+def test_upload_extension_allow_list(client, user_id):
+    """Disallowed extensions are refused whatever the content; extensionless names are sniffed"""
+    for filename in ('payload.exe', 'page.html'):
+        response = upload(client, user_id, make_pdf(), filename, 'application/pdf')
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'File type not allowed'
+    assert KYCDocument.query.count() == 0
+
+    response = upload(client, user_id, make_pdf(), 'statement', 'application/octet-stream')
+    assert response.status_code == 201
+    assert response.get_json()['document']['mimeType'] == 'application/pdf'
+
+
+def test_mismatch_stops_spooling_at_the_head(client, user_id, monkeypatch):
+    """A large mismatched part is refused after its head; the rest is never written"""
+    monkeypatch.setattr(Config, 'UPLOAD_SNIFF_BYTES', 1024)
+    written = []
+    original_write = HashingSpool.write
+
+    def recording_write(self, data):
+        result = original_write(self, data)
+        written.append(os.path.getsize(self.path) if os.path.exists(self.path) else 0)
+        return result
+    monkeypatch.setattr(HashingSpool, 'write', recording_write)
+
+    response = upload(client, user_id, b'MZ\x90\x00' + b'\x00' * 2 * 1024 * 1024, 'statement.pdf', 'application/pdf')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == "File content is not a PDF, PNG, JPEG or Word document"
+    assert max(written) < 2 * 1024 * 1024  # Stopped writing once the head was checked
+    assert written[-1] == 0
+    assert KYCDocument.query.count() == 0 and DocumentBlob.query.count() == 0
+
+
+def test_mismatched_upload_is_not_stored(client, user_id):
+    """A renamed file is rejected without a blob or document being created"""
+    response = upload(client, user_id, b'MZ\x90\x00 executable', 'statement.pdf', 'application/pdf')
+    assert response.status_code == 400
+    assert response.get_json()['code'] == 'INVALID_FILE'
+    assert KYCDocument.query.count() == 0
+    assert DocumentBlob.query.count() == 0
+    assert not any(files for _, _, files in os.walk(document_store.root))
+
+
+def test_stored_mime_type_comes_from_content(client, user_id):
+    """A generic Content-Type is replaced by the sniffed type"""
+    response = upload(client, user_id, PNG, 'scan', 'application/octet-stream')
+    assert response.status_code == 201
+    document_id = response.get_json()['document']['id']
+    assert KYCDocument.query.filter_by(id=document_id).first().mime_type == 'image/png'
+
+
+class CountingStream(io.BytesIO):
+    """Stream recording how much was read"""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def test_resumable_upload_refused_on_first_chunk(app, user_id):
+    """The rest of the body isn't read once the first bytes fail the check"""
+    content = b'MZ\x90\x00' + b'\x00' * (1024 * 1024)
+    upload = resumable_uploads.create(user_id, DocumentType.FINANCIAL_STATEMENT, 'statement.pdf', 'application/pdf', len(content))
+    db.session.commit()
+
+    stream = CountingStream(content)
+    with pytest.raises(InvalidContentError):
+        resumable_uploads.append(upload, 0, stream)
+    assert stream.bytes_read == resumable_uploads.store.chunk_size
+
+
+def test_pdf_bomb_is_rejected(client, user_id, monkeypatch):
+    """A PDF inflating past the limit is refused and its blob removed"""
+    monkeypatch.setattr(Config, 'PDF_MAX_DECOMPRESSED_SIZE', 1024 * 1024)
+    bomb = make_pdf_bomb(8 * 1024 * 1024)
+    assert len(bomb) < 10000
+
+    response = upload(client, user_id, bomb, 'statement.pdf', 'application/pdf')
+    assert response.status_code == 400
+    assert 'decompressed' in response.get_json()['error']
+    assert KYCDocument.query.count() == 0
+    assert DocumentBlob.query.count() == 0
+
+    assert upload(client, user_id, make_pdf(), 'statement.pdf', 'application/pdf').status_code == 201
+
+
+def test_pdf_check_is_time_bounded(tmp_path):
+    """The structure check gives up when its time budget runs out"""
+    path = tmp_path / 'bomb.pdf'
+    path.write_bytes(make_pdf_bomb(8 * 1024 * 1024))
+    assert DocumentValidator.check_pdf_structure(str(path), timeout=0, max_decompressed=10 ** 12) == (
+        False, 'PDF is too complex to validate'
+    )
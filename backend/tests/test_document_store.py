@@ -0,0 +1,265 @@
+"""
+Unit tests for the content-addressed KYC document store
+
+Tests ensure that:
+- Streams are hashed and sized in one pass and stored under their digest
+- Oversized streams are rejected without leaving temporary files
+- Identical uploads share one blob, counted per document
+- The blob file is only removed when its last document is deleted
+- Reference counts change atomically; a file referenced again is kept
+- An upload counts its reference before keeping a file, so a concurrent cleanup waits for it
+- Multipart uploads are hashed and spooled into the store while parsed
+"""
+import hashlib
+import io
+import os
+import pytest
+import sys
+import threading
+import uuid
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask
+from database import db
+from models import User, KYCDocument, DocumentBlob
+from api.kyc import kyc_bp
+from config import Config
+from services.document_store import DocumentStore, DocumentTooLargeError, HashingSpool, document_store
+
+PDF_BYTES = b'%PDF-1.4\n' + b'0123456789' * 10000
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Create Flask app for testing with the store in a temporary directory"""
+    monkeypatch.setattr(document_store, 'root', str(tmp_path / 'blobs'))
+
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    app.register_blueprint(kyc_bp)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+
+@pytest.fixture
+def user_id(app):
+    """Create a user and return its ID"""
+    user_id = str(uuid.uuid4())
+    db.session.add(User(id=user_id, username='uploader', email='uploader@example.com', password_hash='x'))
+    db.session.commit()
+    return user_id
+
+
+def upload(client, user_id, content=PDF_BYTES, filename='registration.pdf'):
+    return client.post(
+        '/api/kyc/documents/upload',
+        data={
+            'file': (io.BytesIO(content), filename, 'application/pdf'),
+            'document_type': 'company_registration'
+        },
+        headers={'X-User-ID': user_id},
+        content_type='multipart/form-data'
+    )
+
+
+def test_write_stream_hashes_and_deduplicates(tmp_path):
+    """Content lands at its digest path; the same content is not written twice"""
+    store = DocumentStore(str(tmp_path), chunk_size=4096)
+    expected = hashlib.sha256(PDF_BYTES).hexdigest()
+
+    first = store.write_stream(io.BytesIO(PDF_BYTES))
+    assert first.sha256 == expected
+    assert first.file_size == len(PDF_BYTES)
+    assert first.created is True
+    assert first.file_path == os.path.join(str(tmp_path), expected[:2], expected[2:4], expected)
+    with open(first.file_path, 'rb') as f:
+        assert f.read() == PDF_BYTES
+
+    second = store.write_stream(io.BytesIO(PDF_BYTES))
+    assert second.file_path == first.file_path
+    assert second.created is False
+    assert os.listdir(store.tmp_dir) == []
+
+
+def test_write_stream_rejects_oversized_content(tmp_path):
+    """Exceeding max_size aborts the write and removes the temporary file"""
+    store = DocumentStore(str(tmp_path), chunk_size=1024)
+    with pytest.raises(DocumentTooLargeError):
+        store.write_stream(io.BytesIO(PDF_BYTES), max_size=10000)
+    assert os.listdir(store.tmp_dir) == []
+    assert sorted(os.listdir(str(tmp_path))) == ['tmp']
+
+
+def test_identical_uploads_share_one_blob(client, user_id):
+    """Two uploads of the same file record the digest and reference one blob"""
+    first = upload(client, user_id)
+    second = upload(client, user_id, filename='registration-copy.pdf')
+    assert first.status_code == 201
+    assert second.status_code == 201
+
+    first_doc = first.get_json()['document']
+    second_doc = second.get_json()['document']
+    assert first_doc['sha256'] == hashlib.sha256(PDF_BYTES).hexdigest()
+    assert first_doc['sha256'] == second_doc['sha256']
+    assert first_doc['filePath'] == second_doc['filePath']
+    assert first_doc['fileSize'] == len(PDF_BYTES)
+
+    blob = DocumentBlob.query.filter_by(sha256=first_doc['sha256']).first()
+    assert blob.ref_count == 2
+    assert KYCDocument.query.count() == 2
+
+    other = upload(client, user_id, content=b'%PDF-1.4\nother')
+    assert other.get_json()['document']['filePath'] != first_doc['filePath']
+    assert DocumentBlob.query.count() == 2
+
+
+def test_blob_removed_with_last_reference(client, user_id):
+    """Deleting a document keeps the shared file until no document uses it"""
+    first = upload(client, user_id).get_json()['document']
+    second = upload(client, user_id).get_json()['document']
+    path = first['filePath']
+
+    response = client.delete(f"/api/kyc/documents/{first['id']}", headers={'X-User-ID': user_id})
+    assert response.status_code == 200
+    assert response.get_json()['file_deleted'] is False
+    assert os.path.exists(path)
+    assert DocumentBlob.query.filter_by(sha256=first['sha256']).first().ref_count == 1
+
+    response = client.delete(f"/api/kyc/documents/{second['id']}", headers={'X-User-ID': user_id})
+    assert response.get_json()['file_deleted'] is True
+    assert not os.path.exists(path)
+    assert DocumentBlob.query.count() == 0
+
+
+def test_reference_counts_are_atomic_and_rechecked(app):
+    """Counts are upserted without reading the row; a file referenced again is not removed"""
+    stored = document_store.write_stream(io.BytesIO(PDF_BYTES))
+    document_store.add_reference(stored)
+    document_store.add_reference(stored)
+    db.session.commit()
+    assert db.session.get(DocumentBlob, stored.sha256).ref_count == 2
+
+    assert document_store.release(stored.sha256) is None
+    assert document_store.release(stored.sha256) == stored.file_path
+    db.session.commit()
+    assert DocumentBlob.query.count() == 0
+
+    # A concurrent upload of the same content counted a reference before the cleanup ran
+    document_store.add_reference(stored)
+    db.session.commit()
+    assert document_store.remove_unreferenced(stored.sha256, stored.file_path) is False
+    assert os.path.exists(stored.file_path)
+
+    assert document_store.release(stored.sha256) == stored.file_path
+    db.session.commit()
+    assert document_store.remove_unreferenced(stored.sha256, stored.file_path) is True
+    assert not os.path.exists(stored.file_path)
+
+
+def test_cleanup_waits_for_an_upload_counting_a_reference(tmp_path, monkeypatch):
+    """A deletion's cleanup can't remove a file that an uncommitted upload has just found"""
+    monkeypatch.setattr(document_store, 'root', str(tmp_path / 'blobs'))
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{tmp_path / "store.db"}'  # One connection per thread
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        stored = document_store.store(io.BytesIO(PDF_BYTES))
+        db.session.commit()
+        # The last document is deleted: its release commits, the cleanup hasn't run yet
+        assert document_store.release(stored.sha256) == stored.file_path
+        db.session.commit()
+
+        # An upload of the same content finds the file and drops its own copy
+        spool = HashingSpool(document_store.tmp_dir)
+        spool.write(PDF_BYTES)
+        again = document_store.place_spool(spool)
+        assert again.created is False and not os.path.exists(spool.path)
+
+        # The cleanup now runs before the upload commits
+        results = []
+
+        def cleanup():
+            with app.app_context():
+                results.append(document_store.remove_unreferenced(stored.sha256, stored.file_path))
+        cleaner = threading.Thread(target=cleanup)
+        cleaner.start()
+        cleaner.join(timeout=0.5)
+        assert cleaner.is_alive()  # Waiting for the row the upload holds
+        db.session.commit()
+        cleaner.join()
+
+        assert results == [False]
+        assert os.path.exists(stored.file_path)
+        assert db.session.get(DocumentBlob, stored.sha256).ref_count == 1
+        db.session.remove()
+        db.drop_all()
+
+
+def test_upload_is_spooled_into_the_store(client, user_id, monkeypatch):
+    """The form parser writes the part into the store's tmp dir; nothing is left behind"""
+    spools = []
+    factory = document_store.spool_factory
+
+    def recording_factory(max_size=None, check=None):
+        make = factory(max_size=max_size, check=check)
+
+        def make_and_record(*args, **kwargs):
+            spools.append(make(*args, **kwargs))
+            return spools[-1]
+        return make_and_record
+
+    monkeypatch.setattr(document_store, 'spool_factory', recording_factory)
+    document = upload(client, user_id).get_json()['document']
+    assert len(spools) == 1 and spools[0].placed
+    assert os.path.dirname(spools[0].path) == document_store.tmp_dir
+    assert document['sha256'] == hashlib.sha256(PDF_BYTES).hexdigest()
+    assert os.listdir(document_store.tmp_dir) == []
+
+    # A rejected upload's spool is removed when the request closes
+    response = upload(client, user_id, content=b'not a document', filename='notes.pdf')
+    assert response.status_code == 400
+    assert not spools[1].placed
+    assert os.listdir(document_store.tmp_dir) == []
+
+
+def test_spool_over_max_size(tmp_path):
+    """A spool past its limit drops its content, stays seekable and cannot be placed"""
+    store = DocumentStore(str(tmp_path))
+    spool = HashingSpool(store.tmp_dir, max_size=10)
+    spool.write(b'%PDF-1.4\n')
+    spool.write(b'more than ten bytes')
+    assert spool.too_large and spool.size == 28
+    spool.seek(0)
+    assert spool.read() == b''
+    with pytest.raises(DocumentTooLargeError):
+        store.place_spool(spool)
+    spool.close()
+    assert os.listdir(store.tmp_dir) == []
+
+
+def test_oversized_upload_is_reported(client, user_id, monkeypatch):
+    """An upload past MAX_CONTENT_LENGTH reaches the view as too large rather than missing"""
+    monkeypatch.setattr(Config, 'MAX_CONTENT_LENGTH', 1024)
+    response = upload(client, user_id)
+    assert response.status_code == 400
+    body = response.get_json()
+    assert body['code'] == 'INVALID_FILE' and body['error'].startswith('File too large')
+    assert os.listdir(document_store.tmp_dir) == []
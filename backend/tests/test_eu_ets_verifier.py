@@ -0,0 +1,209 @@
+"""
+Unit tests for cached, batched EU ETS registry verification
+
+Tests ensure that:
+- Results are cached per (country, account) for a status-dependent lifetime
+- Registry outages are reported and not cached
+- Concurrent lookups of the same account reach the registry once
+- Batches are grouped by country registry and queried in parallel
+- The verification endpoints use the cache and the batch API
+- Caching leaves the caller's transaction alone; the stub records calls only when asked
+"""
+import pytest
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask
+from database import db
+from models import User, RegistryVerification
+from api.kyc import kyc_bp
+from api.admin_kyc import admin_kyc_bp
+import services.eu_ets_verifier as eu_ets_verifier
+from services.eu_ets_verifier import RegistryVerifier, REGISTRY_UNAVAILABLE, parse_ttls
+from services.registry_adapters import RegistryUnavailableError, StubRegistryAdapter
+
+TTLS = parse_ttls('active:168,inactive:24,suspended:24,unknown:1')
+
+
+class FailingRegistry(StubRegistryAdapter):
+    """Registry that is down"""
+    name = 'failing'
+
+    def lookup(self, country, account_numbers):
+        super().lookup(country, account_numbers)
+        raise RegistryUnavailableError('registry down')
+
+
+@pytest.fixture
+def app():
+    """Create Flask app for testing"""
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    app.register_blueprint(kyc_bp)
+    app.register_blueprint(admin_kyc_bp)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Stub registry behind a fresh verifier used by the endpoints"""
+    stub = StubRegistryAdapter(accounts={('RO', 'SUSPENDED01'): 'suspended'}, record_calls=True)
+    verifier = RegistryVerifier(stub, TTLS, workers=4, lookup_timeout=5)
+    monkeypatch.setattr(eu_ets_verifier, 'registry_verifier', verifier)
+    return stub, verifier
+
+
+def test_results_are_cached_per_status(app, registry):
+    """Cached results are reused until their status-dependent expiry"""
+    stub, verifier = registry
+
+    first = verifier.verify('RO12345678', 'ro')
+    assert (first['verified'], first['status'], first['cached'], first['registry']) == (True, 'active', False, 'stub')
+    again = verifier.verify('RO12345678', 'RO')
+    assert again['cached'] is True and again['verified'] is True
+    assert len(stub.calls) == 1
+
+    suspended = verifier.verify('SUSPENDED01', 'RO')
+    assert (suspended['verified'], suspended['status']) == (False, 'suspended')
+    rows = {row.account_number: row for row in RegistryVerification.query.all()}
+    assert rows['RO12345678'].expires_at - rows['RO12345678'].verified_at == timedelta(hours=168)
+    assert rows['SUSPENDED01'].expires_at - rows['SUSPENDED01'].verified_at == timedelta(hours=24)
+
+    # Expired and refreshed results are looked up again
+    rows['RO12345678'].expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+    assert verifier.verify('RO12345678', 'RO')['cached'] is False
+    assert verifier.verify('RO12345678', 'RO', refresh=True)['cached'] is False
+    assert len(stub.calls) == 4
+
+    invalid = verifier.verify('bad!', 'RO')
+    assert invalid['error'] == 'Invalid account number format'
+    assert verifier.verify('', 'RO')['error'] == 'Account number and country are required'
+
+
+def test_registry_outage_is_not_cached(app, registry):
+    """Unavailable registries give an error result and are asked again next time"""
+    _, verifier = registry
+    failing = FailingRegistry(record_calls=True)
+    verifier.register_adapter(failing, ['DE'])
+
+    result = verifier.verify('DE12345678', 'DE')
+    assert result['verified'] is False
+    assert result['error'] == REGISTRY_UNAVAILABLE
+    assert RegistryVerification.query.count() == 0
+
+    verifier.verify('DE12345678', 'DE')
+    assert len(failing.calls) == 2
+    assert verifier.get_stats()['registry_errors'] == 2
+
+
+def test_cache_writes_leave_caller_transaction_alone(app, registry):
+    """Cache rows commit on their own; the caller's pending changes are not committed"""
+    _, verifier = registry
+    db.session.add(User(id=str(uuid.uuid4()), username='pending', email='pending@example.com', password_hash='x'))
+    with db.session.no_autoflush:
+        assert verifier.verify('RO12345678', 'RO')['cached'] is False
+    db.session.rollback()
+
+    assert User.query.count() == 0
+    assert RegistryVerification.query.count() == 1
+
+    quiet = StubRegistryAdapter()
+    quiet.lookup('RO', ['RO12345678'])
+    assert quiet.calls == []
+
+
+def test_concurrent_lookups_are_coalesced():
+    """Identical lookups in flight share one registry call"""
+    stub = StubRegistryAdapter(delay=0.3, record_calls=True)
+    verifier = RegistryVerifier(stub, ttls={}, workers=2)
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(verifier.verify('RO12345678', 'RO', refresh=True)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(stub.calls) == 1
+    assert [result['verified'] for result in results] == [True] * 5
+    assert verifier.get_stats()['coalesced'] == 4
+    assert verifier.get_stats()['inflight'] == 0
+
+
+def test_batches_are_grouped_by_registry_and_parallel(app):
+    """Each country's accounts go to its registry in batches, countries in parallel"""
+    romania = StubRegistryAdapter(delay=0.2, record_calls=True)
+    romania.max_batch_size = 2
+    germany = StubRegistryAdapter(delay=0.2, record_calls=True)
+    verifier = RegistryVerifier(germany, TTLS, workers=4)
+    verifier.register_adapter(romania, ['RO'])
+
+    accounts = [('RO00000001', 'RO'), ('DE00000001', 'DE'), ('RO00000002', 'ro'),
+                ('RO00000003', 'RO'), ('RO00000001', 'RO'), (None, 'DE')]
+    started = time.monotonic()
+    results = verifier.verify_many(accounts)
+    assert time.monotonic() - started < 0.35
+
+    assert [result['account_number'] for result in results] == [
+        'RO00000001', 'DE00000001', 'RO00000002', 'RO00000003', 'RO00000001', None
+    ]
+    assert all(result['verified'] for result in results[:5])
+    assert results[5]['error'] == 'Account number and country are required'
+    assert sorted(romania.calls) == [('RO', ('RO00000001', 'RO00000002')), ('RO', ('RO00000003',))]
+    assert germany.calls == [('DE', ('DE00000001',))]
+
+    assert all(result['cached'] for result in verifier.verify_many(accounts[:4]))
+
+
+def test_verification_endpoints(app, registry):
+    """The user endpoint reads through the cache; admins verify in batches"""
+    stub, _ = registry
+    user_id = str(uuid.uuid4())
+    admin_id = str(uuid.uuid4())
+    db.session.add(User(id=user_id, username='operator', email='operator@example.com', password_hash='x'))
+    db.session.add(User(id=admin_id, username='reviewer', email='reviewer@example.com', password_hash='x',
+                        is_admin=True))
+    db.session.commit()
+    client = app.test_client()
+
+    for _ in range(2):
+        response = client.post('/api/kyc/eu-ets-verify', json={'account_number': 'RO12345678', 'country': 'RO'},
+                               headers={'X-User-ID': user_id})
+        assert response.status_code == 200
+        assert response.get_json()['verification']['verified'] is True
+    assert response.get_json()['verification']['cached'] is True
+    assert len(stub.calls) == 1
+
+    headers = {'X-Admin-ID': admin_id}
+    response = client.post('/api/admin/kyc/eu-ets-verify/batch', headers=headers, json={'accounts': [
+        {'account_number': 'RO12345678', 'country': 'RO'},
+        {'account_number': 'SUSPENDED01', 'country': 'RO'},
+    ]})
+    assert response.status_code == 200
+    verifications = response.get_json()['verifications']
+    assert [item['status'] for item in verifications] == ['active', 'suspended']
+    assert [item['cached'] for item in verifications] == [True, False]
+
+    response = client.post('/api/admin/kyc/eu-ets-verify/batch', headers=headers,
+                           json={'accounts': [{'account_number': 'RO12345678', 'country': 'RO'}] * 101})
+    assert response.status_code == 400
+    assert response.get_json()['code'] == 'TOO_MANY_ACCOUNTS'
+    assert client.post('/api/admin/kyc/eu-ets-verify/batch', headers=headers, json={}).status_code == 400
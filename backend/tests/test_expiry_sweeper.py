@@ -0,0 +1,126 @@
+"""
+Unit tests for the expiry sweeper
+
+Tests ensure that:
+- Overdue listings, demands, negotiations and quotes are flipped to EXPIRED
+- Rows that are not overdue or not in an expirable status are left untouched
+- Sweeps run in bounded batches and report counts
+"""
+import pytest
+import sys
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask
+from database import db
+from models import (
+    User, Listing, ListingStatus, DemandListing, DemandStatus,
+    Negotiation, NegotiationStatus, SwapRequest, SwapQuote, SwapQuoteStatus
+)
+from services.expiry_sweeper import ExpirySweeper
+
+
+@pytest.fixture
+def app():
+    """Create Flask app for testing"""
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def user_id(app):
+    """Create a user and return its ID"""
+    user_id = str(uuid.uuid4())
+    db.session.add(User(id=user_id, username='seller', email='seller@example.com', password_hash='x'))
+    db.session.commit()
+    return user_id
+
+
+def _listing(user_id, expires_at, status=ListingStatus.ACTIVE):
+    return Listing(
+        id=str(uuid.uuid4()), seller_id=user_id, seller_code='SELLER-CN-1000',
+        volume=1000, price_per_tonne=8.0, currency='EUR', timeline='T+2',
+        status=status, expires_at=expires_at
+    )
+
+
+def test_sweep_expires_overdue_rows(app, user_id):
+    """Overdue rows in expirable statuses are expired, others untouched"""
+    now = datetime.utcnow()
+    past = now - timedelta(hours=1)
+    future = now + timedelta(days=1)
+
+    overdue = _listing(user_id, past)
+    fresh = _listing(user_id, future)
+    withdrawn = _listing(user_id, past, status=ListingStatus.WITHDRAWN)
+    no_expiry = _listing(user_id, None)
+    demand = DemandListing(
+        id=str(uuid.uuid4()), buyer_id=user_id, buyer_code='BUYER-EU-1000',
+        volume_needed=500, max_price=9.0, currency='EUR', timeline='T+2',
+        status=DemandStatus.ACTIVE, expires_at=past
+    )
+    negotiation = Negotiation(
+        id=str(uuid.uuid4()), listing_id=overdue.id,
+        initiator_id=user_id, initiator_code='BUYER-EU-1000',
+        counterparty_id=user_id, counterparty_code='SELLER-CN-1000',
+        status=NegotiationStatus.OPEN, expires_at=past
+    )
+    swap_request = SwapRequest(id=str(uuid.uuid4()), requester_id=user_id, eua_volume=100)
+    quote = SwapQuote(
+        id=str(uuid.uuid4()), swap_request_id=swap_request.id, offered_ratio=10.5,
+        cea_volume=1050, cea_price=8.0, cea_value=8400, eua_value=8800,
+        settlement_timeline='T+2', valid_until=past
+    )
+    db.session.add_all([overdue, fresh, withdrawn, no_expiry, demand, negotiation, swap_request, quote])
+    db.session.commit()
+
+    counts = ExpirySweeper().sweep(now=now)
+
+    assert counts == {'listings': 1, 'demand_listings': 1, 'negotiations': 1, 'swap_quotes': 1}
+    db.session.expire_all()
+    assert db.session.get(Listing, overdue.id).status == ListingStatus.EXPIRED
+    assert db.session.get(Listing, fresh.id).status == ListingStatus.ACTIVE
+    assert db.session.get(Listing, withdrawn.id).status == ListingStatus.WITHDRAWN
+    assert db.session.get(Listing, no_expiry.id).status == ListingStatus.ACTIVE
+    assert db.session.get(DemandListing, demand.id).status == DemandStatus.EXPIRED
+    assert db.session.get(Negotiation, negotiation.id).status == NegotiationStatus.EXPIRED
+    assert db.session.get(SwapQuote, quote.id).status == SwapQuoteStatus.EXPIRED
+
+
+def test_sweep_runs_in_bounded_batches(app, user_id):
+    """Batches are bounded by batch_size and max_batches"""
+    past = datetime.utcnow() - timedelta(minutes=5)
+    db.session.add_all([_listing(user_id, past) for _ in range(7)])
+    db.session.commit()
+
+    sweeper = ExpirySweeper(batch_size=3, max_batches=2)
+    assert sweeper.sweep_target('listings') == 6
+    assert sweeper.sweep_target('listings') == 1
+    assert sweeper.sweep_target('listings') == 0
+
+
+def test_sweep_stats(app, user_id):
+    """Counters accumulate across runs"""
+    db.session.add(_listing(user_id, datetime.utcnow() - timedelta(minutes=1)))
+    db.session.commit()
+
+    sweeper = ExpirySweeper()
+    sweeper.sweep()
+    sweeper.sweep()
+
+    stats = sweeper.get_stats()
+    assert stats['runs'] == 2
+    assert stats['total_expired']['listings'] == 1
+    assert stats['last_run_counts']['listings'] == 0
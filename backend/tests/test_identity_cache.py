@@ -0,0 +1,145 @@
+"""
+Unit tests for the identity cache
+
+Tests ensure that:
+- TTLCache honours TTL, LRU size bound and the disabled (ttl=0) mode
+- A user is loaded at most once per request
+- Cached identities are served across requests and dropped on invalidation
+- Admin checks never come from the cache
+"""
+import pytest
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask
+from sqlalchemy import event
+from database import db
+from models import User, UserRole
+from utils.cache import TTLCache
+from utils.identity import (
+    identity_cache, get_current_user, get_user_identity, is_admin_user,
+    invalidate_user_identity
+)
+
+
+@pytest.fixture
+def app():
+    """Create Flask app for testing"""
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        identity_cache.clear()
+        yield app
+        identity_cache.clear()
+        db.drop_all()
+
+
+@pytest.fixture
+def user_id(app):
+    """Create a seller and return its ID"""
+    user_id = str(uuid.uuid4())
+    db.session.add(User(
+        id=user_id, username='seller', email='seller@example.com',
+        password_hash='x', role=UserRole.CEA_SELLER
+    ))
+    db.session.commit()
+    return user_id
+
+
+@pytest.fixture
+def user_queries(app):
+    """Count SELECTs against the users table"""
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'FROM users' in statement:
+            statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', _record)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', _record)
+
+
+def test_ttl_cache_expiry_and_lru():
+    """Entries expire after ttl and the least recently used is evicted"""
+    cache = TTLCache(maxsize=2, ttl=0.05)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+
+    time.sleep(0.06)
+    assert cache.get('a') is None
+
+    disabled = TTLCache(ttl=0)
+    disabled.set('a', 1)
+    assert disabled.get('a') is None
+
+
+def test_user_loaded_once_per_request(app, user_id, user_queries):
+    """Handler load, identity and admin checks share one query"""
+    with app.test_request_context(headers={'X-User-ID': user_id}):
+        user = get_current_user()
+        assert user.id == user_id
+        assert get_current_user() is user
+        assert get_user_identity(user_id).role == UserRole.CEA_SELLER
+        assert is_admin_user(user_id) is False
+
+    assert len(user_queries) == 1
+
+
+def test_identity_cached_across_requests(app, user_id, user_queries):
+    """Identity is served from cache until invalidated"""
+    with app.test_request_context():
+        assert get_user_identity(user_id).seller_code is None
+    with app.test_request_context():
+        assert get_user_identity(user_id).seller_code is None
+    assert len(user_queries) == 1
+
+    user = db.session.get(User, user_id)
+    user.seller_code = 'SELLER-CN-1234'
+    db.session.commit()
+    invalidate_user_identity(user_id)
+
+    with app.test_request_context():
+        assert get_user_identity(user_id).seller_code == 'SELLER-CN-1234'
+
+
+def test_admin_flag_not_cached(app, user_id, user_queries):
+    """A changed admin flag applies on the next request, without invalidation"""
+    user = db.session.get(User, user_id)
+    user.is_admin = True
+    db.session.commit()
+    user_queries.clear()
+    with app.test_request_context():
+        assert get_user_identity(user_id).role == UserRole.CEA_SELLER
+        assert is_admin_user(user_id) is True
+
+    # Revoked by another worker: this worker's cache is not invalidated
+    db.session.execute(db.update(User).where(User.id == user_id).values(is_admin=False))
+    db.session.commit()
+    with app.test_request_context():
+        assert get_user_identity(user_id).role == UserRole.CEA_SELLER
+        assert is_admin_user(user_id) is False
+    assert len(user_queries) == 2
+
+
+def test_unknown_user(app):
+    """Unknown users resolve to None and are not cached"""
+    with app.test_request_context():
+        assert get_user_identity(str(uuid.uuid4())) is None
+        assert is_admin_user(None) is False
+    assert len(identity_cache) == 0
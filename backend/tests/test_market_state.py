@@ -0,0 +1,149 @@
+"""
+Unit tests for the market state snapshot and the endpoints reading it
+
+Tests ensure that:
+- Ticks update prices, exact 24h change, high/low and spread statistics
+- Published hub ticks reach the shared market state
+- The long (7d) window and repeated ticks are handled
+- Market analysis uses live prices and reports 503 without any
+- Query parameters still override the snapshot
+"""
+import pytest
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask
+from api.market_analysis import market_analysis_bp
+from api.market_opportunities import market_opportunities_bp
+from services.market_state import MarketState, market_state
+from services.price_stream import PriceStreamHub, price_hub
+
+START = datetime(2026, 3, 2, 8, 0)
+
+
+def tick(state, event, price, minutes):
+    """Apply a tick `minutes` after START"""
+    state.on_tick(event, {'price': price, 'timestamp': (START + timedelta(minutes=minutes)).isoformat()})
+
+
+@pytest.fixture
+def client():
+    """Create test client"""
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.register_blueprint(market_analysis_bp)
+    app.register_blueprint(market_opportunities_bp)
+    market_state.reset()
+    yield app.test_client()
+    market_state.reset()
+
+
+def test_change_and_range_over_window():
+    """24h change is measured against the price at the window start"""
+    state = MarketState(change_window_hours=24)
+    tick(state, 'eua', 80.0, 0)
+    tick(state, 'eua', 95.0, 60)
+    tick(state, 'eua', 70.0, 12 * 60)
+
+    snapshot = state.snapshot()['eua']
+    assert snapshot['price'] == 70.0
+    assert snapshot['change_absolute24h'] is None  # Less than 24h of history
+    assert (snapshot['high24h'], snapshot['low24h']) == (95.0, 70.0)
+
+    tick(state, 'eua', 90.0, 24 * 60 + 30)
+    snapshot = state.snapshot()['eua']
+    assert snapshot['change_absolute24h'] == 10.0
+    assert snapshot['change_percent24h'] == 12.5
+    assert snapshot['samples24h'] == 3
+    assert (snapshot['high24h'], snapshot['low24h']) == (95.0, 70.0)
+
+    tick(state, 'eua', 85.0, 36 * 60 + 1)
+    snapshot = state.snapshot()['eua']
+    assert snapshot['change_absolute24h'] == 15.0  # Against the 70.0 tick
+    assert (snapshot['high24h'], snapshot['low24h']) == (90.0, 85.0)
+
+
+def test_long_window_and_repeated_ticks():
+    """7d statistics sit alongside 24h; re-applying the latest tick is a no-op"""
+    state = MarketState(change_window_hours=24, long_window_days=7)
+    for day in range(8):
+        tick(state, 'eua', 80.0 + day, day * 24 * 60)
+    entry = state.on_tick('eua', {'price': 87.0, 'timestamp': (START + timedelta(days=7)).isoformat()})
+
+    assert state.snapshot()['ticks'] == 8
+    assert entry['change_absolute24h'] == 1.0
+    assert entry['windows']['7d']['change'] == 7.0
+    assert entry['windows']['7d']['samples'] == 8
+    assert entry['windows']['24h']['samples'] == 2
+    assert entry['windows']['7d']['volatility'] is not None
+
+
+def test_spread_statistics():
+    """Spread mean/std/z-score follow the EUA-CEA difference"""
+    state = MarketState()
+    assert state.snapshot()['spread'] is None
+
+    tick(state, 'eua', 80.0, 0)
+    tick(state, 'cea', 10.0, 0)
+    tick(state, 'eua', 82.0, 10)
+    tick(state, 'cea', 10.0, 10)
+
+    spread = state.snapshot()['spread']
+    assert spread['samples'] == 3
+    assert spread['current'] == 72.0
+    assert spread['mean'] == pytest.approx(71.3333, abs=1e-4)
+    assert spread['std'] == pytest.approx(0.9428, abs=1e-4)
+    assert spread['z_score'] == pytest.approx(0.7071, abs=1e-4)
+
+
+def test_hub_publish_updates_state():
+    """Listeners receive new ticks only"""
+    hub = PriceStreamHub()
+    state = MarketState()
+    hub.add_listener(state.on_tick)
+
+    payload = {'price': 81.5, 'timestamp': START.isoformat(), 'source': 'ICE'}
+    hub.publish('eua', payload)
+    hub.publish('eua', dict(payload))  # Same tick again
+
+    assert state.snapshot()['ticks'] == 1
+    assert state.prices() == (81.5, None)
+    assert state.snapshot()['eua']['source'] == 'ICE'
+
+
+def test_analysis_uses_live_prices(client):
+    """Analysis reads prices and trends from the shared snapshot"""
+    response = client.get('/api/market/analysis')
+    assert response.status_code == 503
+    assert response.get_json()['code'] == 'PRICE_UNAVAILABLE'
+
+    price_hub.publish('eua', {'price': 90.0, 'timestamp': START.isoformat()})
+    price_hub.publish('cea', {'price': 8.5, 'timestamp': START.isoformat()})
+
+    data = client.get('/api/market/analysis').get_json()
+    assert data['currentPrices']['eua']['price'] == 90.0
+    assert data['currentPrices']['cea']['price'] == 8.5
+    assert data['spread']['absolute'] == 81.5
+    assert data['historicalTrends']['spread']['current'] == 81.5
+    assert data['historicalTrends']['eua']['high24h'] == 90.0
+    assert data['historicalTrends']['eua']['windows']['7d']['twap'] == 90.0
+
+    data = client.get('/api/market/analysis', query_string={'euaPrice': 100.0}).get_json()
+    assert data['currentPrices']['eua']['price'] == 100.0
+    assert data['currentPrices']['cea']['price'] == 8.5
+
+
+def test_opportunities_use_live_prices(client):
+    """Price-based opportunities appear once prices are known"""
+    without_prices = client.get('/api/market/opportunities').get_json()['opportunities']
+    assert all(opp['type'] == 'liquidity_crisis' for opp in without_prices)
+
+    price_hub.publish('eua', {'price': 88.0, 'timestamp': START.isoformat()})
+    price_hub.publish('cea', {'price': 8.0, 'timestamp': START.isoformat()})
+
+    with_prices = client.get('/api/market/opportunities').get_json()['opportunities']
+    assert any(opp['type'] == 'arbitrage' for opp in with_prices)
@@ -0,0 +1,127 @@
+"""
+Unit tests for the Monte Carlo risk engine
+
+Tests ensure that:
+- Calibration recovers volatility and correlation from a price history
+- Runs are reproducible by seed, in-process and in a worker pool
+- Zero-volatility runs reproduce the single-point calculator
+- The time budget truncates long runs, which the reported paths reproduce
+- The endpoint validates input and returns camelCase statistics
+"""
+import pytest
+import sys
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask
+from api.calculator import calculator_bp
+from services.monte_carlo import MonteCarloEngine, calibrate, DEFAULT_CALIBRATION
+from services.value_calculator import ValueCalculatorService
+
+SELLER = {'volume': 100000, 'current_price': 8.0, 'urgency': 'normal'}
+BUYER_SWAP = {
+    'eua_volume': 10000, 'eua_price': 88.0, 'cea_price': 52.8, 'use_case': 'cbam',
+    'has_china_operations': False, 'in_compliance_period': False
+}
+CALIBRATION = {
+    'eua_drift': 0.0, 'cea_drift': 0.0, 'eua_volatility': 0.3, 'cea_volatility': 0.25,
+    'correlation': 0.5, 'observations': 0, 'source': 'test'
+}
+
+
+def _gbm_history(days=2000, seed=7):
+    rng = np.random.default_rng(seed)
+    dt = 1 / 365
+    z = rng.standard_normal((2, days))
+    z[1] = 0.6 * z[0] + np.sqrt(1 - 0.6 ** 2) * z[1]
+    eua = 70 * np.exp(np.cumsum(-0.3 ** 2 / 2 * dt + 0.3 * np.sqrt(dt) * z[0]))
+    cea = 9 * np.exp(np.cumsum(-0.2 ** 2 / 2 * dt + 0.2 * np.sqrt(dt) * z[1]))
+    return eua, cea
+
+
+def test_calibration_recovers_parameters():
+    """Volatility and correlation of a simulated history are recovered"""
+    calibration = calibrate(*_gbm_history())
+    assert calibration['source'] == 'history'
+    assert calibration['eua_volatility'] == pytest.approx(0.3, rel=0.1)
+    assert calibration['cea_volatility'] == pytest.approx(0.2, rel=0.1)
+    assert calibration['correlation'] == pytest.approx(0.6, abs=0.1)
+
+    assert calibrate([70, 71], [9, 9.1]) == DEFAULT_CALIBRATION
+
+
+def test_seed_reproducible_across_workers():
+    """The same seed gives the same distribution in-process and in a pool"""
+    engine = MonteCarloEngine(chunk_size=5000)
+    first = engine.run('buyerSwap', BUYER_SWAP, paths=20000, seed=42, calibration=CALIBRATION)
+    second = engine.run('buyerSwap', BUYER_SWAP, paths=20000, seed=42, calibration=CALIBRATION)
+    other = engine.run('buyerSwap', BUYER_SWAP, paths=20000, seed=43, calibration=CALIBRATION)
+
+    pooled_engine = MonteCarloEngine(chunk_size=5000, workers=2)
+    try:
+        pooled = pooled_engine.run('buyerSwap', BUYER_SWAP, paths=20000, seed=42, calibration=CALIBRATION)
+    finally:
+        pooled_engine.close()
+
+    assert first['paths'] == 20000 and not first['truncated']
+    assert first['percentiles'] == second['percentiles'] == pooled['percentiles']
+    assert first['var_95'] == pooled['var_95']
+    assert first['percentiles'] != other['percentiles']
+    assert first['var_95'] > 0
+
+
+def test_zero_volatility_matches_calculator():
+    """Without volatility every path equals the single-point seller savings"""
+    engine = MonteCarloEngine()
+    flat = dict(CALIBRATION, eua_volatility=0.0, cea_volatility=0.0)
+    result = engine.run('seller', SELLER, paths=1000, seed=1, calibration=flat)
+
+    expected = ValueCalculatorService().calculate_seller_benefits(100000, 8.0)['total_savings']
+    assert result['mean'] == pytest.approx(expected, abs=0.01)
+    assert result['std'] == pytest.approx(0.0, abs=1e-6)
+    assert result['horizon_days'] == 28.0  # 3-5 weeks
+
+
+def test_time_budget_truncates():
+    """A tiny time budget stops after the first chunk"""
+    engine = MonteCarloEngine(chunk_size=1000)
+    result = engine.run('seller', SELLER, paths=100000, seed=1, time_budget_ms=0.001, calibration=CALIBRATION)
+    assert result['truncated'] is True
+    assert 1000 <= result['paths'] < 100000
+
+    # The completed chunks are the first ones: the reported paths reproduce it
+    rerun = engine.run('seller', SELLER, paths=result['paths'], seed=1, calibration=CALIBRATION)
+    assert rerun['truncated'] is False
+    assert rerun['percentiles'] == result['percentiles']
+
+
+def test_monte_carlo_endpoint():
+    """The endpoint returns camelCase statistics and validates input"""
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.register_blueprint(calculator_bp)
+    client = app.test_client()
+    headers = {'X-User-ID': str(uuid.uuid4())}
+
+    body = {'calculation': 'seller', 'inputs': {'volume': 100000, 'currentPrice': 8.0}, 'paths': 5000, 'seed': 3}
+    first = client.post('/api/calculator/monte-carlo', json=body, headers=headers)
+    second = client.post('/api/calculator/monte-carlo', json=body, headers=headers)
+
+    assert first.status_code == 200
+    data = first.get_json()
+    assert data['paths'] == 5000 and data['seed'] == 3
+    assert {'var95', 'var99', 'expectedShortfall95', 'probabilityOfLoss'} <= set(data)
+    assert set(data['percentiles']) == {'p1', 'p5', 'p25', 'p50', 'p75', 'p95', 'p99'}
+    assert data['percentiles'] == second.get_json()['percentiles']
+
+    response = client.post('/api/calculator/monte-carlo', json=dict(body, paths=10 ** 7), headers=headers)
+    assert response.status_code == 400
+    response = client.post('/api/calculator/monte-carlo', json=dict(body, seed='abc'), headers=headers)
+    assert response.status_code == 400
+    response = client.post('/api/calculator/monte-carlo', json={'calculation': 'buyerSwap', 'inputs': {}}, headers=headers)
+    assert response.status_code == 400
@@ -0,0 +1,188 @@
+"""
+Unit tests for the negotiation API
+
+Tests ensure that:
+- Buyers can open negotiations on listings and messages get sequence numbers
+- message_count is maintained without loading the message thread
+- Messages can be fetched incrementally by sequence or message ID
+- Long-poll returns as soon as a message is posted and times out otherwise
+- The notifier forgets idle negotiations but keeps those with waiters
+- Non-participants cannot read a negotiation
+"""
+import pytest
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask
+from database import db
+from models import User, UserRole, Listing, ListingStatus, Negotiation
+from api.negotiations import negotiations_bp
+from services.negotiation_service import NegotiationNotifier
+from utils.identity import identity_cache
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Create Flask app for testing (file database so threads share data)"""
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{tmp_path / "test.db"}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+
+    app.register_blueprint(negotiations_bp, url_prefix='/api/negotiations')
+
+    with app.app_context():
+        db.create_all()
+        identity_cache.clear()
+        yield app
+        identity_cache.clear()
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+
+def _create_user(role):
+    user_id = str(uuid.uuid4())
+    db.session.add(User(
+        id=user_id, username=f'user-{user_id[:8]}', email=f'{user_id[:8]}@example.com',
+        password_hash='x', role=role
+    ))
+    db.session.commit()
+    return user_id
+
+
+@pytest.fixture
+def parties(app):
+    """Seller with an active listing and a buyer"""
+    seller_id = _create_user(UserRole.CEA_SELLER)
+    buyer_id = _create_user(UserRole.CEA_BUYER)
+    listing_id = str(uuid.uuid4())
+    db.session.add(Listing(
+        id=listing_id, seller_id=seller_id, seller_code='SELLER-CN-1000', volume=1000,
+        price_per_tonne=8.0, currency='EUR', timeline='T+2', status=ListingStatus.ACTIVE
+    ))
+    db.session.commit()
+    return seller_id, buyer_id, listing_id
+
+
+def _open(client, buyer_id, listing_id, **extra):
+    response = client.post(
+        '/api/negotiations', json=dict(listing_id=listing_id, **extra), headers={'X-User-ID': buyer_id}
+    )
+    assert response.status_code == 201
+    return response.get_json()
+
+
+def test_open_and_message_sequence(client, parties):
+    """Messages are numbered per negotiation and counted on the negotiation row"""
+    seller_id, buyer_id, listing_id = parties
+    negotiation = _open(client, buyer_id, listing_id, message='Interested in 1000t', proposed_price=7.9)
+
+    assert negotiation['messageCount'] == 1
+    assert negotiation['initiatorCode'].startswith('BUYER-EU-')
+    assert negotiation['counterpartyCode'] == 'SELLER-CN-1000'
+
+    response = client.post(
+        f"/api/negotiations/{negotiation['id']}/messages",
+        json={'message': 'Can do 8.1', 'price_proposal': 8.1},
+        headers={'X-User-ID': seller_id}
+    )
+    assert response.status_code == 201
+    message = response.get_json()
+    assert message['sequence'] == 2
+    assert message['senderType'] == 'seller'
+
+    db.session.expire_all()
+    stored = db.session.get(Negotiation, negotiation['id'])
+    assert stored.message_count == 2
+    assert float(stored.proposed_price) == 8.1
+
+
+def test_incremental_fetch(client, parties):
+    """Messages after a sequence or message ID cursor are returned"""
+    seller_id, buyer_id, listing_id = parties
+    negotiation = _open(client, buyer_id, listing_id, message='first')
+    url = f"/api/negotiations/{negotiation['id']}/messages"
+    for text in ('second', 'third'):
+        client.post(url, json={'message': text}, headers={'X-User-ID': seller_id})
+
+    page = client.get(f'{url}?since=1', headers={'X-User-ID': buyer_id}).get_json()
+    assert [m['messageText'] for m in page['messages']] == ['second', 'third']
+    assert page['cursor'] == 3
+
+    second_id = page['messages'][0]['id']
+    page = client.get(f'{url}?since={second_id}', headers={'X-User-ID': buyer_id}).get_json()
+    assert [m['messageText'] for m in page['messages']] == ['third']
+
+    page = client.get(f'{url}?since=3', headers={'X-User-ID': buyer_id}).get_json()
+    assert page['messages'] == [] and page['cursor'] == 3
+
+    response = client.get(f'{url}?since=not-a-message', headers={'X-User-ID': buyer_id})
+    assert response.status_code == 400
+
+
+def test_long_poll_wakes_on_new_message(app, client, parties):
+    """A waiting long-poll returns when the counterparty posts"""
+    seller_id, buyer_id, listing_id = parties
+    negotiation = _open(client, buyer_id, listing_id)
+    url = f"/api/negotiations/{negotiation['id']}/messages"
+
+    def post_later():
+        time.sleep(0.3)
+        with app.test_client() as other:
+            other.post(url, json={'message': 'offer'}, headers={'X-User-ID': seller_id})
+
+    poster = threading.Thread(target=post_later)
+    started = time.monotonic()
+    poster.start()
+    page = client.get(f'{url}/poll?since=0&timeout=10', headers={'X-User-ID': buyer_id}).get_json()
+    poster.join()
+
+    assert [m['messageText'] for m in page['messages']] == ['offer']
+    assert time.monotonic() - started < 5
+
+    page = client.get(f'{url}/poll?since=1&timeout=0.2', headers={'X-User-ID': buyer_id}).get_json()
+    assert page['messages'] == [] and page['cursor'] == 1
+
+
+def test_notifier_prunes_idle_negotiations():
+    """Announced sequences are dropped after retention unless someone waits"""
+    notifier = NegotiationNotifier(retention_seconds=0.05)
+    for index in range(100):
+        notifier.notify(f'idle-{index}', 1)
+    assert len(notifier) == 100
+
+    woken = []
+    waiter = threading.Thread(target=lambda: woken.append(notifier.wait('watched', 1, timeout=5)))
+    notifier.notify('watched', 1)
+    waiter.start()
+    time.sleep(0.1)
+    notifier.notify('other', 1)  # Prunes the idle ones, not the watched one
+    assert len(notifier) == 2
+    assert notifier.wait('watched', 0, timeout=0)
+
+    notifier.notify('watched', 2)
+    waiter.join()
+    assert woken == [True]
+
+
+def test_non_participant_denied(client, parties):
+    """Users outside the negotiation get 403"""
+    _, buyer_id, listing_id = parties
+    negotiation = _open(client, buyer_id, listing_id)
+    outsider_id = _create_user(UserRole.CEA_BUYER)
+
+    response = client.get(f"/api/negotiations/{negotiation['id']}", headers={'X-User-ID': outsider_id})
+    assert response.status_code == 403
@@ -0,0 +1,121 @@
+"""
+Unit tests for the price stream hub and SSE endpoint
+
+Tests ensure that:
+- New subscribers get a snapshot of the latest tick per type
+- Subscribers resume from Last-Event-ID; unknown ids fall back to a snapshot
+- Unchanged ticks are not re-broadcast
+- Waiters are woken by publish and time out otherwise
+- The SSE endpoint streams buffered ticks filtered by type
+- Streams beyond the per-worker cap get 503 with Retry-After
+"""
+import pytest
+import sys
+import threading
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask
+from config import Config
+from services.price_stream import PriceStreamHub, price_hub
+from api.price_stream import price_stream_bp
+from utils.sse import stream_slots
+
+
+def _tick(price):
+    return {'price': price, 'timestamp': '2024-01-01T12:00:00', 'currency': 'EUR', 'change24h': None, 'source': 'test'}
+
+
+def test_snapshot_and_resume():
+    """New subscribers get the latest tick per type; known ids resume"""
+    hub = PriceStreamHub(buffer_size=3)
+    hub.publish('eua', _tick(70.0))
+    hub.publish('cea', _tick(8.0))
+    third = hub.publish('eua', _tick(71.0))
+
+    events, cursor = hub.events_since(None)
+    assert [(e.event, e.data['price']) for e in events] == [('cea', 8.0), ('eua', 71.0)]
+    assert cursor == third
+
+    events, _ = hub.events_since(1)
+    assert [e.id for e in events] == [2, 3]
+
+    # Id from a previous process: snapshot instead of nothing
+    events, _ = hub.events_since(999)
+    assert {e.event for e in events} == {'eua', 'cea'}
+
+    hub.publish('eua', _tick(72.0))
+    hub.publish('eua', _tick(73.0))
+    # Id 1 fell out of the 3-event buffer: snapshot
+    events, _ = hub.events_since(1)
+    assert [(e.event, e.data['price']) for e in events] == [('cea', 8.0), ('eua', 73.0)]
+
+
+def test_duplicate_tick_not_rebroadcast():
+    """Publishing identical data returns the previous id"""
+    hub = PriceStreamHub()
+    first = hub.publish('eua', _tick(70.0))
+    assert hub.publish('eua', _tick(70.0)) == first
+    assert hub.get_stats()['published'] == 1
+
+
+def test_wait_wakes_on_publish():
+    """wait() returns new events when published and [] on timeout"""
+    hub = PriceStreamHub()
+    _, cursor = hub.events_since(None)
+
+    timer = threading.Timer(0.1, hub.publish, args=('eua', _tick(70.0)))
+    timer.start()
+    events, cursor = hub.wait(cursor, timeout=5)
+    timer.join()
+    assert [e.data['price'] for e in events] == [70.0]
+
+    events, same_cursor = hub.wait(cursor, timeout=0.05)
+    assert events == [] and same_cursor == cursor
+
+
+def test_sse_endpoint_streams_filtered_ticks(monkeypatch):
+    """The SSE endpoint sends buffered ticks of the requested types"""
+    monkeypatch.setattr(Config, 'PRICE_STREAM_MAX_DURATION_SECONDS', 0)
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.register_blueprint(price_stream_bp)
+
+    price_hub.publish('eua', _tick(75.5))
+    price_hub.publish('cea', _tick(8.25))
+
+    response = app.test_client().get('/api/prices/stream?types=cea')
+    body = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    assert 'event: cea' in body and '"price":8.25' in body
+    assert 'event: eua' not in body
+
+
+def test_stream_refused_at_capacity(monkeypatch):
+    """Streams beyond STREAM_MAX_CONNECTIONS_PER_WORKER are refused; closed streams free their slot"""
+    monkeypatch.setattr(Config, 'PRICE_STREAM_MAX_DURATION_SECONDS', 0)
+    monkeypatch.setattr(stream_slots, 'limit', 1)
+    monkeypatch.setattr(stream_slots, '_in_use', 0)  # Earlier tests may leave unclosed test responses
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.register_blueprint(price_stream_bp)
+    client = app.test_client()
+
+    assert stream_slots.acquire()
+    try:
+        response = client.get('/api/prices/stream')
+        assert response.status_code == 503
+        assert response.get_json()['code'] == 'STREAM_CAPACITY_EXCEEDED'
+        assert response.headers['Retry-After'] == str(Config.STREAM_RETRY_AFTER_SECONDS)
+    finally:
+        stream_slots.release()
+
+    response = client.get('/api/prices/stream')
+    response.get_data()
+    response.close()
+    assert response.status_code == 200
+    assert stream_slots.get_stats()['in_use'] == 0
@@ -0,0 +1,280 @@
+"""
+Unit tests for resumable (tus-style) KYC document uploads
+
+Tests ensure that:
+- Chunks are appended at the current offset and the file is assembled on disk
+- Finalize validates the file and creates a KYCDocument in the document store
+- Offset mismatches, incomplete uploads and bad requests are rejected
+- Interrupted chunks keep the bytes received so far
+- Expired uploads are purged with their partial files
+- A chunk or finalize held by another worker process is refused
+- A finalize whose commit fails can be retried, also for content already stored
+"""
+import hashlib
+import io
+import os
+import pytest
+import sys
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask
+from database import db
+from models import User, KYCDocument, DocumentBlob, DocumentUpload, UploadStatus
+from models.kyc_document import DocumentType
+from api.kyc import kyc_bp
+from services.document_store import document_store
+from services.resumable_upload import resumable_uploads, fcntl
+
+CONTENT = b'%PDF-1.4\n' + bytes(range(256)) * 400
+CHUNK = b'application/offset+octet-stream'
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Create Flask app for testing with the store in a temporary directory"""
+    monkeypatch.setattr(document_store, 'root', str(tmp_path / 'blobs'))
+
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    app.register_blueprint(kyc_bp)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+
+@pytest.fixture
+def user_id(app):
+    """Create a user and return its ID"""
+    user_id = str(uuid.uuid4())
+    db.session.add(User(id=user_id, username='uploader', email='uploader@example.com', password_hash='x'))
+    db.session.commit()
+    return user_id
+
+
+def create(client, user_id, file_name='statement.pdf', file_size=len(CONTENT), **extra):
+    return client.post('/api/kyc/documents/uploads', json={
+        'document_type': 'financial_statement', 'file_name': file_name, 'file_size': file_size, **extra
+    }, headers={'X-User-ID': user_id})
+
+
+def patch(client, user_id, upload_id, offset, data):
+    return client.patch(
+        f'/api/kyc/documents/uploads/{upload_id}', data=data,
+        headers={'X-User-ID': user_id, 'Upload-Offset': str(offset), 'Content-Type': CHUNK.decode()}
+    )
+
+
+def test_chunked_upload_creates_document(client, user_id):
+    """Chunks sent in order are assembled and finalized into a document"""
+    response = create(client, user_id)
+    assert response.status_code == 201
+    assert response.headers['Upload-Offset'] == '0'
+    upload_id = response.get_json()['upload']['id']
+    assert response.headers['Location'].endswith(f'/api/kyc/documents/uploads/{upload_id}')
+
+    offset = 0
+    for size in (40000, 40000, len(CONTENT) - 80000):
+        response = patch(client, user_id, upload_id, offset, CONTENT[offset:offset + size])
+        assert response.status_code == 204
+        offset += size
+        assert response.headers['Upload-Offset'] == str(offset)
+
+    response = client.head(f'/api/kyc/documents/uploads/{upload_id}', headers={'X-User-ID': user_id})
+    assert response.headers['Upload-Offset'] == str(len(CONTENT))
+
+    response = client.post(f'/api/kyc/documents/uploads/{upload_id}/finalize', headers={'X-User-ID': user_id})
+    assert response.status_code == 201
+    document = response.get_json()['document']
+    assert document['sha256'] == hashlib.sha256(CONTENT).hexdigest()
+    assert document['fileSize'] == len(CONTENT)
+    assert document['documentType'] == 'financial_statement'
+    with open(document['filePath'], 'rb') as f:
+        assert f.read() == CONTENT
+
+    upload = DocumentUpload.query.filter_by(id=upload_id).first()
+    assert upload.status == UploadStatus.COMPLETED
+    assert upload.document_id == document['id']
+    assert not os.path.exists(resumable_uploads.partial_path(upload_id))
+    assert KYCDocument.query.count() == 1
+
+
+def test_offset_mismatch_and_incomplete_upload(client, user_id):
+    """Chunks at the wrong offset and early finalize are rejected with the current offset"""
+    upload_id = create(client, user_id).get_json()['upload']['id']
+    assert patch(client, user_id, upload_id, 0, CONTENT[:1000]).status_code == 204
+
+    response = patch(client, user_id, upload_id, 0, CONTENT[:1000])
+    assert response.status_code == 409
+    assert response.get_json()['code'] == 'OFFSET_MISMATCH'
+    assert response.headers['Upload-Offset'] == '1000'
+
+    response = client.post(f'/api/kyc/documents/uploads/{upload_id}/finalize', headers={'X-User-ID': user_id})
+    assert response.status_code == 409
+    assert response.get_json()['code'] == 'UPLOAD_INCOMPLETE'
+
+    response = patch(client, user_id, upload_id, 1000, CONTENT[1000:] + b'extra')
+    assert response.status_code == 413
+    assert response.headers['Upload-Offset'] == '1000'
+
+
+def test_request_validation(client, user_id):
+    """Bad create and chunk requests are rejected"""
+    assert create(client, user_id, file_name='statement.exe').status_code == 400
+    assert create(client, user_id, file_size=0).status_code == 400
+    assert create(client, user_id, file_size=resumable_uploads.max_size + 1).status_code == 413
+
+    upload_id = create(client, user_id).get_json()['upload']['id']
+    response = client.patch(
+        f'/api/kyc/documents/uploads/{upload_id}', data=b'x',
+        headers={'X-User-ID': user_id, 'Upload-Offset': '0', 'Content-Type': 'application/pdf'}
+    )
+    assert response.status_code == 415
+
+    other_user = str(uuid.uuid4())
+    assert patch(client, other_user, upload_id, 0, b'x').status_code == 404
+
+
+def test_invalid_file_aborts_upload(client, user_id):
+    """An upload whose first bytes don't match its type is aborted and discarded"""
+    upload_id = create(client, user_id, mime_type='image/png').get_json()['upload']['id']
+
+    response = patch(client, user_id, upload_id, 0, CONTENT)
+    assert response.status_code == 400
+    assert response.get_json()['code'] == 'INVALID_FILE'
+    assert DocumentUpload.query.filter_by(id=upload_id).first().status == UploadStatus.ABORTED
+    assert not os.path.exists(resumable_uploads.partial_path(upload_id))
+    assert patch(client, user_id, upload_id, len(CONTENT), b'x').status_code == 409
+
+
+@pytest.mark.skipif(fcntl is None, reason='flock needs a POSIX system')
+def test_upload_held_by_another_worker(client, user_id):
+    """A partial file locked elsewhere refuses chunks and finalize; completion is one-shot"""
+    upload_id = create(client, user_id).get_json()['upload']['id']
+    assert patch(client, user_id, upload_id, 0, CONTENT).status_code == 204
+
+    # Another worker process writing the upload holds its own flock on the partial file
+    with open(resumable_uploads.partial_path(upload_id), 'r+b') as other:
+        fcntl.flock(other.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        response = client.post(f'/api/kyc/documents/uploads/{upload_id}/finalize', headers={'X-User-ID': user_id})
+        assert response.status_code == 409
+        assert response.get_json()['code'] == 'UPLOAD_BUSY'
+        assert patch(client, user_id, upload_id, len(CONTENT), b'').status_code == 409
+
+    upload = DocumentUpload.query.filter_by(id=upload_id).first()
+    assert upload.status == UploadStatus.IN_PROGRESS
+    assert resumable_uploads.complete(upload) is True
+    assert resumable_uploads.complete(upload) is False
+    db.session.rollback()
+
+
+def test_failed_finalize_can_be_retried(client, user_id, monkeypatch):
+    """The partial file survives a failed commit, whether the content was new or already stored"""
+    headers = {'X-User-ID': user_id}
+    upload_ids = []
+    for _ in range(2):
+        upload_ids.append(create(client, user_id).get_json()['upload']['id'])
+        assert patch(client, user_id, upload_ids[-1], 0, CONTENT).status_code == 204
+
+    commit = db.session.commit
+    for upload_id in upload_ids:  # New content, then the same content again
+        failures = []
+
+        def failing_commit():
+            if not failures:
+                failures.append(True)
+                raise RuntimeError('database is locked')
+            commit()
+
+        monkeypatch.setattr(db.session, 'commit', failing_commit)
+        response = client.post(f'/api/kyc/documents/uploads/{upload_id}/finalize', headers=headers)
+        assert response.status_code == 500
+        assert os.path.exists(resumable_uploads.partial_path(upload_id))
+        monkeypatch.setattr(db.session, 'commit', commit)
+
+        response = client.post(f'/api/kyc/documents/uploads/{upload_id}/finalize', headers=headers)
+        assert response.status_code == 201
+        assert not os.path.exists(resumable_uploads.partial_path(upload_id))
+    assert KYCDocument.query.count() == 2
+
+
+def test_failed_restore_still_cleans_up(client, user_id, monkeypatch):
+    """When the partial file cannot be put back, the new blob is still removed and the error reported"""
+    upload_id = create(client, user_id).get_json()['upload']['id']
+    assert patch(client, user_id, upload_id, 0, CONTENT).status_code == 204
+
+    commit = db.session.commit
+    failures = []
+
+    def failing_commit():
+        if not failures:
+            failures.append(True)
+            raise RuntimeError('database is locked')
+        commit()
+
+    link = os.link
+
+    def failing_link(src, dst, **kwargs):
+        if dst == resumable_uploads.partial_path(upload_id):
+            raise OSError('disk full')
+        return link(src, dst, **kwargs)
+
+    monkeypatch.setattr(db.session, 'commit', failing_commit)
+    monkeypatch.setattr(os, 'link', failing_link)
+    response = client.post(f'/api/kyc/documents/uploads/{upload_id}/finalize', headers={'X-User-ID': user_id})
+    assert response.status_code == 500
+    assert response.get_json()['code'] == 'UPLOAD_ERROR'
+    assert not os.path.exists(document_store.blob_path(hashlib.sha256(CONTENT).hexdigest()))
+    assert DocumentBlob.query.count() == 0
+
+
+class BrokenStream(io.BytesIO):
+    """Stream that fails after its first read, like a dropped connection"""
+
+    def read(self, size=-1):
+        if self.tell():
+            raise ConnectionResetError('client went away')
+        return super().read(size)
+
+
+def test_interrupted_chunk_keeps_received_bytes(app, user_id):
+    """Bytes received before a dropped connection count towards the offset"""
+    upload = resumable_uploads.create(user_id, DocumentType.FINANCIAL_STATEMENT, 'statement.pdf', 'application/pdf', len(CONTENT))
+    db.session.commit()
+
+    with pytest.raises(ConnectionResetError):
+        resumable_uploads.append(upload, 0, BrokenStream(CONTENT))
+    received = resumable_uploads.store.chunk_size
+    assert upload.upload_offset == received
+
+    assert resumable_uploads.append(upload, received, io.BytesIO(CONTENT[received:])) == len(CONTENT)
+    with open(resumable_uploads.partial_path(upload.id), 'rb') as f:
+        assert f.read() == CONTENT
+
+
+def test_purge_expired_uploads(app, user_id):
+    """Uploads past their expiry are deleted with their partial files"""
+    stale = resumable_uploads.create(user_id, DocumentType.FINANCIAL_STATEMENT, 'old.pdf', 'application/pdf', 10)
+    fresh = resumable_uploads.create(user_id, DocumentType.FINANCIAL_STATEMENT, 'new.pdf', 'application/pdf', 10)
+    stale.expires_at = datetime.utcnow() - timedelta(minutes=1)
+    db.session.commit()
+
+    assert resumable_uploads.purge_expired() == 1
+    assert not os.path.exists(resumable_uploads.partial_path(stale.id))
+    assert os.path.exists(resumable_uploads.partial_path(fresh.id))
+    assert [upload.id for upload in DocumentUpload.query.all()] == [fresh.id]
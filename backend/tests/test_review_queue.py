@@ -0,0 +1,253 @@
+"""
+Unit tests for the admin KYC review queue
+
+Tests ensure that:
+- Dossier summaries follow uploads, deletions, submission and reviews
+- Queue pages come from one query on the summaries, oldest first, keyset-paginated
+- Status and risk filters and malformed parameters are handled
+- Expired registration certificates are flagged as time passes
+- Users without a summary are backfilled; admins are left out
+- Refreshes upsert, and users auto-created on status lookups get a summary
+"""
+import io
+import pytest
+import sys
+import uuid
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import event
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask
+from database import db
+from models import User, KYCDocument, KYCReviewSummary
+from models.kyc_document import DocumentType
+from models.user import KYCStatus, RiskLevel, SanctionsCheckStatus
+from api.kyc import kyc_bp
+from api.admin_kyc import admin_kyc_bp
+from services.document_store import document_store
+from services.review_queue import review_queue, REQUIRED_DOCUMENTS
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 100
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Create Flask app for testing with the store in a temporary directory"""
+    monkeypatch.setattr(document_store, 'root', str(tmp_path / 'blobs'))
+
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    app.register_blueprint(kyc_bp)
+    app.register_blueprint(admin_kyc_bp)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def admin_headers(app):
+    """Create an admin and return its request headers"""
+    admin_id = str(uuid.uuid4())
+    db.session.add(User(id=admin_id, username='reviewer', email='reviewer@example.com', password_hash='x',
+                        is_admin=True))
+    db.session.commit()
+    return {'X-Admin-ID': admin_id}
+
+
+def add_user(name, **fields):
+    """Create a user and return its ID"""
+    user_id = str(uuid.uuid4())
+    db.session.add(User(id=user_id, username=name, email=f'{name}@example.com', password_hash='x', **fields))
+    db.session.commit()
+    return user_id
+
+
+def upload(client, user_id, document_type):
+    """Upload a PNG document and return its ID"""
+    response = client.post('/api/kyc/documents/upload', headers={'X-User-ID': user_id},
+                           data={'document_type': document_type.value, 'file': (io.BytesIO(PNG), 'scan.png')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 201
+    return response.get_json()['document']['id']
+
+
+def summary_of(user_id):
+    """Current summary row of a user"""
+    db.session.expire_all()
+    return db.session.get(KYCReviewSummary, user_id)
+
+
+def test_summary_follows_dossier_events(app, admin_headers):
+    """Uploads, deletions, submission and reviews keep the summary current"""
+    client = app.test_client()
+    user_id = add_user('operator', company_name='Operator SRL')
+    headers = {'X-User-ID': user_id}
+
+    document_ids = [upload(client, user_id, document_type) for document_type in REQUIRED_DOCUMENTS]
+    upload(client, user_id, DocumentType.COMPANY_REGISTRATION)
+    summary = summary_of(user_id)
+    assert summary.document_counts['company_registration'] == 2
+    assert (summary.document_total, summary.unverified_documents, summary.missing_documents) == (6, 6, [])
+    assert summary.kyc_status == KYCStatus.PENDING and summary.in_queue
+    assert 'sanctions_unchecked' in summary.risk_flags
+
+    assert client.delete(f'/api/kyc/documents/{document_ids[3]}', headers=headers).status_code == 200
+    assert summary_of(user_id).missing_documents == ['eu_ets_proof']
+    response = client.post('/api/kyc/submit', headers=headers)
+    assert response.status_code == 400
+    assert response.get_json()['missing_documents'] == ['eu_ets_proof']
+
+    upload(client, user_id, DocumentType.EU_ETS_PROOF)
+    assert client.post('/api/kyc/submit', headers=headers).status_code == 200
+    summary = summary_of(user_id)
+    user = db.session.get(User, user_id)
+    assert summary.kyc_status == KYCStatus.IN_REVIEW
+    assert summary.queued_at == user.kyc_submitted_at
+
+    response = client.post(f'/api/admin/kyc/{user_id}/verify-document/{document_ids[0]}', headers=admin_headers,
+                           json={'action': 'verify'})
+    assert response.status_code == 200
+    response = client.post(f'/api/admin/kyc/{user_id}/verify-document/{document_ids[1]}', headers=admin_headers,
+                           json={'action': 'reject'})
+    assert response.status_code == 200
+    summary = summary_of(user_id)
+    assert (summary.unverified_documents, summary.rejected_documents) == (4, 1)
+
+    response = client.post(f'/api/admin/kyc/{user_id}/set-risk-level', headers=admin_headers,
+                           json={'risk_level': 'high'})
+    assert response.status_code == 200
+    assert summary_of(user_id).risk_level == RiskLevel.HIGH
+
+    assert client.post(f'/api/admin/kyc/{user_id}/approve', headers=admin_headers, json={}).status_code == 200
+    summary = summary_of(user_id)
+    assert summary.kyc_status == KYCStatus.APPROVED and not summary.in_queue
+
+    # Dossier details load the user with documents and workflow
+    response = client.get(f'/api/admin/kyc/{user_id}', headers=admin_headers)
+    assert response.status_code == 200
+    assert len(response.get_json()['documents']) == 6
+    assert response.get_json()['workflow']['currentStep'] == 'approved'
+
+
+def test_queue_pages_from_summaries(app, admin_headers):
+    """Queue pages are one query on the summaries, longest waiting first"""
+    now = datetime.utcnow()
+    user_ids = []
+    for index in range(5):
+        user_ids.append(add_user(
+            f'company{index}',
+            kyc_status=KYCStatus.IN_REVIEW if index % 2 else KYCStatus.PENDING,
+            kyc_submitted_at=now - timedelta(hours=10 - index),
+            created_at=now - timedelta(hours=20 - index),
+            risk_level=RiskLevel.MEDIUM if index == 3 else RiskLevel.LOW,
+            sanctions_check_status=SanctionsCheckStatus.FLAGGED if index == 1 else SanctionsCheckStatus.CLEARED,
+        ))
+    add_user('approved', kyc_status=KYCStatus.APPROVED)
+    add_user('late_joiner')  # No summary yet
+    review_queue.refresh_many(user_ids + [User.query.filter_by(username='approved').one().id])
+    db.session.commit()
+
+    client = app.test_client()
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = client.get('/api/admin/kyc/queue?limit=2', headers=admin_headers)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    assert response.status_code == 200
+    data = response.get_json()
+    queue_statements = [s for s in statements if 'kyc_review_summaries' in s]
+    assert len(queue_statements) == 1
+    assert not any('FROM kyc_documents' in s for s in statements)
+
+    # Pending dossiers wait since registration, in-review ones since submission
+    assert [item['username'] for item in data['dossiers']] == ['company0', 'company2']
+    assert data['hasMore'] is True
+    first = data['dossiers'][0]
+    assert first['missingDocuments'] == [doc.value for doc in REQUIRED_DOCUMENTS]
+    assert first['documentCounts'] == {}
+    assert 18 < first['ageInQueueHours'] <= 20
+    assert 'kycDocuments' not in first and 'beneficialOwners' not in first
+
+    seen = [item['username'] for item in data['dossiers']]
+    while data['nextCursor']:
+        data = client.get(f"/api/admin/kyc/queue?limit=2&cursor={data['nextCursor']}",
+                          headers=admin_headers).get_json()
+        seen += [item['username'] for item in data['dossiers']]
+    assert seen == ['company0', 'company2', 'company4', 'company1', 'company3']
+
+    response = client.get('/api/admin/kyc/queue?status=in_review', headers=admin_headers)
+    dossiers = response.get_json()['dossiers']
+    assert [item['username'] for item in dossiers] == ['company1', 'company3']
+    assert 'sanctions_flagged' in dossiers[0]['riskFlags']
+    response = client.get('/api/admin/kyc/queue?status=in_review&risk_level=medium', headers=admin_headers)
+    assert [item['username'] for item in response.get_json()['dossiers']] == ['company3']
+
+    for query, code in (('status=approved', 'INVALID_STATUS'), ('risk_level=extreme', 'INVALID_RISK_LEVEL'),
+                        ('cursor=not-a-cursor', 'INVALID_CURSOR'), ('limit=many', 'INVALID_LIMIT')):
+        response = client.get(f'/api/admin/kyc/queue?{query}', headers=admin_headers)
+        assert response.status_code == 400
+        assert response.get_json()['code'] == code
+
+
+def test_expired_documents_and_backfill(app, admin_headers):
+    """Registration certificates are flagged once too old; missing summaries are backfilled"""
+    old_id = add_user('old_filer')
+    new_id = add_user('new_filer')
+    for user_id, document_date in ((old_id, date.today() - timedelta(days=100)),
+                                   (new_id, date.today() - timedelta(days=10))):
+        db.session.add(KYCDocument(
+            id=str(uuid.uuid4()), user_id=user_id, document_type=DocumentType.COMPANY_REGISTRATION,
+            file_path='/tmp/cert.pdf', file_name='cert.pdf', file_size=100, mime_type='application/pdf',
+            document_date=document_date
+        ))
+    db.session.commit()
+
+    assert review_queue.backfill() == 2
+    assert review_queue.backfill() == 0
+    assert KYCReviewSummary.query.count() == 2  # Not the admin
+
+    summaries = {summary.username: summary for summary in KYCReviewSummary.query.all()}
+    assert 'expired_documents' in summaries['old_filer'].to_dict()['riskFlags']
+    assert 'expired_documents' not in summaries['new_filer'].to_dict()['riskFlags']
+    later = datetime.utcnow() + timedelta(days=81)
+    assert 'expired_documents' in summaries['new_filer'].to_dict(now=later)['riskFlags']
+
+    # Summaries go with their user
+    db.session.delete(db.session.get(User, old_id))
+    db.session.commit()
+    assert KYCReviewSummary.query.count() == 1
+
+
+def test_refresh_upserts_and_auto_created_users(app):
+    """A summary written concurrently is updated, not inserted twice"""
+    user_id = add_user('racer')
+    # Another request summarised the user after this one started
+    db.session.execute(KYCReviewSummary.__table__.insert().values(
+        user_id=user_id, username='stale', kyc_status=KYCStatus.PENDING, risk_level=RiskLevel.LOW,
+        in_queue=True, queued_at=datetime.utcnow(), document_counts={}, missing_documents=[], risk_flags=[]
+    ))
+    assert review_queue.refresh(user_id) is True
+    assert review_queue.refresh(user_id) is True
+    db.session.commit()
+    assert KYCReviewSummary.query.count() == 1
+    assert summary_of(user_id).username == 'racer'
+    assert summary_of(user_id).missing_documents == [doc.value for doc in REQUIRED_DOCUMENTS]
+
+    new_id = str(uuid.uuid4())
+    response = app.test_client().get('/api/kyc/status', headers={'X-User-ID': new_id})
+    assert response.status_code == 404  # Onboarding not started, but the user now exists
+    assert summary_of(new_id).kyc_status == KYCStatus.PENDING
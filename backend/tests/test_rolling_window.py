@@ -0,0 +1,92 @@
+"""
+Unit tests for the time-indexed rolling window
+
+Tests ensure that:
+- Change is measured against the last value at (latest - window)
+- Running mean/std, high/low and volatility match a full recomputation
+- Time- and volume-weighted averages weight samples correctly
+"""
+import math
+import random
+import statistics
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.rolling_window import RollingWindow, SECONDS_PER_YEAR
+
+START = datetime(2026, 3, 2, 0, 0)
+
+
+def test_exact_24h_change_with_minute_ticks():
+    """With one tick a minute, the reference is the tick 24h earlier, not 24 ticks earlier"""
+    window = RollingWindow(timedelta(hours=24))
+    for minute in range(24 * 60 + 31):
+        window.add(START + timedelta(minutes=minute), 80.0 + minute / 100)
+
+    # Latest tick at 24h30m; the value 24h earlier is the 30th minute's
+    assert window.change() == pytest.approx(24 * 60 / 100)
+    assert window.change_percent() == pytest.approx((24 * 60 / 100) / 80.3 * 100)
+    assert len(window) == 24 * 60 + 1
+
+
+def test_stats_match_recomputation():
+    """Incremental stats equal a recomputation over the samples in the window"""
+    rng = random.Random(7)
+    window = RollingWindow(timedelta(hours=6))
+    samples = []
+    timestamp = START
+    for _ in range(2000):
+        timestamp += timedelta(seconds=rng.randint(30, 90))
+        value = 80 + rng.gauss(0, 3)
+        window.add(timestamp, value)
+        samples.append((timestamp, value))
+
+    cutoff = timestamp - timedelta(hours=6)
+    kept = [value for ts, value in samples if ts >= cutoff]
+    kept_times = [ts for ts, _ in samples if ts >= cutoff]
+    assert len(window) == len(kept)
+    assert window.mean() == pytest.approx(statistics.fmean(kept))
+    assert window.std() == pytest.approx(statistics.pstdev(kept), rel=1e-6)
+    assert window.high() == max(kept)
+    assert window.low() == min(kept)
+
+    # Each kept sample carries the log return from its predecessor
+    first = samples.index((kept_times[0], kept[0]))
+    returns = [
+        math.log(samples[i][1] / samples[i - 1][1])
+        for i in range(first, len(samples))
+    ]
+    interval = (kept_times[-1] - kept_times[0]).total_seconds() / (len(kept) - 1)
+    expected = statistics.pstdev(returns) * math.sqrt(SECONDS_PER_YEAR / interval)
+    assert window.volatility() == pytest.approx(expected, rel=1e-6)
+
+
+def test_weighted_averages():
+    """TWAP weights by holding time, VWAP by volume"""
+    window = RollingWindow(timedelta(hours=24))
+    window.add(START, 80.0, volume=100)
+    assert window.twap() == 80.0
+    assert window.vwap() == 80.0
+
+    window.add(START + timedelta(minutes=30), 90.0, volume=300)
+    window.add(START + timedelta(minutes=40), 85.0)
+
+    # 80 held for 30 minutes, 90 for 10 minutes
+    assert window.twap() == pytest.approx((80 * 30 + 90 * 10) / 40)
+    assert window.vwap() == pytest.approx((80 * 100 + 90 * 300) / 400)
+    assert window.z_score() == 0.0  # Latest value equals the mean
+
+
+def test_empty_window_stats():
+    """An empty window reports no statistics"""
+    stats = RollingWindow(timedelta(hours=1)).stats()
+    assert stats['samples'] == 0
+    assert stats['change'] is None
+    assert stats['mean'] is None
+    assert stats['complete'] is False
@@ -0,0 +1,251 @@
+"""
+Unit tests for incremental sanctions list loading
+
+Tests ensure that:
+- CSV and XML list exports are parsed as streams
+- Syncs apply only added, changed and removed entries, without emptying the index
+- Unchanged files aren't parsed again; unreadable files don't remove entries
+- Missing list files and mass removals are refused without changing the index
+- Versioned gzip snapshots restore the index on a cold start
+- Admins can sync the lists and read the loaded version
+"""
+import gzip
+import os
+import pytest
+import sys
+import uuid
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask
+from database import db
+from models import User
+from api.admin_kyc import admin_kyc_bp
+import services.sanctions_checker as sanctions_checker
+import services.sanctions_list_loader as sanctions_list_loader
+from config import Config
+from services.sanctions_checker import SanctionsChecker, screening_index
+from services.sanctions_list_loader import SanctionsListLoader
+from services.screening_index import ScreeningIndex, iter_xml_entries
+
+SANCTIONS_CSV = (
+    'id,name,aliases,program\n'
+    '1,"PUTIN, Vladimir Vladimirovich",Vladimir Putin,RUSSIA\n'
+    '2,Rosneft Oil Company,,RUSSIA\n'
+    '3,Ivan Petrov,,BELARUS\n'
+)
+
+PEP_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<export xmlns="urn:example:pep">
+  <entries>
+    <entry id="7">
+      <name>Ştefan Ionescu</name>
+      <alias>Stefan Ionesco</alias>
+      <position>Minister</position>
+    </entry>
+    <record><id>8</id><name>Maria Dumitrescu</name><country>RO</country></record>
+  </entries>
+</export>
+"""
+
+
+@pytest.fixture
+def folder(tmp_path):
+    """List folder with a sanctions CSV and a PEP XML export"""
+    (tmp_path / 'eu_consolidated.csv').write_text(SANCTIONS_CSV, encoding='utf-8')
+    (tmp_path / 'pep_romania.xml').write_text(PEP_XML, encoding='utf-8')
+    return tmp_path
+
+
+@pytest.fixture
+def loader():
+    return SanctionsListLoader(ScreeningIndex())
+
+
+def test_xml_entries(folder):
+    """Attributes, child elements and repeated aliases make up the entry"""
+    entries = list(iter_xml_entries(str(folder / 'pep_romania.xml'), list_type='pep'))
+    assert [entry.entry_id for entry in entries] == ['pep_romania:7', 'pep_romania:8']
+    assert entries[0].aliases == ('Stefan Ionesco',)
+    assert entries[0].details == {'position': 'Minister'}
+    assert entries[1].list_type == 'pep'
+
+
+def test_sync_applies_deltas(folder, loader, monkeypatch):
+    """Only changed entries touch the index, which is never emptied"""
+    result = loader.sync(str(folder))
+    assert (result.added, result.updated, result.removed, result.errors) == (5, 0, 0, [])
+    assert loader.index.search('Stefan Ionescu', list_types=('pep',))[0].entry.details['position'] == 'Minister'
+    first_version = result.version
+
+    def fail():
+        raise AssertionError('index rebuilt')
+    monkeypatch.setattr(loader.index, 'clear', fail)
+
+    (folder / 'eu_consolidated.csv').write_text(
+        'id,name,aliases,program\n'
+        '1,"PUTIN, Vladimir Vladimirovich",Vladimir Putin;Volodymyr Putin,RUSSIA\n'
+        '3,Ivan Petrov,,BELARUS\n'
+        '4,Gazprom Neft,,RUSSIA\n',
+        encoding='utf-8'
+    )
+    result = loader.sync(str(folder))
+    assert (result.added, result.updated, result.removed, result.unchanged) == (1, 1, 1, 3)
+    assert result.version != first_version
+    assert loader.index.search('Rosneft Oil Company') == []
+    assert loader.index.search('Gazprom Neft')[0].entry.entry_id == 'eu_consolidated:4'
+    assert loader.index.get('eu_consolidated:1').aliases == ('Vladimir Putin', 'Volodymyr Putin')
+    assert len(loader.index) == 5
+
+
+def test_unchanged_files_are_not_parsed(folder, loader, monkeypatch):
+    """Same files skip parsing; same entries keep the version"""
+    version = loader.sync(str(folder)).version
+
+    def fail(path):
+        raise AssertionError('list parsed again')
+    monkeypatch.setattr(sanctions_list_loader, 'iter_list_entries', fail)
+    assert loader.sync(str(folder)).version == version
+    monkeypatch.undo()
+
+    # Reformatted but equivalent export
+    (folder / 'eu_consolidated.csv').write_text(SANCTIONS_CSV.replace('\n', '\r\n'), encoding='utf-8')
+    result = loader.sync(str(folder))
+    assert result.version == version
+    assert not result.changed
+
+
+def test_unreadable_file_keeps_entries(folder, loader):
+    """A broken export is reported and its entries stay indexed"""
+    loader.sync(str(folder))
+    (folder / 'pep_romania.xml').write_text('<export><entry id="7"><name>Broken', encoding='utf-8')
+
+    result = loader.sync(str(folder))
+    assert result.errors and result.errors[0].startswith('pep_romania.xml')
+    assert result.removed == 0
+    assert 'pep_romania:8' in loader.index
+
+
+def test_snapshot_cold_start(folder, loader, monkeypatch):
+    """A new loader restores the newest valid snapshot without parsing the lists"""
+    snapshots = folder / 'snapshots'
+    version = loader.sync(str(folder), str(snapshots)).version
+    assert os.path.exists(loader.snapshot_path(str(snapshots), version))
+
+    restarted = SanctionsListLoader(ScreeningIndex())
+    assert restarted.load_snapshot(str(snapshots)) is True
+    assert restarted.version == version
+    assert restarted.index.search('Vladimir Putin')[0].entry.details == {'program': 'RUSSIA'}
+
+    def fail(path):
+        raise AssertionError('list parsed after a cold start')
+    monkeypatch.setattr(sanctions_list_loader, 'iter_list_entries', fail)
+    assert restarted.sync(str(folder), str(snapshots)).version == version
+    monkeypatch.undo()
+
+    # Snapshots beyond snapshot_keep are dropped; an invalid newest one is skipped
+    loader.snapshot_keep = 2
+    for number in range(3):
+        with open(folder / 'eu_consolidated.csv', 'a', encoding='utf-8') as f:
+            f.write(f'{10 + number},Entry {number},,TEST\n')
+        version = loader.sync(str(folder), str(snapshots)).version
+    assert len(list(snapshots.glob('screening-*.jsonl.gz'))) == 2
+
+    previous = [path for path in snapshots.glob('screening-*.jsonl.gz')
+                if path.name != os.path.basename(loader.snapshot_path(str(snapshots), version))][0]
+    with gzip.open(loader.snapshot_path(str(snapshots), version), 'wt', encoding='utf-8') as f:
+        f.write('{"version": "%s"}\n' % version)
+    os.utime(previous, (1, 1))
+    restarted = SanctionsListLoader(ScreeningIndex())
+    assert restarted.load_snapshot(str(snapshots)) is True
+    assert restarted.version != version
+    assert len(restarted.index) > 0
+
+
+def test_sanctions_checker_loads_incrementally(folder, monkeypatch):
+    """First use restores the snapshot; later loads apply deltas"""
+    monkeypatch.setattr(Config, 'SANCTIONS_LISTS_FOLDER', str(folder))
+    monkeypatch.setattr(sanctions_checker, '_loaded', False)
+    try:
+        assert SanctionsChecker.check_sanctions('Ivan Petrov')['sanctions_match'] is True
+        version = SanctionsChecker.list_version()
+
+        (folder / 'eu_consolidated.csv').write_text(SANCTIONS_CSV.replace('3,Ivan Petrov,,BELARUS\n', ''),
+                                                     encoding='utf-8')
+        result = SanctionsChecker.load_lists()
+        assert (result.added, result.removed) == (0, 1)
+        assert SanctionsChecker.check_sanctions('Ivan Petrov')['sanctions_match'] is False
+        assert SanctionsChecker.list_version() == result.version != version
+
+        # Cold start: snapshot of the current version, then nothing to apply
+        monkeypatch.setattr(sanctions_checker, '_loaded', False)
+        result = SanctionsChecker.load_lists()
+        assert result.version != version and not result.changed
+        assert sanctions_checker.list_loader.get_stats()['snapshot_loaded']
+    finally:
+        screening_index.clear()
+
+
+def test_admin_sync_endpoints(folder, monkeypatch):
+    """The sync endpoint reports the applied changes and the status the loaded version"""
+    monkeypatch.setattr(Config, 'SANCTIONS_LISTS_FOLDER', str(folder))
+    monkeypatch.setattr(sanctions_checker, '_loaded', False)
+
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    app.register_blueprint(admin_kyc_bp)
+
+    with app.app_context():
+        db.create_all()
+        admin_id = str(uuid.uuid4())
+        db.session.add(User(id=admin_id, username='reviewer', email='reviewer@example.com',
+                            password_hash='x', is_admin=True))
+        db.session.commit()
+        client = app.test_client()
+        headers = {'X-Admin-ID': admin_id}
+        try:
+            status = client.get('/api/admin/kyc/sanctions-lists', headers=headers).get_json()
+            assert status['entries'] == 5
+            assert status['version'] == SanctionsChecker.list_version()
+
+            with open(folder / 'eu_consolidated.csv', 'a', encoding='utf-8') as f:
+                f.write('4,Gazprom Neft,,RUSSIA\n')
+            response = client.post('/api/admin/kyc/sanctions-lists/sync', headers=headers)
+            assert response.status_code == 200
+            result = response.get_json()['result']
+            assert (result['added'], result['removed'], result['changed']) == (1, 0, True)
+            assert response.get_json()['status']['version'] == result['version'] != status['version']
+        finally:
+            screening_index.clear()
+            db.drop_all()
+
+
+def test_missing_files_and_mass_removals_are_refused(folder, loader):
+    """An emptied folder or a truncated export keeps the index and version"""
+    version = loader.sync(str(folder)).version
+    moved = {path.name: path.read_text(encoding='utf-8') for path in folder.glob('*.*')}
+    for path in folder.glob('*.*'):
+        path.unlink()
+
+    result = loader.sync(str(folder))
+    assert result.errors == [f'No list files found in {folder}']
+    assert (result.version, result.removed) == (version, 0)
+    assert len(loader.index) == 5
+
+    for name, text in moved.items():
+        (folder / name).write_text(text, encoding='utf-8')
+    (folder / 'eu_consolidated.csv').write_text('id,name,aliases,program\n4,Gazprom Neft,,RUSSIA\n',
+                                                encoding='utf-8')
+    result = loader.sync(str(folder))
+    assert result.errors and 'would remove 3 of 5' in result.errors[0]
+    assert (result.version, result.added, result.removed) == (version, 0, 0)
+    assert loader.index.search('Gazprom Neft') == []
+
+    result = loader.sync(str(folder), accept_removals=True)
+    assert (result.added, result.removed, result.errors) == (1, 3, [])
+    assert len(loader.index) == 3
@@ -0,0 +1,205 @@
+"""
+Unit tests for bulk sanctions/PEP rescreening
+
+Tests ensure that:
+- Company names and beneficial owners of every user are screened in pages
+- Statuses, PEP flags and risk levels are updated in bulk, each name screened once
+- Users already screened against the current list version are skipped
+- A list update or a forced run rescreens everyone
+- Admins can start the job and read its status; manual checks record the version
+- Nothing is cleared or stamped while no usable lists are loaded
+"""
+import pytest
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask
+from database import db
+from models import User
+from models.user import RiskLevel, SanctionsCheckStatus
+from api.admin_kyc import admin_kyc_bp
+import services.sanctions_checker as sanctions_checker
+from config import Config
+from services.sanctions_checker import SanctionsChecker, screening_index
+from services.sanctions_rescreening import SanctionsRescreening, sanctions_rescreening
+
+SANCTIONS_LIST = (
+    'id,name,aliases\n'
+    '1,"PUTIN, Vladimir Vladimirovich",Vladimir Putin\n'
+    '2,Rosneft Oil Company,\n'
+)
+
+
+@pytest.fixture
+def lists(tmp_path, monkeypatch):
+    """Sanctions and PEP list files used by SanctionsChecker"""
+    (tmp_path / 'eu_consolidated.csv').write_text(SANCTIONS_LIST, encoding='utf-8')
+    (tmp_path / 'pep_romania.csv').write_text('id,name,position\n7,Stefan Ionescu,Minister\n', encoding='utf-8')
+    monkeypatch.setattr(Config, 'SANCTIONS_LISTS_FOLDER', str(tmp_path))
+    monkeypatch.setattr(sanctions_checker, '_loaded', False)
+    yield tmp_path
+    screening_index.clear()
+
+
+@pytest.fixture
+def app(lists):
+    """Create Flask app for testing"""
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    app.register_blueprint(admin_kyc_bp)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+
+def add_user(company_name, owners=(), **fields):
+    """Create a user with beneficial owners and return its ID"""
+    user_id = str(uuid.uuid4())
+    db.session.add(User(
+        id=user_id, username=f'user-{user_id[:8]}', email=f'{user_id[:8]}@example.com', password_hash='x',
+        company_name=company_name, beneficial_owners=[{'name': name} for name in owners], **fields
+    ))
+    db.session.commit()
+    return user_id
+
+
+def get_user(user_id):
+    db.session.expire_all()
+    return User.query.filter_by(id=user_id).first()
+
+
+def test_rescreening_updates_users_and_owners(app, monkeypatch):
+    """Owners on a list flag their company; each name is screened once"""
+    clean = add_user('Acme Carbon Trading SRL', ['Maria Popescu'])
+    sanctioned_owner = add_user('Northern Energy Ltd', ['Vladimir Putin', 'Maria Popescu'])
+    sanctioned_company = add_user('ROSNEFT OIL CO')
+    pep_owner = add_user('Danube Steel SA', ['Ştefan Ionescu'])
+    admin = add_user('Nihao', is_admin=True)
+
+    screened = []
+    check_sanctions = SanctionsChecker.check_sanctions
+    monkeypatch.setattr(SanctionsChecker, 'check_sanctions', staticmethod(
+        lambda name, *args: screened.append(name) or check_sanctions(name, *args)
+    ))
+
+    job = SanctionsRescreening(page_size=2, workers=2)
+    counts = job.run()
+    version = SanctionsChecker.list_version()
+    assert counts == {'users': 4, 'flagged': 2, 'pep': 1, 'names': 7, 'skipped': 0, 'list_version': version}
+    assert sorted(screened) == sorted(set(screened))
+
+    assert get_user(clean).sanctions_check_status == SanctionsCheckStatus.CLEARED
+    assert get_user(clean).risk_level == RiskLevel.LOW
+    for user_id in (sanctioned_owner, sanctioned_company):
+        user = get_user(user_id)
+        assert user.sanctions_check_status == SanctionsCheckStatus.FLAGGED
+        assert user.risk_level == RiskLevel.HIGH
+        assert user.sanctions_list_version == version
+    user = get_user(pep_owner)
+    assert user.pep_status is True
+    assert user.sanctions_check_status == SanctionsCheckStatus.CLEARED
+    assert user.risk_level == RiskLevel.MEDIUM
+    assert get_user(admin).sanctions_list_version is None
+
+
+def test_rescreening_skips_current_version(app, lists):
+    """Only users not screened against the current lists are rescreened"""
+    user_id = add_user('Northern Energy Ltd', ['Ivan Petrov'])
+    job = SanctionsRescreening()
+    assert job.run()['users'] == 1
+
+    counts = job.run()
+    assert counts['users'] == 0
+    assert counts['skipped'] == 1
+    assert job.run(force=True)['users'] == 1
+
+    # A list update puts the owner on the list and changes the version
+    (lists / 'eu_consolidated.csv').write_text(SANCTIONS_LIST + '3,Ivan Petrov,\n', encoding='utf-8')
+    SanctionsChecker.load_lists()
+    counts = job.run()
+    assert counts['users'] == 1 and counts['flagged'] == 1
+    assert get_user(user_id).sanctions_check_status == SanctionsCheckStatus.FLAGGED
+
+
+def test_admin_rescreening_endpoints(app, client):
+    """Admins start the job in the background and read its status"""
+    admin_id = add_user('Nihao', is_admin=True)
+    user_id = add_user('Northern Energy Ltd', ['Vladimir Putin'])
+    headers = {'X-Admin-ID': admin_id}
+
+    assert client.post('/api/admin/kyc/rescreen', headers={'X-Admin-ID': user_id}).status_code in (401, 403)
+
+    runs = sanctions_rescreening.get_stats()['runs']
+    response = client.post('/api/admin/kyc/rescreen', json={'force': True}, headers=headers)
+    assert response.status_code == 202
+    assert response.get_json()['listVersion'] == SanctionsChecker.list_version()
+
+    deadline = time.monotonic() + 10
+    while sanctions_rescreening.get_stats()['runs'] == runs and time.monotonic() < deadline:
+        time.sleep(0.05)
+    status = client.get('/api/admin/kyc/rescreen/status', headers=headers).get_json()
+    assert status['lastRunCounts']['users'] == 1
+    assert status['lastRunCounts']['flagged'] == 1
+    assert get_user(user_id).sanctions_check_status == SanctionsCheckStatus.FLAGGED
+
+    sanctions_rescreening._lock.acquire()
+    try:
+        response = client.post('/api/admin/kyc/rescreen', headers=headers)
+        assert response.status_code == 409
+        assert response.get_json()['code'] == 'RESCREENING_RUNNING'
+    finally:
+        sanctions_rescreening._lock.release()
+
+
+def test_manual_check_flags_owners_and_records_version(app, client):
+    """A sanctions check from the review screen counts for the rescreening job"""
+    admin_id = add_user('Nihao', is_admin=True)
+    user_id = add_user('Northern Energy Ltd', ['Vladimir Putin'])
+
+    response = client.post(f'/api/admin/kyc/{user_id}/sanctions-check', headers={'X-Admin-ID': admin_id})
+    assert response.status_code == 200
+    user = get_user(user_id)
+    assert user.sanctions_check_status == SanctionsCheckStatus.FLAGGED
+    assert user.sanctions_list_version == SanctionsChecker.list_version()
+    assert SanctionsRescreening().run()['users'] == 0
+
+
+def test_rescreening_refuses_without_lists(app, client, lists, monkeypatch):
+    """With no usable lists nobody is cleared or stamped with a version"""
+    for path in lists.glob('*.csv'):
+        path.unlink()
+    monkeypatch.setattr(sanctions_checker, '_loaded', False)
+    admin_id = add_user('Nihao', is_admin=True)
+    user_id = add_user('Rosneft Oil Company')
+    headers = {'X-Admin-ID': admin_id}
+
+    counts = SanctionsRescreening().run()
+    assert counts == {'lists_unavailable': 'No sanctions list entries are loaded'}
+    user = get_user(user_id)
+    assert user.sanctions_check_status == SanctionsCheckStatus.PENDING
+    assert user.sanctions_list_version is None
+
+    status = client.get('/api/admin/kyc/rescreen/status', headers=headers).get_json()
+    assert status['listsUnavailable'] == 'No sanctions list entries are loaded'
+    response = client.post('/api/admin/kyc/rescreen', headers=headers)
+    assert response.status_code == 503
+    assert response.get_json()['code'] == 'SANCTIONS_LISTS_UNAVAILABLE'
+    response = client.post(f'/api/admin/kyc/{user_id}/sanctions-check', headers=headers)
+    assert response.status_code == 503
+    assert get_user(user_id).sanctions_check_status == SanctionsCheckStatus.PENDING
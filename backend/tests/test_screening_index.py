@@ -0,0 +1,166 @@
+"""
+Unit tests for the indexed sanctions/PEP screening engine
+
+Tests ensure that:
+- Names are normalised and compared with Jaro-Winkler/Levenshtein
+- The index finds entries despite word order, aliases, accents and typos
+- Unrelated names and other list types are not reported
+- Entries can be added, replaced and removed
+- Scoring runs outside the index lock
+- SanctionsChecker screens against list files loaded into the index
+"""
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import services.sanctions_checker as sanctions_checker
+import services.screening_index as screening_module
+from config import Config
+from services.sanctions_checker import SanctionsChecker, screening_index
+from services.screening_index import ScreeningEntry, ScreeningIndex, iter_csv_entries
+from utils.name_matching import (
+    jaro_winkler, levenshtein, levenshtein_ratio, name_similarity, name_tokens, soundex
+)
+
+ENTRIES = [
+    ScreeningEntry('eu:1', 'PUTIN, Vladimir Vladimirovich', 'sanctions', 'eu', ('Vladimir Putin',)),
+    ScreeningEntry('eu:2', 'Aleksandr Grigoryevich LUKASHENKO', 'sanctions', 'eu', ('Alexander Lukashenka',)),
+    ScreeningEntry('un:3', 'Rosneft Oil Company', 'sanctions', 'un'),
+    ScreeningEntry('pep:4', 'Ştefan Ionescu', 'pep', 'pep', details={'position': 'Minister', 'country': 'RO'}),
+]
+
+
+@pytest.fixture
+def index():
+    index = ScreeningIndex(threshold=0.9)
+    index.add_all(ENTRIES)
+    return index
+
+
+def test_name_matching_primitives():
+    """Normalisation, phonetic keys and string similarities"""
+    assert name_tokens('Ştefan-Ionescu  SRL.') == ['stefan', 'ionescu']
+    assert name_tokens('SRL') == ['srl']
+    assert soundex('robert') == soundex('rupert') == 'r163'
+    assert soundex('ashcraft') == 'a261'
+    assert jaro_winkler('martha', 'marhta') == pytest.approx(0.9611, abs=1e-4)
+    assert levenshtein('kitten', 'sitting') == 3
+    assert levenshtein('kitten', 'sitting', max_distance=1) == 2
+    assert levenshtein_ratio('kitten', 'sitting', cutoff=0.9) == 0.0
+    assert name_similarity(name_tokens('Jon Smith'), name_tokens('John Smyth')) > 0.9
+    assert name_similarity(name_tokens('Ivan'), name_tokens('Ivan Petrov Sidorov')) < 0.9
+
+
+def test_search_finds_variants(index):
+    """Word order, aliases, accents, legal forms and typos still match"""
+    assert index.search('Vladimir Putin')[0].entry.entry_id == 'eu:1'
+    assert index.search('Putin Vladimir V.')[0].entry.entry_id == 'eu:1'
+
+    match = index.search('Alexander Lukashenko')[0]
+    assert match.entry.entry_id == 'eu:2'
+    assert match.score > 0.9
+
+    assert index.search('ROSNEFT OIL CO')[0].entry.entry_id == 'un:3'
+    assert index.search('Stefan Ionesco')[0].entry.entry_id == 'pep:4'
+
+
+def test_search_rejects_unrelated_names_and_filters_lists(index):
+    """Different names score below the threshold; list types can be restricted"""
+    assert index.search('Vladimir Popescu') == []
+    assert index.search('John Smith') == []
+    assert index.search('') == []
+    assert index.search('Stefan Ionescu', list_types=('sanctions',)) == []
+    assert index.search('Stefan Ionescu', list_types=('pep',))[0].entry.details['position'] == 'Minister'
+
+
+def test_add_replace_and_remove(index):
+    """Entries are updated in place and removed with their names"""
+    index.add(ScreeningEntry('un:3', 'Gazprom Neft', 'sanctions', 'un'))
+    assert index.search('Rosneft Oil') == []
+    assert index.search('Gazpromneft')[0].entry.entry_id == 'un:3'
+
+    assert index.remove('eu:1') is True
+    assert index.remove('eu:1') is False
+    assert index.search('Vladimir Putin') == []
+    assert 'eu:1' not in index
+    assert len(index) == 3
+
+
+def test_scoring_does_not_hold_the_lock(index, monkeypatch):
+    """Other threads can take the index lock while a search scores its candidates"""
+    acquired = []
+
+    def scoring(*args, **kwargs):
+        def try_lock():
+            if index._lock.acquire(timeout=1):
+                acquired.append(True)
+                index._lock.release()
+        thread = threading.Thread(target=try_lock)
+        thread.start()
+        thread.join()
+        return name_similarity(*args, **kwargs)
+
+    monkeypatch.setattr(screening_module, 'name_similarity', scoring)
+    assert [match.entry.entry_id for match in index.search('Vladimir Putin')] == ['eu:1']
+    assert acquired
+
+
+def test_candidates_are_bounded():
+    """Only max_candidates names are considered per search on a large list"""
+    index = ScreeningIndex(max_candidates=25)
+    index.add_all(
+        ScreeningEntry(str(number), f'Ivan Petrov {number:05d}', 'sanctions', 'test') for number in range(2000)
+    )
+    assert len(index._candidates(name_tokens('Ivan Petrov'))) == 25
+    assert index.get_stats()['entries'] == 2000
+
+
+@pytest.fixture
+def list_folder(tmp_path, monkeypatch):
+    """Sanctions and PEP CSV exports loaded through SanctionsChecker"""
+    (tmp_path / 'eu_consolidated.csv').write_text(
+        'id,name,aliases,program\n'
+        '1,"PUTIN, Vladimir Vladimirovich",Vladimir Putin,RUSSIA\n'
+        '2,,,EMPTY\n',
+        encoding='utf-8'
+    )
+    (tmp_path / 'pep_romania.csv').write_text(
+        'id,name,position,country\n'
+        '7,Ştefan Ionescu,Minister,RO\n',
+        encoding='utf-8'
+    )
+    monkeypatch.setattr(Config, 'SANCTIONS_LISTS_FOLDER', str(tmp_path))
+    monkeypatch.setattr(sanctions_checker, '_loaded', False)
+    yield tmp_path
+    screening_index.clear()
+
+
+def test_csv_entries(list_folder):
+    """Rows become entries with source-scoped ids; nameless rows are skipped"""
+    entries = list(iter_csv_entries(str(list_folder / 'eu_consolidated.csv')))
+    assert entries == [ScreeningEntry(
+        'eu_consolidated:1', 'PUTIN, Vladimir Vladimirovich', 'sanctions', 'eu_consolidated',
+        ('Vladimir Putin',), {'program': 'RUSSIA'}
+    )]
+
+
+def test_sanctions_checker_uses_list_files(list_folder):
+    """Lists are indexed on first use and screened with fuzzy matching"""
+    result = SanctionsChecker.check_sanctions('Vladimir Putin')
+    assert result['sanctions_match'] is True
+    assert result['risk_level'] == 'high'
+    assert result['matches'][0]['source'] == 'eu_consolidated'
+    assert result['matches'][0]['score'] == 1.0
+
+    pep = SanctionsChecker.check_pep('Stefan Ionescu')
+    assert pep['is_pep'] is True
+    assert pep['details']['position'] == 'Minister'
+
+    clean = SanctionsChecker.check_sanctions('Acme Carbon Trading SRL')
+    assert clean['sanctions_match'] is False and clean['pep_match'] is False
+    assert clean['risk_level'] == 'low'
@@ -0,0 +1,112 @@
+"""
+Unit tests for the swap quote engine
+
+Tests ensure that:
+- Pending swap requests are quoted from the current prices and flipped to QUOTED
+- Quotes carry the calculator ratio, fee and configured validity
+- Requests are not quoted twice and are left pending when no price is known
+- The background worker quotes enqueued requests quickly
+"""
+import pytest
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask
+from database import db
+from models import User, SwapRequest, SwapRequestStatus, SwapQuote, SwapQuoteStatus
+from services.buyer_swap_calculator import market_conditions
+from services.swap_quote_engine import SwapQuoteEngine
+from utils.compliance_detector import ComplianceDetector
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Create Flask app for testing (file database so the worker thread shares data)"""
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{tmp_path / "test.db"}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def user_id(app):
+    """Create an EUA holder and return its ID"""
+    user_id = str(uuid.uuid4())
+    db.session.add(User(id=user_id, username='holder', email='holder@example.com', password_hash='x'))
+    db.session.commit()
+    return user_id
+
+
+def _swap_request(user_id, eua_volume=10000):
+    swap_request = SwapRequest(
+        id=str(uuid.uuid4()), requester_id=user_id, eua_volume=eua_volume,
+        settlement_timeline='T+2', status=SwapRequestStatus.PENDING
+    )
+    db.session.add(swap_request)
+    db.session.commit()
+    return swap_request.id
+
+
+def test_quotes_pending_requests(app, user_id):
+    """Each pending request gets one quote and becomes QUOTED"""
+    ids = [_swap_request(user_id) for _ in range(3)]
+    engine = SwapQuoteEngine(validity_minutes=30, fee_percent=0.5, price_provider=lambda: (88.0, 8.0))
+
+    before = datetime.utcnow()
+    assert engine.quote_pending() == 3
+    assert engine.quote_pending() == 0
+
+    quotes = SwapQuote.query.all()
+    assert sorted(q.swap_request_id for q in quotes) == sorted(ids)
+    quote = quotes[0]
+    expected_ratio = engine.swap_calculator.calculate_swap_ratio(
+        88.0, 8.0, market_conditions(10000, ComplianceDetector.is_compliance_period())
+    )
+    assert float(quote.offered_ratio) == expected_ratio
+    assert quote.cea_volume == int(10000 * float(quote.offered_ratio))
+    assert float(quote.eua_value) == 880000.0
+    assert float(quote.facilitation_fee_amount) == 4400.0
+    assert quote.status == SwapQuoteStatus.PENDING
+    assert before + timedelta(minutes=29) < quote.valid_until <= datetime.utcnow() + timedelta(minutes=30)
+    assert {r.status for r in SwapRequest.query.all()} == {SwapRequestStatus.QUOTED}
+
+
+def test_no_price_leaves_requests_pending(app, user_id):
+    """Without prices nothing is quoted"""
+    request_id = _swap_request(user_id)
+    engine = SwapQuoteEngine(price_provider=lambda: (None, None))
+
+    assert engine.quote_requests([request_id]) == 0
+    assert engine.get_stats()['skipped_no_price'] == 1
+    assert db.session.get(SwapRequest, request_id).status == SwapRequestStatus.PENDING
+    assert SwapQuote.query.count() == 0
+
+
+def test_worker_quotes_enqueued_requests(app, user_id):
+    """Enqueued requests are quoted by the worker in well under a second"""
+    engine = SwapQuoteEngine(price_provider=lambda: (88.0, 8.0))
+    engine.start(app)
+    ids = [_swap_request(user_id) for _ in range(50)]
+
+    started = time.monotonic()
+    for request_id in ids:
+        engine.enqueue(request_id)
+    while SwapQuote.query.count() < len(ids) and time.monotonic() - started < 5:
+        db.session.rollback()
+        time.sleep(0.01)
+
+    assert SwapQuote.query.count() == len(ids)
+    assert time.monotonic() - started < 1
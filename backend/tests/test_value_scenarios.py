@@ -0,0 +1,184 @@
+"""
+Unit tests for saved value scenarios
+
+Tests ensure that:
+- Scenarios are listed newest first with cursor pagination
+- Summary mode returns no payloads and doesn't select them
+- Single scenarios load their full payload and are private to their owner
+- Rows written as JSON text before the column change still load; unparseable ones are skipped
+- Empty lists and cursors past the last row return empty pages
+"""
+import pytest
+import sys
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask
+from sqlalchemy import event, text
+from database import db
+from models import User
+from models.value_scenario import ValueScenario
+from api.calculator import calculator_bp, _encode_scenario_cursor
+
+
+@pytest.fixture
+def app():
+    """Create Flask app for testing"""
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    app.register_blueprint(calculator_bp)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+
+def _create_user():
+    user_id = str(uuid.uuid4())
+    db.session.add(User(id=user_id, username=f'user-{user_id[:8]}', email=f'{user_id[:8]}@example.com', password_hash='x'))
+    db.session.commit()
+    return user_id
+
+
+def _create_scenarios(user_id, count):
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        db.session.add(ValueScenario(
+            id=str(uuid.uuid4()), user_id=user_id, scenario_type='seller_cea',
+            input_data={'volume': 1000 * (i + 1)}, nihao_benefits={'price': 7.84},
+            alternative_costs={'price': 7.4}, savings=float(i), created_at=start + timedelta(hours=i)
+        ))
+    db.session.commit()
+
+
+def test_save_and_paginate(client, app):
+    """Saved scenarios come back newest first across pages"""
+    user_id = _create_user()
+    headers = {'X-User-ID': user_id}
+    response = client.post('/api/calculator/scenarios', json={
+        'scenarioType': 'seller_cea', 'inputData': {'volume': 5}, 'results': {'totalSavings': 99.0, 'nihaoOffer': {'price': 1}}
+    }, headers=headers)
+    assert response.status_code == 200
+    _create_scenarios(user_id, 4)
+
+    savings, cursor, pages = [], None, 0
+    while True:
+        url = '/api/calculator/scenarios?limit=2' + (f'&cursor={cursor}' if cursor else '')
+        data = client.get(url, headers=headers).get_json()
+        savings += [s['savings'] for s in data['scenarios']]
+        pages += 1
+        cursor = data['nextCursor']
+        if not data['hasMore']:
+            break
+
+    assert pages == 3
+    assert savings == [99.0, 3.0, 2.0, 1.0, 0.0]
+
+    first = client.get('/api/calculator/scenarios?limit=1', headers=headers).get_json()['scenarios'][0]
+    assert first['inputData'] == {'volume': 5}
+    assert first['nihaoBenefits'] == {'price': 1}
+
+
+def test_summary_skips_payloads(client, app):
+    """Summary mode neither returns nor selects payload columns"""
+    user_id = _create_user()
+    _create_scenarios(user_id, 3)
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        data = client.get('/api/calculator/scenarios?view=summary', headers={'X-User-ID': user_id}).get_json()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+
+    assert len(data['scenarios']) == 3
+    assert set(data['scenarios'][0]) == {'id', 'scenarioType', 'savings', 'createdAt'}
+    assert not any('input_data' in statement for statement in statements)
+
+
+def test_get_scenario(client, app):
+    """A single scenario returns its payload to its owner only"""
+    user_id = _create_user()
+    _create_scenarios(user_id, 1)
+    scenario_id = ValueScenario.query.first().id
+
+    response = client.get(f'/api/calculator/scenarios/{scenario_id}', headers={'X-User-ID': user_id})
+    assert response.status_code == 200
+    assert response.get_json()['alternativeCosts'] == {'price': 7.4}
+
+    response = client.get(f'/api/calculator/scenarios/{scenario_id}', headers={'X-User-ID': _create_user()})
+    assert response.status_code == 404
+
+    response = client.get('/api/calculator/scenarios?cursor=not-a-cursor', headers={'X-User-ID': user_id})
+    assert response.status_code == 400
+
+
+def test_legacy_text_rows_load(client, app):
+    """Rows stored as JSON text decode through the JSON columns"""
+    user_id = _create_user()
+    db.session.execute(text(
+        "INSERT INTO value_scenarios (id, user_id, scenario_type, input_data, nihao_benefits, alternative_costs, savings, created_at) "
+        "VALUES (:id, :user_id, 'buyer_swap', '{\"euaVolume\": 10}', '{}', '{}', 1.5, '2024-01-01 00:00:00')"
+    ), {'id': str(uuid.uuid4()), 'user_id': user_id})
+    db.session.commit()
+
+    data = client.get('/api/calculator/scenarios', headers={'X-User-ID': user_id}).get_json()
+    assert data['scenarios'][0]['inputData'] == {'euaVolume': 10}
+
+
+def test_unparseable_legacy_row_skipped(client, app):
+    """A legacy row that isn't valid JSON is left out instead of failing the page"""
+    user_id = _create_user()
+    _create_scenarios(user_id, 2)
+    db.session.execute(text(
+        "INSERT INTO value_scenarios (id, user_id, scenario_type, input_data, nihao_benefits, alternative_costs, savings, created_at) "
+        "VALUES (:id, :user_id, 'seller_cea', '{broken', '{}', '{}', 1.5, '2024-01-01 00:30:00')"
+    ), {'id': str(uuid.uuid4()), 'user_id': user_id})
+    db.session.commit()
+
+    data = client.get('/api/calculator/scenarios?limit=2', headers={'X-User-ID': user_id}).get_json()
+    assert [item['inputData'] for item in data['scenarios']] == [{'volume': 2000}]
+    assert data['hasMore'] is True
+    data = client.get(f"/api/calculator/scenarios?limit=2&cursor={data['nextCursor']}",
+                      headers={'X-User-ID': user_id}).get_json()
+    assert [item['inputData'] for item in data['scenarios']] == [{'volume': 1000}]
+
+    data = client.get('/api/calculator/scenarios?view=summary', headers={'X-User-ID': user_id}).get_json()
+    assert len(data['scenarios']) == 3
+
+
+def test_empty_pages(client, app):
+    """No scenarios, or a cursor past the last one, give an empty page in both views"""
+    user_id = _create_user()
+    headers = {'X-User-ID': user_id}
+    for view in ('full', 'summary'):
+        response = client.get(f'/api/calculator/scenarios?view={view}', headers=headers)
+        assert response.status_code == 200
+        assert response.get_json() == {'scenarios': [], 'nextCursor': None, 'hasMore': False}
+
+    _create_scenarios(user_id, 2)
+    data = client.get('/api/calculator/scenarios?limit=1', headers=headers).get_json()
+    data = client.get(f"/api/calculator/scenarios?limit=1&cursor={data['nextCursor']}", headers=headers).get_json()
+    assert data['hasMore'] is False
+    for view in ('full', 'summary'):
+        # Cursor of the oldest scenario: nothing comes after it
+        cursor = _encode_scenario_cursor(ValueScenario.query.order_by(ValueScenario.created_at).first())
+        response = client.get(f'/api/calculator/scenarios?view={view}&cursor={cursor}', headers=headers)
+        assert response.status_code == 200
+        assert response.get_json() == {'scenarios': [], 'nextCursor': None, 'hasMore': False}
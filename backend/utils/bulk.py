@@ -0,0 +1,113 @@
+"""
+Batch request helpers
+
+Parsing of batch payloads (JSON arrays or NDJSON) and set-based inserts used
+by the bulk listing/demand endpoints.
+"""
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from flask import request
+from sqlalchemy import insert
+from database import db
+
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+
+def parse_batch_payload(key: str) -> Tuple[Optional[List[Any]], Dict[int, str]]:
+    """
+    Parse the items of a batch request body.
+
+    Accepted formats:
+    - JSON array of objects
+    - JSON object with the array under ``key`` (e.g. {"listings": [...]})
+    - NDJSON (one JSON object per line) when Content-Type is application/x-ndjson
+
+    A malformed NDJSON line does not reject the whole batch; it is reported
+    as a per-item parse error instead.
+
+    Args:
+        key: Name of the array field in the JSON object form
+
+    Returns:
+        Tuple of (items or None if the body is not a valid batch, {index: parse error})
+    """
+    content_type = (request.mimetype or '').lower()
+
+    if content_type in NDJSON_CONTENT_TYPES:
+        items, parse_errors = [], {}
+        for line in request.get_data(as_text=True).splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as e:
+                parse_errors[len(items)] = f'Invalid JSON: {e}'
+                items.append(None)
+        return items, parse_errors
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get(key)
+    if not isinstance(data, list):
+        return None, {}
+    return data, {}
+
+
+def build_batch_rows(
+    items: List[Any],
+    build_row: Callable[[Dict], Tuple[Optional[Dict], Optional[Tuple[str, str]]]],
+    parse_errors: Optional[Dict[int, str]] = None
+) -> Tuple[List[Tuple[int, Dict]], List[Dict]]:
+    """
+    Validate every item of a batch and build insert rows.
+
+    Args:
+        items: Parsed batch items
+        build_row: Callable returning (row, None) or (None, (message, code))
+        parse_errors: Per-index parse errors from parse_batch_payload
+
+    Returns:
+        Tuple of ([(index, row)], [{index, error, code}])
+    """
+    parse_errors = parse_errors or {}
+    rows, errors = [], []
+
+    for index, item in enumerate(items):
+        if index in parse_errors:
+            errors.append({'index': index, 'error': parse_errors[index], 'code': 'INVALID_JSON'})
+            continue
+        if not isinstance(item, dict):
+            errors.append({'index': index, 'error': 'Item must be a JSON object', 'code': 'INVALID_ITEM'})
+            continue
+
+        row, error = build_row(item)
+        if error:
+            message, code = error
+            errors.append({'index': index, 'error': message, 'code': code})
+        else:
+            rows.append((index, row))
+
+    return rows, errors
+
+
+def bulk_insert(model, rows: List[Dict]):
+    """
+    Insert rows with a single executemany INSERT (no ORM object per row).
+
+    Caller is responsible for committing.
+
+    Args:
+        model: SQLAlchemy model class
+        rows: Column dictionaries
+    """
+    if rows:
+        db.session.execute(insert(model), rows)
+
+
+def batch_response_status(created_count: int, error_count: int) -> int:
+    """
+    HTTP status for a batch result: 201 all created, 207 partial, 400 none created
+    """
+    if error_count == 0:
+        return 201
+    return 207 if created_count else 400
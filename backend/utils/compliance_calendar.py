@@ -0,0 +1,187 @@
+"""
+Precomputed China ETS compliance calendar
+
+Day-indexed arrays of days-to-deadline, compliance period and market
+condition for a range of years, so single-date and whole-array lookups are
+index operations instead of date arithmetic.
+"""
+import threading
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from config import Config
+
+# Market condition codes stored in the calendar
+MARKET_CONDITIONS = np.array(['normal', 'compliance', 'panic'])
+NORMAL, COMPLIANCE, PANIC = 0, 1, 2
+
+
+def parse_date_list(value: str) -> list:
+    """Parse a comma-separated list of ISO dates (empty entries ignored)"""
+    return [date.fromisoformat(item.strip()) for item in (value or '').split(',') if item.strip()]
+
+
+class ComplianceCalendar:
+    """
+    China ETS compliance calendar over a range of years.
+
+    For every day from January 1 of the first year to December 31 of the
+    last year it stores:
+    - days_until: calendar days to the next deadline (0 on the deadline)
+    - business_days_until: weekdays to the next deadline, excluding holidays
+    - compliance: whether the day is in its deadline year's compliance
+      period (from compliance_start_month to the deadline)
+    - condition: 'panic' (<= panic_days to the deadline), 'compliance'
+      (<= compliance_days) or 'normal'
+
+    The deadline is December 31 unless overridden for a year. Lookups
+    outside the range extend it first (rebuilding the arrays once); all
+    arrays are replaced together, so readers never mix two builds.
+    """
+
+    def __init__(
+        self,
+        start_year: int,
+        end_year: int,
+        deadlines: Optional[Dict[int, date]] = None,
+        holidays: Optional[Iterable[date]] = None,
+        compliance_start_month: int = 10,
+        panic_days: int = 30,
+        compliance_days: int = 90
+    ):
+        """
+        Initialize calendar
+
+        Args:
+            start_year: First year covered
+            end_year: Last year covered
+            deadlines: Deadline per year overriding December 31
+            holidays: Non-business days besides weekends
+            compliance_start_month: First month of the compliance period
+            panic_days: Days before the deadline counted as 'panic'
+            compliance_days: Days before the deadline counted as 'compliance'
+        """
+        self.deadline_overrides = dict(deadlines or {})
+        self.holidays = np.array(sorted(set(holidays or ())), dtype='datetime64[D]')
+        self.compliance_start_month = compliance_start_month
+        self.panic_days = panic_days
+        self.compliance_days = compliance_days
+        self._lock = threading.Lock()
+        self._build(start_year, end_year)
+
+    def deadline(self, year: int) -> date:
+        """Compliance deadline of a year"""
+        return self.deadline_overrides.get(year, date(year, 12, 31))
+
+    def _build(self, start_year: int, end_year: int):
+        """Compute the day arrays for start_year..end_year"""
+        first = np.datetime64(f'{start_year}-01-01', 'D')
+        days = np.arange(first, np.datetime64(f'{end_year + 1}-01-01', 'D'))
+
+        # One year past the end so the last days still have a next deadline
+        deadlines = np.array(
+            [self.deadline(year) for year in range(start_year, end_year + 2)],
+            dtype='datetime64[D]'
+        )
+        deadline_index = np.searchsorted(deadlines, days, side='left')
+        next_deadline = deadlines[deadline_index]
+        days_until = (next_deadline - days).astype(np.int32)
+
+        deadline_years = next_deadline.astype('datetime64[Y]')
+        compliance_start = deadline_years.astype('datetime64[M]') + (self.compliance_start_month - 1)
+        compliance = days >= compliance_start.astype('datetime64[D]')
+
+        condition = np.select(
+            [days_until <= self.panic_days, days_until <= self.compliance_days],
+            [PANIC, COMPLIANCE],
+            default=NORMAL
+        ).astype(np.int8)
+
+        business_days_until = np.busday_count(days, next_deadline, holidays=self.holidays).astype(np.int32)
+
+        # Swap in the new arrays together so concurrent readers see a consistent set
+        self._arrays = (date(start_year, 1, 1), days_until, business_days_until, compliance, condition)
+        self.start_year = start_year
+        self.end_year = end_year
+
+    def _ensure(self, first: np.datetime64, last: np.datetime64):
+        """Extend the covered years to include first..last"""
+        first_year = int(str(first.astype('datetime64[Y]')))
+        last_year = int(str(last.astype('datetime64[Y]')))
+        if first_year >= self.start_year and last_year <= self.end_year:
+            return
+        with self._lock:
+            start_year = min(first_year, self.start_year)
+            end_year = max(last_year, self.end_year)
+            if start_year < self.start_year or end_year > self.end_year:
+                self._build(start_year, end_year)
+
+    def _lookup(self, check_date: Optional[date]):
+        """(arrays, index) of one date (default: today)"""
+        if check_date is None:
+            check_date = datetime.now().date()
+        elif isinstance(check_date, datetime):
+            check_date = check_date.date()
+        if not self.start_year <= check_date.year <= self.end_year:
+            day = np.datetime64(check_date, 'D')
+            self._ensure(day, day)
+        arrays = self._arrays
+        return arrays, (check_date - arrays[0]).days
+
+    def _lookup_many(self, dates):
+        """(arrays, indices) of an array of dates"""
+        days = np.asarray(dates, dtype='datetime64[D]')
+        if days.size:
+            self._ensure(days.min(), days.max())
+        arrays = self._arrays
+        return arrays, (days - np.datetime64(arrays[0], 'D')).astype(np.int64)
+
+    # Single-date lookups (default: today)
+
+    def days_until_deadline(self, check_date: Optional[date] = None) -> int:
+        arrays, index = self._lookup(check_date)
+        return int(arrays[1][index])
+
+    def business_days_until_deadline(self, check_date: Optional[date] = None) -> int:
+        arrays, index = self._lookup(check_date)
+        return int(arrays[2][index])
+
+    def is_compliance_period(self, check_date: Optional[date] = None) -> bool:
+        arrays, index = self._lookup(check_date)
+        return bool(arrays[3][index])
+
+    def market_condition(self, check_date: Optional[date] = None) -> str:
+        arrays, index = self._lookup(check_date)
+        return str(MARKET_CONDITIONS[arrays[4][index]])
+
+    # Vectorized lookups for whole date arrays
+
+    def days_until_deadlines(self, dates) -> np.ndarray:
+        arrays, indices = self._lookup_many(dates)
+        return arrays[1][indices]
+
+    def business_days_until_deadlines(self, dates) -> np.ndarray:
+        arrays, indices = self._lookup_many(dates)
+        return arrays[2][indices]
+
+    def compliance_periods(self, dates) -> np.ndarray:
+        arrays, indices = self._lookup_many(dates)
+        return arrays[3][indices]
+
+    def market_conditions(self, dates) -> np.ndarray:
+        arrays, indices = self._lookup_many(dates)
+        return MARKET_CONDITIONS[arrays[4][indices]]
+
+
+def _configured_deadlines() -> Dict[int, date]:
+    return {deadline.year: deadline for deadline in parse_date_list(Config.COMPLIANCE_DEADLINES)}
+
+
+compliance_calendar = ComplianceCalendar(
+    start_year=Config.COMPLIANCE_CALENDAR_START_YEAR,
+    end_year=Config.COMPLIANCE_CALENDAR_END_YEAR,
+    deadlines=_configured_deadlines(),
+    holidays=parse_date_list(Config.COMPLIANCE_HOLIDAYS)
+)
@@ -2,12 +2,17 @@
 Compliance Period Detection Utility for China ETS
 
 Detects compliance periods and market conditions for China ETS trading.
-China ETS compliance deadline: December 31 each year
+China ETS compliance deadline: December 31 each year (configurable per year,
+see utils/compliance_calendar.py)
 """
 
-from datetime import datetime, date
+from datetime import date
 from typing import Optional
 
+import numpy as np
+
+from utils.compliance_calendar import compliance_calendar
+
 
 class ComplianceDetector:
     """
@@ -16,6 +21,8 @@ class ComplianceDetector:
     China ETS compliance deadline: December 31 each year
     Panic period: October-December (high volume, price volatility)
     Off-season: January-September (low volume, stable prices)
+    
+    All lookups are served from the precomputed compliance calendar.
     """
     
     @staticmethod
@@ -29,9 +36,7 @@ class ComplianceDetector:
         Returns:
             True if date is in compliance period (Oct-Dec), False otherwise
         """
-        if check_date is None:
-            check_date = datetime.now().date()
-        return check_date.month >= 10
+        return compliance_calendar.is_compliance_period(check_date)
     
     @staticmethod
     def days_until_deadline(check_date: Optional[date] = None) -> int:
@@ -44,18 +49,17 @@ class ComplianceDetector:
         Returns:
             Number of days until December 31 deadline
         """
-        if check_date is None:
-            check_date = datetime.now().date()
-        current_year = check_date.year
-        deadline = date(current_year, 12, 31)
-        days_until = (deadline - check_date).days
-        
-        # If deadline has passed this year, calculate for next year
-        if days_until < 0:
-            deadline = date(current_year + 1, 12, 31)
-            days_until = (deadline - check_date).days
+        return compliance_calendar.days_until_deadline(check_date)
+    
+    @staticmethod
+    def business_days_until_deadline(check_date: Optional[date] = None) -> int:
+        """
+        Business days (weekdays, excluding configured holidays) until the deadline
         
-        return days_until
+        Args:
+            check_date: Date to check from (defaults to today)
+        """
+        return compliance_calendar.business_days_until_deadline(check_date)
     
     @staticmethod
     def get_market_condition(check_date: Optional[date] = None) -> str:
@@ -68,15 +72,37 @@ class ComplianceDetector:
         Returns:
             Market condition: 'panic', 'compliance', or 'normal'
         """
-        if check_date is None:
-            check_date = datetime.now().date()
+        return compliance_calendar.market_condition(check_date)
+    
+    @staticmethod
+    def days_until_deadlines(dates) -> np.ndarray:
+        """
+        Vectorized days_until_deadline for an array of dates
         
-        days_until = ComplianceDetector.days_until_deadline(check_date)
+        Args:
+            dates: Array-like of dates (datetime64, date or ISO strings)
+            
+        Returns:
+            Integer array of days until each date's deadline
+        """
+        return compliance_calendar.days_until_deadlines(dates)
+    
+    @staticmethod
+    def compliance_periods(dates) -> np.ndarray:
+        """
+        Vectorized is_compliance_period for an array of dates
         
-        if days_until <= 30:
-            return 'panic'  # Last month before deadline
-        elif days_until <= 90:
-            return 'compliance'  # Q4 compliance period
-        else:
-            return 'normal'  # Off-season
-
+        Returns:
+            Boolean array, True for dates in the compliance period
+        """
+        return compliance_calendar.compliance_periods(dates)
+    
+    @staticmethod
+    def market_conditions(dates) -> np.ndarray:
+        """
+        Vectorized get_market_condition for an array of dates
+        
+        Returns:
+            Array of 'panic', 'compliance' or 'normal'
+        """
+        return compliance_calendar.market_conditions(dates)
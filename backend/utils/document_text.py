@@ -0,0 +1,128 @@
+"""
+Field extraction from KYC document text
+
+Finds dates and company registration numbers in text extracted from
+uploaded documents (Romanian trade register certificates, Chinese business
+licences, English-language statements).
+"""
+import re
+from datetime import date
+from typing import Dict, List
+
+MONTHS = {
+    # English
+    'january': 1, 'february': 2, 'march': 3, 'april': 4, 'may': 5, 'june': 6,
+    'july': 7, 'august': 8, 'september': 9, 'october': 10, 'november': 11, 'december': 12,
+    # Romanian
+    'ianuarie': 1, 'februarie': 2, 'martie': 3, 'aprilie': 4, 'mai': 5, 'iunie': 6,
+    'iulie': 7, 'septembrie': 9, 'octombrie': 10, 'noiembrie': 11, 'decembrie': 12,
+}
+_MONTH_NAMES = '|'.join(sorted(MONTHS, key=len, reverse=True))
+
+# (pattern, group order) - numeric dates are read day first, as on EU documents
+DATE_PATTERNS = [
+    (re.compile(r'\b(\d{4})-(\d{1,2})-(\d{1,2})\b'), 'ymd'),
+    (re.compile(r'\b(\d{1,2})[./-](\d{1,2})[./-](\d{4})\b'), 'dmy'),
+    (re.compile(r'(\d{4})\s*年\s*(\d{1,2})\s*月\s*(\d{1,2})\s*日'), 'ymd'),
+    (re.compile(rf'\b(\d{{1,2}})\s+({_MONTH_NAMES})\s+(\d{{4}})\b', re.IGNORECASE), 'dmy'),
+    (re.compile(rf'\b({_MONTH_NAMES})\s+(\d{{1,2}}),?\s+(\d{{4}})\b', re.IGNORECASE), 'mdy'),
+]
+
+MIN_YEAR = 1900
+MAX_YEAR = 2100
+
+# Romanian trade register number, e.g. J40/1234/2020
+TRADE_REGISTER_PATTERN = re.compile(r'\b([JFC])\s?(\d{1,2})\s?/\s?(\d{1,8})\s?/\s?(\d{4})\b')
+# Romanian fiscal code (CUI/CIF), with its label
+TAX_ID_PATTERN = re.compile(
+    r'\b(?:CUI|CIF|C\.U\.I\.|C\.I\.F\.|Cod\s+fiscal|Cod\s+unic\s+de\s+[îi]nregistrare)\s*[:.]?\s*(RO)?\s?(\d{2,10})\b',
+    re.IGNORECASE
+)
+# Chinese unified social credit code (统一社会信用代码), 18 characters; CJK text
+# counts as word characters, so codes are delimited by lookarounds, not \b
+USCC_PATTERN = re.compile(r'(?<![0-9A-Z])([0-9A-HJ-NPQRTUWXY]{2}\d{6}[0-9A-HJ-NPQRTUWXY]{10})(?![0-9A-Z])')
+USCC_CHARSET = '0123456789ABCDEFGHJKLMNPQRTUWXY'
+USCC_WEIGHTS = (1, 3, 9, 27, 19, 26, 16, 17, 20, 29, 25, 13, 8, 24, 10, 30, 28)
+# Legal Entity Identifier (ISO 17442), 20 characters
+LEI_PATTERN = re.compile(r'(?<![0-9A-Z])([A-Z0-9]{18}\d{2})(?![0-9A-Z])')
+
+
+def _to_date(year: str, month: str, day: str):
+    try:
+        parsed = date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+    return parsed if MIN_YEAR <= parsed.year <= MAX_YEAR else None
+
+
+def extract_dates(text: str) -> List[date]:
+    """
+    Dates mentioned in a text.
+
+    Returns:
+        Distinct valid dates, sorted
+    """
+    found = set()
+    for pattern, order in DATE_PATTERNS:
+        for match in pattern.finditer(text or ''):
+            first, second, third = match.groups()
+            if order == 'ymd':
+                parsed = _to_date(first, second, third)
+            elif order == 'dmy':
+                month = second if second.isdigit() else MONTHS[second.lower()]
+                parsed = _to_date(third, month, first)
+            else:
+                parsed = _to_date(third, MONTHS[first.lower()], second)
+            if parsed:
+                found.add(parsed)
+    return sorted(found)
+
+
+def is_valid_uscc(code: str) -> bool:
+    """Check digit of a Chinese unified social credit code (GB 32100-2015)"""
+    if len(code) != 18 or any(char not in USCC_CHARSET for char in code):
+        return False
+    total = sum(USCC_CHARSET.index(char) * weight for char, weight in zip(code, USCC_WEIGHTS))
+    return USCC_CHARSET[(31 - total % 31) % 31] == code[17]
+
+
+def is_valid_lei(code: str) -> bool:
+    """ISO 7064 mod 97-10 check of a Legal Entity Identifier"""
+    if len(code) != 20 or not code.isalnum():
+        return False
+    return int(''.join(str(int(char, 36)) for char in code)) % 97 == 1
+
+
+def extract_registration_numbers(text: str) -> List[Dict[str, str]]:
+    """
+    Company registration numbers mentioned in a text.
+
+    Types: 'trade_register' (Romanian ONRC), 'tax_id' (Romanian CUI/CIF),
+    'uscc' (Chinese unified social credit code) and 'lei'. USCC and LEI
+    candidates must pass their check digits.
+
+    Returns:
+        List of {'type', 'value'} in order of appearance, without duplicates
+    """
+    text = text or ''
+    found = []
+    for match in TRADE_REGISTER_PATTERN.finditer(text):
+        prefix, county, number, year = match.groups()
+        found.append((match.start(), 'trade_register', f'{prefix}{int(county):02d}/{number}/{year}'))
+    for match in TAX_ID_PATTERN.finditer(text):
+        prefix, number = match.groups()
+        found.append((match.start(), 'tax_id', f"{'RO' if prefix else ''}{number}"))
+    for match in USCC_PATTERN.finditer(text):
+        if is_valid_uscc(match.group(1)):
+            found.append((match.start(), 'uscc', match.group(1)))
+    for match in LEI_PATTERN.finditer(text):
+        if is_valid_lei(match.group(1)):
+            found.append((match.start(), 'lei', match.group(1)))
+
+    results = []
+    seen = set()
+    for _, number_type, value in sorted(found):
+        if (number_type, value) not in seen:
+            seen.add((number_type, value))
+            results.append({'type': number_type, 'value': value})
+    return results
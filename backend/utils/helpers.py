@@ -5,6 +5,7 @@ import uuid
 from functools import wraps
 from flask import request, jsonify
 from .validators import validate_uuid
+from .identity import get_admin_status
 
 
 def generate_uuid():
@@ -60,7 +61,8 @@ def require_auth(f):
 def require_admin(f):
     """
     Decorator to require admin authentication
-    Verifies that the user exists in the database and has admin privileges
+    Verifies that the user exists in the database and has admin privileges.
+    The admin flag is read from the database, not the identity cache (see utils.identity).
     """
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -73,12 +75,11 @@ def require_admin(f):
             return standard_error_response('Invalid admin ID format', 'INVALID_ADMIN_ID', 400)
         
         # Check if user exists and has admin privileges
-        from models import User
-        admin_user = User.query.filter_by(id=admin_id).first()
-        if not admin_user:
+        is_admin = get_admin_status(admin_id)
+        if is_admin is None:
             return standard_error_response('Admin user not found', 'ADMIN_NOT_FOUND', 404)
         
-        if not admin_user.is_admin:
+        if not is_admin:
             return standard_error_response('Admin privileges required', 'ADMIN_PRIVILEGES_REQUIRED', 403)
         
         # Store admin_id in request context for use in route handlers
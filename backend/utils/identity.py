@@ -0,0 +1,181 @@
+"""
+Authenticated user identity helpers
+
+Loads the authenticated user at most once per request (stored in flask.g) and
+keeps a short-TTL cache of the fields needed for ownership checks (role,
+seller/buyer codes) so they don't hit the users table on every request.
+
+The cache is per process and invalidation only reaches the worker that made
+the change, so admin privileges are never served from it: admin checks read
+the request-local user or the database, so a revoked admin loses access on
+the next request in every worker.
+"""
+from typing import Optional, NamedTuple
+from flask import g, request, has_app_context
+from config import Config
+from .cache import TTLCache
+
+
+class UserIdentity(NamedTuple):
+    """Cacheable authorization subset of a User row (no admin flag, see get_admin_status)"""
+    id: str
+    role: Optional[object]
+    seller_code: Optional[str]
+    buyer_code: Optional[str]
+
+
+identity_cache = TTLCache(
+    maxsize=Config.IDENTITY_CACHE_MAX_SIZE,
+    ttl=Config.IDENTITY_CACHE_TTL_SECONDS
+)
+
+
+def _identity_from_user(user) -> UserIdentity:
+    """Build identity tuple from a User model instance"""
+    return UserIdentity(
+        id=user.id,
+        role=user.role,
+        seller_code=user.seller_code,
+        buyer_code=user.buyer_code
+    )
+
+
+def _load_user(user_id: str):
+    """
+    Load a User once per request.
+
+    Users loaded during the request are memoised in ``g._loaded_users`` so
+    repeated lookups for the same ID (handler, ownership check, admin check)
+    share one query.
+    """
+    from models import User
+
+    loaded = g.setdefault('_loaded_users', {})
+    if user_id not in loaded:
+        user = User.query.get(user_id)
+        loaded[user_id] = user
+        if user is not None:
+            identity_cache.set(user_id, _identity_from_user(user))
+    return loaded[user_id]
+
+
+def get_current_user():
+    """
+    Get the authenticated user (from X-User-ID) as a User model instance.
+
+    Must be called inside a route protected by @require_auth. The user is
+    loaded at most once per request.
+
+    Returns:
+        User instance or None if the user does not exist
+    """
+    user_id = getattr(request, 'user_id', None) or request.headers.get('X-User-ID')
+    if not user_id:
+        return None
+    user = _load_user(user_id)
+    g.current_user = user
+    return user
+
+
+def get_user_identity(user_id: str) -> Optional[UserIdentity]:
+    """
+    Get the authorization identity for a user ID.
+
+    Served from the request-local user if already loaded, then from the
+    short-TTL identity cache, and only then from the database.
+
+    Args:
+        user_id: User UUID
+
+    Returns:
+        UserIdentity or None if the user does not exist
+    """
+    if not user_id:
+        return None
+
+    loaded = g.get('_loaded_users', {})
+    if user_id in loaded:
+        user = loaded[user_id]
+        return _identity_from_user(user) if user is not None else None
+
+    identity = identity_cache.get(user_id)
+    if identity is not None:
+        return identity
+
+    user = _load_user(user_id)
+    return _identity_from_user(user) if user is not None else None
+
+
+def get_admin_status(user_id: str) -> Optional[bool]:
+    """
+    Get the admin flag of a user ID.
+
+    Read from the request-local user or the database, never from the
+    identity cache, so privilege changes apply to the next request in every
+    worker.
+
+    Returns:
+        True/False, or None if the user does not exist
+    """
+    if not user_id:
+        return None
+    user = _load_user(user_id)
+    return bool(user.is_admin) if user is not None else None
+
+
+def is_admin_user(user_id: str) -> bool:
+    """Check admin privileges for a user ID (see get_admin_status)"""
+    return get_admin_status(user_id) is True
+
+
+def invalidate_user_identity(user_id: str):
+    """
+    Drop cached identity for a user.
+
+    Must be called whenever role, seller_code or buyer_code changes, or
+    when the user is deleted.
+    """
+    identity_cache.invalidate(user_id)
+    if not has_app_context():
+        return
+    loaded = g.get('_loaded_users')
+    if loaded is not None:
+        loaded.pop(user_id, None)
+
+
+def ensure_seller_code(user_id: str, identity: UserIdentity):
+    """
+    Return the user's anonymous seller code, assigning one if missing.
+
+    A newly assigned code is only added to the session; the caller commits it
+    and then calls invalidate_user_identity().
+
+    Returns:
+        Tuple of (seller_code, assigned)
+    """
+    if identity.seller_code:
+        return identity.seller_code, False
+    # Generate unique seller code: SELLER-CN-{4-digit}
+    import random
+    code_number = random.randint(1000, 9999)
+    seller_code = f"SELLER-CN-{code_number}"
+    _load_user(user_id).seller_code = seller_code
+    return seller_code, True
+
+
+def ensure_buyer_code(user_id: str, identity: UserIdentity):
+    """
+    Return the user's anonymous buyer code, assigning one if missing.
+
+    Same contract as ensure_seller_code().
+
+    Returns:
+        Tuple of (buyer_code, assigned)
+    """
+    if identity.buyer_code:
+        return identity.buyer_code, False
+    import random
+    code_number = random.randint(1000, 9999)
+    buyer_code = f"BUYER-EU-{code_number}"
+    _load_user(user_id).buyer_code = buyer_code
+    return buyer_code, True
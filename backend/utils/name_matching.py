@@ -0,0 +1,177 @@
+"""
+Name normalisation and similarity for sanctions/PEP screening
+
+Names are compared as token lists: accents and punctuation are stripped,
+legal-form words dropped, and tokens matched with Jaro-Winkler so word order,
+middle names and small spelling differences don't hide a match.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Iterable, List, Optional, Set
+
+# Legal forms and connectives ignored when comparing names (kept if nothing else is left)
+NOISE_TOKENS = frozenset({
+    'srl', 'sa', 'sca', 'snc', 'pfa', 'ltd', 'limited', 'llc', 'inc', 'corp', 'co', 'plc', 'gmbh',
+    'company', 'ag', 'bv', 'nv', 'oy', 'ab', 'jsc', 'ooo', 'pjsc', 'ojsc', 'the', 'and', 'of', 'de', 'si',
+})
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys('bfpv', '1'), **dict.fromkeys('cgjkqsxz', '2'), **dict.fromkeys('dt', '3'),
+    'l': '4', **dict.fromkeys('mn', '5'), 'r': '6',
+}
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase ASCII letters and digits separated by single spaces"""
+    decomposed = unicodedata.normalize('NFKD', name or '')
+    ascii_name = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return _NON_ALNUM.sub(' ', ascii_name.lower()).strip()
+
+
+def name_tokens(name: str) -> List[str]:
+    """Normalised tokens of a name without legal forms"""
+    tokens = normalize_name(name).split()
+    meaningful = [token for token in tokens if token not in NOISE_TOKENS]
+    return meaningful or tokens
+
+
+def soundex(token: str) -> str:
+    """American Soundex code of a token (digits are kept as they are)"""
+    if not token or not token[0].isalpha():
+        return token
+    code = token[0]
+    previous = _SOUNDEX_CODES.get(token[0], '')
+    for char in token[1:]:
+        digit = _SOUNDEX_CODES.get(char, '')
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if char not in 'hw':
+            previous = digit
+    return code.ljust(4, '0')
+
+
+def trigrams(tokens: Iterable[str]) -> Set[str]:
+    """Character trigrams of each token, padded so word starts and ends count"""
+    grams = set()
+    for token in tokens:
+        padded = f'  {token} '
+        grams.update(padded[index:index + 3] for index in range(len(padded) - 2))
+    return grams
+
+
+def jaro(first: str, second: str) -> float:
+    """Jaro similarity (0..1)"""
+    if first == second:
+        return 1.0
+    len_first, len_second = len(first), len(second)
+    if not len_first or not len_second:
+        return 0.0
+
+    window = max(len_first, len_second) // 2 - 1
+    first_matched = [False] * len_first
+    second_matched = [False] * len_second
+    matches = 0
+    for index, char in enumerate(first):
+        start, end = max(0, index - window), min(index + window + 1, len_second)
+        for other in range(start, end):
+            if not second_matched[other] and second[other] == char:
+                first_matched[index] = second_matched[other] = True
+                matches += 1
+                break
+    if not matches:
+        return 0.0
+
+    transpositions = 0
+    other = 0
+    for index in range(len_first):
+        if first_matched[index]:
+            while not second_matched[other]:
+                other += 1
+            if first[index] != second[other]:
+                transpositions += 1
+            other += 1
+    transpositions //= 2
+    return (matches / len_first + matches / len_second + (matches - transpositions) / matches) / 3
+
+
+@lru_cache(maxsize=100000)
+def jaro_winkler(first: str, second: str, prefix_scale: float = 0.1) -> float:
+    """Jaro-Winkler similarity (0..1), boosting strings with a common prefix of up to 4 characters"""
+    similarity = jaro(first, second)
+    prefix = 0
+    for char_first, char_second in zip(first[:4], second[:4]):
+        if char_first != char_second:
+            break
+        prefix += 1
+    return similarity + prefix * prefix_scale * (1 - similarity)
+
+
+def levenshtein(first: str, second: str, max_distance: Optional[int] = None) -> int:
+    """
+    Edit distance (insertions, deletions, substitutions).
+
+    With max_distance, stops as soon as the distance must exceed it and
+    returns max_distance + 1.
+    """
+    if len(first) < len(second):
+        first, second = second, first
+    if max_distance is not None and len(first) - len(second) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(second) + 1))
+    for index, char in enumerate(first, 1):
+        current = [index]
+        for other, other_char in enumerate(second, 1):
+            current.append(min(
+                previous[other] + 1,
+                current[other - 1] + 1,
+                previous[other - 1] + (char != other_char)
+            ))
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def levenshtein_ratio(first: str, second: str, cutoff: float = 0.0) -> float:
+    """1 - edit distance / length of the longer string (0.0 if below cutoff)"""
+    longest = max(len(first), len(second))
+    if not longest:
+        return 1.0
+    max_distance = int((1 - cutoff) * longest) if cutoff else None
+    distance = levenshtein(first, second, max_distance)
+    if max_distance is not None and distance > max_distance:
+        return 0.0
+    return 1.0 - distance / longest
+
+
+def _aligned(tokens: List[str], others: List[str]) -> float:
+    """Length-weighted mean of each token's best Jaro-Winkler match among others"""
+    total = sum(len(token) for token in tokens)
+    return sum(len(token) * max(jaro_winkler(token, other) for other in others) for token in tokens) / total
+
+
+def name_similarity(query: List[str], candidate: List[str], cutoff: float = 0.0) -> float:
+    """
+    Similarity of two token lists (0..1).
+
+    Tokens are aligned independently of order. The shorter name's tokens
+    weigh most, so a missing middle name costs little, while tokens of
+    the longer name without a counterpart still lower the score. A
+    Levenshtein ratio over the sorted tokens catches split or merged words;
+    it is only computed when it can beat both the aligned score and cutoff
+    (scores below cutoff are therefore approximate).
+    """
+    if not query or not candidate:
+        return 0.0
+    shorter, longer = sorted((query, candidate), key=len)
+    score = 0.6 * _aligned(shorter, longer) + 0.4 * _aligned(longer, shorter)
+    joined_query, joined_candidate = ''.join(sorted(query)), ''.join(sorted(candidate))
+    lengths = sorted((len(joined_query), len(joined_candidate)))
+    if lengths[0] / lengths[1] > max(score, cutoff):
+        score = max(score, levenshtein_ratio(joined_query, joined_candidate, cutoff=max(score, cutoff)))
+    return round(score, 4)
@@ -0,0 +1,202 @@
+"""
+Time-indexed rolling window statistics
+"""
+import math
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+
+class RollingWindow:
+    """
+    Time-bounded window of price samples with incrementally maintained stats.
+
+    Each sample is appended and evicted exactly once, and every statistic
+    is kept as running sums or monotonic deques, so ``add`` is amortised
+    O(1) and every read is O(1):
+
+    - change: against the last known value at (latest - window): the
+      oldest sample if it sits exactly on the window start, otherwise
+      ``anchor``, the newest sample that has left the window
+    - high / low: monotonic deques
+    - mean / std: running sum and sum of squares
+    - volatility: std of log returns between consecutive samples,
+      annualised with the mean sampling interval
+    - twap: each sample's value weighted by how long it was the latest
+    - vwap: weighted by the optional sample volume (None without volumes)
+
+    Timestamps must be added in non-decreasing order.
+    """
+
+    def __init__(self, window: timedelta):
+        """
+        Initialize window
+
+        Args:
+            window: Time span kept in the window
+        """
+        self.window = window
+        # (timestamp, value, volume, log_return, held_value, held_seconds)
+        self._samples = deque()
+        self._maxima = deque()
+        self._minima = deque()
+        self._sum = 0.0
+        self._sum_squares = 0.0
+        self._returns = 0
+        self._return_sum = 0.0
+        self._return_sum_squares = 0.0
+        self._time_weighted_sum = 0.0
+        self._time_weight = 0.0
+        self._volume_weighted_sum = 0.0
+        self._volume = 0.0
+        self._last = None
+        self.anchor = None
+
+    def add(self, timestamp: datetime, value: float, volume: Optional[float] = None):
+        """Append a sample and evict the ones older than the window"""
+        log_return = None
+        held_value = None
+        held_seconds = 0.0
+        if self._last is not None:
+            last_timestamp, last_value = self._last
+            held_value = last_value
+            held_seconds = max(0.0, (timestamp - last_timestamp).total_seconds())
+            if last_value > 0 and value > 0:
+                log_return = math.log(value / last_value)
+
+        self._samples.append((timestamp, value, volume, log_return, held_value, held_seconds))
+        self._last = (timestamp, value)
+        self._apply(value, volume, log_return, held_value, held_seconds, 1)
+
+        while self._maxima and self._maxima[-1][1] <= value:
+            self._maxima.pop()
+        self._maxima.append((timestamp, value))
+        while self._minima and self._minima[-1][1] >= value:
+            self._minima.pop()
+        self._minima.append((timestamp, value))
+
+        cutoff = timestamp - self.window
+        while self._samples[0][0] < cutoff:
+            sample = self._samples.popleft()
+            self.anchor = (sample[0], sample[1])
+            self._apply(*sample[1:], -1)
+        while self._maxima[0][0] < cutoff:
+            self._maxima.popleft()
+        while self._minima[0][0] < cutoff:
+            self._minima.popleft()
+
+    def _apply(self, value, volume, log_return, held_value, held_seconds, sign):
+        """Add (sign=1) or remove (sign=-1) a sample's contribution to the sums"""
+        self._sum += sign * value
+        self._sum_squares += sign * value * value
+        if log_return is not None:
+            self._returns += sign
+            self._return_sum += sign * log_return
+            self._return_sum_squares += sign * log_return * log_return
+        if held_value is not None:
+            # The previous value was the latest for held_seconds before this sample
+            self._time_weighted_sum += sign * held_value * held_seconds
+            self._time_weight += sign * held_seconds
+        if volume:
+            self._volume_weighted_sum += sign * value * volume
+            self._volume += sign * volume
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    @property
+    def latest(self):
+        """(timestamp, value) of the newest sample, None if empty"""
+        return self._last if self._samples else None
+
+    def reference(self) -> Optional[float]:
+        """Value at (latest - window), None until the samples cover the window"""
+        if not self._samples:
+            return None
+        oldest = self._samples[0]
+        if oldest[0] <= self._last[0] - self.window:
+            return oldest[1]
+        return self.anchor[1] if self.anchor is not None else None
+
+    def change(self) -> Optional[float]:
+        """Change of the latest value over the window"""
+        reference = self.reference()
+        return self._last[1] - reference if reference is not None else None
+
+    def change_percent(self) -> Optional[float]:
+        reference = self.reference()
+        if not reference:
+            return None
+        return (self._last[1] - reference) / reference * 100
+
+    def high(self) -> Optional[float]:
+        return self._maxima[0][1] if self._maxima else None
+
+    def low(self) -> Optional[float]:
+        return self._minima[0][1] if self._minima else None
+
+    def mean(self) -> Optional[float]:
+        return self._sum / len(self._samples) if self._samples else None
+
+    def std(self) -> Optional[float]:
+        """Population standard deviation"""
+        if not self._samples:
+            return None
+        mean = self.mean()
+        return math.sqrt(max(0.0, self._sum_squares / len(self._samples) - mean * mean))
+
+    def z_score(self) -> Optional[float]:
+        """How many standard deviations the latest value is from the mean"""
+        if not self._samples:
+            return None
+        std = self.std()
+        return (self._last[1] - self.mean()) / std if std else 0.0
+
+    def volatility(self) -> Optional[float]:
+        """Annualised volatility of log returns, None with fewer than two returns"""
+        if self._returns < 2:
+            return None
+        mean = self._return_sum / self._returns
+        variance = max(0.0, self._return_sum_squares / self._returns - mean * mean)
+        span = (self._samples[-1][0] - self._samples[0][0]).total_seconds()
+        if span <= 0:
+            return None
+        interval = span / (len(self._samples) - 1)
+        return math.sqrt(variance * SECONDS_PER_YEAR / interval)
+
+    def twap(self) -> Optional[float]:
+        """Time-weighted average value (latest value if the window has no duration)"""
+        if not self._samples:
+            return None
+        if self._time_weight <= 0:
+            return self._last[1]
+        return self._time_weighted_sum / self._time_weight
+
+    def vwap(self) -> Optional[float]:
+        """Volume-weighted average value, None if no sample carried a volume"""
+        if self._volume <= 0:
+            return None
+        return self._volume_weighted_sum / self._volume
+
+    def stats(self, digits: int = 2) -> Dict:
+        """All window statistics as a dict (empty window: counts only)"""
+        def rounded(value, places=digits):
+            return round(value, places) if value is not None else None
+
+        return {
+            'change': rounded(self.change()),
+            'change_percent': rounded(self.change_percent()),
+            'high': rounded(self.high()),
+            'low': rounded(self.low()),
+            'mean': rounded(self.mean(), 4),
+            'std': rounded(self.std(), 4),
+            'z_score': rounded(self.z_score(), 4),
+            'volatility': rounded(self.volatility(), 4),
+            'twap': rounded(self.twap(), 4),
+            'vwap': rounded(self.vwap(), 4),
+            'samples': len(self._samples),
+            'complete': self.reference() is not None,
+            'window_hours': self.window.total_seconds() / 3600,
+        }
@@ -0,0 +1,116 @@
+"""
+Server-Sent Events helpers
+"""
+import json
+import threading
+from typing import Any, Iterable, Optional
+from flask import Response, stream_with_context
+from config import Config
+from utils.helpers import standard_error_response
+
+
+def format_sse(data: Any = None, event: Optional[str] = None,
+               event_id: Optional[Any] = None, retry_ms: Optional[int] = None) -> str:
+    """
+    Format one SSE frame.
+
+    Args:
+        data: Payload; non-string values are JSON encoded
+        event: Optional event name
+        event_id: Optional event ID (sent back by the browser as Last-Event-ID)
+        retry_ms: Optional reconnection delay hint in milliseconds
+
+    Returns:
+        Frame text terminated by a blank line
+    """
+    lines = []
+    if retry_ms is not None:
+        lines.append(f'retry: {int(retry_ms)}')
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event:
+        lines.append(f'event: {event}')
+    if data is not None:
+        payload = data if isinstance(data, str) else json.dumps(data, separators=(',', ':'))
+        lines.extend(f'data: {line}' for line in payload.splitlines() or [''])
+    return '\n'.join(lines) + '\n\n'
+
+
+def sse_heartbeat() -> str:
+    """Comment frame that keeps idle connections (and proxies) open"""
+    return ': keep-alive\n\n'
+
+
+def last_event_id(request, arg_name: str = 'since') -> Optional[str]:
+    """
+    Resume position sent by the client.
+
+    Browsers resend the last received ID in the Last-Event-ID header when
+    reconnecting; clients can also pass it explicitly as a query parameter.
+    """
+    return request.headers.get('Last-Event-ID') or request.args.get(arg_name)
+
+
+def sse_response(frames: Iterable[str]) -> Response:
+    """
+    Wrap a frame generator in a streaming text/event-stream response.
+
+    The generator runs inside the request context, so it may use the
+    database session; it must release the session between waits.
+    """
+    response = Response(stream_with_context(frames), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Disable proxy buffering (nginx)
+    return response
+
+
+class StreamSlots:
+    """
+    Per-worker cap on long-lived connections (SSE, WebSocket, long-poll).
+
+    Each open stream holds one of the worker's threads for its whole life,
+    so without a cap enough idle subscribers starve ordinary API requests.
+    """
+
+    def __init__(self, limit: int):
+        """
+        Initialize stream slots
+
+        Args:
+            limit: Maximum concurrent streams in this process (0 disables the cap)
+        """
+        self.limit = limit
+        self._in_use = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        """Take a slot; False when the worker is at capacity"""
+        with self._lock:
+            if self.limit and self._in_use >= self.limit:
+                self._rejected += 1
+                return False
+            self._in_use += 1
+            return True
+
+    def release(self):
+        """Give a slot back"""
+        with self._lock:
+            self._in_use = max(0, self._in_use - 1)
+
+    def get_stats(self):
+        """Return slot counters for monitoring"""
+        with self._lock:
+            return {'in_use': self._in_use, 'limit': self.limit, 'rejected': self._rejected}
+
+
+def stream_capacity_response():
+    """503 with Retry-After for a stream refused by StreamSlots"""
+    response, status = standard_error_response(
+        'Too many open streams, retry later', 'STREAM_CAPACITY_EXCEEDED', 503
+    )
+    response.headers['Retry-After'] = str(Config.STREAM_RETRY_AFTER_SECONDS)
+    return response, status
+
+
+stream_slots = StreamSlots(limit=Config.STREAM_MAX_CONNECTIONS_PER_WORKER)
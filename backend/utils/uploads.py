@@ -0,0 +1,35 @@
+"""
+Upload request helpers
+
+Werkzeug parses multipart bodies lazily, on the first access to
+request.files or request.form, and writes file parts into containers made by
+Request._get_file_stream. UploadRequest lets a view pick that container, so
+an upload route can spool its parts straight to their destination while the
+body is received.
+"""
+from flask import Request, current_app
+
+
+def file_stream_factory(factory):
+    """
+    Decorator: parse file parts of this view's requests into factory(...)
+
+    Args:
+        factory: Werkzeug stream_factory, called as
+                 factory(total_content_length, content_type, filename, content_length)
+    """
+    def decorator(view):
+        view.file_stream_factory = factory
+        return view
+    return decorator
+
+
+class UploadRequest(Request):
+    """Request whose file part containers come from the matched view's file_stream_factory"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        view = current_app.view_functions.get(self.endpoint) if self.endpoint else None
+        factory = getattr(view, 'file_stream_factory', None)
+        if factory is None:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        return factory(total_content_length, content_type, filename, content_length)